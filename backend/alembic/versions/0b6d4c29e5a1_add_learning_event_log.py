@@ -0,0 +1,59 @@
+"""Add learning event log
+
+Revision ID: 0b6d4c29e5a1
+Revises: e9f3a85b2d17
+Create Date: 2026-10-19 15:03:44.610382
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6d4c29e5a1'
+down_revision: Union[str, None] = 'e9f3a85b2d17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        # Range partitioned by day; daily partitions are created ahead of time
+        # by the event flusher, the default partition catches anything else
+        op.execute("""
+            CREATE TABLE events (
+                id BIGSERIAL NOT NULL,
+                event_date DATE NOT NULL,
+                event_type VARCHAR(50) NOT NULL,
+                user_id INTEGER,
+                course_id INTEGER,
+                entity_id INTEGER,
+                payload JSON,
+                occurred_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+                PRIMARY KEY (event_date, id)
+            ) PARTITION BY RANGE (event_date)
+        """)
+        op.execute("CREATE TABLE events_default PARTITION OF events DEFAULT")
+    else:
+        op.create_table('events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_date', sa.Date(), nullable=False),
+        sa.Column('event_type', sa.String(length=50), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('course_id', sa.Integer(), nullable=True),
+        sa.Column('entity_id', sa.Integer(), nullable=True),
+        sa.Column('payload', sa.JSON(), nullable=True),
+        sa.Column('occurred_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    op.create_index('ix_events_date_type', 'events', ['event_date', 'event_type'], unique=False)
+    op.create_index('ix_events_course_occurred', 'events', ['course_id', 'occurred_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_events_course_occurred', table_name='events')
+    op.drop_index('ix_events_date_type', table_name='events')
+    op.drop_table('events')
@@ -0,0 +1,64 @@
+"""Add unread notification counters and partial unread index
+
+Revision ID: 2c8f5e1a7d49
+Revises: 9e4c7a1d2b56
+Create Date: 2026-10-19 21:05:37.640218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c8f5e1a7d49'
+down_revision: Union[str, None] = '9e4c7a1d2b56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Deployments that created their schema with create_tables.py already have
+    # the notifications table; earlier revisions never created it
+    if not sa.inspect(op.get_bind()).has_table('notifications'):
+        op.create_table('notifications',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('message', sa.String(), nullable=False),
+            sa.Column('type', sa.String(), nullable=False),
+            sa.Column('related_id', sa.Integer(), nullable=True),
+            sa.Column('is_read', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_notifications_id'), 'notifications', ['id'], unique=False)
+
+    op.create_index(
+        'ix_notifications_user_unread', 'notifications', ['user_id'], unique=False,
+        postgresql_where=sa.text('is_read = false'),
+        sqlite_where=sa.text('is_read = 0')
+    )
+
+    op.create_table('notification_counters',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('unread_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Backfill from the existing notifications
+    op.execute("""
+        INSERT INTO notification_counters (user_id, unread_count, updated_at)
+        SELECT user_id, COUNT(*), CURRENT_TIMESTAMP
+        FROM notifications
+        WHERE is_read = false
+        GROUP BY user_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('notification_counters')
+    op.drop_index('ix_notifications_user_unread', table_name='notifications')
@@ -0,0 +1,76 @@
+"""Make course progress unique per enrollment and lesson
+
+Revision ID: 3f7c1b8e6a90
+Revises: d5a92e7f3b61
+Create Date: 2026-10-19 16:34:51.402716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f7c1b8e6a90'
+down_revision: Union[str, None] = 'd5a92e7f3b61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Fold duplicates left by the old select-then-insert path into the newest
+    # row of each (enrollment, lesson), keeping the furthest progress
+    op.execute("""
+        UPDATE course_progresses
+        SET completed = EXISTS (
+                SELECT 1 FROM course_progresses dup
+                WHERE dup.enrollment_id = course_progresses.enrollment_id
+                  AND dup.lesson_id = course_progresses.lesson_id
+                  AND dup.completed
+            ),
+            progress_percentage = (
+                SELECT MAX(dup.progress_percentage) FROM course_progresses dup
+                WHERE dup.enrollment_id = course_progresses.enrollment_id
+                  AND dup.lesson_id = course_progresses.lesson_id
+            ),
+            completed_at = (
+                SELECT MIN(dup.completed_at) FROM course_progresses dup
+                WHERE dup.enrollment_id = course_progresses.enrollment_id
+                  AND dup.lesson_id = course_progresses.lesson_id
+            )
+        WHERE id IN (
+            SELECT MAX(id) FROM course_progresses
+            GROUP BY enrollment_id, lesson_id
+            HAVING COUNT(*) > 1
+        )
+    """)
+    op.execute("""
+        DELETE FROM course_progresses
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM course_progresses
+            GROUP BY enrollment_id, lesson_id
+        )
+    """)
+
+    # Duplicates were counted twice by the enrollment counters
+    op.execute("""
+        UPDATE enrollments
+        SET completed_lessons = (
+            SELECT COUNT(*) FROM course_progresses
+            WHERE course_progresses.enrollment_id = enrollments.id
+              AND course_progresses.completed
+        )
+    """)
+
+    # A unique index rather than a constraint so SQLite can add it in place
+    op.create_index(
+        'uq_course_progresses_enrollment_lesson',
+        'course_progresses',
+        ['enrollment_id', 'lesson_id'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_course_progresses_enrollment_lesson', table_name='course_progresses')
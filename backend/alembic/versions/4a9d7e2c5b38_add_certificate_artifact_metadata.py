@@ -0,0 +1,54 @@
+"""Add rendered artifact metadata to certificates
+
+Revision ID: 4a9d7e2c5b38
+Revises: 8c4e2a7f9d13
+Create Date: 2026-10-19 17:46:12.873520
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a9d7e2c5b38'
+down_revision: Union[str, None] = '8c4e2a7f9d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ARTIFACT_COLUMNS = (
+    ('png_sha256', sa.String(length=64)),
+    ('png_size', sa.Integer()),
+    ('pdf_sha256', sa.String(length=64)),
+    ('pdf_size', sa.Integer()),
+    ('rendered_at', sa.DateTime()),
+)
+
+
+def upgrade() -> None:
+    # Deployments that created their schema with create_tables.py already have
+    # the certificates table; earlier revisions never created it
+    if not sa.inspect(op.get_bind()).has_table('certificates'):
+        op.create_table('certificates',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('course_id', sa.Integer(), nullable=False),
+            sa.Column('certificate_id', sa.String(), nullable=False),
+            sa.Column('issued_at', sa.DateTime(), nullable=True),
+            *(sa.Column(name, column_type, nullable=True) for name, column_type in ARTIFACT_COLUMNS),
+            sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_certificates_id'), 'certificates', ['id'], unique=False)
+        op.create_index(op.f('ix_certificates_certificate_id'), 'certificates', ['certificate_id'], unique=True)
+        return
+
+    for name, column_type in ARTIFACT_COLUMNS:
+        op.add_column('certificates', sa.Column(name, column_type, nullable=True))
+
+
+def downgrade() -> None:
+    for name, _ in reversed(ARTIFACT_COLUMNS):
+        op.drop_column('certificates', name)
@@ -0,0 +1,30 @@
+"""Add a server-side synced_at cursor to course progress
+
+Revision ID: 4d8b2e6f9a15
+Revises: 7a3e9c5d1f24
+Create Date: 2026-10-19 23:12:46.581930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d8b2e6f9a15'
+down_revision: Union[str, None] = '7a3e9c5d1f24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('course_progresses', sa.Column('synced_at', sa.DateTime(), nullable=True))
+    # Existing rows were last written no later than their device time
+    op.execute("UPDATE course_progresses SET synced_at = updated_at")
+    op.create_index(op.f('ix_course_progresses_synced_at'), 'course_progresses', ['synced_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_course_progresses_synced_at'), table_name='course_progresses')
+    op.drop_column('course_progresses', 'synced_at')
@@ -0,0 +1,74 @@
+"""Add per-question incorrect answer counters
+
+Revision ID: 5e8b2f61c7a4
+Revises: a3c1e7d94b20
+Create Date: 2026-10-19 11:02:37.540219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8b2f61c7a4'
+down_revision: Union[str, None] = 'a3c1e7d94b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_question_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('attempt_count', sa.Integer(), nullable=False),
+    sa.Column('incorrect_count', sa.Integer(), nullable=False),
+    sa.Column('last_attempt_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ),
+    sa.ForeignKeyConstraint(['question_id'], ['quiz_questions.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'question_id')
+    )
+    op.create_index('ix_user_question_stats_user_incorrect', 'user_question_stats', ['user_id', 'incorrect_count'], unique=False)
+
+    op.create_table('question_stats',
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('quiz_id', sa.Integer(), nullable=False),
+    sa.Column('attempt_count', sa.Integer(), nullable=False),
+    sa.Column('incorrect_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ),
+    sa.ForeignKeyConstraint(['question_id'], ['quiz_questions.id'], ),
+    sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ),
+    sa.PrimaryKeyConstraint('question_id')
+    )
+    op.create_index('ix_question_stats_course_incorrect', 'question_stats', ['course_id', 'incorrect_count'], unique=False)
+
+    # Backfill counters from answers graded before this migration
+    op.execute("""
+        INSERT INTO user_question_stats (user_id, question_id, course_id, attempt_count, incorrect_count, last_attempt_at)
+        SELECT s.user_id, a.question_id, q.course_id, COUNT(*),
+               SUM(CASE WHEN a.is_correct THEN 0 ELSE 1 END), MAX(s.submitted_at)
+        FROM quiz_submission_answers a
+        JOIN quiz_submissions s ON s.id = a.submission_id
+        JOIN quizzes q ON q.id = s.quiz_id
+        GROUP BY s.user_id, a.question_id, q.course_id
+    """)
+    op.execute("""
+        INSERT INTO question_stats (question_id, course_id, quiz_id, attempt_count, incorrect_count)
+        SELECT qq.id, q.course_id, q.id, COUNT(*),
+               SUM(CASE WHEN a.is_correct THEN 0 ELSE 1 END)
+        FROM quiz_submission_answers a
+        JOIN quiz_questions qq ON qq.id = a.question_id
+        JOIN quizzes q ON q.id = qq.quiz_id
+        GROUP BY qq.id, q.course_id, q.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_question_stats_course_incorrect', table_name='question_stats')
+    op.drop_table('question_stats')
+    op.drop_index('ix_user_question_stats_user_incorrect', table_name='user_question_stats')
+    op.drop_table('user_question_stats')
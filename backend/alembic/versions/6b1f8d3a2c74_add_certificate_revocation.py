@@ -0,0 +1,28 @@
+"""Add revocation time to certificates
+
+Revision ID: 6b1f8d3a2c74
+Revises: 4a9d7e2c5b38
+Create Date: 2026-10-19 18:21:40.215967
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b1f8d3a2c74'
+down_revision: Union[str, None] = '4a9d7e2c5b38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('certificates', sa.Column('revoked_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_certificates_revoked_at', 'certificates', ['revoked_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_certificates_revoked_at', table_name='certificates')
+    op.drop_column('certificates', 'revoked_at')
@@ -0,0 +1,42 @@
+"""Make certificates unique per learner and course
+
+Revision ID: 7a3e9c5d1f24
+Revises: 2c8f5e1a7d49
+Create Date: 2026-10-19 22:41:07.318254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3e9c5d1f24'
+down_revision: Union[str, None] = '2c8f5e1a7d49'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Concurrent batch runs could issue a learner several certificates for
+    # one course; keep the earliest, which is the one learners were sent
+    op.execute("""
+        DELETE FROM certificates
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM certificates
+            GROUP BY user_id, course_id
+        )
+    """)
+
+    # A unique index rather than a constraint so SQLite can add it in place
+    op.create_index(
+        'uq_certificates_user_course',
+        'certificates',
+        ['user_id', 'course_id'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_certificates_user_course', table_name='certificates')
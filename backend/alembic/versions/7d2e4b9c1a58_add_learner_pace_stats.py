@@ -0,0 +1,65 @@
+"""Store lesson completion durations and per-learner pace totals
+
+Revision ID: 7d2e4b9c1a58
+Revises: 0b6d4c29e5a1
+Create Date: 2026-10-19 14:05:12.418306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e4b9c1a58'
+down_revision: Union[str, None] = '0b6d4c29e5a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+DURATION_SQL = {
+    'postgresql': "EXTRACT(EPOCH FROM completed_at - started_at)",
+    'sqlite': "(julianday(completed_at) - julianday(started_at)) * 86400",
+}
+
+
+def upgrade() -> None:
+    op.create_table('learner_pace_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('completed_lessons', sa.Integer(), nullable=False),
+    sa.Column('total_completion_seconds', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    bind = op.get_bind()
+    if 'lesson_progresses' not in sa.inspect(bind).get_table_names():
+        return
+
+    op.add_column('lesson_progresses', sa.Column('completion_seconds', sa.Integer(), nullable=True))
+
+    # Backfill durations and running totals for lessons completed before this migration
+    duration = DURATION_SQL.get(bind.dialect.name)
+    if duration is None:
+        return
+
+    op.execute(f"""
+        UPDATE lesson_progresses
+        SET completion_seconds = CAST({duration} AS INTEGER)
+        WHERE is_completed AND started_at IS NOT NULL AND completed_at IS NOT NULL
+    """)
+    op.execute("""
+        INSERT INTO learner_pace_stats (user_id, completed_lessons, total_completion_seconds, updated_at)
+        SELECT user_id, COUNT(*), SUM(completion_seconds), CURRENT_TIMESTAMP
+        FROM lesson_progresses
+        WHERE is_completed AND completion_seconds IS NOT NULL
+        GROUP BY user_id
+    """)
+
+
+def downgrade() -> None:
+    if 'lesson_progresses' in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_column('lesson_progresses', 'completion_seconds')
+    op.drop_table('learner_pace_stats')
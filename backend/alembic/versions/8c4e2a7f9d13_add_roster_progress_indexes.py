@@ -0,0 +1,28 @@
+"""Add indexes for course roster progress pages
+
+Revision ID: 8c4e2a7f9d13
+Revises: 3f7c1b8e6a90
+Create Date: 2026-10-19 17:08:26.539104
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4e2a7f9d13'
+down_revision: Union[str, None] = '3f7c1b8e6a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_enrollments_course_progress', 'enrollments', ['course_id', 'completed_lessons', 'id'], unique=False)
+    op.create_index('ix_quiz_submissions_user_quiz', 'quiz_submissions', ['user_id', 'quiz_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_quiz_submissions_user_quiz', table_name='quiz_submissions')
+    op.drop_index('ix_enrollments_course_progress', table_name='enrollments')
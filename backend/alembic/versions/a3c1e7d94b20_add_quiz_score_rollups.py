@@ -0,0 +1,54 @@
+"""Add quiz score rollups
+
+Revision ID: a3c1e7d94b20
+Revises: f0b5d2235f06
+Create Date: 2026-10-19 09:12:04.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c1e7d94b20'
+down_revision: Union[str, None] = 'f0b5d2235f06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('quiz_score_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('granularity', sa.String(length=10), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('quiz_id', sa.Integer(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('passes', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.Column('score_sq_sum', sa.Float(), nullable=False),
+    sa.Column('score_histogram', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ),
+    sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('granularity', 'course_id', 'quiz_id', 'bucket_start', name='uq_quiz_score_rollup_bucket')
+    )
+    op.create_index(op.f('ix_quiz_score_rollups_id'), 'quiz_score_rollups', ['id'], unique=False)
+    op.create_index('ix_quiz_score_rollups_course_bucket', 'quiz_score_rollups', ['granularity', 'course_id', 'bucket_start'], unique=False)
+
+    op.create_table('rollup_watermarks',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('last_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rollup_watermarks')
+    op.drop_index('ix_quiz_score_rollups_course_bucket', table_name='quiz_score_rollups')
+    op.drop_index(op.f('ix_quiz_score_rollups_id'), table_name='quiz_score_rollups')
+    op.drop_table('quiz_score_rollups')
@@ -0,0 +1,38 @@
+"""Shard score sketches
+
+Revision ID: b6e1d4a8c352
+Revises: 4d8b2e6f9a15
+Create Date: 2026-10-19 23:58:17.402938
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e1d4a8c352'
+down_revision: Union[str, None] = '4d8b2e6f9a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing digests become shard 0
+    with op.batch_alter_table('score_sketches', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('shard', sa.Integer(), nullable=False, server_default='0'))
+        # SQLite's primary key is unnamed; the batch rebuild replaces it
+        if op.get_bind().dialect.name != 'sqlite':
+            batch_op.drop_constraint('score_sketches_pkey', type_='primary')
+        batch_op.create_primary_key('score_sketches_pkey', ['scope', 'scope_id', 'shard'])
+
+
+def downgrade() -> None:
+    # Digests cannot be merged in SQL; keep shard 0 and rebuild quiz digests afterwards
+    op.execute("DELETE FROM score_sketches WHERE shard <> 0")
+    with op.batch_alter_table('score_sketches', schema=None) as batch_op:
+        if op.get_bind().dialect.name != 'sqlite':
+            batch_op.drop_constraint('score_sketches_pkey', type_='primary')
+        batch_op.create_primary_key('score_sketches_pkey', ['scope', 'scope_id'])
+        batch_op.drop_column('shard')
@@ -0,0 +1,44 @@
+"""Add denormalized progress counters to enrollments
+
+Revision ID: b81f5c3d2e47
+Revises: 7d2e4b9c1a58
+Create Date: 2026-10-19 15:10:44.902317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81f5c3d2e47'
+down_revision: Union[str, None] = '7d2e4b9c1a58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('enrollments', sa.Column('completed_lessons', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('enrollments', sa.Column('total_lessons', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('enrollments', sa.Column('last_activity_at', sa.DateTime(), nullable=True))
+
+    # Backfill counters for existing enrollments
+    op.execute("""
+        UPDATE enrollments SET
+            total_lessons = (SELECT COUNT(*) FROM lessons WHERE lessons.course_id = enrollments.course_id),
+            completed_lessons = (
+                SELECT COUNT(*) FROM course_progresses
+                WHERE course_progresses.enrollment_id = enrollments.id AND course_progresses.completed
+            ),
+            last_activity_at = (
+                SELECT MAX(course_progresses.completed_at) FROM course_progresses
+                WHERE course_progresses.enrollment_id = enrollments.id
+            )
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('enrollments', 'last_activity_at')
+    op.drop_column('enrollments', 'total_lessons')
+    op.drop_column('enrollments', 'completed_lessons')
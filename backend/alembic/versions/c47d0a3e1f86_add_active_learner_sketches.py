@@ -0,0 +1,33 @@
+"""Add active learner sketches
+
+Revision ID: c47d0a3e1f86
+Revises: 5e8b2f61c7a4
+Create Date: 2026-10-19 12:20:51.802733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47d0a3e1f86'
+down_revision: Union[str, None] = '5e8b2f61c7a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('active_learner_sketches',
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('sketch', sa.LargeBinary(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ),
+    sa.PrimaryKeyConstraint('course_id', 'day')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('active_learner_sketches')
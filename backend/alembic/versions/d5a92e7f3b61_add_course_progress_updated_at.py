@@ -0,0 +1,27 @@
+"""Add updated_at to course progress for offline sync conflict resolution
+
+Revision ID: d5a92e7f3b61
+Revises: b81f5c3d2e47
+Create Date: 2026-10-19 15:52:03.117845
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a92e7f3b61'
+down_revision: Union[str, None] = 'b81f5c3d2e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('course_progresses', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE course_progresses SET updated_at = completed_at")
+
+
+def downgrade() -> None:
+    op.drop_column('course_progresses', 'updated_at')
@@ -0,0 +1,26 @@
+"""Index notifications for the quiz reminder resend guard
+
+Revision ID: e3c7a9f15b80
+Revises: b6e1d4a8c352
+Create Date: 2026-10-20 00:41:53.218406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3c7a9f15b80'
+down_revision: Union[str, None] = 'b6e1d4a8c352'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_notifications_user_type_related', 'notifications', ['user_id', 'type', 'related_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notifications_user_type_related', table_name='notifications')
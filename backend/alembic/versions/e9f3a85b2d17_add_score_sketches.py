@@ -0,0 +1,33 @@
+"""Add score sketches
+
+Revision ID: e9f3a85b2d17
+Revises: c47d0a3e1f86
+Create Date: 2026-10-19 13:41:09.274615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9f3a85b2d17'
+down_revision: Union[str, None] = 'c47d0a3e1f86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('score_sketches',
+    sa.Column('scope', sa.String(length=10), nullable=False),
+    sa.Column('scope_id', sa.Integer(), nullable=False),
+    sa.Column('digest', sa.LargeBinary(), nullable=False),
+    sa.Column('sample_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('scope', 'scope_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('score_sketches')
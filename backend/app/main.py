@@ -1,6 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import users, courses, enrollments, progress, lessons, assessments
+from app.services.event_pipeline import event_pipeline
+from app.services.heartbeat_buffer import heartbeat_buffer
+from app.services.certificate_renderer import certificate_renderer
+from app.services.certificate_signing import certificate_revocations
+from app.services.smtp_pool import smtp_pool
+from app.services.notification_outbox import notification_outbox_worker
+from app.services.notification_service import NotificationService
+from app.routes import users, courses, enrollments, progress, lessons, assessments, analytics, exports, certificates, notifications
 
 app = FastAPI(title="Swahili Learn LMS", version="0.1.0")
 
@@ -20,6 +27,29 @@ app.include_router(enrollments.router, prefix="/enrollments", tags=["enrollments
 app.include_router(progress.router, prefix="/progress", tags=["progress"])
 app.include_router(lessons.router)
 app.include_router(assessments.router)
+app.include_router(analytics.router)
+app.include_router(exports.router)
+app.include_router(certificates.router)
+app.include_router(notifications.router)
+
+@app.on_event("startup")
+def start_background_writers():
+    event_pipeline.start()
+    heartbeat_buffer.start()
+    certificate_revocations.start()
+    # Combine held emails into per-user digests before each delivery round
+    notification_outbox_worker.add_stage(NotificationService.digest_pending_emails)
+    notification_outbox_worker.start()
+
+@app.on_event("shutdown")
+def stop_background_writers():
+    # Flush buffered learning events and heartbeats before the process exits
+    heartbeat_buffer.stop()
+    event_pipeline.stop()
+    certificate_renderer.shutdown()
+    certificate_revocations.stop()
+    notification_outbox_worker.stop()
+    smtp_pool.close()
 
 @app.get("/")
 async def root():
@@ -5,3 +5,5 @@ from .lesson import *
 from .lesson_progress import *
 from .notification import *
 from .user import *
+from .analytics import *
+from .event import *
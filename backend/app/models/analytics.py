@@ -0,0 +1,105 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Date, ForeignKey, Float, JSON, LargeBinary, UniqueConstraint, Index
+from datetime import datetime
+
+from app.services.database import Base
+
+class QuizScoreRollup(Base):
+    """
+    Pre-aggregated quiz submission statistics per (course, quiz) and time bucket
+    """
+    __tablename__ = "quiz_score_rollups"
+    __table_args__ = (
+        UniqueConstraint('granularity', 'course_id', 'quiz_id', 'bucket_start', name='uq_quiz_score_rollup_bucket'),
+        Index('ix_quiz_score_rollups_course_bucket', 'granularity', 'course_id', 'bucket_start'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    granularity = Column(String(10), nullable=False)  # 'hour' or 'day'
+    bucket_start = Column(DateTime, nullable=False)
+    course_id = Column(Integer, ForeignKey('courses.id'), nullable=False)
+    quiz_id = Column(Integer, ForeignKey('quizzes.id'), nullable=False)
+
+    attempts = Column(Integer, default=0, nullable=False)
+    passes = Column(Integer, default=0, nullable=False)
+    score_sum = Column(Float, default=0.0, nullable=False)
+    score_sq_sum = Column(Float, default=0.0, nullable=False)
+    score_histogram = Column(JSON, nullable=False)  # counts per score decile
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class RollupWatermark(Base):
+    """
+    High-water mark of source rows already folded into a rollup
+    """
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(50), primary_key=True)
+    last_id = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class UserQuestionStat(Base):
+    """
+    Running per-learner attempt and incorrect-answer counters for a question,
+    maintained at grading time
+    """
+    __tablename__ = "user_question_stats"
+    __table_args__ = (
+        Index('ix_user_question_stats_user_incorrect', 'user_id', 'incorrect_count'),
+    )
+
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    question_id = Column(Integer, ForeignKey('quiz_questions.id'), primary_key=True)
+    course_id = Column(Integer, ForeignKey('courses.id'), nullable=False)
+    attempt_count = Column(Integer, default=0, nullable=False)
+    incorrect_count = Column(Integer, default=0, nullable=False)
+    last_attempt_at = Column(DateTime, default=datetime.utcnow)
+
+class QuestionStat(Base):
+    """
+    Course-wide attempt and incorrect-answer counters per question
+    """
+    __tablename__ = "question_stats"
+    __table_args__ = (
+        Index('ix_question_stats_course_incorrect', 'course_id', 'incorrect_count'),
+    )
+
+    question_id = Column(Integer, ForeignKey('quiz_questions.id'), primary_key=True)
+    course_id = Column(Integer, ForeignKey('courses.id'), nullable=False)
+    quiz_id = Column(Integer, ForeignKey('quizzes.id'), nullable=False)
+    attempt_count = Column(Integer, default=0, nullable=False)
+    incorrect_count = Column(Integer, default=0, nullable=False)
+
+class ActiveLearnerSketch(Base):
+    """
+    HyperLogLog sketch of distinct active learners per course and day
+    """
+    __tablename__ = "active_learner_sketches"
+
+    course_id = Column(Integer, ForeignKey('courses.id'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    sketch = Column(LargeBinary, nullable=False)  # serialized HyperLogLog registers
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ScoreSketch(Base):
+    """
+    Serialized t-digest shard of quiz scores for a quiz or a whole course
+    """
+    __tablename__ = "score_sketches"
+
+    scope = Column(String(10), primary_key=True)  # 'quiz' or 'course'
+    scope_id = Column(Integer, primary_key=True)
+    shard = Column(Integer, primary_key=True, default=0)  # digests are merged across shards on read
+    digest = Column(LargeBinary, nullable=False)
+    sample_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class LearnerPaceStat(Base):
+    """
+    Running totals of lesson completion time per learner
+    """
+    __tablename__ = "learner_pace_stats"
+
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    completed_lessons = Column(Integer, default=0, nullable=False)
+    total_completion_seconds = Column(BigInteger, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
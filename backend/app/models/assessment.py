@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Float, Enum, JSON
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Float, Enum, JSON, Index
 from sqlalchemy.orm import relationship
 from app.services.database import Base
 from datetime import datetime
@@ -72,6 +72,9 @@ class QuizSubmission(Base):
     Represents a student's submission of a quiz
     """
     __tablename__ = "quiz_submissions"
+    __table_args__ = (
+        Index('ix_quiz_submissions_user_quiz', 'user_id', 'quiz_id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     quiz_id = Column(Integer, ForeignKey('quizzes.id'), nullable=False)
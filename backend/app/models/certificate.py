@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -9,6 +9,10 @@ class Certificate(Base):
     Represents course completion certificates
     """
     __tablename__ = "certificates"
+    __table_args__ = (
+        # One certificate per learner and course, even under concurrent issuing
+        Index('uq_certificates_user_course', 'user_id', 'course_id', unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
@@ -17,6 +21,16 @@ class Certificate(Base):
     certificate_id = Column(String, unique=True, nullable=False, index=True)
     issued_at = Column(DateTime, default=datetime.utcnow)
     
+    # Rendered artifacts live in CertificateStorage under their SHA-256 digest
+    png_sha256 = Column(String(64), nullable=True)
+    png_size = Column(Integer, nullable=True)
+    pdf_sha256 = Column(String(64), nullable=True)
+    pdf_size = Column(Integer, nullable=True)
+    rendered_at = Column(DateTime, nullable=True)  # NULL until the artifacts are stored
+    
+    # Revoked certificates fail verification even though their signed token is valid
+    revoked_at = Column(DateTime, nullable=True, index=True)
+    
     # Relationships
     user = relationship("User")
     course = relationship("Course")
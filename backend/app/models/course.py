@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Table, Enum, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Table, Enum, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.services.database import Base
@@ -20,6 +20,10 @@ class EnrollmentStatus(enum.Enum):
 
 class Enrollment(Base):
     __tablename__ = "enrollments"
+    __table_args__ = (
+        # Keyset pagination of course rosters ordered by progress
+        Index('ix_enrollments_course_progress', 'course_id', 'completed_lessons', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.id'))
@@ -27,6 +31,11 @@ class Enrollment(Base):
     enrolled_at = Column(DateTime, default=datetime.utcnow)
     status = Column(Enum(EnrollmentStatus), default=EnrollmentStatus.PENDING)
     
+    # Denormalized progress counters, maintained by EnrollmentProgressService
+    completed_lessons = Column(Integer, default=0, nullable=False, server_default="0")
+    total_lessons = Column(Integer, default=0, nullable=False, server_default="0")
+    last_activity_at = Column(DateTime, nullable=True)
+    
     # Relationships
     user = relationship("User", back_populates="enrollments")
     course = relationship("Course", back_populates="enrollments")
@@ -95,6 +104,9 @@ class Lesson(Base):
 
 class CourseProgress(Base):
     __tablename__ = "course_progresses"
+    __table_args__ = (
+        Index('uq_course_progresses_enrollment_lesson', 'enrollment_id', 'lesson_id', unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     enrollment_id = Column(Integer, ForeignKey('enrollments.id'))
@@ -102,6 +114,8 @@ class CourseProgress(Base):
     completed = Column(Boolean, default=False)
     completed_at = Column(DateTime, nullable=True)
     progress_percentage = Column(Float, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # last-writer-wins clock for offline sync
+    synced_at = Column(DateTime, nullable=True, index=True)  # server time of the last write, cursor for sync deltas
     
     # Relationships
     enrollment = relationship("Enrollment", back_populates="progress_tracks")
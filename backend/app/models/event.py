@@ -0,0 +1,23 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Date, JSON, Index
+from datetime import datetime
+
+from app.services.database import Base
+
+class EventLog(Base):
+    """
+    Append-only log of learning events, partitioned by event_date on Postgres
+    """
+    __tablename__ = "events"
+    __table_args__ = (
+        Index('ix_events_date_type', 'event_date', 'event_type'),
+        Index('ix_events_course_occurred', 'course_id', 'occurred_at'),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    event_date = Column(Date, nullable=False)  # partition key
+    event_type = Column(String(50), nullable=False)
+    user_id = Column(Integer, nullable=True)
+    course_id = Column(Integer, nullable=True)
+    entity_id = Column(Integer, nullable=True)  # lesson, quiz or submission id depending on type
+    payload = Column(JSON, nullable=True)
+    occurred_at = Column(DateTime, default=datetime.utcnow, nullable=False)
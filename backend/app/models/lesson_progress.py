@@ -21,17 +21,31 @@ class LessonProgress(Base):
     
     # Time spent on lesson
     total_time_spent = Column(Integer, default=0)  # in seconds
+    completion_seconds = Column(Integer, nullable=True)  # started_at -> completed_at, set on completion
     
     # Relationships
     user = relationship("User", back_populates="lesson_progresses")
     lesson = relationship("LessonModule", back_populates="lesson_progresses")
     
-    def mark_completed(self):
+    def mark_completed(self) -> bool:
         """
-        Mark lesson as completed
+        Mark lesson as completed and store how long it took
+        
+        completion_seconds stays None when the lesson has no start time.
+        LearningPaceService.record_lesson_completion is the set-based
+        equivalent that also maintains the learner's pace totals.
+        
+        :return: False if the lesson was already completed (so callers never
+                 count it twice), True otherwise
         """
+        if self.is_completed:
+            return False
+        
         self.is_completed = True
         self.completed_at = datetime.utcnow()
+        if self.started_at:
+            self.completion_seconds = max(int((self.completed_at - self.started_at).total_seconds()), 0)
+        return True
     
     def update_time_spent(self, time_spent: int):
         """
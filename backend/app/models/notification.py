@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, BigInteger, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -9,6 +9,16 @@ class Notification(Base):
     Represents user notifications in the system
     """
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Only unread rows are indexed, so the index stays small for long histories
+        Index(
+            'ix_notifications_user_unread', 'user_id',
+            postgresql_where=text('is_read = false'),
+            sqlite_where=text('is_read = 0')
+        ),
+        # Lets the reminder job skip learners it already reminded of a quiz
+        Index('ix_notifications_user_type_related', 'user_id', 'type', 'related_id', 'created_at'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
@@ -24,3 +34,47 @@ class Notification(Base):
     
     def __repr__(self):
         return f"<Notification {self.id}: {self.message[:50]}>"
+
+class NotificationOutbox(Base):
+    """
+    Email notifications waiting for delivery
+
+    Rows are inserted in the same transaction as the change that triggers
+    them and delivered by the outbox workers, so a notification is neither
+    lost on a crash nor sent for a change that was rolled back.
+    """
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        Index('ix_notification_outbox_status_available', 'status', 'available_at'),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    user_id = Column(Integer, nullable=True)
+    notification_type = Column(String(50), nullable=False)
+    related_id = Column(Integer, nullable=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    html_body = Column(Text, nullable=True)
+
+    status = Column(String(20), nullable=False, default="pending")  # pending, processing, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # next delivery attempt
+    claim_token = Column(String(36), nullable=True)
+    locked_until = Column(DateTime, nullable=True)  # claim lease; expired claims are picked up again
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+class NotificationCounter(Base):
+    """
+    Denormalized unread notification count per user
+
+    Maintained by NotificationService whenever notifications are created or
+    marked as read, so badge polling reads a single row.
+    """
+    __tablename__ = "notification_counters"
+
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
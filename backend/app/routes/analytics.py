@@ -0,0 +1,224 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import date, datetime, timedelta
+
+from app.services.read_replica import get_analytics_db
+from app.services.auth import get_current_active_user
+from app.models.user import User
+from app.models.course import Course
+from app.models.assessment import Quiz
+from app.services.performance_analytics import PerformanceAnalytics
+from app.services.rollup_service import RollupService
+from app.services.advanced_analytics_service import AdvancedAnalyticsService
+from app.services.active_learner_service import ActiveLearnerService
+from app.services.score_distribution_service import ScoreDistributionService
+from app.services.instructor_dashboard_service import InstructorDashboardService
+from app.services.roster_progress_service import RosterProgressService, ROSTER_SORTS
+
+router = APIRouter(
+    prefix="/analytics",
+    tags=["analytics"]
+)
+
+def get_course_for_instructor(db: Session, course_id: int, current_user: User) -> Course:
+    """
+    Load a course and ensure the current user may view its analytics
+    """
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    
+    if course.instructor_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to view analytics for this course")
+    
+    return course
+
+@router.get("/courses/{course_id}/performance", response_model=dict)
+def get_course_performance(
+    course_id: int,
+    use_rollups: bool = Query(True, description="Read rollups merged with the live tail"),
+    db: Session = Depends(get_analytics_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Course quiz performance dashboard
+    - Only the course instructor or an admin can view it
+    """
+    get_course_for_instructor(db, course_id, current_user)
+    return PerformanceAnalytics.get_course_performance_summary(db, course_id, use_rollups=use_rollups)
+
+@router.get("/courses/{course_id}/timeseries", response_model=List[dict])
+def get_course_timeseries(
+    course_id: int,
+    granularity: str = Query("day", pattern="^(hour|day)$"),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    db: Session = Depends(get_analytics_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Quiz attempts and scores per hour or day for a course
+    """
+    get_course_for_instructor(db, course_id, current_user)
+    return RollupService.get_course_timeseries(db, course_id, granularity, start, end)
+
+@router.get("/courses/{course_id}/at-risk", response_model=List[dict])
+def get_at_risk_learners(
+    course_id: int,
+    threshold: float = Query(0.6, ge=0, le=1, description="Predicted score below which a learner is at risk"),
+    db: Session = Depends(get_analytics_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Every enrolled learner's predicted outcome, ranked by risk
+    """
+    get_course_for_instructor(db, course_id, current_user)
+    return AdvancedAnalyticsService.predict_course_learning_outcomes(db, course_id, at_risk_threshold=threshold)
+
+@router.get("/courses/{course_id}/hardest-questions", response_model=List[dict])
+def get_hardest_questions(
+    course_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_analytics_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Questions with the most incorrect answers across the course
+    """
+    get_course_for_instructor(db, course_id, current_user)
+    return PerformanceAnalytics.get_hardest_questions(db, course_id, limit=limit)
+
+@router.get("/me/learning-gaps", response_model=List[dict])
+def get_my_learning_gaps(
+    limit: int = Query(5, ge=1, le=50),
+    db: Session = Depends(get_analytics_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Questions the current learner gets wrong most often
+    """
+    return PerformanceAnalytics.identify_learning_gaps(db, current_user.id, limit=limit)
+
+@router.get("/courses/{course_id}/active-learners", response_model=dict)
+def get_active_learners(
+    course_id: int,
+    start: Optional[date] = Query(None, description="First day of the window (defaults to 30 days ago)"),
+    end: Optional[date] = Query(None, description="Last day of the window (defaults to today)"),
+    db: Session = Depends(get_analytics_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Approximate number of unique active learners in a date range
+    """
+    get_course_for_instructor(db, course_id, current_user)
+    
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=29)
+    
+    try:
+        return ActiveLearnerService.count_active_learners(db, course_id, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/instructors/{instructor_id}/dashboard", response_model=dict)
+def get_instructor_dashboard(
+    instructor_id: int,
+    activity_days: int = Query(7, ge=1, le=90, description="Window for the active learner count"),
+    refresh: bool = Query(False, description="Bypass the short-lived dashboard cache"),
+    db: Session = Depends(get_analytics_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Enrollment, completion, quiz and activity metrics for all of an instructor's courses
+    """
+    if instructor_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to view this instructor's dashboard")
+    
+    return InstructorDashboardService.get_dashboard(
+        db, instructor_id, activity_days=activity_days, use_cache=not refresh
+    )
+
+@router.get("/courses/{course_id}/roster", response_model=dict)
+def get_course_roster(
+    course_id: int,
+    limit: int = Query(50, ge=1, le=500, description="Learners per page"),
+    cursor: Optional[str] = Query(None, description="Cursor returned with the previous page"),
+    sort: str = Query("progress", description=f"One of: {', '.join(ROSTER_SORTS)}"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    db: Session = Depends(get_analytics_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Progress, average quiz score and last activity of every learner in a course
+    - Keyset-paginated; pass next_cursor back to fetch the following page
+    """
+    get_course_for_instructor(db, course_id, current_user)
+    
+    try:
+        return RosterProgressService.get_roster(
+            db, course_id, limit=limit, cursor=cursor, sort=sort, descending=order == "desc"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def parse_quantiles(quantiles: str) -> List[float]:
+    try:
+        values = [float(value) for value in quantiles.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Quantiles must be comma separated numbers")
+    
+    if not values or any(not 0 <= value <= 1 for value in values):
+        raise HTTPException(status_code=400, detail="Quantiles must be between 0 and 1")
+    return values
+
+@router.get("/courses/{course_id}/score-percentiles", response_model=dict)
+def get_course_score_percentiles(
+    course_id: int,
+    quantiles: str = Query("0.1,0.5,0.9", description="Comma separated quantiles between 0 and 1"),
+    db: Session = Depends(get_analytics_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Score percentiles across every quiz of a course
+    """
+    get_course_for_instructor(db, course_id, current_user)
+    return ScoreDistributionService.get_percentiles(db, "course", course_id, parse_quantiles(quantiles))
+
+@router.get("/quizzes/{quiz_id}/score-percentiles", response_model=dict)
+def get_quiz_score_percentiles(
+    quiz_id: int,
+    quantiles: str = Query("0.1,0.5,0.9", description="Comma separated quantiles between 0 and 1"),
+    db: Session = Depends(get_analytics_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Score percentiles for a single quiz
+    """
+    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    
+    get_course_for_instructor(db, quiz.course_id, current_user)
+    return ScoreDistributionService.get_percentiles(db, "quiz", quiz_id, parse_quantiles(quantiles))
+
+@router.get("/quizzes/{quiz_id}/percentile-rank", response_model=dict)
+def get_quiz_percentile_rank(
+    quiz_id: int,
+    score: float = Query(..., ge=0, le=1),
+    db: Session = Depends(get_analytics_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Percentage of scores on a quiz at or below a given score
+    """
+    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    
+    get_course_for_instructor(db, quiz.course_id, current_user)
+    return {
+        "quiz_id": quiz_id,
+        "score": score,
+        "percentile_rank": ScoreDistributionService.get_percentile_rank(db, quiz_id, score)
+    }
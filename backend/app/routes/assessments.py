@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List, Dict, Tuple
 
@@ -6,6 +7,7 @@ from app.services.database import get_db
 from app.services.auth import get_current_active_user, get_current_admin_user
 from app.models.user import User
 from app.models.assessment import Quiz, QuizQuestion, QuizQuestionChoice, QuizSubmission, QuizSubmissionAnswer
+from app.models.course import Enrollment
 from app.schemas.assessment import (
     QuizCreate, 
     QuizResponse, 
@@ -13,6 +15,10 @@ from app.schemas.assessment import (
     QuizSubmissionResponse,
     QuizSubmissionAnswerBase
 )
+from app.services.question_stats_service import QuestionStatsService
+from app.services.active_learner_service import ActiveLearnerService
+from app.services.score_distribution_service import ScoreDistributionService
+from app.services.event_pipeline import LearningEventType, publish_event
 
 import logging
 
@@ -142,6 +148,50 @@ def get_course_quizzes(
     
     return quizzes
 
+@router.post("/{quiz_id}/start", response_model=dict)
+def start_quiz(
+    quiz_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Announce the start of a quiz attempt
+    - Returns the quiz's time limit for display; submissions are not timed against it
+    """
+    quizzes = Quiz.__table__
+    enrollments = Enrollment.__table__
+
+    quiz = db.execute(
+        select(quizzes.c.course_id, quizzes.c.is_timed, quizzes.c.duration_minutes).where(quizzes.c.id == quiz_id)
+    ).first()
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+
+    enrolled = db.execute(
+        select(enrollments.c.id).where(
+            enrollments.c.user_id == current_user.id,
+            enrollments.c.course_id == quiz.course_id
+        )
+    ).first()
+    if not enrolled:
+        raise HTTPException(status_code=403, detail="Not enrolled in this course")
+
+    is_timed = bool(quiz.is_timed and quiz.duration_minutes)
+
+    publish_event(
+        LearningEventType.QUIZ_STARTED,
+        user_id=current_user.id,
+        course_id=quiz.course_id,
+        entity_id=quiz_id,
+        is_timed=is_timed
+    )
+
+    return {
+        "quiz_id": quiz_id,
+        "is_timed": is_timed,
+        "duration_minutes": quiz.duration_minutes if is_timed else None
+    }
+
 @router.post("/submit", response_model=QuizSubmissionResponse)
 def submit_quiz(
     submission: QuizSubmissionCreate, 
@@ -170,6 +220,7 @@ def submit_quiz(
     # Track total points and correct answers
     total_points = 0
     earned_points = 0
+    graded_answers = []
 
     # Process and grade each answer
     for answer_data in submission.answers:
@@ -224,6 +275,7 @@ def submit_quiz(
             length_score=length_score
         )
         db.add(db_submission_answer)
+        graded_answers.append((question.id, is_correct))
 
         # Track points
         total_points += question.points
@@ -238,9 +290,26 @@ def submit_quiz(
     db_submission.score = score
     db_submission.is_passed = is_passed
 
+    # Maintain per-question error counters in the same transaction
+    QuestionStatsService.record_graded_answers(
+        db, current_user.id, quiz.course_id, quiz.id, graded_answers
+    )
+    ActiveLearnerService.record_activity(db, quiz.course_id, current_user.id)
+    ScoreDistributionService.record_score(db, quiz.id, quiz.course_id, score)
+
     db.commit()
     db.refresh(db_submission)
 
+    publish_event(
+        LearningEventType.QUIZ_SUBMITTED,
+        user_id=current_user.id,
+        course_id=quiz.course_id,
+        entity_id=quiz.id,
+        submission_id=db_submission.id,
+        score=score,
+        is_passed=is_passed
+    )
+
     return db_submission
 
 @router.get("/{quiz_id}/results", response_model=QuizSubmissionResponse)
@@ -262,3 +331,26 @@ def get_quiz_submission_result(
         raise HTTPException(status_code=404, detail="No submission found")
 
     return submission
+
+@router.get("/{quiz_id}/results/percentile", response_model=dict)
+def get_quiz_result_percentile(
+    quiz_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Where the current user's latest score on a quiz ranks among all scores
+    """
+    submission = db.query(QuizSubmission).filter(
+        QuizSubmission.quiz_id == quiz_id,
+        QuizSubmission.user_id == current_user.id
+    ).order_by(QuizSubmission.submitted_at.desc()).first()
+
+    if not submission or submission.score is None:
+        raise HTTPException(status_code=404, detail="No submission found")
+
+    return {
+        "quiz_id": quiz_id,
+        "score": submission.score,
+        "percentile_rank": ScoreDistributionService.get_percentile_rank(db, quiz_id, submission.score)
+    }
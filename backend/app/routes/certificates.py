@@ -0,0 +1,190 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update
+from datetime import datetime
+from sqlalchemy.orm import Session
+import os
+
+from app.services.database import get_db
+from app.services.auth import get_current_active_user, get_current_admin_user
+from app.models.user import User
+from app.models.course import Course
+from app.models.certificate import Certificate
+from app.services.certificate_batch_service import CertificateBatchService
+from app.services.certificate_storage import (
+    ARTIFACT_MEDIA_TYPES, CERTIFICATE_CACHE_MAX_AGE_SECONDS, certificate_storage
+)
+from app.services.certificate_signing import CertificateTokenService, certificate_revocations
+from app.services.certificate_verification_service import CertificateVerificationService
+from app.schemas.certificate import CertificateBatchVerifyRequest
+from app.utils.byte_range import iter_file_range, parse_range
+
+router = APIRouter(
+    prefix="/certificates",
+    tags=["certificates"]
+)
+
+def get_course_for_instructor(db: Session, course_id: int, current_user: User) -> Course:
+    """
+    Load a course and ensure the current user may manage its certificates
+    """
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    
+    if course.instructor_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to issue certificates for this course")
+    
+    return course
+
+@router.post("/courses/{course_id}/batch", response_model=dict, status_code=202)
+def start_certificate_batch(
+    course_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Issue and render certificates for every learner who completed the course
+    - Runs in the background; poll the returned job for progress
+    """
+    get_course_for_instructor(db, course_id, current_user)
+    
+    job = CertificateBatchService.start_course_batch(course_id)
+    return job.to_dict()
+
+@router.get("/jobs/{job_id}", response_model=dict)
+def get_certificate_batch(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Progress of a batch certificate job
+    """
+    job = CertificateBatchService.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Certificate job not found")
+    
+    get_course_for_instructor(db, job.course_id, current_user)
+    return job.to_dict()
+
+@router.get("/{certificate_id}/download")
+def download_certificate(
+    certificate_id: str,
+    request: Request,
+    format: str = Query("png", pattern="^(png|pdf)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream a rendered certificate as PNG or PDF
+    - Public like the verification link; the certificate id is unguessable
+    - Supports conditional requests (ETag) and single byte ranges
+    """
+    certificates = Certificate.__table__
+    row = db.execute(
+        select(certificates.c[f"{format}_sha256"]).where(certificates.c.certificate_id == certificate_id)
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Certificate not found")
+    
+    digest = row[0]
+    if not certificate_storage.exists(digest, format):
+        raise HTTPException(status_code=404, detail="Certificate has not been rendered yet")
+    
+    path = certificate_storage.path_for(digest, format)
+    size = os.path.getsize(path)
+    etag = f'"{digest}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={CERTIFICATE_CACHE_MAX_AGE_SECONDS}",
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'inline; filename="certificate-{certificate_id}.{format}"',
+    }
+    
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    
+    # A range for an older version of the artifact is answered with the whole file
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range and if_range != etag:
+        range_header = None
+    
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    
+    start, end = byte_range or (0, size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    
+    return StreamingResponse(
+        iter_file_range(path, start, end),
+        status_code=206 if byte_range else 200,
+        media_type=ARTIFACT_MEDIA_TYPES[format],
+        headers=headers
+    )
+
+@router.get("/verify/{token}", response_model=dict)
+def verify_certificate_token(token: str):
+    """
+    Verify a certificate from the signed token in its QR code or link
+    - Pure signature check plus the in-memory revocation list; no database access
+    """
+    return CertificateTokenService.verify_token(token)
+
+@router.post("/verify", response_model=dict)
+def verify_certificates(
+    request: CertificateBatchVerifyRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Verify up to 1000 certificate ids in one call
+    - Results are returned in request order, one per id
+    """
+    results = CertificateVerificationService.verify_many(db, request.certificate_ids)
+    return {
+        "total": len(results),
+        "valid": sum(1 for result in results if result["is_valid"]),
+        "results": results
+    }
+
+@router.get("/{certificate_id}/verify", response_model=dict)
+def verify_certificate(
+    certificate_id: str,
+    db: Session = Depends(get_db)
+):
+    """
+    Verify a single certificate by id
+    """
+    return CertificateVerificationService.verify(db, certificate_id)
+
+@router.post("/{certificate_id}/revoke", response_model=dict)
+def revoke_certificate(
+    certificate_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Revoke a certificate
+    - Only admins can revoke certificates
+    - Other API processes pick the revocation up on their next refresh
+    """
+    certificates = Certificate.__table__
+    result = db.execute(
+        update(certificates).where(
+            certificates.c.certificate_id == certificate_id,
+            certificates.c.revoked_at.is_(None)
+        ).values(revoked_at=datetime.utcnow())
+    )
+    db.commit()
+    
+    if result.rowcount == 0 and not db.execute(
+        select(certificates.c.id).where(certificates.c.certificate_id == certificate_id)
+    ).first():
+        raise HTTPException(status_code=404, detail="Certificate not found")
+    
+    certificate_revocations.add(certificate_id)
+    return {"certificate_id": certificate_id, "revoked": True}
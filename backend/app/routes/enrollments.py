@@ -7,6 +7,9 @@ from app.services.auth import get_current_active_user
 from app.models.user import User
 from app.models.course import Course, Enrollment, EnrollmentStatus
 from app.schemas.course import EnrollmentCreate, EnrollmentResponse
+from app.services.enrollment_progress_service import EnrollmentProgressService
+from app.services.notification_service import NotificationService
+from app.services.notification_outbox import notification_outbox_worker
 
 router = APIRouter()
 
@@ -37,12 +40,16 @@ def enroll_in_course(
     db_enrollment = Enrollment(
         user_id=current_user.id,
         course_id=enrollment.course_id,
-        status=enrollment.status or EnrollmentStatus.PENDING
+        status=enrollment.status or EnrollmentStatus.PENDING,
+        total_lessons=EnrollmentProgressService.count_course_lessons(db, enrollment.course_id)
     )
     
     db.add(db_enrollment)
+    # Notifications are committed together with the enrollment and delivered by the outbox workers
+    NotificationService.send_course_enrollment_notification(db, current_user, course)
     db.commit()
     db.refresh(db_enrollment)
+    notification_outbox_worker.wake()
     
     return db_enrollment
 
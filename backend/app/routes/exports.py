@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
+import importlib.util
+import logging
+import os
+import tempfile
+
+from app.services.read_replica import get_analytics_db
+from app.services.auth import get_current_admin_user
+from app.models.user import User
+from app.services.export_service import SubmissionExportService, EXPORT_TABLES
+
+router = APIRouter(
+    prefix="/exports",
+    tags=["exports"]
+)
+
+MEDIA_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+def iter_file(path: str, chunk_size: int = 1024 * 1024):
+    with open(path, "rb") as export_file:
+        while True:
+            chunk = export_file.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+@router.get("/{table}")
+def export_table(
+    table: str,
+    format: str = Query("parquet", pattern="^(parquet|arrow)$"),
+    course_id: Optional[int] = Query(None),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    db: Session = Depends(get_analytics_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Download a columnar export of submissions, answers or lesson progress
+    - Only admins can export data
+    - The file is written to a temporary spool in bounded chunks and streamed back
+    """
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown export table: {table}")
+
+    if importlib.util.find_spec("pyarrow") is None:
+        raise HTTPException(status_code=501, detail="Columnar exports require pyarrow to be installed")
+
+    fd, path = tempfile.mkstemp(suffix=f".{format}")
+    try:
+        with os.fdopen(fd, "wb") as sink:
+            row_count = SubmissionExportService.export(
+                db, table, sink, file_format=format, course_id=course_id, start=start, end=end
+            )
+    except Exception:
+        os.remove(path)
+        raise
+
+    logging.info(f"Exported {row_count} rows of {table} for user {current_user.id}")
+
+    filename = f"{table}{'_course_' + str(course_id) if course_id else ''}.{format}"
+    return StreamingResponse(
+        iter_file(path),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Length": str(os.path.getsize(path)),
+            "X-Row-Count": str(row_count),
+        },
+        background=BackgroundTask(os.remove, path)
+    )
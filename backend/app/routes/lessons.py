@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -6,19 +7,49 @@ from app.services.database import get_db
 from app.services.auth import get_current_active_user, get_current_admin_user
 from app.models.user import User
 from app.models.lesson import LessonModule
+from app.models.course import Enrollment
 from app.schemas.lesson import (
     LessonModuleCreate, 
     LessonModuleResponse, 
     LessonModuleUpdate,
-    LessonVisibilityUpdate
+    LessonVisibilityUpdate,
+    LessonHeartbeat
 )
 from app.services.lesson_service import LessonVisibilityService
+from app.services.heartbeat_buffer import heartbeat_buffer
+from app.services.learning_pace_service import LearningPaceService
+from app.services.active_learner_service import ActiveLearnerService
+from app.services.event_pipeline import LearningEventType, publish_event
 
 router = APIRouter(
     prefix="/lessons",
     tags=["lessons"]
 )
 
+def require_lesson_access(db: Session, user_id: int, lesson_id: int) -> int:
+    """
+    Ensure a lesson module exists and the user is enrolled in its course
+
+    :return: The lesson's course id
+    """
+    lessons = LessonModule.__table__
+    enrollments = Enrollment.__table__
+
+    course_id = db.execute(select(lessons.c.course_id).where(lessons.c.id == lesson_id)).scalar()
+    if course_id is None:
+        raise HTTPException(status_code=404, detail="Lesson module not found")
+
+    enrolled = db.execute(
+        select(enrollments.c.id).where(
+            enrollments.c.user_id == user_id,
+            enrollments.c.course_id == course_id
+        )
+    ).first()
+    if not enrolled:
+        raise HTTPException(status_code=403, detail="Not enrolled in this course")
+
+    return course_id
+
 @router.post("/", response_model=LessonModuleResponse)
 def create_lesson_module(
     lesson: LessonModuleCreate, 
@@ -152,3 +183,65 @@ def get_accessible_lessons(
         db, course_id, current_user.role
     )
     return accessible_lessons
+
+@router.post("/{lesson_id}/heartbeat", status_code=202)
+def record_lesson_heartbeat(
+    lesson_id: int,
+    heartbeat: LessonHeartbeat,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Record time spent on a lesson from a media player heartbeat
+    - Only for lessons of courses the user is enrolled in
+    - Buffered in memory and written to lesson progress in periodic batches
+    - Counts the learner as active in the course today
+    """
+    course_id = require_lesson_access(db, current_user.id, lesson_id)
+    heartbeat_buffer.record(current_user.id, lesson_id, heartbeat.seconds)
+    # Only the first heartbeat of a learner per day normally touches the sketch
+    ActiveLearnerService.record_activity(db, course_id, current_user.id)
+    db.commit()
+
+    publish_event(
+        LearningEventType.LESSON_VIEWED,
+        user_id=current_user.id,
+        course_id=course_id,
+        entity_id=lesson_id,
+        seconds=heartbeat.seconds
+    )
+    return {"accepted": True}
+
+@router.post("/{lesson_id}/complete", response_model=dict)
+def complete_lesson_module(
+    lesson_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Mark a lesson module as completed for the current user
+    - The completion time is folded into the learner's pace in the same transaction
+    - Completing an already completed lesson changes nothing
+    """
+    course_id = require_lesson_access(db, current_user.id, lesson_id)
+
+    newly_completed, completion_seconds = LearningPaceService.record_lesson_completion(
+        db, current_user.id, lesson_id
+    )
+    ActiveLearnerService.record_activity(db, course_id, current_user.id)
+    db.commit()
+
+    if newly_completed:
+        publish_event(
+            LearningEventType.LESSON_COMPLETED,
+            user_id=current_user.id,
+            course_id=course_id,
+            entity_id=lesson_id,
+            completion_seconds=completion_seconds
+        )
+
+    return {
+        "lesson_id": lesson_id,
+        "newly_completed": newly_completed,
+        "completion_seconds": completion_seconds
+    }
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.orm import Session
+
+from app.services.database import get_db
+from app.services.auth import get_current_active_user
+from app.models.user import User
+from app.services.notification_service import NotificationService
+from app.schemas.notification import NotificationMarkReadRequest
+
+router = APIRouter(
+    prefix="/notifications",
+    tags=["notifications"]
+)
+
+@router.get("/unread-count", response_model=dict)
+def get_unread_count(
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Unread notification count for the badge
+    - Reads one counter row, so it is cheap enough to poll on every page load
+    """
+    response.headers["Cache-Control"] = "private, no-cache"
+    return {"unread_count": NotificationService.get_unread_count(db, current_user.id)}
+
+@router.post("/mark-read", response_model=dict)
+def mark_notifications_read(
+    request: NotificationMarkReadRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Mark the given notifications (or all of them) as read
+    """
+    marked = NotificationService.mark_notifications_as_read(db, current_user.id, request.notification_ids)
+    return {
+        "marked_read": marked,
+        "unread_count": NotificationService.get_unread_count(db, current_user.id)
+    }
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session, joinedload
 from typing import List
 from datetime import datetime
@@ -11,8 +12,13 @@ from app.schemas.course import (
     LessonCreate, 
     LessonResponse, 
     CourseProgressCreate, 
-    CourseProgressResponse
+    CourseProgressResponse,
+    ProgressSyncRequest
 )
+from app.services.active_learner_service import ActiveLearnerService
+from app.services.event_pipeline import LearningEventType, publish_event
+from app.services.enrollment_progress_service import EnrollmentProgressService
+from app.services.progress_sync_service import ProgressSyncService
 
 router = APIRouter()
 
@@ -37,55 +43,109 @@ def create_lesson(
     # Create lesson
     db_lesson = Lesson(**lesson.dict())
     db.add(db_lesson)
+    EnrollmentProgressService.lesson_added(db, lesson.course_id)
     db.commit()
     db.refresh(db_lesson)
     
     return db_lesson
 
+@router.delete("/lessons/{lesson_id}", status_code=204)
+def delete_lesson(
+    lesson_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Delete a lesson and its progress rows, keeping enrollment counters in step
+    """
+    lessons = Lesson.__table__
+    courses = Course.__table__
+
+    lesson = db.execute(
+        select(lessons.c.course_id, courses.c.instructor_id).join(
+            courses, courses.c.id == lessons.c.course_id
+        ).where(lessons.c.id == lesson_id)
+    ).first()
+    if not lesson:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    if lesson.instructor_id != current_user.id:
+        raise HTTPException(
+            status_code=403, 
+            detail="Not authorized to remove lessons from this course"
+        )
+    
+    # Counters are lowered before the progress rows they are derived from go
+    EnrollmentProgressService.lesson_removed(db, lesson.course_id, lesson_id)
+    db.execute(delete(CourseProgress.__table__).where(CourseProgress.__table__.c.lesson_id == lesson_id))
+    db.execute(delete(lessons).where(lessons.c.id == lesson_id))
+    db.commit()
+    
+    return None
+
 @router.post("/track", response_model=CourseProgressResponse)
 def update_lesson_progress(
     progress: CourseProgressCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    # Verify enrollment
-    enrollment = db.query(Enrollment).filter(
-        Enrollment.id == progress.enrollment_id,
-        Enrollment.user_id == current_user.id
-    ).first()
+    # Verify enrollment and lesson in one read; the row lock serializes
+    # progress writes of this enrollment
+    target = EnrollmentProgressService.lock_lesson_progress(
+        db, current_user.id, progress.enrollment_id, progress.lesson_id
+    )
     
-    if not enrollment:
+    if not target:
         raise HTTPException(status_code=404, detail="Enrollment not found")
     
-    # Check if lesson exists
-    lesson = db.query(Lesson).filter(Lesson.id == progress.lesson_id).first()
-    if not lesson:
+    # The lesson must exist in the enrolled course
+    if target.id is None:
         raise HTTPException(status_code=404, detail="Lesson not found")
     
-    # Find or create progress track
-    db_progress = db.query(CourseProgress).filter(
-        CourseProgress.enrollment_id == progress.enrollment_id,
-        CourseProgress.lesson_id == progress.lesson_id
-    ).first()
-    
-    if not db_progress:
-        db_progress = CourseProgress(
-            enrollment_id=progress.enrollment_id,
-            lesson_id=progress.lesson_id
-        )
-        db.add(db_progress)
-    
-    # Update progress
-    db_progress.completed = progress.completed
-    db_progress.progress_percentage = progress.progress_percentage
-    
-    if progress.completed:
-        db_progress.completed_at = datetime.utcnow()
+    # Create or update the progress track in one atomic statement
+    now = datetime.utcnow()
+    db_progress = EnrollmentProgressService.upsert_lesson_progress(
+        db,
+        enrollment_id=target.enrollment_id,
+        lesson_id=target.id,
+        completed=progress.completed,
+        progress_percentage=progress.progress_percentage,
+        at=now
+    )
+    
+    EnrollmentProgressService.record_progress_change(
+        db, target.enrollment_id, target.was_completed, progress.completed, at=now
+    )
+    ActiveLearnerService.record_activity(db, target.course_id, current_user.id)
     
     db.commit()
-    db.refresh(db_progress)
     
-    return db_progress
+    publish_event(
+        LearningEventType.LESSON_COMPLETED if progress.completed else LearningEventType.PROGRESS_UPDATED,
+        user_id=current_user.id,
+        course_id=target.course_id,
+        entity_id=target.id,
+        progress_percentage=progress.progress_percentage
+    )
+    
+    # Built from the rows already read and returned, no extra round trip
+    return {
+        **db_progress._mapping,
+        "lesson": {name: target._mapping[name] for name in Lesson.__table__.c.keys()}
+    }
+
+@router.post("/sync", response_model=dict)
+def sync_offline_progress(
+    sync: ProgressSyncRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Apply a batch of progress and time-spent events recorded offline
+    - Conflicts are resolved last-writer-wins per lesson
+    - Returns the resulting server state of the touched lessons (and any
+      changes since the client's previous sync)
+    """
+    return ProgressSyncService.sync(db, current_user.id, sync.events, since=sync.since)
 
 @router.get("/course/{course_id}/progress", response_model=List[CourseProgressResponse])
 def get_course_progress(
@@ -126,21 +186,5 @@ def get_overall_course_progress(
     if not enrollment:
         raise HTTPException(status_code=404, detail="Enrollment not found")
     
-    # Count total and completed lessons
-    total_lessons = db.query(Lesson).filter(
-        Lesson.course_id == enrollment.course_id
-    ).count()
-    
-    completed_lessons = db.query(CourseProgress).filter(
-        CourseProgress.enrollment_id == enrollment_id,
-        CourseProgress.completed == True
-    ).count()
-    
-    # Calculate overall progress
-    overall_progress = (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0
-    
-    return {
-        "total_lessons": total_lessons,
-        "completed_lessons": completed_lessons,
-        "progress_percentage": round(overall_progress, 2)
-    }
+    # Counters are maintained on the enrollment, no aggregation needed
+    return EnrollmentProgressService.get_progress(enrollment)
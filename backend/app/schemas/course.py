@@ -98,11 +98,31 @@ class CourseProgressResponse(CourseProgressBase):
     class Config:
         from_attributes = True
 
+class ProgressSyncEventType(str, Enum):
+    PROGRESS = "progress"
+    TIME_SPENT = "time_spent"
+
+class ProgressSyncEvent(BaseModel):
+    type: ProgressSyncEventType = ProgressSyncEventType.PROGRESS
+    lesson_id: int
+    enrollment_id: Optional[int] = Field(None, description="Required for progress events")
+    completed: bool = False
+    progress_percentage: float = Field(0.0, ge=0, le=100)
+    seconds: int = Field(0, ge=0, le=86400, description="Time spent on a lesson module (time_spent events)")
+    occurred_at: datetime = Field(..., description="When the learner made the change on the device")
+
+class ProgressSyncRequest(BaseModel):
+    events: List[ProgressSyncEvent] = Field(..., max_length=2000)
+    since: Optional[datetime] = Field(None, description="Last successful sync; server changes after it are returned")
+
 class EnrollmentResponse(BaseModel):
     id: int
     user_id: int
     enrolled_at: datetime
     status: EnrollmentStatus
+    completed_lessons: int = 0
+    total_lessons: int = 0
+    last_activity_at: Optional[datetime] = None
     progress_tracks: List[CourseProgressResponse] = []
     course: Optional[CourseResponse] = None
 
@@ -42,6 +42,9 @@ class LessonModuleUpdate(BaseModel):
     order: Optional[int] = Field(None, ge=0, description="Order of the lesson in the course")
     is_interactive: Optional[bool] = Field(None, description="Whether the lesson is interactive")
 
+class LessonHeartbeat(BaseModel):
+    seconds: int = Field(..., gt=0, le=600, description="Seconds spent on the lesson since the previous heartbeat")
+
 class LessonVisibilityUpdate(BaseModel):
     is_visible: Optional[bool] = True
     visibility_start_date: Optional[datetime] = None
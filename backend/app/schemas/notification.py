@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class NotificationMarkReadRequest(BaseModel):
+    # Omit to mark every unread notification as read
+    notification_ids: Optional[List[int]] = Field(None, max_length=1000)
@@ -0,0 +1,139 @@
+from typing import Dict, Any, Optional, Tuple
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+from datetime import date, datetime, timedelta
+import threading
+
+from app.models.analytics import ActiveLearnerSketch
+from app.utils.hyperloglog import HyperLogLog
+from app.utils.upsert import dialect_insert
+
+# Local copies of recently touched sketches. A learner that is already reflected
+# in the local registers costs no database write at all.
+_sketch_cache: Dict[Tuple[int, date], HyperLogLog] = {}
+_cache_lock = threading.Lock()
+_PENDING_KEY = "active_learner_sketch_keys"
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_unpersisted_sketches(session, previous_transaction):
+    # Registers merged in a rolled back transaction never reached the database
+    keys = session.info.pop(_PENDING_KEY, None)
+    if keys:
+        with _cache_lock:
+            for key in keys:
+                _sketch_cache.pop(key, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _confirm_persisted_sketches(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+class ActiveLearnerService:
+    """
+    Approximate distinct active learners per course over arbitrary date ranges
+    """
+
+    @classmethod
+    def record_activity(
+        cls,
+        db: Session,
+        course_id: int,
+        user_id: int,
+        at: Optional[datetime] = None
+    ) -> bool:
+        """
+        Register a learner as active in a course on a given day
+
+        Runs in the caller's transaction. The shared sketch row is only
+        locked and rewritten when the learner changes a register, which stops
+        happening quickly once a course's daily audience has been seen.
+
+        :param db: Database session
+        :param course_id: Course identifier
+        :param user_id: Learner identifier
+        :param at: Time of the activity (defaults to now)
+        :return: Whether the stored sketch was updated
+        """
+        day = (at or datetime.utcnow()).date()
+        key = (course_id, day)
+
+        with _cache_lock:
+            local = _sketch_cache.get(key)
+            if local is not None and not local.would_change(user_id):
+                return False
+            cls._evict_stale(day)
+
+        # Make sure the row exists, then merge under a row lock so concurrent
+        # workers never overwrite each other's registers
+        table = ActiveLearnerSketch.__table__
+        db.execute(dialect_insert(db, table).values(
+            course_id=course_id,
+            day=day,
+            sketch=HyperLogLog().to_bytes(),
+            updated_at=datetime.utcnow()
+        ).on_conflict_do_nothing(index_elements=[table.c.course_id, table.c.day]))
+
+        row_filter = (table.c.course_id == course_id, table.c.day == day)
+        stored = db.execute(
+            select(table.c.sketch).where(*row_filter).with_for_update()
+        ).scalar_one()
+
+        sketch = HyperLogLog.from_bytes(stored)
+        changed = sketch.add(user_id)
+        if changed:
+            db.execute(update(table).where(*row_filter).values(
+                sketch=sketch.to_bytes(),
+                updated_at=datetime.utcnow()
+            ))
+
+        with _cache_lock:
+            _sketch_cache[key] = sketch
+        db.info.setdefault(_PENDING_KEY, set()).add(key)
+
+        return changed
+
+    @classmethod
+    def _evict_stale(cls, today: date) -> None:
+        # Activity only lands on the current (or, around midnight, previous) day
+        cutoff = today - timedelta(days=1)
+        for stale_key in [cache_key for cache_key in _sketch_cache if cache_key[1] < cutoff]:
+            del _sketch_cache[stale_key]
+
+    @classmethod
+    def count_active_learners(
+        cls,
+        db: Session,
+        course_id: int,
+        start: date,
+        end: date
+    ) -> Dict[str, Any]:
+        """
+        Estimate distinct active learners of a course between two days (inclusive)
+
+        :param db: Database session
+        :param course_id: Course identifier
+        :param start: First day of the window
+        :param end: Last day of the window
+        :return: Estimate, window and the sketch's relative standard error
+        """
+        if end < start:
+            raise ValueError("End date must not be before start date")
+
+        sketches = db.query(ActiveLearnerSketch.sketch).filter(
+            ActiveLearnerSketch.course_id == course_id,
+            ActiveLearnerSketch.day >= start,
+            ActiveLearnerSketch.day <= end
+        ).all()
+
+        merged = HyperLogLog.merge_all(HyperLogLog.from_bytes(row.sketch) for row in sketches)
+
+        return {
+            "course_id": course_id,
+            "start": start,
+            "end": end,
+            "active_learners": merged.count(),
+            "days_with_activity": len(sketches),
+            "relative_error": 1.04 / (merged.num_registers ** 0.5)
+        }
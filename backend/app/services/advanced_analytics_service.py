@@ -1,18 +1,25 @@
 from typing import Dict, List, Any, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, desc, asc
+from sqlalchemy import func, and_, or_, desc, asc, case, exists, select
 from datetime import datetime, timedelta
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import io
 import base64
+import math
+
+from app.utils.lazy_import import lazy_import
+
+# Heavy numeric/plotting stacks are only loaded when a chart or model is built
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+plt = lazy_import("matplotlib.pyplot")
+sns = lazy_import("seaborn")
 
 from app.models.user import User
-from app.models.course import Course, CourseEnrollment
+from app.models.course import Course, Enrollment, EnrollmentStatus
 from app.models.assessment import Quiz, QuizSubmission, QuizSubmissionAnswer
-from app.models.lesson import Lesson, LessonProgress
+from app.models.lesson import LessonModule
+from app.services.learning_pace_service import LearningPaceService
+from app.services.rollup_service import RollupService
 
 class AdvancedAnalyticsService:
     """
@@ -32,35 +39,39 @@ class AdvancedAnalyticsService:
         :param user_id: User identifier
         :return: Detailed learner profile
         """
+        users = User.__table__
+        enrollments = Enrollment.__table__
+        submissions = QuizSubmission.__table__
+        
         # Basic user information
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.execute(
+            select(users.c.id, users.c.username, users.c.email).where(users.c.id == user_id)
+        ).first()
+        if user is None:
+            raise ValueError("User not found")
         
         # Course enrollment statistics
-        total_courses = db.query(CourseEnrollment).filter(
-            CourseEnrollment.user_id == user_id
-        ).count()
-        
-        completed_courses = db.query(CourseEnrollment).filter(
-            CourseEnrollment.user_id == user_id,
-            CourseEnrollment.status == 'completed'
-        ).count()
+        total_courses, completed_courses = db.execute(
+            select(
+                func.count(enrollments.c.id),
+                func.sum(case((enrollments.c.status == EnrollmentStatus.COMPLETED, 1), else_=0))
+            ).where(enrollments.c.user_id == user_id)
+        ).one()
+        completed_courses = int(completed_courses or 0)
         
         # Quiz performance
-        quiz_stats = db.query(
-            func.count(QuizSubmission.id).label('total_quizzes'),
-            func.avg(QuizSubmission.score).label('average_score'),
-            func.sum(QuizSubmission.is_passed).label('passed_quizzes')
-        ).filter(
-            QuizSubmission.user_id == user_id
-        ).first()
+        quiz_stats = db.execute(
+            select(
+                func.count(submissions.c.id).label('total_quizzes'),
+                func.avg(submissions.c.score).label('average_score'),
+                # sum(boolean) does not exist on PostgreSQL
+                func.sum(case((submissions.c.is_passed == True, 1), else_=0)).label('passed_quizzes')
+            ).where(submissions.c.user_id == user_id)
+        ).one()
+        passed_quizzes = int(quiz_stats.passed_quizzes or 0)
         
-        # Learning pace analysis
-        learning_pace = db.query(
-            func.avg(func.julianday(LessonProgress.completed_at) - 
-                     func.julianday(LessonProgress.started_at)).label('avg_lesson_duration')
-        ).filter(
-            LessonProgress.user_id == user_id
-        ).scalar() or 0
+        # Learning pace analysis (running average maintained on completion)
+        learning_pace = LearningPaceService.get_learning_pace(db, user_id)["avg_lesson_duration_hours"]
         
         # Skill tags and strengths
         skill_performance = cls._analyze_skill_performance(db, user_id)
@@ -77,8 +88,8 @@ class AdvancedAnalyticsService:
                 "quiz_performance": {
                     "total_quizzes": quiz_stats.total_quizzes,
                     "average_score": float(quiz_stats.average_score or 0),
-                    "passed_quizzes": quiz_stats.passed_quizzes,
-                    "pass_rate": (quiz_stats.passed_quizzes / quiz_stats.total_quizzes * 100) if quiz_stats.total_quizzes > 0 else 0
+                    "passed_quizzes": passed_quizzes,
+                    "pass_rate": (passed_quizzes / quiz_stats.total_quizzes * 100) if quiz_stats.total_quizzes > 0 else 0
                 },
                 
                 "learning_pace": {
@@ -103,22 +114,46 @@ class AdvancedAnalyticsService:
         :param user_id: User identifier
         :return: List of skill performances
         """
-        # Analyze quiz performance by lesson tags/skills
-        skill_performance = db.query(
-            Lesson.skill_tags,
-            func.avg(QuizSubmission.score).label('avg_score'),
-            func.count(QuizSubmission.id).label('total_attempts')
-        ).join(
-            Quiz, Quiz.lesson_id == Lesson.id
-        ).join(
-            QuizSubmission, QuizSubmission.quiz_id == Quiz.id
-        ).filter(
-            QuizSubmission.user_id == user_id
-        ).group_by(
-            Lesson.skill_tags
-        ).order_by(
-            desc('avg_score')
+        # Quizzes belong to courses, so a course's quiz results count towards
+        # every skill tagged on its lesson modules
+        submissions = QuizSubmission.__table__
+        quizzes = Quiz.__table__
+        modules = LessonModule.__table__
+        
+        course_scores = db.execute(
+            select(
+                quizzes.c.course_id,
+                func.sum(submissions.c.score),
+                func.count(submissions.c.id)
+            ).join_from(
+                submissions, quizzes, quizzes.c.id == submissions.c.quiz_id
+            ).where(
+                submissions.c.user_id == user_id,
+                submissions.c.score.isnot(None)
+            ).group_by(quizzes.c.course_id)
         ).all()
+        if not course_scores:
+            return []
+        
+        course_tags: Dict[int, set] = {}
+        for course_id, skill_tags in db.execute(
+            select(modules.c.course_id, modules.c.skill_tags).where(
+                modules.c.course_id.in_([row[0] for row in course_scores])
+            )
+        ).all():
+            course_tags.setdefault(course_id, set()).update(skill_tags or [])
+        
+        totals: Dict[str, List[float]] = {}
+        for course_id, score_sum, attempts in course_scores:
+            for skill_tag in course_tags.get(course_id, ()):
+                total = totals.setdefault(skill_tag, [0.0, 0])
+                total[0] += score_sum
+                total[1] += attempts
+        
+        skill_performance = sorted(
+            ((skill_tag, score_sum / attempts, attempts) for skill_tag, (score_sum, attempts) in totals.items()),
+            key=lambda skill: (-skill[1], skill[0])
+        )
         
         return [
             {
@@ -180,18 +215,18 @@ class AdvancedAnalyticsService:
         :param course_id: Course identifier
         :return: Performance visualization data
         """
-        # Quiz performance distribution
-        quiz_performance = db.query(
-            Quiz.title,
-            func.avg(QuizSubmission.score).label('avg_score'),
-            func.count(QuizSubmission.id).label('total_attempts')
-        ).join(
-            QuizSubmission, QuizSubmission.quiz_id == Quiz.id
-        ).filter(
-            Quiz.course_id == course_id
-        ).group_by(
-            Quiz.title
-        ).all()
+        # Quiz performance distribution, read from rollups plus the live tail
+        quiz_titles = dict(
+            db.query(Quiz.id, Quiz.title).filter(Quiz.course_id == course_id).all()
+        )
+        quiz_performance = []
+        for quiz_id, stats in sorted(RollupService.get_course_quiz_stats(db, course_id).items()):
+            metrics = RollupService.summarize(stats)
+            quiz_performance.append((
+                quiz_titles.get(quiz_id),
+                metrics['average_score'],
+                metrics['total_attempts']
+            ))
         
         # Prepare data for visualization
         df = pd.DataFrame(
@@ -228,6 +263,122 @@ class AdvancedAnalyticsService:
             ]
         }
     
+    @classmethod
+    def _graded_submissions(cls) -> Any:
+        """
+        Graded submissions of learners enrolled in the quiz's course
+        
+        :return: SELECT of user_id, quiz_id and score
+        """
+        submissions = QuizSubmission.__table__
+        quizzes = Quiz.__table__
+        enrollments = Enrollment.__table__
+        enrolled = exists().where(
+            enrollments.c.user_id == submissions.c.user_id,
+            enrollments.c.course_id == quizzes.c.course_id
+        )
+        return select(
+            submissions.c.user_id,
+            submissions.c.quiz_id,
+            submissions.c.score
+        ).join_from(
+            submissions, quizzes, submissions.c.quiz_id == quizzes.c.id
+        ).where(
+            submissions.c.score.isnot(None),
+            enrolled
+        )
+    
+    @classmethod
+    def _quiz_difficulty(cls, db: Session, *criteria: Any) -> Dict[int, float]:
+        """
+        Cohort-derived quiz difficulty on the 1 (easy) .. 3 (hard) scale
+        
+        Quizzes have no difficulty column, so a quiz is rated from the mean score
+        of the enrolled learners who took it.
+        
+        :param db: Database session
+        :param criteria: Filters selecting the quizzes to rate
+        :return: Difficulty by quiz ID
+        """
+        cohort = cls._graded_submissions().where(*criteria).subquery()
+        quiz_means = db.execute(
+            select(cohort.c.quiz_id, func.avg(cohort.c.score)).group_by(cohort.c.quiz_id)
+        ).all()
+        return {
+            quiz_id: 1 + 2 * (1 - min(max(mean_score, 0.0), 1.0))
+            for quiz_id, mean_score in quiz_means
+        }
+    
+    @classmethod
+    def _learner_statistics(cls, user_ids: Any, difficulty: Any, scores: Any) -> tuple:
+        """
+        Per-learner attempt count, mean, sample deviation and difficulty/score correlation
+        
+        Segment sums (np.unique + np.bincount) reduce a whole roster in one pass.
+        Statistics a learner's data cannot define are NaN, as in pandas: the
+        deviation of a single attempt, and the correlation when difficulty or
+        score does not vary.
+        
+        :param user_ids: Learner of each submission
+        :param difficulty: Quiz difficulty of each submission
+        :param scores: Score of each submission
+        :return: Learner IDs, counts, means, deviations and correlations
+        """
+        user_keys, user_index = np.unique(user_ids, return_inverse=True)
+        n = np.bincount(user_index).astype(np.float64)
+        sum_y = np.bincount(user_index, weights=scores)
+        sum_yy = np.bincount(user_index, weights=scores * scores)
+        sum_x = np.bincount(user_index, weights=difficulty)
+        sum_xx = np.bincount(user_index, weights=difficulty * difficulty)
+        sum_xy = np.bincount(user_index, weights=difficulty * scores)
+        
+        mean = sum_y / n
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Sample variance (ddof=1) to match pandas' std()
+            variance = np.where(n > 1, (sum_yy - sum_y * sum_y / n) / (n - 1), np.nan)
+            spread_x = n * sum_xx - sum_x * sum_x
+            spread_y = n * sum_yy - sum_y * sum_y
+            # Relative tolerance so rounding noise on a constant series is not read as spread
+            varies = (spread_x > 1e-12 * n * sum_xx) & (spread_y > 1e-12 * n * sum_yy)
+            correlation = np.where(
+                varies, (n * sum_xy - sum_x * sum_y) / np.sqrt(spread_x * spread_y), np.nan
+            )
+        
+        return user_keys, n, mean, np.sqrt(np.maximum(variance, 0.0)), correlation
+    
+    @classmethod
+    def _outcome_prediction(cls, mean: float, deviation: float, correlation: float) -> Dict[str, Any]:
+        """
+        Prediction rule shared by the single-learner and course models
+        
+        Undefined statistics are reported as None. Without a correlation there is
+        no difficulty trend to apply, so the prediction stays at the mean.
+        
+        :param mean: Average score
+        :param deviation: Sample standard deviation of the scores (NaN if undefined)
+        :param correlation: Difficulty/score correlation (NaN if undefined)
+        :return: Historical performance and predictive insights
+        """
+        has_trend = not math.isnan(correlation)
+        predicted_performance = mean + (correlation * 0.1 if has_trend else 0.0)
+        
+        return {
+            "historical_performance": {
+                "average_score": mean,
+                "performance_variance": None if math.isnan(deviation) else deviation
+            },
+            "predictive_insights": {
+                "difficulty_performance_correlation": correlation if has_trend else None,
+                "predicted_future_performance": predicted_performance,
+                "recommended_difficulty": (
+                    'advanced' if predicted_performance > 0.8 else
+                    'intermediate' if predicted_performance > 0.6 else
+                    'beginner'
+                )
+            }
+        }
+    
     @classmethod
     def predict_learning_outcomes(
         cls, 
@@ -241,58 +392,97 @@ class AdvancedAnalyticsService:
         :param user_id: User identifier
         :return: Predictive learning outcome insights
         """
-        # Historical performance data
-        performance_history = db.query(
-            QuizSubmission.quiz_id,
-            QuizSubmission.score,
-            Quiz.difficulty_level
-        ).join(
-            Quiz, QuizSubmission.quiz_id == Quiz.id
-        ).filter(
-            QuizSubmission.user_id == user_id
+        # Historical performance in the courses the learner is enrolled in
+        submissions = QuizSubmission.__table__
+        performance_history = db.execute(
+            cls._graded_submissions().where(submissions.c.user_id == user_id)
         ).all()
         
-        # Simple predictive model using historical performance
-        difficulty_scores = {
-            'beginner': 1,
-            'intermediate': 2,
-            'advanced': 3
-        }
+        if not performance_history:
+            return {
+                "message": "Insufficient data for predictive analysis"
+            }
         
-        performance_data = [
-            {
-                'difficulty': diff,
-                'score': score,
-                'difficulty_score': difficulty_scores.get(diff, 1)
-            } for _, score, diff in performance_history
-        ]
+        difficulty_by_quiz = cls._quiz_difficulty(
+            db, submissions.c.quiz_id.in_({row.quiz_id for row in performance_history})
+        )
+        _, _, mean, deviation, correlation = cls._learner_statistics(
+            np.zeros(len(performance_history), dtype=np.int64),
+            np.array([difficulty_by_quiz[row.quiz_id] for row in performance_history], dtype=np.float64),
+            np.array([row.score for row in performance_history], dtype=np.float64)
+        )
         
-        # Basic predictive insights
-        if performance_data:
-            df = pd.DataFrame(performance_data)
-            
-            # Correlation between difficulty and performance
-            correlation = df['difficulty_score'].corr(df['score'])
-            
-            # Predicted future performance
-            predicted_performance = df['score'].mean() + (correlation * 0.1)
+        return cls._outcome_prediction(float(mean[0]), float(deviation[0]), float(correlation[0]))
+    
+    @classmethod
+    def predict_course_learning_outcomes(
+        cls, 
+        db: Session, 
+        course_id: int,
+        at_risk_threshold: float = 0.6
+    ) -> List[Dict[str, Any]]:
+        """
+        Batch variant of predict_learning_outcomes for every learner in a course
+        
+        All graded submissions of the course's enrolled learners are loaded in one
+        query and reduced with grouped NumPy sums instead of a query and
+        DataFrame per learner. Both variants share the difficulty rating and
+        prediction rule, so a learner gets the same prediction from either.
+        
+        :param db: Database session
+        :param course_id: Course identifier
+        :param at_risk_threshold: Predicted score below which a learner is at risk
+        :return: Roster ordered from highest to lowest risk
+        """
+        quizzes = Quiz.__table__
+        users = User.__table__
+        enrollments = Enrollment.__table__
+        
+        submissions = db.execute(
+            cls._graded_submissions().where(quizzes.c.course_id == course_id)
+        ).all()
+        
+        roster = db.execute(
+            select(users.c.id, users.c.username).where(
+                users.c.id.in_(select(enrollments.c.user_id).where(enrollments.c.course_id == course_id))
+            )
+        ).all()
+        usernames = dict(roster)
+        
+        predictions = []
+        if submissions:
+            difficulty_by_quiz = cls._quiz_difficulty(db, quizzes.c.course_id == course_id)
+            user_keys, n, mean, deviation, correlation = cls._learner_statistics(
+                np.fromiter((row.user_id for row in submissions), dtype=np.int64, count=len(submissions)),
+                np.fromiter((difficulty_by_quiz[row.quiz_id] for row in submissions), dtype=np.float64, count=len(submissions)),
+                np.fromiter((row.score for row in submissions), dtype=np.float64, count=len(submissions))
+            )
             
-            return {
-                "historical_performance": {
-                    "average_score": df['score'].mean(),
-                    "performance_variance": df['score'].std()
-                },
-                "predictive_insights": {
-                    "difficulty_performance_correlation": correlation,
-                    "predicted_future_performance": predicted_performance,
-                    "recommended_difficulty": (
-                        'advanced' if predicted_performance > 0.8 else
-                        'intermediate' if predicted_performance > 0.6 else
-                        'beginner'
-                    )
-                }
-            }
+            for i, user_id in enumerate(user_keys.tolist()):
+                prediction = cls._outcome_prediction(float(mean[i]), float(deviation[i]), float(correlation[i]))
+                predicted_performance = prediction["predictive_insights"]["predicted_future_performance"]
+                predictions.append({
+                    "user_id": user_id,
+                    "username": usernames.get(user_id),
+                    "total_attempts": int(n[i]),
+                    **prediction,
+                    "risk_score": float(np.clip(1 - predicted_performance, 0, 1)),
+                    "is_at_risk": predicted_performance < at_risk_threshold
+                })
         
-        return {
-            "message": "Insufficient data for predictive analysis"
-        }
+        predictions.sort(key=lambda prediction: prediction["risk_score"], reverse=True)
+        
+        # Enrolled learners without graded work go last; there is nothing to predict from
+        scored_users = {prediction["user_id"] for prediction in predictions}
+        for user_id, username in roster:
+            if user_id not in scored_users:
+                predictions.append({
+                    "user_id": user_id,
+                    "username": username,
+                    "total_attempts": 0,
+                    "message": "Insufficient data for predictive analysis",
+                    "risk_score": None,
+                    "is_at_risk": None
+                })
+        
+        return predictions
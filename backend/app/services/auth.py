@@ -57,6 +57,9 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     user = db.query(User).filter(User.username == token_data.username).first()
     if user is None:
         raise credentials_exception
+    
+    # Lets session hooks attribute writes to the user (read replica pinning)
+    db.info["user_id"] = user.id
     return user
 
 def get_current_active_user(current_user: User = Depends(get_current_user)):
@@ -0,0 +1,310 @@
+from typing import Dict, List, Any, Optional, Callable, Tuple
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from sqlalchemy import and_, bindparam, exists, select, update
+from sqlalchemy.orm import Session
+import logging
+import os
+import threading
+import uuid
+
+from app.models.certificate import Certificate
+from app.models.course import Course, Enrollment
+from app.models.user import User
+from app.services.certificate_renderer import ARTIFACT_FORMATS, CertificateRenderer, certificate_renderer
+from app.services.certificate_storage import CertificateStorage, certificate_storage
+from app.services.certificate_signing import CertificateTokenService
+from app.utils.upsert import dialect_insert
+
+BASE_URL = os.getenv("BASE_URL", "http://localhost:8000")
+# Rendered certificates are recorded in batches of this many rows
+CERTIFICATE_BATCH_WRITE_SIZE = int(os.getenv("CERTIFICATE_BATCH_WRITE_SIZE", 100))
+
+logger = logging.getLogger(__name__)
+
+class CertificateJobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+ACTIVE_JOB_STATUSES = (CertificateJobStatus.PENDING, CertificateJobStatus.RUNNING)
+
+@dataclass
+class CertificateBatchJob:
+    """
+    Progress of a batch certificate run for one course
+    """
+    job_id: str
+    course_id: int
+    status: CertificateJobStatus = CertificateJobStatus.PENDING
+    total: int = 0
+    rendered: int = 0
+    failed: int = 0
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        done = self.rendered + self.failed
+        return {
+            "job_id": self.job_id,
+            "course_id": self.course_id,
+            "status": self.status.value,
+            "total": self.total,
+            "rendered": self.rendered,
+            "failed": self.failed,
+            "progress_percentage": round(done / self.total * 100, 2) if self.total else (100.0 if self.finished_at else 0.0),
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+class CertificateBatchService:
+    """
+    Issues and renders certificates for every learner who completed a course
+    """
+    _jobs: Dict[str, CertificateBatchJob] = {}
+    _jobs_lock = threading.Lock()
+
+    @classmethod
+    def verification_url(cls, token: str) -> str:
+        return f"{BASE_URL}/verify-certificate/{token}"
+
+    @classmethod
+    def issue_for_completers(cls, db: Session, course_id: int) -> int:
+        """
+        Create certificate rows for completers of a course that have none yet
+
+        One query finds the completers (from the enrollment lesson counters)
+        and one INSERT issues all certificates. The insert skips rows that
+        conflict on the unique (user, course) index, so concurrent runs can
+        never issue a learner two certificates. New certificates have no
+        rendered_at until their artifacts are stored.
+
+        :param db: Database session
+        :param course_id: Course identifier
+        :return: Number of issued certificates
+        """
+        enrollments = Enrollment.__table__
+        certificates = Certificate.__table__
+
+        user_ids = db.execute(
+            select(enrollments.c.user_id).where(
+                enrollments.c.course_id == course_id,
+                enrollments.c.total_lessons > 0,
+                enrollments.c.completed_lessons >= enrollments.c.total_lessons,
+                ~exists().where(and_(
+                    certificates.c.user_id == enrollments.c.user_id,
+                    certificates.c.course_id == course_id
+                ))
+            ).order_by(enrollments.c.user_id)
+        ).scalars().all()
+
+        if not user_ids:
+            return 0
+
+        issued_at = datetime.utcnow()
+        stmt = dialect_insert(db, certificates).values([
+            {
+                "user_id": user_id,
+                "course_id": course_id,
+                "certificate_id": str(uuid.uuid4()),
+                "issued_at": issued_at
+            }
+            for user_id in user_ids
+        ]).on_conflict_do_nothing(index_elements=[certificates.c.user_id, certificates.c.course_id])
+        issued = db.execute(stmt).rowcount
+        db.commit()
+
+        return issued
+
+    @classmethod
+    def pending_renders(cls, db: Session, course_id: int) -> List[Dict[str, Any]]:
+        """
+        Render specifications of the course's certificates that have no artifacts yet
+
+        Includes certificates left unrendered by a failed render or an
+        interrupted job, so every run picks them up again.
+
+        :param db: Database session
+        :param course_id: Course identifier
+        :return: Render specifications, in certificate order
+        """
+        certificates = Certificate.__table__
+        users = User.__table__
+        courses = Course.__table__
+
+        rows = db.execute(
+            select(
+                certificates.c.certificate_id,
+                certificates.c.user_id,
+                certificates.c.issued_at,
+                users.c.username,
+                courses.c.title
+            ).select_from(
+                certificates.join(users, users.c.id == certificates.c.user_id).join(
+                    courses, courses.c.id == certificates.c.course_id
+                )
+            ).where(
+                certificates.c.course_id == course_id,
+                certificates.c.rendered_at.is_(None),
+                certificates.c.revoked_at.is_(None)
+            ).order_by(certificates.c.id)
+        ).all()
+
+        specs = []
+        for certificate_id, user_id, issued_at, username, course_title in rows:
+            # Tokens are deterministic, so a re-render embeds the same verification link
+            token = CertificateTokenService.issue_token(
+                certificate_id, user_id, course_id, issued_at, username, course_title
+            )
+            specs.append({
+                "user_id": user_id,
+                "course_id": course_id,
+                "certificate_id": certificate_id,
+                "user_name": username,
+                "course_title": course_title,
+                "issued_at": issued_at,
+                "verification_url": cls.verification_url(token)
+            })
+
+        return specs
+
+    @classmethod
+    def store_artifacts(
+        cls,
+        db: Session,
+        rendered: List[Tuple[str, Dict[str, bytes]]],
+        storage: Optional[CertificateStorage] = None
+    ) -> None:
+        """
+        Store rendered artifacts and record their metadata on the certificates
+
+        :param db: Database session
+        :param rendered: (certificate_id, artifacts keyed by format) pairs
+        :param storage: Artifact store (defaults to the shared store)
+        """
+        if not rendered:
+            return
+
+        storage = storage or certificate_storage
+        certificates = Certificate.__table__
+        rendered_at = datetime.utcnow()
+
+        rows = []
+        for certificate_id, artifacts in rendered:
+            values = {f"{file_format}_{field}": None for file_format in ARTIFACT_FORMATS for field in ("sha256", "size")}
+            values.update(storage.put_all(artifacts))
+            rows.append({
+                "b_certificate_id": certificate_id,
+                "b_rendered_at": rendered_at,
+                **{f"b_{name}": value for name, value in values.items()}
+            })
+
+        db.execute(
+            update(certificates).where(
+                certificates.c.certificate_id == bindparam("b_certificate_id")
+            ).values(
+                png_sha256=bindparam("b_png_sha256"),
+                png_size=bindparam("b_png_size"),
+                pdf_sha256=bindparam("b_pdf_sha256"),
+                pdf_size=bindparam("b_pdf_size"),
+                rendered_at=bindparam("b_rendered_at")
+            ),
+            rows
+        )
+        db.commit()
+
+    @classmethod
+    def start_course_batch(
+        cls,
+        course_id: int,
+        session_factory: Optional[Callable] = None,
+        renderer: Optional[CertificateRenderer] = None,
+        storage: Optional[CertificateStorage] = None,
+        background: bool = True
+    ) -> CertificateBatchJob:
+        """
+        Start issuing and rendering certificates for all completers of a course
+
+        :param course_id: Course identifier
+        :param session_factory: Session factory for the job (defaults to SessionLocal)
+        :param renderer: Renderer to use (defaults to the shared process pool)
+        :param storage: Artifact store (defaults to the shared store)
+        :param background: Run the job in a background thread
+        :return: The job, whose progress can be polled with get_job (the running
+            job if the course is already being processed)
+        """
+        with cls._jobs_lock:
+            # A course already being processed in this process is not started twice
+            for existing in cls._jobs.values():
+                if existing.course_id == course_id and existing.status in ACTIVE_JOB_STATUSES:
+                    return existing
+            job = CertificateBatchJob(job_id=str(uuid.uuid4()), course_id=course_id)
+            cls._jobs[job.job_id] = job
+
+        if background:
+            threading.Thread(
+                target=cls.run_job,
+                args=(job, session_factory, renderer, storage),
+                name=f"certificate-batch-{course_id}",
+                daemon=True
+            ).start()
+        else:
+            cls.run_job(job, session_factory, renderer, storage)
+
+        return job
+
+    @classmethod
+    def get_job(cls, job_id: str) -> Optional[CertificateBatchJob]:
+        with cls._jobs_lock:
+            return cls._jobs.get(job_id)
+
+    @classmethod
+    def run_job(
+        cls,
+        job: CertificateBatchJob,
+        session_factory: Optional[Callable] = None,
+        renderer: Optional[CertificateRenderer] = None,
+        storage: Optional[CertificateStorage] = None
+    ) -> None:
+        """
+        Issue the course's certificates and render every unrendered one, updating job progress
+        """
+        if session_factory is None:
+            from app.services.database import SessionLocal
+            session_factory = SessionLocal
+        renderer = renderer or certificate_renderer
+
+        job.status = CertificateJobStatus.RUNNING
+        db = session_factory()
+        try:
+            cls.issue_for_completers(db, job.course_id)
+            specs = cls.pending_renders(db, job.course_id)
+            job.total = len(specs)
+
+            rendered: List[Tuple[str, Dict[str, bytes]]] = []
+            for spec, artifacts, error in renderer.render_many(specs):
+                if error is not None:
+                    logger.error(f"Rendering certificate {spec['certificate_id']} failed: {error}")
+                    job.failed += 1
+                    continue
+                rendered.append((spec["certificate_id"], artifacts))
+                if len(rendered) >= CERTIFICATE_BATCH_WRITE_SIZE:
+                    cls.store_artifacts(db, rendered, storage)
+                    job.rendered += len(rendered)
+                    rendered = []
+
+            cls.store_artifacts(db, rendered, storage)
+            job.rendered += len(rendered)
+
+            job.status = CertificateJobStatus.COMPLETED
+        except Exception as e:
+            logger.error(f"Certificate batch for course {job.course_id} failed: {e}")
+            job.status = CertificateJobStatus.FAILED
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.utcnow()
+            db.close()
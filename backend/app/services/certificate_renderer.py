@@ -0,0 +1,221 @@
+from typing import Dict, Any, Optional, Callable, Iterable, Iterator, Tuple
+from concurrent.futures import ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
+import functools
+import io
+import logging
+import multiprocessing
+import os
+import threading
+
+from app.utils.lazy_import import lazy_import
+
+# Imaging libraries are only needed when a certificate is rendered
+qrcode = lazy_import("qrcode")
+Image = lazy_import("PIL.Image")
+ImageDraw = lazy_import("PIL.ImageDraw")
+ImageFont = lazy_import("PIL.ImageFont")
+
+CERTIFICATE_FONT_DIR = os.getenv("CERTIFICATE_FONT_DIR", "./assets/fonts")
+# 0 renders in the calling process (useful for development and tests)
+CERTIFICATE_RENDER_WORKERS = int(os.getenv("CERTIFICATE_RENDER_WORKERS", min(4, os.cpu_count() or 1)))
+
+CERTIFICATE_SIZE = (1200, 800)
+# 1200x800 px printed at 150 dpi is an 8x5.3 inch page
+CERTIFICATE_PDF_DPI = 150.0
+ARTIFACT_FORMATS = ("png", "pdf")
+FONT_FILES = {
+    "title": ("Montserrat-Bold.ttf", 60),
+    "subtitle": ("Montserrat-Regular.ttf", 40),
+    "details": ("Montserrat-Light.ttf", 30),
+}
+
+logger = logging.getLogger(__name__)
+
+RenderSpec = Dict[str, Any]
+
+@functools.lru_cache(maxsize=None)
+def load_fonts() -> Dict[str, Any]:
+    """
+    Load the certificate fonts once per process
+
+    Falls back to Pillow's built-in font when a TrueType file is missing.
+
+    :return: Fonts keyed by role (title, subtitle, details)
+    """
+    fonts = {}
+    for role, (filename, size) in FONT_FILES.items():
+        path = os.path.join(CERTIFICATE_FONT_DIR, filename)
+        try:
+            fonts[role] = ImageFont.truetype(path, size)
+        except OSError:
+            logger.warning(f"Certificate font {path} not found, using the default font")
+            fonts[role] = ImageFont.load_default()
+    return fonts
+
+@functools.lru_cache(maxsize=1)
+def load_template():
+    """
+    Pre-render the parts of the certificate shared by every learner
+
+    :return: Background image with the static text drawn
+    """
+    fonts = load_fonts()
+    template = Image.new('RGB', CERTIFICATE_SIZE, color='white')
+    draw = ImageDraw.Draw(template)
+
+    draw.text((600, 200), "Certificate of Completion", font=fonts["title"], fill='black', anchor='mm')
+    draw.text((600, 300), "This is to certify that", font=fonts["subtitle"], fill='black', anchor='mm')
+    draw.text((600, 500), "has successfully completed the course", font=fonts["subtitle"], fill='black', anchor='mm')
+
+    return template
+
+def _draw_certificate(spec: RenderSpec):
+    fonts = load_fonts()
+    certificate = load_template().copy()
+    draw = ImageDraw.Draw(certificate)
+
+    draw.text((600, 400), spec["user_name"], font=fonts["title"], fill='black', anchor='mm')
+    draw.text((600, 550), spec["course_title"], font=fonts["title"], fill='black', anchor='mm')
+    draw.text((200, 700), f"Completion Date: {spec['issued_at']:%Y-%m-%d}", font=fonts["details"], fill='black')
+    draw.text((900, 700), f"Certificate ID: {spec['certificate_id']}", font=fonts["details"], fill='black')
+
+    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    qr.add_data(spec["verification_url"])
+    qr.make(fit=True)
+    qr_img = qr.make_image(fill_color="black", back_color="white").get_image()
+    certificate.paste(qr_img.resize((200, 200), Image.NEAREST), (50, 50))
+
+    return certificate
+
+def _encode(image, file_format: str) -> bytes:
+    buffer = io.BytesIO()
+    if file_format == "pdf":
+        image.save(buffer, format='PDF', resolution=CERTIFICATE_PDF_DPI)
+    else:
+        image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def render_certificate_png(spec: RenderSpec) -> bytes:
+    """
+    Render one certificate on top of the cached template
+
+    :param spec: certificate_id, user_name, course_title, issued_at (date) and verification_url
+    :return: PNG bytes
+    """
+    return _encode(_draw_certificate(spec), "png")
+
+def render_certificate(spec: RenderSpec) -> Dict[str, bytes]:
+    """
+    Render one certificate once and encode it in every artifact format
+
+    :param spec: Render specification, as for render_certificate_png
+    :return: Encoded artifacts keyed by format (png, pdf)
+    """
+    certificate = _draw_certificate(spec)
+    return {file_format: _encode(certificate, file_format) for file_format in ARTIFACT_FORMATS}
+
+def _warm_worker() -> None:
+    # Pay for font loading and the template once per worker, not per certificate.
+    # A failing initializer would break the whole pool, so errors are left to
+    # surface per certificate instead
+    try:
+        load_fonts()
+        load_template()
+    except Exception as e:
+        logger.error(f"Warming the certificate template failed: {e}")
+
+class CertificateRenderer:
+    """
+    Renders certificates in a pool of worker processes
+
+    Rendering is CPU-bound, so it is kept off the API workers. Each worker
+    process loads the fonts and pre-renders the template once at start-up
+    and then only draws the per-learner fields. The pool is created on
+    first use.
+    """
+
+    def __init__(
+        self,
+        workers: int = CERTIFICATE_RENDER_WORKERS,
+        render_fn: Callable[[RenderSpec], Any] = render_certificate
+    ):
+        self.workers = workers
+        self.render_fn = render_fn
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Spawned workers do not inherit the API process's threads and connections
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_worker if self.render_fn in (render_certificate, render_certificate_png) else None
+                )
+            return self._pool
+
+    def submit(self, spec: RenderSpec) -> Future:
+        """
+        Queue one certificate for rendering
+
+        :param spec: Render specification
+        :return: Future resolving to the render function's output
+        """
+        if self.workers <= 0:
+            future = Future()
+            try:
+                future.set_result(self.render_fn(spec))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return self._get_pool().submit(self.render_fn, spec)
+
+    def render(self, spec: RenderSpec) -> bytes:
+        """
+        Render one certificate and wait for it
+
+        :param spec: Render specification
+        :return: The render function's output (artifacts keyed by format by default)
+        """
+        return self.submit(spec).result()
+
+    def render_many(self, specs: Iterable[RenderSpec]) -> Iterator[Tuple[RenderSpec, Any, Optional[Exception]]]:
+        """
+        Render many certificates, yielding each as soon as it is done
+
+        At most a few renders per worker are in flight, so memory stays
+        bounded for large cohorts.
+
+        :param specs: Render specifications
+        :return: Iterator of (spec, output or None, error or None) in completion order
+        """
+        max_in_flight = max(1, self.workers) * 4
+        in_flight: Dict[Future, RenderSpec] = {}
+
+        def drain():
+            done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for future in done:
+                spec = in_flight.pop(future)
+                error = future.exception()
+                yield spec, None if error else future.result(), error
+
+        for spec in specs:
+            in_flight[self.submit(spec)] = spec
+            if len(in_flight) >= max_in_flight:
+                yield from drain()
+
+        while in_flight:
+            yield from drain()
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker processes
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+# Process-wide renderer shared by certificate requests and batch jobs
+certificate_renderer = CertificateRenderer()
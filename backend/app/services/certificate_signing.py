@@ -0,0 +1,251 @@
+from typing import Dict, List, Any, Optional, Callable, Set
+from datetime import date, datetime
+from sqlalchemy import select
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+
+from app.models.certificate import Certificate
+
+# Falls back to the JWT secret so a deployment always has a signing key
+CERTIFICATE_SIGNING_KEY = os.getenv("CERTIFICATE_SIGNING_KEY") or os.getenv("SECRET_KEY", "your-secret-key")
+# Comma-separated keys still accepted for verification after a key rotation
+CERTIFICATE_PREVIOUS_SIGNING_KEYS = [key for key in os.getenv("CERTIFICATE_PREVIOUS_SIGNING_KEYS", "").split(",") if key]
+CERTIFICATE_REVOCATION_REFRESH_SECONDS = float(os.getenv("CERTIFICATE_REVOCATION_REFRESH_SECONDS", 60))
+
+# 128-bit truncated HMAC-SHA256 keeps the QR code small
+SIGNATURE_BYTES = 16
+
+logger = logging.getLogger(__name__)
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+class CertificateSigner:
+    """
+    Signs and verifies compact certificate tokens
+
+    A token is base64url(JSON claims) + "." + base64url(HMAC-SHA256), so a
+    certificate can be verified from its QR code or link alone.
+    """
+
+    def __init__(self, key: str = CERTIFICATE_SIGNING_KEY, previous_keys: Optional[List[str]] = None):
+        self._keys = [key.encode()] + [k.encode() for k in (CERTIFICATE_PREVIOUS_SIGNING_KEYS if previous_keys is None else previous_keys)]
+
+    @staticmethod
+    def _signature(key: bytes, payload: str) -> bytes:
+        return hmac.new(key, payload.encode(), hashlib.sha256).digest()[:SIGNATURE_BYTES]
+
+    def sign(self, claims: Dict[str, Any]) -> str:
+        """
+        Create a token for the given claims
+
+        :param claims: JSON-serializable claims
+        :return: Signed token
+        """
+        payload = _b64encode(json.dumps(claims, separators=(",", ":"), sort_keys=True).encode())
+        return f"{payload}.{_b64encode(self._signature(self._keys[0], payload))}"
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Check a token's signature and return its claims
+
+        :param token: Signed token
+        :return: Claims
+        :raises ValueError: If the token is malformed or the signature does not match
+        """
+        try:
+            payload, signature = token.split(".")
+            signature_bytes = _b64decode(signature)
+        except ValueError:
+            raise ValueError("Malformed certificate token")
+
+        if not any(hmac.compare_digest(self._signature(key, payload), signature_bytes) for key in self._keys):
+            raise ValueError("Invalid certificate signature")
+
+        try:
+            return json.loads(_b64decode(payload))
+        except ValueError:
+            raise ValueError("Malformed certificate token")
+
+class CertificateRevocationList:
+    """
+    In-memory set of revoked certificate ids, refreshed in the background
+
+    Verification only consults this set, so it never touches the database.
+    The first refresh loads every revoked id; later refreshes only fetch
+    revocations newer than the last one seen.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        refresh_interval: float = CERTIFICATE_REVOCATION_REFRESH_SECONDS
+    ):
+        self._session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self._revoked: Set[str] = set()
+        self._watermark: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _get_session(self):
+        if self._session_factory is None:
+            from app.services.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def is_revoked(self, certificate_id: str) -> bool:
+        with self._lock:
+            return certificate_id in self._revoked
+
+    def add(self, certificate_id: str) -> None:
+        """
+        Mark a certificate revoked in this process without waiting for a refresh
+
+        :param certificate_id: Certificate identifier
+        """
+        with self._lock:
+            self._revoked.add(certificate_id)
+
+    def refresh(self) -> int:
+        """
+        Load revocations recorded since the previous refresh
+
+        :return: Number of newly loaded revocations
+        """
+        certificates = Certificate.__table__
+        query = select(certificates.c.certificate_id, certificates.c.revoked_at).where(
+            certificates.c.revoked_at.isnot(None)
+        )
+        if self._watermark is not None:
+            query = query.where(certificates.c.revoked_at >= self._watermark)
+
+        db = self._get_session()
+        try:
+            rows = db.execute(query).all()
+        finally:
+            db.close()
+
+        with self._lock:
+            before = len(self._revoked)
+            for certificate_id, revoked_at in rows:
+                self._revoked.add(certificate_id)
+                if self._watermark is None or revoked_at > self._watermark:
+                    self._watermark = revoked_at
+            return len(self._revoked) - before
+
+    def _run(self) -> None:
+        while not self._stopping.wait(timeout=self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Refreshing the certificate revocation list failed: {e}")
+
+    def start(self) -> None:
+        """
+        Load the revocation list and start the background refresher
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"Loading the certificate revocation list failed: {e}")
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="certificate-revocations", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the background refresher
+
+        :param timeout: Seconds to wait for the refresher thread
+        """
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+# Process-wide signer and revocation list used by certificate issuing and verification
+certificate_signer = CertificateSigner()
+certificate_revocations = CertificateRevocationList()
+
+class CertificateTokenService:
+    """
+    Issues and verifies offline-verifiable certificate tokens
+    """
+
+    @classmethod
+    def issue_token(
+        cls,
+        certificate_id: str,
+        user_id: int,
+        course_id: int,
+        issued_at: datetime,
+        user_name: str,
+        course_title: str,
+        signer: Optional[CertificateSigner] = None
+    ) -> str:
+        """
+        Signed token carrying everything a verifier displays
+
+        :param certificate_id: Certificate identifier
+        :param user_id: Learner identifier
+        :param course_id: Course identifier
+        :param issued_at: Issue time
+        :param user_name: Name printed on the certificate
+        :param course_title: Course title printed on the certificate
+        :param signer: Signer to use (defaults to the shared signer)
+        :return: Signed token
+        """
+        return (signer or certificate_signer).sign({
+            "cid": certificate_id,
+            "uid": user_id,
+            "crs": course_id,
+            "iat": issued_at.date().isoformat() if isinstance(issued_at, datetime) else str(issued_at),
+            "un": user_name,
+            "ct": course_title
+        })
+
+    @classmethod
+    def verify_token(
+        cls,
+        token: str,
+        signer: Optional[CertificateSigner] = None,
+        revocations: Optional[CertificateRevocationList] = None
+    ) -> Dict[str, Any]:
+        """
+        Verify a certificate token without any database access
+
+        :param token: Signed token from the QR code or verification link
+        :param signer: Signer to use (defaults to the shared signer)
+        :param revocations: Revocation list (defaults to the shared list)
+        :return: Verification result in the shape of CourseProgressService.verify_certificate
+        """
+        try:
+            claims = (signer or certificate_signer).verify(token)
+        except ValueError as e:
+            return {"is_valid": False, "message": str(e)}
+
+        if (revocations or certificate_revocations).is_revoked(claims["cid"]):
+            return {"is_valid": False, "certificate_id": claims["cid"], "message": "Certificate has been revoked"}
+
+        return {
+            "is_valid": True,
+            "certificate_id": claims["cid"],
+            "user_id": claims["uid"],
+            "course_id": claims["crs"],
+            "issued_at": date.fromisoformat(claims["iat"]),
+            "course_title": claims["ct"],
+            "user_name": claims["un"]
+        }
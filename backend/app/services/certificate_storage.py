@@ -0,0 +1,83 @@
+from typing import Dict, Any, Optional, Tuple
+import hashlib
+import os
+import tempfile
+
+CERTIFICATE_STORAGE_DIR = os.getenv("CERTIFICATE_STORAGE_DIR", "./certificates")
+CERTIFICATE_CACHE_MAX_AGE_SECONDS = int(os.getenv("CERTIFICATE_CACHE_MAX_AGE_SECONDS", 86400))
+
+ARTIFACT_MEDIA_TYPES = {
+    "png": "image/png",
+    "pdf": "application/pdf",
+}
+
+class CertificateStorage:
+    """
+    Content-addressed store for rendered certificate artifacts
+
+    Artifacts are written once under their SHA-256 digest
+    (<root>/ab/cd/abcd...<digest>.<format>) and never modified, so the
+    digest stored on the Certificate row doubles as a strong ETag and
+    identical renders share one file.
+    """
+
+    def __init__(self, root: str = CERTIFICATE_STORAGE_DIR):
+        self.root = root
+
+    def path_for(self, digest: str, file_format: str) -> str:
+        """
+        Location of an artifact on disk
+
+        :param digest: SHA-256 hex digest of the artifact
+        :param file_format: Artifact format (png or pdf)
+        :return: Absolute path
+        """
+        if file_format not in ARTIFACT_MEDIA_TYPES:
+            raise ValueError(f"Unsupported certificate format: {file_format}")
+        return os.path.abspath(os.path.join(self.root, digest[:2], digest[2:4], f"{digest}.{file_format}"))
+
+    def put(self, data: bytes, file_format: str) -> Tuple[str, int]:
+        """
+        Store an artifact unless identical content is already stored
+
+        :param data: Artifact bytes
+        :param file_format: Artifact format (png or pdf)
+        :return: (SHA-256 hex digest, size in bytes)
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest, file_format)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file and rename, so readers never see a partial artifact
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as artifact:
+                    artifact.write(data)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        return digest, len(data)
+
+    def put_all(self, artifacts: Dict[str, bytes]) -> Dict[str, Any]:
+        """
+        Store the artifacts of one certificate
+
+        :param artifacts: Artifact bytes keyed by format
+        :return: Certificate column values describing the stored artifacts
+        """
+        values: Dict[str, Any] = {}
+        for file_format, data in artifacts.items():
+            digest, size = self.put(data, file_format)
+            values[f"{file_format}_sha256"] = digest
+            values[f"{file_format}_size"] = size
+        return values
+
+    def exists(self, digest: Optional[str], file_format: str) -> bool:
+        return bool(digest) and os.path.exists(self.path_for(digest, file_format))
+
+# Process-wide artifact store
+certificate_storage = CertificateStorage()
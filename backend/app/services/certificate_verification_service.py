@@ -0,0 +1,143 @@
+from typing import Dict, List, Any, Optional
+from collections import OrderedDict
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+import os
+import threading
+
+from app.models.certificate import Certificate
+from app.models.course import Course
+from app.models.user import User
+from app.services.certificate_signing import CertificateRevocationList, certificate_revocations
+
+CERTIFICATE_VERIFY_CACHE_SIZE = int(os.getenv("CERTIFICATE_VERIFY_CACHE_SIZE", 50000))
+
+class CertificateVerificationService:
+    """
+    Verifies certificates by id, singly or in bulk, through a read-through LRU cache
+
+    Certificates never change once issued, so their verification details
+    are cached indefinitely (bounded by size). Revocation is the only
+    mutable part and is checked against the revocation list on every read,
+    never cached.
+    """
+    _cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    @classmethod
+    def _cache_get(cls, certificate_id: str) -> Optional[Dict[str, Any]]:
+        with cls._cache_lock:
+            details = cls._cache.get(certificate_id)
+            if details is not None:
+                cls._cache.move_to_end(certificate_id)
+            return details
+
+    @classmethod
+    def _cache_put(cls, details: Dict[str, Any]) -> None:
+        with cls._cache_lock:
+            cls._cache[details["certificate_id"]] = details
+            cls._cache.move_to_end(details["certificate_id"])
+            while len(cls._cache) > CERTIFICATE_VERIFY_CACHE_SIZE:
+                cls._cache.popitem(last=False)
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        with cls._cache_lock:
+            cls._cache.clear()
+
+    @classmethod
+    def _load(cls, db: Session, certificate_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Certificate details with learner and course names, in one IN query
+        """
+        certificates = Certificate.__table__
+        users = User.__table__
+        courses = Course.__table__
+
+        rows = db.execute(
+            select(
+                certificates.c.certificate_id,
+                certificates.c.user_id,
+                certificates.c.course_id,
+                certificates.c.issued_at,
+                certificates.c.revoked_at,
+                users.c.username,
+                courses.c.title
+            ).select_from(
+                certificates.join(users, users.c.id == certificates.c.user_id).join(
+                    courses, courses.c.id == certificates.c.course_id
+                )
+            ).where(certificates.c.certificate_id.in_(certificate_ids))
+        ).all()
+
+        return {
+            row.certificate_id: {
+                "certificate_id": row.certificate_id,
+                "user_id": row.user_id,
+                "course_id": row.course_id,
+                "issued_at": row.issued_at,
+                "course_title": row.title,
+                "user_name": row.username,
+                "revoked": row.revoked_at is not None
+            }
+            for row in rows
+        }
+
+    @classmethod
+    def verify_many(
+        cls,
+        db: Session,
+        certificate_ids: List[str],
+        revocations: Optional[CertificateRevocationList] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Verify many certificates with at most one database query
+
+        :param db: Database session
+        :param certificate_ids: Certificate identifiers (duplicates allowed)
+        :param revocations: Revocation list (defaults to the shared list)
+        :return: One verification result per requested id, in request order
+        """
+        revocations = revocations or certificate_revocations
+
+        found: Dict[str, Dict[str, Any]] = {}
+        misses = []
+        for certificate_id in dict.fromkeys(certificate_ids):
+            details = cls._cache_get(certificate_id)
+            if details is None:
+                misses.append(certificate_id)
+            else:
+                found[certificate_id] = details
+
+        if misses:
+            # Unknown ids are not cached: they may be issued later
+            for certificate_id, details in cls._load(db, misses).items():
+                if not details["revoked"]:
+                    cls._cache_put(details)
+                found[certificate_id] = details
+
+        results = []
+        for certificate_id in certificate_ids:
+            details = found.get(certificate_id)
+            if details is None:
+                results.append({"certificate_id": certificate_id, "is_valid": False, "message": "Certificate not found"})
+            elif details["revoked"] or revocations.is_revoked(certificate_id):
+                results.append({"certificate_id": certificate_id, "is_valid": False, "message": "Certificate has been revoked"})
+            else:
+                results.append({
+                    "is_valid": True,
+                    **{key: value for key, value in details.items() if key != "revoked"}
+                })
+
+        return results
+
+    @classmethod
+    def verify(cls, db: Session, certificate_id: str) -> Dict[str, Any]:
+        """
+        Verify one certificate through the same cache
+
+        :param db: Database session
+        :param certificate_id: Certificate identifier
+        :return: Verification result
+        """
+        return cls.verify_many(db, [certificate_id])[0]
@@ -1,17 +1,20 @@
 from typing import Dict, List, Optional, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, select
 from datetime import datetime
 import uuid
-import qrcode
-import io
-import base64
-from PIL import Image, ImageDraw, ImageFont
 
 from app.models.user import User
-from app.models.course import Course, CourseEnrollment, CourseModule, CourseLesson
+from app.models.course import Course, Enrollment
 from app.models.assessment import Quiz, QuizSubmission
-from app.core.config import settings
+from app.models.certificate import Certificate
+from app.services.certificate_batch_service import BASE_URL, CertificateBatchService
+from app.services.enrollment_progress_service import EnrollmentProgressService
+from app.services.certificate_renderer import ARTIFACT_FORMATS, certificate_renderer
+from app.services.certificate_storage import certificate_storage
+from app.services.certificate_signing import CertificateTokenService
+from app.services.certificate_verification_service import CertificateVerificationService
+from app.utils.upsert import dialect_insert
 
 class CourseProgressService:
     """
@@ -33,50 +36,48 @@ class CourseProgressService:
         :param course_id: Course identifier
         :return: Detailed progress dictionary
         """
-        # Total modules and lessons in the course
-        total_modules = db.query(CourseModule).filter(
-            CourseModule.course_id == course_id
-        ).count()
-        
-        total_lessons = db.query(CourseLesson).filter(
-            CourseLesson.course_id == course_id
-        ).count()
-        
-        # Completed lessons
-        completed_lessons = db.query(CourseLesson).join(
-            QuizSubmission, 
-            and_(
-                QuizSubmission.quiz_id == CourseLesson.quiz_id,
-                QuizSubmission.user_id == user_id,
-                QuizSubmission.is_passed == True
+        enrollments = Enrollment.__table__
+        quizzes = Quiz.__table__
+        submissions = QuizSubmission.__table__
+
+        enrollment = db.execute(
+            select(
+                enrollments.c.total_lessons,
+                enrollments.c.completed_lessons,
+                enrollments.c.last_activity_at
+            ).where(
+                enrollments.c.user_id == user_id,
+                enrollments.c.course_id == course_id
             )
-        ).filter(
-            CourseLesson.course_id == course_id
-        ).count()
+        ).first()
+        
+        # Lesson counters are maintained on the enrollment
+        progress = EnrollmentProgressService.get_progress(enrollment) if enrollment else {
+            "total_lessons": 0,
+            "completed_lessons": 0,
+            "progress_percentage": 0,
+            "last_activity_at": None
+        }
         
         # Quiz performance
-        quiz_performance = db.query(
-            func.avg(QuizSubmission.score)
-        ).join(
-            CourseLesson,
-            CourseLesson.quiz_id == QuizSubmission.quiz_id
-        ).filter(
-            CourseLesson.course_id == course_id,
-            QuizSubmission.user_id == user_id
+        quiz_performance = db.execute(
+            select(func.avg(submissions.c.score)).select_from(
+                submissions.join(quizzes, quizzes.c.id == submissions.c.quiz_id)
+            ).where(
+                quizzes.c.course_id == course_id,
+                submissions.c.user_id == user_id
+            )
         ).scalar() or 0
         
-        # Progress calculations
-        lesson_progress = (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0
-        module_progress = (completed_lessons / total_lessons * total_modules) if total_lessons > 0 else 0
+        lesson_progress = progress["progress_percentage"]
         
         return {
-            "total_modules": total_modules,
-            "total_lessons": total_lessons,
-            "completed_lessons": completed_lessons,
+            "total_lessons": progress["total_lessons"],
+            "completed_lessons": progress["completed_lessons"],
             "lesson_progress_percentage": lesson_progress,
-            "module_progress_percentage": module_progress,
+            "last_activity_at": progress["last_activity_at"],
             "average_quiz_score": quiz_performance,
-            "is_course_completed": lesson_progress >= 100
+            "is_course_completed": progress["total_lessons"] > 0 and lesson_progress >= 100
         }
     
     @classmethod
@@ -104,70 +105,72 @@ class CourseProgressService:
             }
         
         # Fetch user and course details
-        user = db.query(User).filter(User.id == user_id).first()
-        course = db.query(Course).filter(Course.id == course_id).first()
+        user_name = db.execute(select(User.__table__.c.username).where(User.__table__.c.id == user_id)).scalar()
+        course_title = db.execute(select(Course.__table__.c.title).where(Course.__table__.c.id == course_id)).scalar()
         
-        if not user or not course:
+        if user_name is None or course_title is None:
             raise ValueError("User or Course not found")
         
-        # Generate unique certificate ID
-        certificate_id = str(uuid.uuid4())
-        
-        # Generate QR Code
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        qr.add_data(f"{settings.BASE_URL}/verify-certificate/{certificate_id}")
-        qr.make(fit=True)
-        qr_img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Create certificate image
-        certificate = Image.new('RGB', (1200, 800), color='white')
-        draw = ImageDraw.Draw(certificate)
-        
-        # Load fonts
-        title_font = ImageFont.truetype("path/to/fonts/Montserrat-Bold.ttf", 60)
-        subtitle_font = ImageFont.truetype("path/to/fonts/Montserrat-Regular.ttf", 40)
-        details_font = ImageFont.truetype("path/to/fonts/Montserrat-Light.ttf", 30)
-        
-        # Draw certificate elements
-        draw.text((600, 200), "Certificate of Completion", font=title_font, fill='black', anchor='mm')
-        draw.text((600, 300), f"This is to certify that", font=subtitle_font, fill='black', anchor='mm')
-        draw.text((600, 400), user.username, font=title_font, fill='black', anchor='mm')
-        draw.text((600, 500), f"has successfully completed the course", font=subtitle_font, fill='black', anchor='mm')
-        draw.text((600, 550), course.title, font=title_font, fill='black', anchor='mm')
-        
-        # Add completion details
-        draw.text((200, 700), f"Completion Date: {datetime.utcnow().strftime('%Y-%m-%d')}", font=details_font, fill='black')
-        draw.text((900, 700), f"Certificate ID: {certificate_id}", font=details_font, fill='black')
-        
-        # Embed QR Code
-        qr_resized = qr_img.resize((200, 200))
-        certificate.paste(qr_resized, (50, 50))
-        
-        # Save certificate
-        certificate_buffer = io.BytesIO()
-        certificate.save(certificate_buffer, format='PNG')
-        certificate_base64 = base64.b64encode(certificate_buffer.getvalue()).decode('utf-8')
+        # A learner holds one certificate per course; a concurrent request
+        # that issued it first wins and its certificate is returned
+        certificates = Certificate.__table__
+        db.execute(
+            dialect_insert(db, certificates).values(
+                user_id=user_id,
+                course_id=course_id,
+                certificate_id=str(uuid.uuid4()),
+                issued_at=datetime.utcnow()
+            ).on_conflict_do_nothing(index_elements=[certificates.c.user_id, certificates.c.course_id])
+        )
+        db.commit()
         
-        # Store certificate in database
-        from app.models.certificate import Certificate
+        certificate = db.execute(
+            select(
+                certificates.c.certificate_id,
+                certificates.c.issued_at,
+                certificates.c.rendered_at,
+                certificates.c.png_sha256,
+                certificates.c.pdf_sha256
+            ).where(
+                certificates.c.user_id == user_id,
+                certificates.c.course_id == course_id
+            )
+        ).one()
+        certificate_id = certificate.certificate_id
         
-        certificate_record = Certificate(
-            user_id=user_id,
-            course_id=course_id,
-            certificate_id=certificate_id,
-            issued_at=datetime.utcnow()
+        # The signed token lets employers verify the certificate without a lookup
+        token = CertificateTokenService.issue_token(
+            certificate_id, user_id, course_id, certificate.issued_at, user_name, course_title
         )
-        
-        db.add(certificate_record)
-        db.commit()
+        verification_url = CertificateBatchService.verification_url(token)
+        
+        if certificate.rendered_at is None:
+            # Render off the request worker, on the cached template and fonts
+            artifacts = certificate_renderer.render({
+                "certificate_id": certificate_id,
+                "user_name": user_name,
+                "course_title": course_title,
+                "issued_at": certificate.issued_at,
+                "verification_url": verification_url
+            })
+            CertificateBatchService.store_artifacts(db, [(certificate_id, artifacts)], certificate_storage)
+            formats = list(artifacts)
+        else:
+            formats = [
+                file_format for file_format in ARTIFACT_FORMATS
+                if getattr(certificate, f"{file_format}_sha256")
+            ]
         
         return {
             "certificate_id": certificate_id,
             "user_id": user_id,
             "course_id": course_id,
-            "course_title": course.title,
-            "certificate_image": certificate_base64,
-            "verification_url": f"{settings.BASE_URL}/verify-certificate/{certificate_id}"
+            "course_title": course_title,
+            "downloads": {
+                file_format: f"{BASE_URL}/certificates/{certificate_id}/download?format={file_format}"
+                for file_format in formats
+            },
+            "verification_url": verification_url
         }
     
     @classmethod
@@ -183,23 +186,4 @@ class CourseProgressService:
         :param certificate_id: Certificate identifier
         :return: Certificate verification details
         """
-        from app.models.certificate import Certificate
-        
-        certificate = db.query(Certificate).filter(
-            Certificate.certificate_id == certificate_id
-        ).first()
-        
-        if not certificate:
-            return {
-                "is_valid": False,
-                "message": "Certificate not found"
-            }
-        
-        return {
-            "is_valid": True,
-            "user_id": certificate.user_id,
-            "course_id": certificate.course_id,
-            "issued_at": certificate.issued_at,
-            "course_title": certificate.course.title,
-            "user_name": certificate.user.username
-        }
+        return CertificateVerificationService.verify(db, certificate_id)
@@ -1,5 +1,5 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from sqlalchemy.pool import StaticPool
 import os
 from dotenv import load_dotenv
@@ -28,16 +28,16 @@ DATABASE_URL = get_database_url()
 # Determine if we're using SQLite
 is_sqlite = DATABASE_URL.startswith("sqlite")
 
-# Create SQLAlchemy engine with appropriate configuration
-if is_sqlite:
-    engine = create_engine(
-        DATABASE_URL, 
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool
-    )
-else:
-    engine = create_engine(
-        DATABASE_URL,
+def create_db_engine(url: str):
+    # Create SQLAlchemy engine with appropriate configuration
+    if url.startswith("sqlite"):
+        return create_engine(
+            url, 
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+    return create_engine(
+        url,
         pool_size=10,
         max_overflow=20,
         pool_timeout=30,
@@ -45,9 +45,36 @@ else:
         echo=False  # Set to True for SQL logging during development
     )
 
+engine = create_db_engine(DATABASE_URL)
+
+# Optional read replica for analytics and reporting queries
+ANALYTICS_DATABASE_URL = os.getenv("ANALYTICS_DATABASE_URL")
+analytics_engine = create_db_engine(ANALYTICS_DATABASE_URL) if ANALYTICS_DATABASE_URL else None
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+class RoutingSession(Session):
+    """
+    Session that sends reads to the analytics replica when allowed
+
+    Reads only go to the replica while ``info["use_replica"]`` is set and a
+    replica is configured; flushes and INSERT/UPDATE/DELETE statements
+    always go to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            analytics_engine is not None
+            and self.info.get("use_replica")
+            and not self._flushing
+            and not getattr(clause, "is_dml", False)
+        ):
+            return analytics_engine
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+AnalyticsSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+
 # Base class for models
 Base = declarative_base()
 
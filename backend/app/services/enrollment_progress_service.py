@@ -0,0 +1,249 @@
+from typing import Dict, Any, Optional
+from sqlalchemy.engine import Row
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.orm import Session
+from datetime import datetime
+
+from app.models.course import Enrollment, Lesson, CourseProgress
+from app.utils.upsert import dialect_insert
+
+class EnrollmentProgressService:
+    """
+    Maintains the denormalized progress counters stored on enrollments
+    """
+
+    @classmethod
+    def count_course_lessons(cls, db: Session, course_id: int) -> int:
+        """
+        Number of lessons in a course, used to seed a new enrollment
+
+        :param db: Database session
+        :param course_id: Course identifier
+        :return: Lesson count
+        """
+        return db.query(func.count(Lesson.id)).filter(Lesson.course_id == course_id).scalar()
+
+    @classmethod
+    def lock_lesson_progress(cls, db: Session, user_id: int, enrollment_id: int, lesson_id: int) -> Optional[Row]:
+        """
+        Lock a learner's enrollment and read the lesson and its current progress
+
+        One statement takes the enrollment row lock, which serializes progress
+        writers of the enrollment, and returns everything a progress update
+        needs: the lesson (only if it belongs to the enrolled course) and
+        whether it was already completed.
+
+        :param db: Database session
+        :param user_id: Learner the enrollment must belong to
+        :param enrollment_id: Enrollment identifier
+        :param lesson_id: Lesson identifier
+        :return: Row with enrollment_id, was_completed and the lesson's columns
+                 (all None if the lesson is not in the course), or None if
+                 the enrollment is not the learner's
+        """
+        enrollments = Enrollment.__table__
+        lessons = Lesson.__table__
+        progress = CourseProgress.__table__
+
+        return db.execute(
+            select(
+                enrollments.c.id.label("enrollment_id"),
+                progress.c.completed.label("was_completed"),
+                *lessons.c
+            ).select_from(
+                enrollments.outerjoin(lessons, and_(
+                    lessons.c.id == lesson_id,
+                    lessons.c.course_id == enrollments.c.course_id
+                )).outerjoin(progress, and_(
+                    progress.c.enrollment_id == enrollments.c.id,
+                    progress.c.lesson_id == lessons.c.id
+                ))
+            ).where(
+                enrollments.c.id == enrollment_id,
+                enrollments.c.user_id == user_id
+            ).with_for_update(of=enrollments)
+        ).first()
+
+    @classmethod
+    def upsert_lesson_progress(
+        cls,
+        db: Session,
+        enrollment_id: int,
+        lesson_id: int,
+        completed: bool,
+        progress_percentage: float,
+        at: Optional[datetime] = None
+    ) -> Row:
+        """
+        Create or update the progress row of a lesson in one statement
+
+        Uses INSERT ... ON CONFLICT DO UPDATE on the unique (enrollment,
+        lesson) index, so concurrent requests for the same lesson can never
+        create duplicate rows. Runs in the caller's transaction.
+
+        :param db: Database session
+        :param enrollment_id: Enrollment identifier
+        :param lesson_id: Lesson identifier
+        :param completed: Whether the lesson is completed
+        :param progress_percentage: Progress within the lesson
+        :param at: Time of the update (defaults to now)
+        :return: The progress row as written (from RETURNING)
+        """
+        at = at or datetime.utcnow()
+        table = CourseProgress.__table__
+
+        stmt = dialect_insert(db, table).values(
+            enrollment_id=enrollment_id,
+            lesson_id=lesson_id,
+            completed=completed,
+            progress_percentage=progress_percentage,
+            completed_at=at if completed else None,
+            updated_at=at,
+            synced_at=datetime.utcnow()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.enrollment_id, table.c.lesson_id],
+            set_={
+                "completed": stmt.excluded.completed,
+                "progress_percentage": stmt.excluded.progress_percentage,
+                "completed_at": case(
+                    (stmt.excluded.completed.is_(True), stmt.excluded.completed_at),
+                    else_=table.c.completed_at
+                ),
+                "updated_at": stmt.excluded.updated_at,
+                "synced_at": stmt.excluded.synced_at
+            }
+        ).returning(*table.c)
+
+        return db.execute(stmt).one()
+
+    @classmethod
+    def record_progress_change(
+        cls,
+        db: Session,
+        enrollment_id: int,
+        was_completed: bool,
+        is_completed: bool,
+        at: Optional[datetime] = None
+    ) -> None:
+        """
+        Apply a lesson progress update to the enrollment counters
+
+        Runs in the caller's transaction, which must hold the enrollment row
+        lock (see lock_lesson_progress) so was_completed is still current.
+        The counter is changed with an in-database increment.
+
+        :param db: Database session
+        :param enrollment_id: Enrollment the lesson progress belongs to
+        :param was_completed: Whether the lesson was completed before the update
+        :param is_completed: Whether the lesson is completed after the update
+        :param at: Time of the activity (defaults to now)
+        """
+        delta = int(bool(is_completed)) - int(bool(was_completed))
+
+        enrollments = Enrollment.__table__
+        values = {"last_activity_at": at or datetime.utcnow()}
+        if delta:
+            values["completed_lessons"] = enrollments.c.completed_lessons + delta
+
+        db.execute(update(enrollments).where(enrollments.c.id == enrollment_id).values(**values))
+
+    @classmethod
+    def lesson_added(cls, db: Session, course_id: int) -> None:
+        """
+        Bump the lesson total of every enrollment in a course
+
+        :param db: Database session
+        :param course_id: Course the lesson was added to
+        """
+        enrollments = Enrollment.__table__
+        db.execute(update(enrollments).where(
+            enrollments.c.course_id == course_id
+        ).values(total_lessons=enrollments.c.total_lessons + 1))
+
+    @classmethod
+    def lesson_removed(cls, db: Session, course_id: int, lesson_id: int) -> None:
+        """
+        Lower the lesson total (and completed count where it applied) of every
+        enrollment in a course
+
+        Call before the lesson's progress rows are deleted.
+
+        :param db: Database session
+        :param course_id: Course the lesson belonged to
+        :param lesson_id: Removed lesson
+        """
+        enrollments = Enrollment.__table__
+        progress = CourseProgress.__table__
+
+        completed_here = select(progress.c.enrollment_id).where(
+            progress.c.lesson_id == lesson_id,
+            progress.c.completed.is_(True)
+        )
+
+        db.execute(update(enrollments).where(
+            enrollments.c.course_id == course_id,
+            enrollments.c.id.in_(completed_here)
+        ).values(completed_lessons=enrollments.c.completed_lessons - 1))
+
+        db.execute(update(enrollments).where(
+            enrollments.c.course_id == course_id
+        ).values(total_lessons=enrollments.c.total_lessons - 1))
+
+    @classmethod
+    def get_progress(cls, enrollment: Enrollment) -> Dict[str, Any]:
+        """
+        Progress summary read straight from the enrollment counters
+
+        :param enrollment: Enrollment
+        :return: Lesson totals, percentage and last activity
+        """
+        total = enrollment.total_lessons or 0
+        completed = enrollment.completed_lessons or 0
+
+        return {
+            "total_lessons": total,
+            "completed_lessons": completed,
+            "progress_percentage": round(completed / total * 100, 2) if total > 0 else 0,
+            "last_activity_at": enrollment.last_activity_at
+        }
+
+    @classmethod
+    def repair(cls, db: Session, course_id: Optional[int] = None) -> int:
+        """
+        Recompute drifted enrollment counters from lessons and progress rows
+
+        :param db: Database session
+        :param course_id: Limit the repair to one course
+        :return: Number of enrollments whose counters were corrected
+        """
+        enrollments = Enrollment.__table__
+        lessons = Lesson.__table__
+        progress = CourseProgress.__table__
+
+        expected_total = select(func.count(lessons.c.id)).where(
+            lessons.c.course_id == enrollments.c.course_id
+        ).scalar_subquery()
+        expected_completed = select(func.count(progress.c.id)).where(
+            progress.c.enrollment_id == enrollments.c.id,
+            progress.c.completed.is_(True)
+        ).scalar_subquery()
+        expected_activity = select(func.max(progress.c.completed_at)).where(
+            progress.c.enrollment_id == enrollments.c.id
+        ).scalar_subquery()
+
+        conditions = [or_(
+            enrollments.c.total_lessons != expected_total,
+            enrollments.c.completed_lessons != expected_completed
+        )]
+        if course_id is not None:
+            conditions.append(enrollments.c.course_id == course_id)
+
+        result = db.execute(update(enrollments).where(and_(*conditions)).values(
+            total_lessons=expected_total,
+            completed_lessons=expected_completed,
+            last_activity_at=func.coalesce(enrollments.c.last_activity_at, expected_activity)
+        ))
+        db.commit()
+
+        return result.rowcount
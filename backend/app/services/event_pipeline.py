@@ -0,0 +1,256 @@
+from typing import Dict, List, Any, Optional, Callable
+from dataclasses import dataclass, field
+from collections import deque
+from datetime import date, datetime, timedelta
+from enum import Enum
+from sqlalchemy import insert, text
+import logging
+import os
+import threading
+import time
+
+from app.models.event import EventLog
+
+EVENT_BUFFER_CAPACITY = int(os.getenv("EVENT_BUFFER_CAPACITY", 50000))
+EVENT_FLUSH_BATCH_SIZE = int(os.getenv("EVENT_FLUSH_BATCH_SIZE", 1000))
+EVENT_FLUSH_INTERVAL_SECONDS = float(os.getenv("EVENT_FLUSH_INTERVAL_SECONDS", 2.0))
+EVENT_PARTITION_DAYS_AHEAD = int(os.getenv("EVENT_PARTITION_DAYS_AHEAD", 7))
+
+logger = logging.getLogger(__name__)
+
+class LearningEventType(str, Enum):
+    LESSON_VIEWED = "lesson_viewed"
+    PROGRESS_UPDATED = "progress_updated"
+    LESSON_COMPLETED = "lesson_completed"
+    QUIZ_STARTED = "quiz_started"
+    QUIZ_SUBMITTED = "quiz_submitted"
+
+@dataclass(frozen=True)
+class LearningEvent:
+    """
+    A single learning event as published by request handlers and services
+    """
+    event_type: LearningEventType
+    user_id: Optional[int] = None
+    course_id: Optional[int] = None
+    entity_id: Optional[int] = None
+    payload: Dict[str, Any] = field(default_factory=dict)
+    occurred_at: datetime = field(default_factory=datetime.utcnow)
+
+    def to_row(self) -> Dict[str, Any]:
+        return {
+            "event_date": self.occurred_at.date(),
+            "event_type": self.event_type.value,
+            "user_id": self.user_id,
+            "course_id": self.course_id,
+            "entity_id": self.entity_id,
+            "payload": self.payload or None,
+            "occurred_at": self.occurred_at
+        }
+
+class LearningEventPipeline:
+    """
+    In-process ring buffer of learning events with a background batch flusher
+
+    Publishing only appends to a bounded buffer, so request latency never
+    depends on the events table. A daemon thread drains the buffer every
+    flush interval (or as soon as a full batch is waiting), writes each
+    batch with a single executemany INSERT and then hands the persisted
+    batch to subscribers such as rollups, counters and recommendations.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        capacity: int = EVENT_BUFFER_CAPACITY,
+        batch_size: int = EVENT_FLUSH_BATCH_SIZE,
+        flush_interval: float = EVENT_FLUSH_INTERVAL_SECONDS
+    ):
+        self._session_factory = session_factory
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._subscribers: List[Callable[[List[LearningEvent]], None]] = []
+        self._partitions_checked_on: Optional[date] = None
+
+        self.dropped_events = 0
+        self.flushed_events = 0
+
+    def _get_session(self):
+        if self._session_factory is None:
+            from app.services.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def subscribe(self, callback: Callable[[List[LearningEvent]], None]) -> None:
+        """
+        Register a consumer called with every persisted batch of events
+
+        :param callback: Function receiving a list of LearningEvent
+        """
+        self._subscribers.append(callback)
+
+    def publish(self, event: LearningEvent) -> bool:
+        """
+        Append an event to the buffer without touching the database
+
+        :param event: Event to publish
+        :return: False if the buffer is full and the event was dropped
+        """
+        with self._lock:
+            if len(self._buffer) >= self.capacity:
+                self.dropped_events += 1
+                return False
+            self._buffer.append(event)
+            pending = len(self._buffer)
+
+        if pending >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self) -> int:
+        """
+        Write all buffered events in batches
+
+        Failed batches are put back at the front of the buffer so they are
+        retried in order on the next flush.
+
+        :return: Number of events written
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                if not batch:
+                    break
+
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    logger.error(f"Flushing {len(batch)} learning events failed: {e}")
+                    with self._lock:
+                        self._buffer.extendleft(reversed(batch))
+                    break
+
+                written += len(batch)
+                self.flushed_events += len(batch)
+                self._notify(batch)
+
+        return written
+
+    def _write_batch(self, batch: List[LearningEvent]) -> None:
+        db = self._get_session()
+        try:
+            self._ensure_partitions(db)
+            db.execute(insert(EventLog.__table__), [event.to_row() for event in batch])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _ensure_partitions(self, db) -> None:
+        """
+        Create upcoming daily partitions of the events table on Postgres
+        """
+        today = datetime.utcnow().date()
+        if self._partitions_checked_on == today:
+            return
+
+        if db.get_bind().dialect.name == "postgresql":
+            for offset in range(EVENT_PARTITION_DAYS_AHEAD + 1):
+                day = today + timedelta(days=offset)
+                db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS events_{day:%Y%m%d} PARTITION OF events "
+                    f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+                ))
+        self._partitions_checked_on = today
+
+    def _notify(self, batch: List[LearningEvent]) -> None:
+        for subscriber in self._subscribers:
+            try:
+                subscriber(batch)
+            except Exception as e:
+                logger.error(f"Learning event subscriber {subscriber!r} failed: {e}")
+
+    def _run(self) -> None:
+        backoff = self.flush_interval
+        while not self._stopping.is_set():
+            self._wakeup.wait(timeout=backoff)
+            self._wakeup.clear()
+
+            before = self.pending()
+            self.flush()
+            # Back off while the database is unavailable instead of spinning
+            if before and self.pending() >= before:
+                backoff = min(backoff * 2, 60.0)
+            else:
+                backoff = self.flush_interval
+
+    def start(self) -> None:
+        """
+        Start the background flusher thread
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="learning-event-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop the flusher and write whatever is still buffered
+
+        :param timeout: Seconds to wait for the flusher thread
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+        deadline = time.monotonic() + timeout
+        while self.pending() and time.monotonic() < deadline:
+            if not self.flush():
+                break
+
+# Process-wide pipeline used by routes and services
+event_pipeline = LearningEventPipeline()
+
+def publish_event(
+    event_type: LearningEventType,
+    user_id: Optional[int] = None,
+    course_id: Optional[int] = None,
+    entity_id: Optional[int] = None,
+    **payload
+) -> bool:
+    """
+    Publish a learning event to the process-wide pipeline
+
+    :param event_type: Type of event
+    :param user_id: Learner the event is about
+    :param course_id: Course the event belongs to
+    :param entity_id: Lesson, quiz or submission id depending on the type
+    :param payload: Extra event attributes
+    :return: False if the event was dropped because the buffer is full
+    """
+    return event_pipeline.publish(LearningEvent(
+        event_type=event_type,
+        user_id=user_id,
+        course_id=course_id,
+        entity_id=entity_id,
+        payload=payload
+    ))
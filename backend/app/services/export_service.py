@@ -0,0 +1,217 @@
+from typing import Dict, List, Any, Optional, BinaryIO
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from datetime import datetime
+import os
+
+from app.models.assessment import Quiz, QuizSubmission, QuizSubmissionAnswer
+from app.models.lesson import LessonModule
+from app.models.lesson_progress import LessonProgress
+from app.utils.lazy_import import lazy_import
+
+pa = lazy_import("pyarrow")
+pa_ipc = lazy_import("pyarrow.ipc")
+pq = lazy_import("pyarrow.parquet")
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 50000))
+EXPORT_FORMATS = ("parquet", "arrow")
+
+# Column name -> arrow type name, in output order
+EXPORT_TABLES: Dict[str, List[tuple]] = {
+    "quiz_submissions": [
+        ("id", "int64"),
+        ("quiz_id", "int64"),
+        ("course_id", "int64"),
+        ("user_id", "int64"),
+        ("score", "float64"),
+        ("is_passed", "bool"),
+        ("submitted_at", "timestamp"),
+    ],
+    "quiz_submission_answers": [
+        ("id", "int64"),
+        ("submission_id", "int64"),
+        ("question_id", "int64"),
+        ("quiz_id", "int64"),
+        ("course_id", "int64"),
+        ("user_id", "int64"),
+        ("user_answer", "string"),
+        ("is_correct", "bool"),
+        ("keyword_match_score", "float64"),
+        ("length_score", "float64"),
+        ("manual_score", "float64"),
+        ("submitted_at", "timestamp"),
+    ],
+    "lesson_progresses": [
+        ("id", "int64"),
+        ("user_id", "int64"),
+        ("lesson_id", "int64"),
+        ("course_id", "int64"),
+        ("started_at", "timestamp"),
+        ("completed_at", "timestamp"),
+        ("is_completed", "bool"),
+        ("total_time_spent", "int64"),
+    ],
+}
+
+class SubmissionExportService:
+    """
+    Streams assessment and progress tables into typed Arrow/Parquet files
+    without materializing them in memory
+    """
+
+    @classmethod
+    def arrow_schema(cls, table: str):
+        """
+        Build the Arrow schema for an exportable table
+
+        :param table: Export table name
+        :return: pyarrow.Schema
+        """
+        arrow_types = {
+            "int64": pa.int64(),
+            "float64": pa.float64(),
+            "bool": pa.bool_(),
+            "string": pa.string(),
+            "timestamp": pa.timestamp("us"),
+        }
+        return pa.schema([
+            pa.field(name, arrow_types[type_name]) for name, type_name in EXPORT_TABLES[table]
+        ])
+
+    @classmethod
+    def build_query(
+        cls,
+        table: str,
+        course_id: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ):
+        """
+        Build the Core select for a table with course and date range filters
+
+        Core table columns are used instead of ORM entities so rows are never
+        turned into tracked objects.
+
+        :param table: Export table name
+        :param course_id: Optional course filter
+        :param start: Optional inclusive lower bound on the event timestamp
+        :param end: Optional exclusive upper bound on the event timestamp
+        :return: SQLAlchemy select ordered by primary key
+        """
+        submissions = QuizSubmission.__table__
+        answers = QuizSubmissionAnswer.__table__
+        quizzes = Quiz.__table__
+        progresses = LessonProgress.__table__
+        lessons = LessonModule.__table__
+
+        if table == "quiz_submissions":
+            query = select(
+                submissions.c.id,
+                submissions.c.quiz_id,
+                quizzes.c.course_id,
+                submissions.c.user_id,
+                submissions.c.score,
+                submissions.c.is_passed,
+                submissions.c.submitted_at
+            ).join(quizzes, quizzes.c.id == submissions.c.quiz_id)
+            course_column, time_column, order_column = quizzes.c.course_id, submissions.c.submitted_at, submissions.c.id
+        elif table == "quiz_submission_answers":
+            query = select(
+                answers.c.id,
+                answers.c.submission_id,
+                answers.c.question_id,
+                submissions.c.quiz_id,
+                quizzes.c.course_id,
+                submissions.c.user_id,
+                answers.c.user_answer,
+                answers.c.is_correct,
+                answers.c.keyword_match_score,
+                answers.c.length_score,
+                answers.c.manual_score,
+                submissions.c.submitted_at
+            ).join(
+                submissions, submissions.c.id == answers.c.submission_id
+            ).join(
+                quizzes, quizzes.c.id == submissions.c.quiz_id
+            )
+            course_column, time_column, order_column = quizzes.c.course_id, submissions.c.submitted_at, answers.c.id
+        elif table == "lesson_progresses":
+            query = select(
+                progresses.c.id,
+                progresses.c.user_id,
+                progresses.c.lesson_id,
+                lessons.c.course_id,
+                progresses.c.started_at,
+                progresses.c.completed_at,
+                progresses.c.is_completed,
+                progresses.c.total_time_spent
+            ).join(lessons, lessons.c.id == progresses.c.lesson_id)
+            course_column, time_column, order_column = lessons.c.course_id, progresses.c.started_at, progresses.c.id
+        else:
+            raise ValueError(f"Unknown export table: {table}")
+
+        if course_id is not None:
+            query = query.where(course_column == course_id)
+        if start is not None:
+            query = query.where(time_column >= start)
+        if end is not None:
+            query = query.where(time_column < end)
+
+        return query.order_by(order_column)
+
+    @classmethod
+    def export(
+        cls,
+        db: Session,
+        table: str,
+        sink: BinaryIO,
+        file_format: str = "parquet",
+        course_id: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE
+    ) -> int:
+        """
+        Stream a table into an Arrow IPC or Parquet file chunk by chunk
+
+        Rows are fetched through a server-side cursor and written one record
+        batch at a time, so memory stays bounded by chunk_size.
+
+        :param db: Database session
+        :param table: Export table name
+        :param sink: Writable binary file object
+        :param file_format: 'parquet' or 'arrow'
+        :param course_id: Optional course filter
+        :param start: Optional inclusive lower bound on the event timestamp
+        :param end: Optional exclusive upper bound on the event timestamp
+        :param chunk_size: Rows fetched and written per batch
+        :return: Number of exported rows
+        """
+        if table not in EXPORT_TABLES:
+            raise ValueError(f"Unknown export table: {table}")
+        if file_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {file_format}")
+
+        schema = cls.arrow_schema(table)
+        query = cls.build_query(table, course_id, start, end)
+
+        if file_format == "parquet":
+            writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        else:
+            writer = pa_ipc.new_file(sink, schema)
+
+        total_rows = 0
+        try:
+            result = db.execute(query.execution_options(stream_results=True, yield_per=chunk_size))
+            for rows in result.partitions(chunk_size):
+                columns = list(zip(*rows))
+                batch = pa.RecordBatch.from_arrays(
+                    [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                    schema=schema
+                )
+                writer.write_batch(batch)
+                total_rows += len(rows)
+        finally:
+            writer.close()
+
+        return total_rows
@@ -0,0 +1,365 @@
+from typing import Dict, List, Optional, Callable, Tuple
+from sqlalchemy import bindparam, select, tuple_, update
+from datetime import datetime
+import logging
+import os
+import re
+import shutil
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: only this process's own logs are recovered
+    fcntl = None
+
+from app.models.lesson import LessonModule
+from app.models.lesson_progress import LessonProgress
+
+HEARTBEAT_FLUSH_INTERVAL_SECONDS = float(os.getenv("HEARTBEAT_FLUSH_INTERVAL_SECONDS", 10))
+HEARTBEAT_FLUSH_MAX_ENTRIES = int(os.getenv("HEARTBEAT_FLUSH_MAX_ENTRIES", 5000))
+# Directory of per-process append logs replayed after a crash; set to an empty string to disable
+HEARTBEAT_LOG_DIR = os.getenv("HEARTBEAT_LOG_DIR", "./heartbeat_logs")
+HEARTBEAT_LOG_NAME = re.compile(r"^heartbeats-(\d+)\.log(\.flushing)?$")
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[int, int]
+
+def apply_time_deltas(db, deltas: Dict[Key, int]) -> int:
+    """
+    Add time spent to lesson progress rows with set-based statements
+
+    Runs in the caller's transaction: one SELECT finds the existing rows,
+    one executemany UPDATE adds the deltas and one INSERT creates rows for
+    lessons the learner had not opened yet. Deltas for lessons that no
+    longer exist are dropped.
+
+    :param db: Database session
+    :param deltas: Seconds keyed by (user_id, lesson_id)
+    :return: Number of (user, lesson) rows updated or created
+    """
+    if not deltas:
+        return 0
+
+    table = LessonProgress.__table__
+    existing = {tuple(row) for row in db.execute(
+        select(table.c.user_id, table.c.lesson_id).where(
+            tuple_(table.c.user_id, table.c.lesson_id).in_(list(deltas))
+        )
+    )}
+
+    if existing:
+        db.execute(
+            update(table).where(
+                table.c.user_id == bindparam("b_user_id"),
+                table.c.lesson_id == bindparam("b_lesson_id")
+            ).values(total_time_spent=table.c.total_time_spent + bindparam("b_seconds")),
+            [
+                {"b_user_id": user_id, "b_lesson_id": lesson_id, "b_seconds": deltas[(user_id, lesson_id)]}
+                for user_id, lesson_id in existing
+            ]
+        )
+
+    missing = [key for key in deltas if key not in existing]
+    if missing:
+        known_lessons = set(db.execute(
+            select(LessonModule.__table__.c.id).where(
+                LessonModule.__table__.c.id.in_({lesson_id for _, lesson_id in missing})
+            )
+        ).scalars())
+        now = datetime.utcnow()
+        rows = [
+            {
+                "user_id": user_id,
+                "lesson_id": lesson_id,
+                "started_at": now,
+                "is_completed": False,
+                "completed_at": None,
+                "total_time_spent": deltas[(user_id, lesson_id)]
+            }
+            for user_id, lesson_id in missing if lesson_id in known_lessons
+        ]
+        if rows:
+            db.execute(table.insert(), rows)
+        existing.update((row["user_id"], row["lesson_id"]) for row in rows)
+
+    return len(existing)
+
+class HeartbeatBuffer:
+    """
+    Coalescing write-behind buffer for lesson time-spent heartbeats
+
+    Heartbeats from media players are summed in memory per (user, lesson)
+    and written with apply_time_deltas once per flush, instead of one
+    transaction per heartbeat. This is the batched equivalent of
+    LessonProgress.update_time_spent.
+
+    Every accepted heartbeat is also appended to a log of this process
+    (heartbeats-<pid>.log), guarded by an exclusive lock held for the life
+    of the process. At flush the log is rotated aside and removed only after
+    the batch commits. On the next start recover() replays the process's own
+    leftovers and claims the logs of dead processes: a log is only taken
+    once its owner's lock can be acquired, so the logs of live workers are
+    never touched and an orphaned log is replayed by exactly one worker
+    (at-least-once: a crash between commit and removal can count one batch
+    twice).
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        flush_interval: float = HEARTBEAT_FLUSH_INTERVAL_SECONDS,
+        max_entries: int = HEARTBEAT_FLUSH_MAX_ENTRIES,
+        log_dir: Optional[str] = HEARTBEAT_LOG_DIR,
+        pid: Optional[int] = None
+    ):
+        self._session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self.log_dir = log_dir or None
+        self._pid = pid
+
+        self._pending: Dict[Key, int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._log = None
+        self._owner_lock = None
+
+    def _get_session(self):
+        if self._session_factory is None:
+            from app.services.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    @property
+    def pid(self) -> int:
+        # Resolved lazily so workers forked after import get their own log
+        return self._pid or os.getpid()
+
+    def _path_for(self, pid: int, suffix: str = "log") -> str:
+        return os.path.join(self.log_dir, f"heartbeats-{pid}.{suffix}")
+
+    @property
+    def log_path(self) -> Optional[str]:
+        return self._path_for(self.pid) if self.log_dir else None
+
+    @property
+    def _flushing_log_path(self) -> str:
+        return f"{self.log_path}.flushing"
+
+    def _hold_owner_lock(self) -> None:
+        # Marks this process's logs as live for recover() in other processes
+        if self._owner_lock is None:
+            os.makedirs(self.log_dir, exist_ok=True)
+            self._owner_lock = open(self._path_for(self.pid, "lock"), "a")
+            if fcntl is not None:
+                fcntl.flock(self._owner_lock, fcntl.LOCK_EX)
+
+    def _release_owner_lock(self) -> None:
+        if self._owner_lock is not None:
+            self._owner_lock.close()
+            self._owner_lock = None
+
+    def _open_log(self) -> None:
+        if self.log_dir and self._log is None:
+            self._hold_owner_lock()
+            self._log = open(self.log_path, "a", encoding="utf-8")
+
+    def record(self, user_id: int, lesson_id: int, seconds: int) -> None:
+        """
+        Add time spent on a lesson to the buffer
+
+        :param user_id: Learner identifier
+        :param lesson_id: Lesson module identifier
+        :param seconds: Seconds spent since the previous heartbeat
+        """
+        if seconds <= 0:
+            return
+
+        key = (user_id, lesson_id)
+        with self._lock:
+            if self.log_dir:
+                self._open_log()
+                self._log.write(f"{user_id},{lesson_id},{seconds}\n")
+                self._log.flush()
+            self._pending[key] = self._pending.get(key, 0) + seconds
+            pending = len(self._pending)
+
+        if pending >= self.max_entries:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Write buffered time deltas to lesson progress rows
+
+        :return: Number of (user, lesson) rows updated or created
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                if self._log is not None:
+                    self._log.close()
+                    self._log = None
+                if self.log_dir:
+                    # A previous failed flush may have left its log behind
+                    self._merge_log_into(self._flushing_log_path, self.log_path)
+
+            if not batch:
+                return 0
+
+            try:
+                written = self._write_batch(batch)
+            except Exception as e:
+                logger.error(f"Flushing {len(batch)} lesson heartbeats failed: {e}")
+                with self._lock:
+                    for key, seconds in batch.items():
+                        self._pending[key] = self._pending.get(key, 0) + seconds
+                return 0
+
+            if self.log_dir and os.path.exists(self._flushing_log_path):
+                os.remove(self._flushing_log_path)
+            return written
+
+    @staticmethod
+    def _merge_log_into(target: str, source: str) -> None:
+        if not os.path.exists(source):
+            return
+        with open(source, "r", encoding="utf-8") as src, open(target, "a", encoding="utf-8") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+
+    def _write_batch(self, batch: Dict[Key, int]) -> int:
+        db = self._get_session()
+        try:
+            written = apply_time_deltas(db, batch)
+            db.commit()
+            return written
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _replay(self, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+
+        replayed = 0
+        with open(path, "r", encoding="utf-8") as log:
+            for line in log:
+                try:
+                    user_id, lesson_id, seconds = (int(part) for part in line.strip().split(","))
+                except ValueError:
+                    continue  # torn final line from a crash
+                key = (user_id, lesson_id)
+                self._pending[key] = self._pending.get(key, 0) + seconds
+                replayed += 1
+        return replayed
+
+    def _orphan_candidates(self) -> List[int]:
+        if fcntl is None:
+            return []
+        pids = set()
+        for name in os.listdir(self.log_dir):
+            match = HEARTBEAT_LOG_NAME.match(name)
+            if match and int(match.group(1)) != self.pid:
+                pids.add(int(match.group(1)))
+        return sorted(pids)
+
+    def _claim_orphan(self, pid: int) -> int:
+        """
+        Replay the logs of another process if it is no longer running
+
+        Holding the owner's lock both proves the owner is gone and keeps
+        other recovering workers away while the logs are moved into ours.
+        """
+        lock_path = self._path_for(pid, "lock")
+        with open(lock_path, "a") as owner_lock:
+            try:
+                fcntl.flock(owner_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return 0  # still alive
+
+            replayed = 0
+            for path in (f"{self._path_for(pid)}.flushing", self._path_for(pid)):
+                replayed += self._replay(path)
+                # Keep the replayed entries on disk, in our log, until they are flushed
+                self._merge_log_into(self.log_path, path)
+
+            try:
+                os.remove(lock_path)
+            except FileNotFoundError:
+                pass
+        return replayed
+
+    def recover(self) -> int:
+        """
+        Reload heartbeats left in append logs by processes that are gone
+
+        :return: Number of heartbeats replayed into the buffer
+        """
+        if not self.log_dir:
+            return 0
+
+        with self._lock:
+            self._hold_owner_lock()
+
+            # Our own leftovers, from a previous process that had our pid
+            replayed = self._replay(self._flushing_log_path) + self._replay(self.log_path)
+            if self._log is None:
+                self._merge_log_into(self._flushing_log_path, self.log_path)
+
+            for pid in self._orphan_candidates():
+                replayed += self._claim_orphan(pid)
+
+        return replayed
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(timeout=self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def start(self) -> None:
+        """
+        Replay the append log and start the background flusher
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        replayed = self.recover()
+        if replayed:
+            logger.info(f"Replayed {replayed} lesson heartbeats from {self.log_dir}")
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="heartbeat-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop the flusher and write whatever is still buffered
+
+        :param timeout: Seconds to wait for the flusher thread
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        self.flush()
+
+        # Anything left after a failed final flush is recovered by the next worker
+        with self._lock:
+            if self.log_dir and self._owner_lock is not None:
+                if not os.path.exists(self.log_path) and not os.path.exists(self._flushing_log_path):
+                    os.remove(self._path_for(self.pid, "lock"))
+                self._release_owner_lock()
+
+# Process-wide buffer used by the heartbeat endpoint
+heartbeat_buffer = HeartbeatBuffer()
@@ -0,0 +1,215 @@
+from typing import Dict, List, Any, Tuple
+from sqlalchemy import func, case, select
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+import os
+import threading
+import time
+
+from app.models.course import Course, Enrollment, EnrollmentStatus
+from app.models.assessment import Quiz, QuizSubmission
+from app.models.analytics import QuizScoreRollup, ActiveLearnerSketch
+from app.services.rollup_service import RollupService
+from app.utils.hyperloglog import HyperLogLog
+
+INSTRUCTOR_DASHBOARD_CACHE_SECONDS = float(os.getenv("INSTRUCTOR_DASHBOARD_CACHE_SECONDS", 60))
+
+class InstructorDashboardService:
+    """
+    Summary metrics for all of an instructor's courses, computed in one pass
+    """
+    _cache: Dict[Tuple[int, int], Tuple[float, Dict[str, Any]]] = {}
+    _cache_lock = threading.Lock()
+
+    @classmethod
+    def get_dashboard(
+        cls,
+        db: Session,
+        instructor_id: int,
+        activity_days: int = 7,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Enrollments, completion, quiz pass rates and activity per course
+
+        Results are cached per instructor and process for a short TTL, so
+        repeated dashboard refreshes do not re-run the aggregates. Writes are
+        not tracked; a dashboard trails them by at most the TTL.
+
+        :param db: Database session
+        :param instructor_id: Instructor whose courses to summarize
+        :param activity_days: Window for the active learner count
+        :param use_cache: Serve a cached dashboard if it is fresh enough
+        :return: Per-course metrics and instructor-wide totals
+        """
+        key = (instructor_id, activity_days)
+        now = time.monotonic()
+
+        if use_cache:
+            with cls._cache_lock:
+                cached = cls._cache.get(key)
+            if cached and now - cached[0] < INSTRUCTOR_DASHBOARD_CACHE_SECONDS:
+                return cached[1]
+
+        dashboard = cls._build_dashboard(db, instructor_id, activity_days)
+
+        with cls._cache_lock:
+            cls._cache[key] = (now, dashboard)
+            # Drop expired entries so the cache stays bounded by active instructors
+            for stale_key in [k for k, (at, _) in cls._cache.items() if now - at >= INSTRUCTOR_DASHBOARD_CACHE_SECONDS]:
+                del cls._cache[stale_key]
+
+        return dashboard
+
+    @classmethod
+    def _build_dashboard(cls, db: Session, instructor_id: int, activity_days: int) -> Dict[str, Any]:
+        course_table = Course.__table__
+        courses = db.execute(
+            select(course_table.c.id, course_table.c.title).where(
+                course_table.c.instructor_id == instructor_id,
+                course_table.c.is_deleted == False
+            ).order_by(course_table.c.id)
+        ).all()
+
+        course_ids = [course.id for course in courses]
+        if not course_ids:
+            return {
+                "instructor_id": instructor_id,
+                "generated_at": datetime.utcnow(),
+                "activity_days": activity_days,
+                "totals": cls._totals([]),
+                "courses": []
+            }
+
+        enrollments = cls._enrollment_counts(db, course_ids)
+        quiz_stats = cls._quiz_stats(db, course_ids)
+        active_learners = cls._active_learners(db, course_ids, activity_days)
+
+        rows = []
+        for course in courses:
+            total, completed, active = enrollments.get(course.id, (0, 0, 0))
+            metrics = RollupService.summarize(quiz_stats.get(course.id, RollupService.empty_stats()))
+            rows.append({
+                "course_id": course.id,
+                "title": course.title,
+                "total_enrollments": total,
+                "active_enrollments": active,
+                "completed_enrollments": completed,
+                "completion_rate": (completed / total) * 100 if total > 0 else 0,
+                "quiz_attempts": metrics["total_attempts"],
+                "quiz_pass_rate": metrics["pass_rate"],
+                "average_score": metrics["average_score"],
+                "active_learners": active_learners.get(course.id, 0)
+            })
+
+        return {
+            "instructor_id": instructor_id,
+            "generated_at": datetime.utcnow(),
+            "activity_days": activity_days,
+            "totals": cls._totals(rows),
+            "courses": rows
+        }
+
+    @classmethod
+    def _enrollment_counts(cls, db: Session, course_ids: List[int]) -> Dict[int, Tuple[int, int, int]]:
+        enrollments = Enrollment.__table__
+        rows = db.execute(
+            select(
+                enrollments.c.course_id,
+                func.count(enrollments.c.id),
+                func.sum(case((enrollments.c.status == EnrollmentStatus.COMPLETED, 1), else_=0)),
+                func.sum(case((enrollments.c.status == EnrollmentStatus.ACTIVE, 1), else_=0))
+            ).where(
+                enrollments.c.course_id.in_(course_ids)
+            ).group_by(enrollments.c.course_id)
+        ).all()
+
+        return {
+            course_id: (total, int(completed or 0), int(active or 0))
+            for course_id, total, completed, active in rows
+        }
+
+    @classmethod
+    def _quiz_stats(cls, db: Session, course_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Course-level quiz accumulators from daily rollups plus the live tail
+        """
+        rollup_table = QuizScoreRollup.__table__
+        quizzes = Quiz.__table__
+        submissions = QuizSubmission.__table__
+        watermark_id = RollupService.read_watermark(db)
+        stats: Dict[int, Dict[str, Any]] = {}
+
+        rollups = db.execute(
+            select(
+                rollup_table.c.course_id,
+                func.sum(rollup_table.c.attempts),
+                func.sum(rollup_table.c.passes),
+                func.sum(rollup_table.c.score_sum),
+                func.sum(rollup_table.c.score_sq_sum)
+            ).where(
+                rollup_table.c.granularity == "day",
+                rollup_table.c.course_id.in_(course_ids)
+            ).group_by(rollup_table.c.course_id)
+        ).all()
+
+        live_tail = db.execute(
+            select(
+                quizzes.c.course_id,
+                func.count(submissions.c.id),
+                func.sum(case((submissions.c.is_passed == True, 1), else_=0)),
+                func.sum(submissions.c.score),
+                func.sum(submissions.c.score * submissions.c.score)
+            ).join_from(
+                submissions, quizzes, quizzes.c.id == submissions.c.quiz_id
+            ).where(
+                quizzes.c.course_id.in_(course_ids),
+                submissions.c.id > watermark_id,
+                submissions.c.score.isnot(None)
+            ).group_by(quizzes.c.course_id)
+        ).all()
+
+        for course_id, attempts, passes, score_sum, score_sq_sum in list(rollups) + list(live_tail):
+            course_stats = stats.setdefault(course_id, RollupService.empty_stats())
+            course_stats["attempts"] += int(attempts or 0)
+            course_stats["passes"] += int(passes or 0)
+            course_stats["score_sum"] += float(score_sum or 0)
+            course_stats["score_sq_sum"] += float(score_sq_sum or 0)
+
+        return stats
+
+    @classmethod
+    def _active_learners(cls, db: Session, course_ids: List[int], activity_days: int) -> Dict[int, int]:
+        start = datetime.utcnow().date() - timedelta(days=activity_days - 1)
+
+        sketches: Dict[int, List[HyperLogLog]] = {}
+        sketch_table = ActiveLearnerSketch.__table__
+        rows = db.execute(
+            select(sketch_table.c.course_id, sketch_table.c.sketch).where(
+                sketch_table.c.course_id.in_(course_ids),
+                sketch_table.c.day >= start
+            )
+        ).all()
+        for course_id, sketch in rows:
+            sketches.setdefault(course_id, []).append(HyperLogLog.from_bytes(sketch))
+
+        return {
+            course_id: HyperLogLog.merge_all(course_sketches).count()
+            for course_id, course_sketches in sketches.items()
+        }
+
+    @classmethod
+    def _totals(cls, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        total = sum(row["total_enrollments"] for row in rows)
+        completed = sum(row["completed_enrollments"] for row in rows)
+        attempts = sum(row["quiz_attempts"] for row in rows)
+        passed = sum(row["quiz_attempts"] * row["quiz_pass_rate"] / 100 for row in rows)
+
+        return {
+            "courses": len(rows),
+            "total_enrollments": total,
+            "completed_enrollments": completed,
+            "completion_rate": (completed / total) * 100 if total > 0 else 0,
+            "quiz_attempts": attempts,
+            "quiz_pass_rate": (passed / attempts) * 100 if attempts > 0 else 0
+        }
@@ -0,0 +1,181 @@
+from typing import Dict, Any, Optional, Tuple
+from sqlalchemy import DateTime, Integer, case, cast, delete, func, literal, select, update
+from sqlalchemy.orm import Session
+from datetime import datetime
+
+from app.models.lesson_progress import LessonProgress
+from app.models.analytics import LearnerPaceStat
+from app.utils.upsert import dialect_insert
+
+def duration_seconds(dialect_name: str, start, end):
+    """
+    Dialect-aware SQL expression for the seconds between two timestamps
+
+    :param dialect_name: Name of the database dialect
+    :param start: Start timestamp column or expression
+    :param end: End timestamp column or expression
+    :return: SQL expression yielding seconds
+    """
+    if dialect_name == "postgresql":
+        return func.extract("epoch", end - start)
+    if dialect_name == "sqlite":
+        return (func.julianday(end) - func.julianday(start)) * 86400
+    raise ValueError(f"Unsupported database dialect: {dialect_name}")
+
+class LearningPaceService:
+    """
+    Maintains a running average lesson completion time per learner
+    """
+
+    @classmethod
+    def record_lesson_completion(
+        cls,
+        db: Session,
+        user_id: int,
+        lesson_id: int,
+        at: Optional[datetime] = None
+    ) -> Tuple[bool, Optional[int]]:
+        """
+        Complete a lesson and fold its duration into the learner's running average
+
+        Runs in the caller's transaction. The lesson's progress row is flipped
+        to completed by a single conditional UPDATE, so of two concurrent
+        completions only one counts, and totals are bumped with
+        INSERT ... ON CONFLICT DO UPDATE so no increment is lost. A lesson
+        completed without ever being opened gets a progress row but no
+        duration, as there is no start to measure from.
+
+        :param db: Database session
+        :param user_id: Learner identifier
+        :param lesson_id: Lesson module identifier
+        :param at: Completion time (defaults to now)
+        :return: Whether the lesson was newly completed, and the seconds it
+                 took (None when it has no start time)
+        """
+        at = at or datetime.utcnow()
+        progress = LessonProgress.__table__
+        dialect_name = db.get_bind().dialect.name
+
+        completed_at = literal(at, DateTime)
+        completed = db.execute(
+            update(progress).where(
+                progress.c.user_id == user_id,
+                progress.c.lesson_id == lesson_id,
+                progress.c.is_completed.isnot(True)
+            ).values(
+                is_completed=True,
+                completed_at=completed_at,
+                completion_seconds=case(
+                    (progress.c.started_at.isnot(None), cast(
+                        func.round(duration_seconds(dialect_name, progress.c.started_at, completed_at)), Integer
+                    )),
+                    else_=None
+                )
+            ).returning(progress.c.completion_seconds)
+        ).all()
+
+        if not completed:
+            already_completed = db.execute(
+                select(progress.c.id).where(
+                    progress.c.user_id == user_id,
+                    progress.c.lesson_id == lesson_id
+                ).limit(1)
+            ).first()
+            if already_completed:
+                return False, None
+
+            db.execute(progress.insert().values(
+                user_id=user_id,
+                lesson_id=lesson_id,
+                started_at=None,
+                completed_at=at,
+                is_completed=True,
+                total_time_spent=0
+            ))
+            return True, None
+
+        seconds = completed[0].completion_seconds
+        if seconds is None:
+            return True, None
+        seconds = max(seconds, 0)
+
+        table = LearnerPaceStat.__table__
+        stmt = dialect_insert(db, table).values(
+            user_id=user_id,
+            completed_lessons=1,
+            total_completion_seconds=seconds,
+            updated_at=at
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={
+                "completed_lessons": table.c.completed_lessons + 1,
+                "total_completion_seconds": table.c.total_completion_seconds + stmt.excluded.total_completion_seconds,
+                "updated_at": stmt.excluded.updated_at
+            }
+        ))
+
+        return True, seconds
+
+    @classmethod
+    def get_learning_pace(cls, db: Session, user_id: int) -> Dict[str, Any]:
+        """
+        Average lesson completion time of a learner
+
+        :param db: Database session
+        :param user_id: User identifier
+        :return: Completed lesson count and average duration in hours
+        """
+        table = LearnerPaceStat.__table__
+        stat = db.execute(
+            select(table.c.completed_lessons, table.c.total_completion_seconds).where(table.c.user_id == user_id)
+        ).first()
+
+        if not stat or not stat.completed_lessons:
+            return {"completed_lessons": 0, "avg_lesson_duration_hours": 0.0}
+
+        return {
+            "completed_lessons": stat.completed_lessons,
+            "avg_lesson_duration_hours": stat.total_completion_seconds / stat.completed_lessons / 3600
+        }
+
+    @classmethod
+    def rebuild(cls, db: Session) -> int:
+        """
+        Recompute stored durations and running totals from lesson progress rows
+
+        :param db: Database session
+        :return: Number of learners with pace statistics
+        """
+        progress = LessonProgress.__table__
+        pace = LearnerPaceStat.__table__
+        dialect_name = db.get_bind().dialect.name
+
+        db.execute(update(progress).where(
+            progress.c.is_completed.is_(True),
+            progress.c.completion_seconds.is_(None),
+            progress.c.started_at.isnot(None),
+            progress.c.completed_at.isnot(None)
+        ).values(
+            completion_seconds=cast(
+                func.round(duration_seconds(dialect_name, progress.c.started_at, progress.c.completed_at)),
+                Integer
+            )
+        ))
+
+        db.execute(delete(pace))
+        db.execute(pace.insert().from_select(
+            ["user_id", "completed_lessons", "total_completion_seconds", "updated_at"],
+            select(
+                progress.c.user_id,
+                func.count(),
+                func.sum(progress.c.completion_seconds),
+                func.now()
+            ).where(
+                progress.c.is_completed.is_(True),
+                progress.c.completion_seconds.isnot(None)
+            ).group_by(progress.c.user_id)
+        ))
+        db.commit()
+
+        return db.execute(select(func.count()).select_from(pace)).scalar()
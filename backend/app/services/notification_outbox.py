@@ -0,0 +1,384 @@
+from typing import Dict, List, Any, Optional, Callable
+from datetime import datetime, timedelta
+from enum import Enum
+from sqlalchemy import and_, bindparam, insert, or_, select, update
+from sqlalchemy.orm import Session
+import logging
+import os
+import threading
+import time
+import uuid
+
+from app.models.notification import NotificationOutbox
+from app.services.smtp_pool import build_message, smtp_pool
+
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", 2))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 100))
+OUTBOX_POLL_INTERVAL_SECONDS = float(os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", 2.0))
+# A claimed batch not finished within the lease (e.g. the worker crashed) is claimed again
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", 300))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 8))
+OUTBOX_BACKOFF_BASE_SECONDS = float(os.getenv("OUTBOX_BACKOFF_BASE_SECONDS", 30))
+OUTBOX_BACKOFF_MAX_SECONDS = float(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", 3600))
+
+logger = logging.getLogger(__name__)
+
+class OutboxStatus(str, Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    SENT = "sent"
+    FAILED = "failed"
+    # Held for the per-user digest instead of being delivered on its own
+    DIGEST = "digest"
+    DIGESTED = "digested"
+
+class NotificationOutboxService:
+    """
+    Writes email notifications to the outbox and manages their delivery state
+    """
+
+    @classmethod
+    def enqueue_email(
+        cls,
+        db: Session,
+        to_email: str,
+        subject: str,
+        body: str,
+        notification_type: str,
+        user_id: Optional[int] = None,
+        related_id: Optional[int] = None,
+        html_body: Optional[str] = None
+    ) -> None:
+        """
+        Queue one email in the caller's transaction
+
+        Nothing is committed here: the email is delivered only if the
+        caller's transaction commits.
+
+        :param db: Database session
+        :param to_email: Recipient email address
+        :param subject: Email subject
+        :param body: Plain text body
+        :param notification_type: Type of notification (e.g. 'course_enrollment')
+        :param user_id: Optional recipient user id
+        :param related_id: Optional ID of the related entity
+        :param html_body: Optional HTML version of the body
+        """
+        cls.enqueue_emails(db, [{
+            "to_email": to_email,
+            "subject": subject,
+            "body": body,
+            "notification_type": notification_type,
+            "user_id": user_id,
+            "related_id": related_id,
+            "html_body": html_body
+        }])
+
+    @classmethod
+    def enqueue_emails(cls, db: Session, emails: List[Dict[str, Any]], digest: bool = False) -> int:
+        """
+        Queue many emails with one INSERT in the caller's transaction
+
+        :param db: Database session
+        :param emails: Dicts with to_email, subject, body, notification_type and
+            optionally user_id, related_id and html_body
+        :param digest: Hold the emails for the recipient's digest instead of sending each
+        :return: Number of queued emails
+        """
+        if not emails:
+            return 0
+
+        now = datetime.utcnow()
+        db.execute(insert(NotificationOutbox.__table__), [
+            {
+                "to_email": email["to_email"],
+                "subject": email["subject"],
+                "body": email["body"],
+                "html_body": email.get("html_body"),
+                "notification_type": email["notification_type"],
+                "user_id": email.get("user_id"),
+                "related_id": email.get("related_id"),
+                "status": (OutboxStatus.DIGEST if digest else OutboxStatus.PENDING).value,
+                "attempts": 0,
+                "available_at": now,
+                "created_at": now
+            }
+            for email in emails
+        ])
+        return len(emails)
+
+    @classmethod
+    def claim_batch(
+        cls,
+        db: Session,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        lease_seconds: float = OUTBOX_LEASE_SECONDS,
+        now: Optional[datetime] = None
+    ) -> List[Any]:
+        """
+        Claim due emails for delivery by this worker
+
+        A single UPDATE claims the rows selected by a subquery. On PostgreSQL
+        the subquery uses FOR UPDATE SKIP LOCKED, so concurrent workers claim
+        disjoint batches without waiting on each other. SQLite has no row
+        locks (the clause is not rendered) but serializes writers, so the
+        UPDATE is atomic there as well. Each claim is tagged with a token,
+        and later state changes only apply while the token still matches.
+
+        :param db: Database session
+        :param batch_size: Maximum emails to claim
+        :param lease_seconds: How long the claim is held before others may retry it
+        :param now: Current time (defaults to utcnow)
+        :return: Claimed outbox rows
+        """
+        now = now or datetime.utcnow()
+        outbox = NotificationOutbox.__table__
+        token = str(uuid.uuid4())
+
+        due = select(outbox.c.id).where(or_(
+            and_(outbox.c.status == OutboxStatus.PENDING.value, outbox.c.available_at <= now),
+            and_(outbox.c.status == OutboxStatus.PROCESSING.value, outbox.c.locked_until < now)
+        )).order_by(outbox.c.id).limit(batch_size).with_for_update(skip_locked=True)
+
+        claimed = db.execute(
+            update(outbox).where(outbox.c.id.in_(due)).values(
+                status=OutboxStatus.PROCESSING.value,
+                claim_token=token,
+                locked_until=now + timedelta(seconds=lease_seconds),
+                attempts=outbox.c.attempts + 1
+            )
+        ).rowcount
+        db.commit()
+
+        if not claimed:
+            return []
+        return db.execute(
+            select(outbox).where(outbox.c.claim_token == token).order_by(outbox.c.id)
+        ).all()
+
+    @classmethod
+    def backoff_delay(
+        cls,
+        attempts: int,
+        base_seconds: float = OUTBOX_BACKOFF_BASE_SECONDS,
+        max_seconds: float = OUTBOX_BACKOFF_MAX_SECONDS
+    ) -> float:
+        """
+        Seconds to wait before the next attempt, doubling with every failure
+
+        :param attempts: Attempts made so far
+        :return: Delay in seconds
+        """
+        return min(base_seconds * 2 ** max(attempts - 1, 0), max_seconds)
+
+    @classmethod
+    def complete_batch(
+        cls,
+        db: Session,
+        rows: List[Any],
+        results: List[bool],
+        error: Optional[str] = None,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+        now: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """
+        Record delivery results of a claimed batch
+
+        Delivered emails are marked sent. Failed ones are rescheduled with
+        exponential backoff, or marked failed after max_attempts.
+
+        :param db: Database session
+        :param rows: Rows returned by claim_batch
+        :param results: Per-row delivery success, in the same order
+        :param error: Error recorded on failed rows
+        :param max_attempts: Attempts before an email is given up on
+        :param now: Current time (defaults to utcnow)
+        :return: Counts of sent, retried and failed emails
+        """
+        now = now or datetime.utcnow()
+        outbox = NotificationOutbox.__table__
+        sent, retried, failed = [], [], []
+
+        for row, delivered in zip(rows, results):
+            if delivered:
+                sent.append({"b_id": row.id, "b_token": row.claim_token})
+            elif row.attempts >= max_attempts:
+                failed.append({"b_id": row.id, "b_token": row.claim_token})
+            else:
+                retried.append({
+                    "b_id": row.id,
+                    "b_token": row.claim_token,
+                    "b_available_at": now + timedelta(seconds=cls.backoff_delay(row.attempts))
+                })
+
+        owned = and_(outbox.c.id == bindparam("b_id"), outbox.c.claim_token == bindparam("b_token"))
+        if sent:
+            db.execute(update(outbox).where(owned).values(
+                status=OutboxStatus.SENT.value, sent_at=now, claim_token=None, locked_until=None, last_error=None
+            ), sent)
+        if retried:
+            db.execute(update(outbox).where(owned).values(
+                status=OutboxStatus.PENDING.value, available_at=bindparam("b_available_at"),
+                claim_token=None, locked_until=None, last_error=error
+            ), retried)
+        if failed:
+            db.execute(update(outbox).where(owned).values(
+                status=OutboxStatus.FAILED.value, claim_token=None, locked_until=None, last_error=error
+            ), failed)
+        db.commit()
+
+        return {"sent": len(sent), "retried": len(retried), "failed": len(failed)}
+
+class NotificationOutboxWorker:
+    """
+    Pool of background threads delivering emails from the outbox
+
+    Each worker claims a batch, sends it over the pooled SMTP connections
+    and records the results. Workers keep claiming while a backlog remains
+    and otherwise poll every poll interval (or immediately after wake).
+    Registered stages (such as the per-user digest) run before claiming, at
+    most once per poll interval and in one worker at a time.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        sender: Optional[Callable[[List[Any]], List[bool]]] = None,
+        workers: int = OUTBOX_WORKERS,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        poll_interval: float = OUTBOX_POLL_INTERVAL_SECONDS,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS
+    ):
+        self._session_factory = session_factory
+        self._sender = sender
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._stages: List[Callable[[Session], int]] = []
+        self._stage_lock = threading.Lock()
+        self._stages_run_at = 0.0
+
+    def _get_session(self):
+        if self._session_factory is None:
+            from app.services.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def _send(self, messages: List[Any]) -> List[bool]:
+        return (self._sender or smtp_pool.send_many)(messages)
+
+    def add_stage(self, stage: Callable[[Session], int]) -> None:
+        """
+        Register a function run on the outbox before delivery, e.g. digesting
+
+        :param stage: Function receiving a session and returning the number of emails it released
+        """
+        if stage not in self._stages:
+            self._stages.append(stage)
+
+    def run_stages(self) -> int:
+        """
+        Run the registered stages unless another worker is already running them
+
+        :return: Number of emails released by the stages
+        """
+        if not self._stages or not self._stage_lock.acquire(blocking=False):
+            return 0
+        try:
+            self._stages_run_at = time.monotonic()
+            released = 0
+            db = self._get_session()
+            try:
+                for stage in self._stages:
+                    released += stage(db)
+            finally:
+                db.close()
+            return released
+        finally:
+            self._stage_lock.release()
+
+    def wake(self) -> None:
+        """
+        Start delivering without waiting for the next poll
+        """
+        self._wakeup.set()
+
+    def run_once(self, now: Optional[datetime] = None) -> int:
+        """
+        Claim and deliver one batch
+
+        :param now: Current time (defaults to utcnow)
+        :return: Number of claimed emails
+        """
+        db = self._get_session()
+        try:
+            rows = NotificationOutboxService.claim_batch(db, self.batch_size, now=now)
+            if not rows:
+                return 0
+
+            messages = [build_message(row.to_email, row.subject, row.body, row.html_body) for row in rows]
+            error = "SMTP delivery failed"
+            try:
+                results = self._send(messages)
+            except Exception as e:
+                logger.error(f"Delivering {len(rows)} outbox emails failed: {e}")
+                results, error = [False] * len(rows), str(e)
+
+            NotificationOutboxService.complete_batch(
+                db, rows, results, error=error, max_attempts=self.max_attempts, now=now
+            )
+            return len(rows)
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            if time.monotonic() - self._stages_run_at >= self.poll_interval:
+                try:
+                    self.run_stages()
+                except Exception as e:
+                    logger.error(f"Outbox stage failed: {e}")
+
+            try:
+                claimed = self.run_once()
+            except Exception as e:
+                logger.error(f"Outbox delivery failed: {e}")
+                claimed = 0
+
+            if claimed < self.batch_size:
+                self._wakeup.wait(timeout=self.poll_interval)
+                self._wakeup.clear()
+
+    def start(self) -> None:
+        """
+        Start the delivery threads
+        """
+        if any(thread.is_alive() for thread in self._threads):
+            return
+        self._stopping.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"notification-outbox-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the delivery threads; undelivered emails stay in the outbox
+
+        :param timeout: Seconds to wait for each thread
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+# Process-wide worker pool delivering outbox emails
+notification_outbox_worker = NotificationOutboxWorker()
@@ -1,14 +1,29 @@
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
+from sqlalchemy import and_, case, exists, false, func, insert, select, tuple_, update
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from email.message import EmailMessage
+from collections import Counter
+from itertools import groupby
+import os
 
 from app.models.user import User
-from app.models.course import Course, CourseEnrollment
+from app.models.course import Course, Enrollment
 from app.models.assessment import Quiz, QuizSubmission
-from app.core.config import settings
+from app.models.notification import NotificationCounter, NotificationOutbox
+from app.services.notification_outbox import NotificationOutboxService, OutboxStatus, notification_outbox_worker
+from app.services.smtp_pool import build_message, smtp_pool
+from app.utils.upsert import dialect_insert
+
+# Quiz reminders are selected, written and committed in pages of this many rows
+REMINDER_CHUNK_SIZE = int(os.getenv("REMINDER_CHUNK_SIZE", 5000))
+# A learner is reminded of the same quiz at most once in this window
+REMINDER_RESEND_SECONDS = float(os.getenv("REMINDER_RESEND_SECONDS", 20 * 60 * 60))
+# Emails of these types are combined into one digest per user instead of sent one by one
+NOTIFICATION_DIGEST_TYPES = {t for t in os.getenv("NOTIFICATION_DIGEST_TYPES", "quiz_reminder").split(",") if t}
+# How long after a user's first held email the digest goes out
+NOTIFICATION_DIGEST_WINDOW_SECONDS = float(os.getenv("NOTIFICATION_DIGEST_WINDOW_SECONDS", 600))
+NOTIFICATION_DIGEST_CHUNK_SIZE = int(os.getenv("NOTIFICATION_DIGEST_CHUNK_SIZE", 500))
 
 class NotificationService:
     """
@@ -25,7 +40,7 @@ class NotificationService:
         html_body: Optional[str] = None
     ) -> bool:
         """
-        Send an email notification
+        Send an email notification over a pooled SMTP connection
         
         :param to_email: Recipient email address
         :param subject: Email subject
@@ -33,31 +48,17 @@ class NotificationService:
         :param html_body: Optional HTML version of the email
         :return: Whether email was sent successfully
         """
-        try:
-            # Create message container
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = settings.EMAIL_FROM
-            msg['To'] = to_email
-            
-            # Plain text part
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # HTML part (if provided)
-            if html_body:
-                msg.attach(MIMEText(html_body, 'html'))
-            
-            # Send email
-            with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-                server.starttls()
-                server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-                server.sendmail(settings.EMAIL_FROM, to_email, msg.as_string())
-            
-            return True
-        except Exception as e:
-            # Log the error (you'd typically use a proper logging system)
-            print(f"Email sending failed: {e}")
-            return False
+        return smtp_pool.send(build_message(to_email, subject, body, html_body))
+    
+    @classmethod
+    def send_emails(cls, messages: List[EmailMessage]) -> List[bool]:
+        """
+        Send many email notifications over the pooled SMTP connections
+        
+        :param messages: Messages built with build_message
+        :return: Per-message success, in input order
+        """
+        return smtp_pool.send_many(messages)
     
     @classmethod
     def create_in_app_notification(
@@ -90,6 +91,7 @@ class NotificationService:
         )
         
         db.add(notification)
+        cls.increment_unread_counts(db, {user_id: 1})
         db.commit()
         db.refresh(notification)
         
@@ -107,12 +109,19 @@ class NotificationService:
         course: Course
     ) -> None:
         """
-        Send notifications for course enrollment
+        Queue notifications for course enrollment
+        
+        The email goes to the outbox and the in-app notification is added in
+        the caller's transaction; both take effect when the caller commits the
+        enrollment. Delivery happens in the outbox workers, so the request
+        never waits on the mail server.
         
         :param db: Database session
         :param user: Enrolled user
         :param course: Enrolled course
         """
+        from app.models.notification import Notification
+        
         # Email notification
         email_subject = f"Enrolled in {course.title}"
         email_body = f"""
@@ -129,96 +138,323 @@ class NotificationService:
         Swahili Learn Team
         """
         
-        # Send email
-        cls.send_email(
-            to_email=user.email, 
-            subject=email_subject, 
-            body=email_body
+        NotificationOutboxService.enqueue_email(
+            db,
+            to_email=user.email,
+            subject=email_subject,
+            body=email_body,
+            notification_type="course_enrollment",
+            user_id=user.id,
+            related_id=course.id
         )
         
         # In-app notification
-        cls.create_in_app_notification(
-            db=db,
+        db.add(Notification(
             user_id=user.id,
             message=f"You've enrolled in {course.title}",
-            notification_type="course_enrollment",
-            related_id=course.id
-        )
+            type="course_enrollment",
+            related_id=course.id,
+            is_read=False,
+            created_at=datetime.utcnow()
+        ))
+        cls.increment_unread_counts(db, {user.id: 1})
     
     @classmethod
     def send_quiz_deadline_reminders(
         cls, 
-        db: Session
-    ) -> List[Dict[str, Any]]:
+        db: Session,
+        chunk_size: int = REMINDER_CHUNK_SIZE,
+        now: Optional[datetime] = None
+    ) -> int:
         """
         Send quiz deadline reminders
         
+        Selects (timed quiz, enrolled learner) pairs without a submission and
+        without a reminder in the last REMINDER_RESEND_SECONDS, using NOT
+        EXISTS on the (user_id, quiz_id) submission index and the
+        (user_id, type, related_id) notification index. Pairs are paged by
+        (quiz_id, enrollment id) keyset. Each page's in-app notifications and
+        outbox emails are written with one INSERT each and committed, so row
+        locks on the unread counters are held for one page only, the outbox
+        workers can start sending right away and an interrupted run can simply
+        be repeated without reminding anyone twice.
+        
         :param db: Database session
-        :return: List of sent reminders
+        :param chunk_size: Reminders selected and written per transaction
+        :param now: Override for the current time
+        :return: Number of reminders sent
         """
-        # Find upcoming quizzes within next 48 hours
-        now = datetime.utcnow()
-        deadline = now + timedelta(hours=48)
-        
-        # Find quizzes and their enrolled students
-        upcoming_quizzes = db.query(Quiz, CourseEnrollment, User).join(
-            CourseEnrollment, CourseEnrollment.course_id == Quiz.course_id
-        ).join(
-            User, User.id == CourseEnrollment.user_id
-        ).filter(
-            Quiz.is_timed == True,
-            Quiz.duration_minutes is not None
-        ).all()
-        
-        sent_reminders = []
-        
-        for quiz, enrollment, user in upcoming_quizzes:
-            # Check if user hasn't submitted the quiz
-            existing_submission = db.query(QuizSubmission).filter(
-                QuizSubmission.quiz_id == quiz.id,
-                QuizSubmission.user_id == user.id
-            ).first()
+        from app.models.notification import Notification
+        
+        quizzes = Quiz.__table__
+        enrollments = Enrollment.__table__
+        users = User.__table__
+        courses = Course.__table__
+        submissions = QuizSubmission.__table__
+        notifications_table = Notification.__table__
+        
+        now = now or datetime.utcnow()
+        resend_after = now - timedelta(seconds=REMINDER_RESEND_SECONDS)
+        
+        # Timed quizzes the learner has neither submitted nor been reminded of recently
+        query = select(
+            quizzes.c.id,
+            enrollments.c.id,
+            quizzes.c.title,
+            quizzes.c.duration_minutes,
+            courses.c.title,
+            users.c.id,
+            users.c.email
+        ).select_from(
+            quizzes.join(
+                enrollments, enrollments.c.course_id == quizzes.c.course_id
+            ).join(
+                users, users.c.id == enrollments.c.user_id
+            ).join(
+                courses, courses.c.id == quizzes.c.course_id
+            )
+        ).where(
+            quizzes.c.is_timed.is_(True),
+            quizzes.c.duration_minutes.isnot(None),
+            ~exists().where(and_(
+                submissions.c.quiz_id == quizzes.c.id,
+                submissions.c.user_id == enrollments.c.user_id
+            )),
+            ~exists().where(and_(
+                notifications_table.c.user_id == enrollments.c.user_id,
+                notifications_table.c.type == "quiz_reminder",
+                notifications_table.c.related_id == quizzes.c.id,
+                notifications_table.c.created_at >= resend_after
+            ))
+        ).order_by(
+            quizzes.c.id, enrollments.c.id
+        ).limit(chunk_size)
+        
+        sent_reminders = 0
+        last_key = None
+        while True:
+            page_query = query
+            if last_key is not None:
+                page_query = page_query.where(tuple_(quizzes.c.id, enrollments.c.id) > last_key)
+            rows = db.execute(page_query).all()
+            if not rows:
+                break
             
-            if not existing_submission:
-                # Send reminder
-                reminder_email = f"""
-                Upcoming Quiz Deadline: {quiz.title}
+            notifications = []
+            emails = []
+            for quiz_id, _, quiz_title, duration_minutes, course_title, user_id, email in rows:
+                notifications.append({
+                    "user_id": user_id,
+                    "message": f"Reminder: Quiz '{quiz_title}' is coming up",
+                    "type": "quiz_reminder",
+                    "related_id": quiz_id,
+                    "is_read": False,
+                    "created_at": now
+                })
+                emails.append({
+                    "to_email": email,
+                    "subject": f"Upcoming Quiz: {quiz_title}",
+                    "body": f"""
+                Upcoming Quiz Deadline: {quiz_title}
                 
                 You have an upcoming quiz that needs to be completed:
-                Course: {quiz.course.title}
-                Quiz: {quiz.title}
-                Duration: {quiz.duration_minutes} minutes
+                Course: {course_title}
+                Quiz: {quiz_title}
+                Duration: {duration_minutes} minutes
                 
                 Don't miss out! Log in and complete the quiz soon.
                 
                 Best regards,
                 Swahili Learn Team
-                """
-                
-                # Send email and in-app notification
-                email_sent = cls.send_email(
-                    to_email=user.email,
-                    subject=f"Upcoming Quiz: {quiz.title}",
-                    body=reminder_email
-                )
-                
-                in_app_notification = cls.create_in_app_notification(
-                    db=db,
-                    user_id=user.id,
-                    message=f"Reminder: Quiz '{quiz.title}' is coming up",
-                    notification_type="quiz_reminder",
-                    related_id=quiz.id
-                )
-                
-                sent_reminders.append({
-                    "user_email": user.email,
-                    "quiz_title": quiz.title,
-                    "email_sent": email_sent
+                """,
+                    "notification_type": "quiz_reminder",
+                    "user_id": user_id,
+                    "related_id": quiz_id
                 })
+            
+            db.execute(insert(notifications_table), notifications)
+            cls.increment_unread_counts(db, Counter(notification["user_id"] for notification in notifications))
+            NotificationOutboxService.enqueue_emails(db, emails, digest="quiz_reminder" in NOTIFICATION_DIGEST_TYPES)
+            db.commit()
+            notification_outbox_worker.wake()
+            
+            sent_reminders += len(rows)
+            last_key = (rows[-1][0], rows[-1][1])
+            if len(rows) < chunk_size:
+                break
         
-        db.commit()
         return sent_reminders
     
+    @classmethod
+    def render_digest(cls, subjects: List[str]) -> Dict[str, str]:
+        """
+        Render one email summarizing several notifications
+        
+        :param subjects: Subjects of the combined emails, oldest first
+        :return: Subject and plain text body of the digest
+        """
+        items = "\n".join(f"        - {subject}" for subject in subjects)
+        return {
+            "subject": f"You have {len(subjects)} updates from Swahili Learn",
+            "body": f"""
+        Hello,
+        
+        Here is a summary of your recent notifications:
+        
+{items}
+        
+        Log in to see the details.
+        
+        Best regards,
+        Swahili Learn Team
+        """
+        }
+    
+    @classmethod
+    def digest_pending_emails(
+        cls,
+        db: Session,
+        window_seconds: float = NOTIFICATION_DIGEST_WINDOW_SECONDS,
+        now: Optional[datetime] = None,
+        chunk_size: int = NOTIFICATION_DIGEST_CHUNK_SIZE
+    ) -> int:
+        """
+        Combine each user's held emails into one digest email
+        
+        Recipients whose oldest held email is at least window_seconds old
+        are found with one grouped query. Their held emails are loaded per
+        chunk of recipients and replaced by one digest email per recipient,
+        which goes to the outbox for delivery; a single held email is
+        released unchanged. In-app notifications are not affected. Held rows
+        are locked with SKIP LOCKED on PostgreSQL, so concurrent digest runs
+        never combine the same email twice.
+        
+        :param db: Database session
+        :param window_seconds: Seconds to collect emails after a user's first held one
+        :param now: Current time (defaults to utcnow)
+        :param chunk_size: Recipients processed per batch
+        :return: Number of emails released for delivery
+        """
+        now = now or datetime.utcnow()
+        outbox = NotificationOutbox.__table__
+        held = outbox.c.status == OutboxStatus.DIGEST.value
+        
+        due_recipients = db.execute(
+            select(outbox.c.to_email).where(held).group_by(outbox.c.to_email).having(
+                func.min(outbox.c.created_at) <= now - timedelta(seconds=window_seconds)
+            ).order_by(outbox.c.to_email)
+        ).scalars().all()
+        
+        released = 0
+        for start in range(0, len(due_recipients), chunk_size):
+            rows = db.execute(
+                select(outbox.c.id, outbox.c.to_email, outbox.c.user_id, outbox.c.subject).where(
+                    held, outbox.c.to_email.in_(due_recipients[start:start + chunk_size])
+                ).order_by(outbox.c.to_email, outbox.c.id).with_for_update(skip_locked=True)
+            ).all()
+            
+            single_ids, digested_ids, digests = [], [], []
+            for to_email, group in groupby(rows, key=lambda row: row.to_email):
+                group = list(group)
+                if len(group) == 1:
+                    single_ids.append(group[0].id)
+                    continue
+                digested_ids.extend(row.id for row in group)
+                digests.append({
+                    "to_email": to_email,
+                    "user_id": group[0].user_id,
+                    "notification_type": "digest",
+                    **cls.render_digest([row.subject for row in group])
+                })
+            
+            if single_ids:
+                db.execute(update(outbox).where(outbox.c.id.in_(single_ids)).values(
+                    status=OutboxStatus.PENDING.value, available_at=now
+                ))
+            if digested_ids:
+                db.execute(update(outbox).where(outbox.c.id.in_(digested_ids)).values(
+                    status=OutboxStatus.DIGESTED.value
+                ))
+            NotificationOutboxService.enqueue_emails(db, digests)
+            db.commit()
+            released += len(single_ids) + len(digests)
+        
+        return released
+    
+    @classmethod
+    def increment_unread_counts(cls, db: Session, counts: Dict[int, int]) -> None:
+        """
+        Add newly created notifications to the users' unread counters
+        
+        One upsert covers every user; it runs in the caller's transaction so
+        the counters change together with the notifications.
+        
+        :param db: Database session
+        :param counts: New unread notifications per user id
+        """
+        if not counts:
+            return
+        
+        table = NotificationCounter.__table__
+        now = datetime.utcnow()
+        # Sorted so concurrent upserts lock counter rows in the same order
+        stmt = dialect_insert(db, table).values([
+            {"user_id": user_id, "unread_count": count, "updated_at": now}
+            for user_id, count in sorted(counts.items())
+        ])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={
+                "unread_count": table.c.unread_count + stmt.excluded.unread_count,
+                "updated_at": stmt.excluded.updated_at
+            }
+        ))
+    
+    @classmethod
+    def get_unread_count(cls, db: Session, user_id: int) -> int:
+        """
+        Number of unread notifications, read from the user's counter row
+        
+        :param db: Database session
+        :param user_id: User identifier
+        :return: Unread notification count
+        """
+        table = NotificationCounter.__table__
+        count = db.execute(
+            select(table.c.unread_count).where(table.c.user_id == user_id)
+        ).scalar()
+        return count or 0
+    
+    @classmethod
+    def recount_unread(cls, db: Session, user_id: int) -> int:
+        """
+        Rebuild a user's unread counter from the notifications
+        
+        Served by the partial unread index; used to repair a drifted counter.
+        
+        :param db: Database session
+        :param user_id: User identifier
+        :return: Unread notification count
+        """
+        from app.models.notification import Notification
+        
+        notifications = Notification.__table__
+        table = NotificationCounter.__table__
+        count = db.execute(
+            select(func.count()).select_from(notifications).where(
+                notifications.c.user_id == user_id,
+                notifications.c.is_read == false()
+            )
+        ).scalar()
+        
+        stmt = dialect_insert(db, table).values(user_id=user_id, unread_count=count, updated_at=datetime.utcnow())
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={"unread_count": stmt.excluded.unread_count, "updated_at": stmt.excluded.updated_at}
+        ))
+        db.commit()
+        return count
+    
     @classmethod
     def mark_notifications_as_read(
         cls, 
@@ -229,6 +465,9 @@ class NotificationService:
         """
         Mark notifications as read
         
+        The user's unread counter is decremented by the number of rows
+        actually changed, in the same transaction.
+        
         :param db: Database session
         :param user_id: User whose notifications to mark
         :param notification_ids: Optional list of specific notification IDs
@@ -236,18 +475,26 @@ class NotificationService:
         """
         from app.models.notification import Notification
         
-        query = db.query(Notification).filter(
-            Notification.user_id == user_id,
-            Notification.is_read == False
+        notifications = Notification.__table__
+        query = update(notifications).where(
+            notifications.c.user_id == user_id,
+            notifications.c.is_read == false()
         )
         
         if notification_ids:
-            query = query.filter(Notification.id.in_(notification_ids))
+            query = query.where(notifications.c.id.in_(notification_ids))
         
-        updated_count = query.update(
-            {"is_read": True}, 
-            synchronize_session=False
-        )
+        updated_count = db.execute(query.values(is_read=True)).rowcount
+        
+        if updated_count:
+            table = NotificationCounter.__table__
+            db.execute(update(table).where(table.c.user_id == user_id).values(
+                unread_count=case(
+                    (table.c.unread_count > updated_count, table.c.unread_count - updated_count),
+                    else_=0
+                ),
+                updated_at=datetime.utcnow()
+            ))
         
         db.commit()
         return updated_count
@@ -3,8 +3,10 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
 
 from app.models.user import User
-from app.models.assessment import Quiz, QuizSubmission, QuizSubmissionAnswer
-from app.models.course import Course, CourseEnrollment
+from app.models.assessment import Quiz, QuizQuestion, QuizSubmission, QuizSubmissionAnswer
+from app.models.course import Course, Enrollment
+from app.services.rollup_service import RollupService
+from app.services.question_stats_service import QuestionStatsService
 
 class PerformanceAnalytics:
     """
@@ -75,20 +77,48 @@ class PerformanceAnalytics:
     def get_course_performance_summary(
         cls, 
         db: Session, 
-        course_id: int
+        course_id: int,
+        use_rollups: bool = True
     ) -> Dict[str, Any]:
         """
         Get comprehensive performance summary for a course
         
         :param db: Database session
         :param course_id: Course ID
+        :param use_rollups: Read pre-aggregated rollups merged with the live tail
+                            instead of scanning every submission
         :return: Course performance summary
         """
         # Total enrolled students
-        total_students = db.query(CourseEnrollment).filter(
-            CourseEnrollment.course_id == course_id
+        total_students = db.query(Enrollment).filter(
+            Enrollment.course_id == course_id
         ).count()
         
+        summary = {
+            'total_students': total_students,
+            'quizzes': []
+        }
+        
+        if use_rollups:
+            quiz_titles = dict(
+                db.query(Quiz.id, Quiz.title).filter(Quiz.course_id == course_id).all()
+            )
+            quiz_stats = RollupService.get_course_quiz_stats(db, course_id)
+            
+            for quiz_id, stats in sorted(quiz_stats.items()):
+                metrics = RollupService.summarize(stats)
+                summary['quizzes'].append({
+                    'quiz_id': quiz_id,
+                    'title': quiz_titles.get(quiz_id),
+                    'average_score': metrics['average_score'],
+                    'total_attempts': metrics['total_attempts'],
+                    'pass_rate': metrics['pass_rate'],
+                    'score_stddev': metrics['score_stddev'],
+                    'score_histogram': metrics['score_histogram']
+                })
+            
+            return summary
+        
         # Quiz performance
         quiz_performance = db.query(
             Quiz.id, 
@@ -105,11 +135,6 @@ class PerformanceAnalytics:
             Quiz.id, Quiz.title
         ).all()
         
-        summary = {
-            'total_students': total_students,
-            'quizzes': []
-        }
-        
         for quiz_id, title, avg_score, total_attempts, passed_attempts in quiz_performance:
             summary['quizzes'].append({
                 'quiz_id': quiz_id,
@@ -125,39 +150,35 @@ class PerformanceAnalytics:
     def identify_learning_gaps(
         cls, 
         db: Session, 
-        user_id: int
+        user_id: int,
+        limit: int = 5
     ) -> List[Dict[str, Any]]:
         """
         Identify areas where a student needs improvement
         
+        Reads the per-question incorrect-answer counters maintained at grading
+        time instead of aggregating every submitted answer.
+        
         :param db: Database session
         :param user_id: User's ID
+        :param limit: Number of questions to return
         :return: List of learning gaps
         """
-        # Analyze incorrect answers
-        learning_gaps = db.query(
-            QuizQuestion.question_text,
-            func.count(QuizSubmissionAnswer.id).label('incorrect_count')
-        ).join(
-            QuizSubmissionAnswer, 
-            and_(
-                QuizSubmissionAnswer.question_id == QuizQuestion.id,
-                QuizSubmissionAnswer.is_correct == False
-            )
-        ).join(
-            QuizSubmission,
-            QuizSubmission.id == QuizSubmissionAnswer.submission_id
-        ).filter(
-            QuizSubmission.user_id == user_id
-        ).group_by(
-            QuizQuestion.question_text
-        ).order_by(
-            func.count(QuizSubmissionAnswer.id).desc()
-        ).limit(5).all()
-        
-        return [
-            {
-                'question': question,
-                'incorrect_attempts': count
-            } for question, count in learning_gaps
-        ]
+        return QuestionStatsService.get_user_learning_gaps(db, user_id, limit=limit)
+    
+    @classmethod
+    def get_hardest_questions(
+        cls, 
+        db: Session, 
+        course_id: int,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Identify the questions learners in a course struggle with most
+        
+        :param db: Database session
+        :param course_id: Course ID
+        :param limit: Number of questions to return
+        :return: List of questions ordered by incorrect attempts
+        """
+        return QuestionStatsService.get_hardest_questions(db, course_id, limit=limit)
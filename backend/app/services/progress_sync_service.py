@@ -0,0 +1,275 @@
+from typing import Dict, List, Any, Optional, Tuple
+from sqlalchemy import bindparam, case, or_, select, tuple_, update
+from sqlalchemy.orm import Session
+from datetime import date, datetime, timezone
+
+from app.models.course import Enrollment, Lesson, CourseProgress
+from app.models.lesson import LessonModule
+from app.schemas.course import ProgressSyncEvent, ProgressSyncEventType
+from app.services.heartbeat_buffer import apply_time_deltas
+from app.services.active_learner_service import ActiveLearnerService
+from app.services.event_pipeline import LearningEvent, LearningEventType, event_pipeline
+from app.utils.upsert import dialect_insert
+
+Key = Tuple[int, int]
+
+class ProgressSyncService:
+    """
+    Applies batches of progress recorded offline on learners' devices
+    """
+
+    @classmethod
+    def _normalize_time(cls, moment: datetime, now: datetime) -> datetime:
+        # Stored timestamps are naive UTC; device clocks running ahead must not
+        # let a stale change win every future conflict
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+        return min(moment, now)
+
+    @classmethod
+    def sync(
+        cls,
+        db: Session,
+        user_id: int,
+        events: List[ProgressSyncEvent],
+        since: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Validate and apply a batch of offline progress events in one transaction
+
+        Progress conflicts are resolved last-writer-wins per (enrollment,
+        lesson) on the time the change was made: within the batch the newest
+        event wins, and it is only applied if it is newer than the stored row.
+        Time-spent events are additive and are summed per lesson module.
+
+        :param db: Database session
+        :param user_id: Learner syncing
+        :param events: Events in the order they were recorded
+        :param since: Time of the client's previous successful sync
+        :return: Applied/stale/rejected counts and the changed progress rows
+        """
+        now = datetime.utcnow()
+        rejected: List[Dict[str, Any]] = []
+
+        # Set-based validation: one query per referenced entity type
+        lesson_ids = {e.lesson_id for e in events if e.type == ProgressSyncEventType.PROGRESS}
+        module_ids = {e.lesson_id for e in events if e.type == ProgressSyncEventType.TIME_SPENT}
+
+        enrolled_courses = dict(db.execute(
+            select(Enrollment.__table__.c.id, Enrollment.__table__.c.course_id).where(
+                Enrollment.__table__.c.user_id == user_id
+            )
+        ).all())
+        lesson_courses = dict(db.execute(
+            select(Lesson.__table__.c.id, Lesson.__table__.c.course_id).where(
+                Lesson.__table__.c.id.in_(lesson_ids)
+            )
+        ).all()) if lesson_ids else {}
+        module_courses = dict(db.execute(
+            select(LessonModule.__table__.c.id, LessonModule.__table__.c.course_id).where(
+                LessonModule.__table__.c.id.in_(module_ids)
+            )
+        ).all()) if module_ids else {}
+        user_courses = set(enrolled_courses.values())
+
+        winners: Dict[Key, Tuple[datetime, ProgressSyncEvent]] = {}
+        time_deltas: Dict[Key, int] = {}
+        # The learner was active in a course on each day an accepted event was recorded
+        active_days: Dict[Tuple[int, date], datetime] = {}
+
+        for index, event in enumerate(events):
+            if event.type == ProgressSyncEventType.TIME_SPENT:
+                course_id = module_courses.get(event.lesson_id)
+                if course_id not in user_courses:
+                    rejected.append({"index": index, "reason": "lesson_not_accessible"})
+                    continue
+                key = (user_id, event.lesson_id)
+                time_deltas[key] = time_deltas.get(key, 0) + event.seconds
+                occurred_at = cls._normalize_time(event.occurred_at, now)
+                active_days[(course_id, occurred_at.date())] = occurred_at
+                continue
+
+            course_id = enrolled_courses.get(event.enrollment_id)
+            if course_id is None:
+                rejected.append({"index": index, "reason": "enrollment_not_found"})
+                continue
+            if lesson_courses.get(event.lesson_id) != course_id:
+                rejected.append({"index": index, "reason": "lesson_not_in_course"})
+                continue
+
+            occurred_at = cls._normalize_time(event.occurred_at, now)
+            active_days[(course_id, occurred_at.date())] = occurred_at
+            key = (event.enrollment_id, event.lesson_id)
+            if key not in winners or occurred_at >= winners[key][0]:
+                winners[key] = (occurred_at, event)
+
+        applied, stale = cls._apply_progress(db, winners, now)
+        apply_time_deltas(db, time_deltas)
+        # Sorted so concurrent syncs lock the shared sketch rows in the same order
+        for (course_id, _), occurred_at in sorted(active_days.items()):
+            ActiveLearnerService.record_activity(db, course_id, user_id, at=occurred_at)
+        db.commit()
+
+        for enrollment_id, lesson_id in applied:
+            occurred_at, event = winners[(enrollment_id, lesson_id)]
+            event_pipeline.publish(LearningEvent(
+                event_type=LearningEventType.LESSON_COMPLETED if event.completed else LearningEventType.PROGRESS_UPDATED,
+                user_id=user_id,
+                course_id=enrolled_courses[enrollment_id],
+                entity_id=lesson_id,
+                payload={"progress_percentage": event.progress_percentage, "offline": True},
+                occurred_at=occurred_at
+            ))
+
+        return {
+            "server_time": now,
+            "applied": len(applied),
+            "stale": stale,
+            "time_spent_lessons": len(time_deltas),
+            "rejected": rejected,
+            "progress": cls._delta(db, user_id, list(winners), since)
+        }
+
+    @classmethod
+    def _apply_progress(
+        cls,
+        db: Session,
+        winners: Dict[Key, Tuple[datetime, ProgressSyncEvent]],
+        now: datetime
+    ) -> Tuple[List[Key], int]:
+        if not winners:
+            return [], 0
+
+        # Take the enrollment row locks first, in id order, like the lesson
+        # progress endpoint does, so the read below cannot race another writer
+        enrollments = Enrollment.__table__
+        db.execute(
+            select(enrollments.c.id).where(
+                enrollments.c.id.in_({enrollment_id for enrollment_id, _ in winners})
+            ).order_by(enrollments.c.id).with_for_update()
+        )
+
+        progress = CourseProgress.__table__
+        existing = {
+            (row.enrollment_id, row.lesson_id): row
+            for row in db.execute(
+                select(
+                    progress.c.enrollment_id,
+                    progress.c.lesson_id,
+                    progress.c.completed,
+                    progress.c.completed_at,
+                    progress.c.updated_at
+                ).where(tuple_(progress.c.enrollment_id, progress.c.lesson_id).in_(list(winners)))
+            )
+        }
+
+        rows, applied = [], []
+        completion_deltas: Dict[int, int] = {}
+        last_activity: Dict[int, datetime] = {}
+        stale = 0
+
+        for key, (occurred_at, event) in winners.items():
+            enrollment_id, lesson_id = key
+            row = existing.get(key)
+
+            if row is not None and row.updated_at is not None and row.updated_at >= occurred_at:
+                stale += 1
+                continue
+
+            was_completed = bool(row.completed) if row is not None else False
+            completed_at = None
+            if event.completed:
+                completed_at = row.completed_at if was_completed and row.completed_at else occurred_at
+            elif row is not None:
+                completed_at = row.completed_at
+
+            rows.append({
+                "completed": event.completed,
+                "completed_at": completed_at,
+                "enrollment_id": enrollment_id,
+                "lesson_id": lesson_id,
+                "progress_percentage": event.progress_percentage,
+                "synced_at": now,
+                "updated_at": occurred_at
+            })
+            applied.append(key)
+
+            delta = int(event.completed) - int(was_completed)
+            if delta:
+                completion_deltas[enrollment_id] = completion_deltas.get(enrollment_id, 0) + delta
+            last_activity[enrollment_id] = max(occurred_at, last_activity.get(enrollment_id, occurred_at))
+
+        if rows:
+            # One upsert for new and existing rows; updated_at is the device
+            # clock (last-writer-wins), synced_at the server clock for deltas
+            stmt = dialect_insert(db, progress).values(rows)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[progress.c.enrollment_id, progress.c.lesson_id],
+                set_={
+                    "completed": stmt.excluded.completed,
+                    "progress_percentage": stmt.excluded.progress_percentage,
+                    "completed_at": stmt.excluded.completed_at,
+                    "updated_at": stmt.excluded.updated_at,
+                    "synced_at": stmt.excluded.synced_at
+                }
+            ))
+
+        # Keep the denormalized enrollment counters in step, one statement for all enrollments
+        if last_activity:
+            activity = bindparam("b_last_activity_at")
+            db.execute(
+                update(enrollments).where(enrollments.c.id == bindparam("b_enrollment_id")).values(
+                    completed_lessons=enrollments.c.completed_lessons + bindparam("b_delta"),
+                    last_activity_at=case(
+                        (or_(enrollments.c.last_activity_at.is_(None), enrollments.c.last_activity_at < activity), activity),
+                        else_=enrollments.c.last_activity_at
+                    )
+                ),
+                [
+                    {
+                        "b_enrollment_id": enrollment_id,
+                        "b_delta": completion_deltas.get(enrollment_id, 0),
+                        "b_last_activity_at": at
+                    }
+                    for enrollment_id, at in last_activity.items()
+                ]
+            )
+
+        return applied, stale
+
+    @classmethod
+    def _delta(cls, db: Session, user_id: int, touched: List[Key], since: Optional[datetime]) -> List[Dict[str, Any]]:
+        """
+        Server state of the touched rows plus anything changed since the last sync
+        """
+        progress = CourseProgress.__table__
+        enrollments = Enrollment.__table__
+
+        conditions = []
+        if touched:
+            conditions.append(tuple_(progress.c.enrollment_id, progress.c.lesson_id).in_(touched))
+        if since is not None:
+            if since.tzinfo is not None:
+                since = since.astimezone(timezone.utc).replace(tzinfo=None)
+            # The server write time, not the device time stored in updated_at:
+            # an offline change made before `since` but synced after it is new
+            conditions.append(progress.c.synced_at > since)
+        if not conditions:
+            return []
+
+        rows = db.execute(
+            select(
+                progress.c.enrollment_id,
+                progress.c.lesson_id,
+                progress.c.completed,
+                progress.c.progress_percentage,
+                progress.c.updated_at
+            ).join(
+                enrollments, enrollments.c.id == progress.c.enrollment_id
+            ).where(
+                enrollments.c.user_id == user_id,
+                or_(*conditions)
+            )
+        ).all()
+
+        return [dict(row._mapping) for row in rows]
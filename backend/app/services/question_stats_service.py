@@ -0,0 +1,166 @@
+from typing import Dict, List, Any, Iterable, Tuple
+from sqlalchemy.orm import Session
+from datetime import datetime
+
+from app.models.assessment import QuizQuestion
+from app.models.analytics import UserQuestionStat, QuestionStat
+from app.utils.upsert import dialect_insert
+
+class QuestionStatsService:
+    """
+    Maintains per-learner and course-wide question error counters at grading time
+    """
+
+    @classmethod
+    def record_graded_answers(
+        cls,
+        db: Session,
+        user_id: int,
+        course_id: int,
+        quiz_id: int,
+        graded_answers: Iterable[Tuple[int, bool]]
+    ) -> None:
+        """
+        Add a submission's graded answers to the question counters
+
+        Runs in the caller's transaction so counters commit together with the
+        submission. Counters are bumped with INSERT ... ON CONFLICT DO UPDATE,
+        so concurrent submissions never lose increments.
+
+        :param db: Database session
+        :param user_id: Learner who submitted
+        :param course_id: Course of the quiz
+        :param quiz_id: Quiz identifier
+        :param graded_answers: Pairs of (question_id, is_correct)
+        """
+        per_question: Dict[int, List[int]] = {}
+        for question_id, is_correct in graded_answers:
+            counts = per_question.setdefault(question_id, [0, 0])
+            counts[0] += 1
+            counts[1] += 0 if is_correct else 1
+
+        if not per_question:
+            return
+
+        now = datetime.utcnow()
+        user_table = UserQuestionStat.__table__
+        question_table = QuestionStat.__table__
+
+        user_stmt = dialect_insert(db, user_table).values([
+            {
+                "user_id": user_id,
+                "question_id": question_id,
+                "course_id": course_id,
+                "attempt_count": attempts,
+                "incorrect_count": incorrect,
+                "last_attempt_at": now
+            } for question_id, (attempts, incorrect) in per_question.items()
+        ])
+        db.execute(user_stmt.on_conflict_do_update(
+            index_elements=[user_table.c.user_id, user_table.c.question_id],
+            set_={
+                "attempt_count": user_table.c.attempt_count + user_stmt.excluded.attempt_count,
+                "incorrect_count": user_table.c.incorrect_count + user_stmt.excluded.incorrect_count,
+                "last_attempt_at": user_stmt.excluded.last_attempt_at
+            }
+        ))
+
+        question_stmt = dialect_insert(db, question_table).values([
+            {
+                "question_id": question_id,
+                "course_id": course_id,
+                "quiz_id": quiz_id,
+                "attempt_count": attempts,
+                "incorrect_count": incorrect
+            } for question_id, (attempts, incorrect) in per_question.items()
+        ])
+        db.execute(question_stmt.on_conflict_do_update(
+            index_elements=[question_table.c.question_id],
+            set_={
+                "attempt_count": question_table.c.attempt_count + question_stmt.excluded.attempt_count,
+                "incorrect_count": question_table.c.incorrect_count + question_stmt.excluded.incorrect_count
+            }
+        ))
+
+    @classmethod
+    def get_user_learning_gaps(
+        cls,
+        db: Session,
+        user_id: int,
+        limit: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Questions a learner gets wrong most often
+
+        Served by an index-ordered read on (user_id, incorrect_count).
+
+        :param db: Database session
+        :param user_id: Learner identifier
+        :param limit: Number of questions to return
+        :return: Questions with their incorrect and total attempts
+        """
+        gaps = db.query(
+            UserQuestionStat.question_id,
+            QuizQuestion.question_text,
+            UserQuestionStat.incorrect_count,
+            UserQuestionStat.attempt_count
+        ).join(
+            QuizQuestion, QuizQuestion.id == UserQuestionStat.question_id
+        ).filter(
+            UserQuestionStat.user_id == user_id,
+            UserQuestionStat.incorrect_count > 0
+        ).order_by(
+            UserQuestionStat.incorrect_count.desc()
+        ).limit(limit).all()
+
+        return [
+            {
+                'question_id': question_id,
+                'question': question_text,
+                'incorrect_attempts': incorrect_count,
+                'total_attempts': attempt_count
+            } for question_id, question_text, incorrect_count, attempt_count in gaps
+        ]
+
+    @classmethod
+    def get_hardest_questions(
+        cls,
+        db: Session,
+        course_id: int,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Questions in a course with the most incorrect answers across all learners
+
+        Served by an index-ordered read on (course_id, incorrect_count).
+
+        :param db: Database session
+        :param course_id: Course identifier
+        :param limit: Number of questions to return
+        :return: Questions with their incorrect counts and error rates
+        """
+        questions = db.query(
+            QuestionStat.question_id,
+            QuestionStat.quiz_id,
+            QuizQuestion.question_text,
+            QuestionStat.incorrect_count,
+            QuestionStat.attempt_count
+        ).join(
+            QuizQuestion, QuizQuestion.id == QuestionStat.question_id
+        ).filter(
+            QuestionStat.course_id == course_id,
+            QuestionStat.incorrect_count > 0
+        ).order_by(
+            QuestionStat.incorrect_count.desc()
+        ).limit(limit).all()
+
+        return [
+            {
+                'question_id': question_id,
+                'quiz_id': quiz_id,
+                'question': question_text,
+                'incorrect_attempts': incorrect_count,
+                'total_attempts': attempt_count,
+                'error_rate': (incorrect_count / attempt_count) if attempt_count else 0.0
+            } for question_id, quiz_id, question_text, incorrect_count, attempt_count in questions
+        ]
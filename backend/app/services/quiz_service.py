@@ -7,6 +7,9 @@ from app.models.assessment import Quiz, QuizSubmission, QuizSubmissionAnswer, Qu
 from app.models.user import User
 from app.schemas.quiz_schemas import QuizSubmissionCreate
 from app.core.exceptions import QuizTimeoutException, QuizValidationError
+from app.services.question_stats_service import QuestionStatsService
+from app.services.active_learner_service import ActiveLearnerService
+from app.services.score_distribution_service import ScoreDistributionService
 
 class QuizService:
     """
@@ -136,6 +139,19 @@ class QuizService:
         submission.score = total_score / max_possible_score if max_possible_score > 0 else 0
         submission.is_passed = submission.score >= submission.quiz.passing_score
         
+        # Maintain per-question error counters in the same transaction
+        QuestionStatsService.record_graded_answers(
+            db,
+            submission.user_id,
+            submission.quiz.course_id,
+            submission.quiz_id,
+            [(answer.question_id, answer.is_correct) for answer in submission_answers]
+        )
+        ActiveLearnerService.record_activity(db, submission.quiz.course_id, submission.user_id)
+        ScoreDistributionService.record_score(
+            db, submission.quiz_id, submission.quiz.course_id, submission.score
+        )
+        
         db.commit()
         
         return {
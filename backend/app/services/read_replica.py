@@ -0,0 +1,168 @@
+from typing import Dict, Optional
+from fastapi import Depends
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+import logging
+import os
+import threading
+import time
+
+from app.models.user import User
+from app.services.auth import get_current_active_user
+from app.services import database
+
+# Reads are sent to the primary when the replica is further behind than this
+ANALYTICS_MAX_REPLICA_LAG_SECONDS = float(os.getenv("ANALYTICS_MAX_REPLICA_LAG_SECONDS", 30))
+# A user's reads stay on the primary for at least this long after they write
+ANALYTICS_PIN_AFTER_WRITE_SECONDS = float(os.getenv("ANALYTICS_PIN_AFTER_WRITE_SECONDS", 5))
+ANALYTICS_LAG_CHECK_SECONDS = float(os.getenv("ANALYTICS_LAG_CHECK_SECONDS", 5))
+
+logger = logging.getLogger(__name__)
+
+_WROTE_KEY = "read_replica_wrote"
+_USER_KEY = "user_id"  # set by auth.get_current_user
+
+# Postgres standbys report how far WAL replay is behind; a fully replayed
+# standby reports zero even if the primary has been idle for a while
+_POSTGRES_LAG_SQL = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_session_wrote(session, flush_context):
+    session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement_wrote(orm_execute_state):
+    # Core INSERT/UPDATE/DELETE run through Session.execute never flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _record_committed_write(session):
+    if session.info.pop(_WROTE_KEY, False):
+        user_id = session.info.get(_USER_KEY)
+        if user_id is not None:
+            ReplicaRouter.record_write(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back_write(session, previous_transaction):
+    session.info.pop(_WROTE_KEY, None)
+
+
+class ReplicaRouter:
+    """
+    Decides whether a read-only analytics workload may use the replica
+    """
+    _lock = threading.Lock()
+    _recent_writes: Dict[int, float] = {}
+    _lag_seconds: Optional[float] = None
+    _lag_checked_at = 0.0
+
+    @classmethod
+    def record_write(cls, user_id: int) -> None:
+        """
+        Remember that a user just committed a write on the primary
+
+        Tracking is per process, so it covers the common case of a client
+        reading its own writes back through the same worker.
+
+        :param user_id: User whose request wrote
+        """
+        now = time.monotonic()
+        with cls._lock:
+            cls._recent_writes[user_id] = now
+            if len(cls._recent_writes) > 10000:
+                cutoff = now - cls._pin_window()
+                cls._recent_writes = {
+                    key: written_at for key, written_at in cls._recent_writes.items()
+                    if written_at >= cutoff
+                }
+
+    @classmethod
+    def _pin_window(cls) -> float:
+        # Stay pinned until the replica has had time to replay the write
+        return max(ANALYTICS_PIN_AFTER_WRITE_SECONDS, cls._lag_seconds or 0.0)
+
+    @classmethod
+    def is_pinned(cls, user_id: Optional[int]) -> bool:
+        """
+        Check whether a user wrote recently enough to need primary reads
+
+        :param user_id: User identifier
+        :return: True if reads should stay on the primary
+        """
+        if user_id is None:
+            return False
+        with cls._lock:
+            written_at = cls._recent_writes.get(user_id)
+        return written_at is not None and time.monotonic() - written_at < cls._pin_window()
+
+    @classmethod
+    def replica_lag(cls) -> Optional[float]:
+        """
+        Replication lag of the analytics replica, refreshed every few seconds
+
+        :return: Lag in seconds, or None if there is no usable replica
+        """
+        replica = database.analytics_engine
+        if replica is None:
+            return None
+
+        now = time.monotonic()
+        if now - cls._lag_checked_at < ANALYTICS_LAG_CHECK_SECONDS:
+            return cls._lag_seconds
+
+        try:
+            with replica.connect() as conn:
+                if replica.dialect.name == "postgresql":
+                    lag = float(conn.execute(_POSTGRES_LAG_SQL).scalar() or 0)
+                else:
+                    conn.execute(text("SELECT 1"))
+                    lag = 0.0
+        except Exception as e:
+            logger.warning(f"Analytics replica unavailable, reading from primary: {e}")
+            lag = None
+
+        cls._lag_seconds = lag
+        cls._lag_checked_at = now
+        return lag
+
+    @classmethod
+    def should_use_replica(cls, user_id: Optional[int] = None) -> bool:
+        """
+        Decide where a read-only workload should run
+
+        :param user_id: User the reads are for, used for read-your-writes pinning
+        :return: True to read from the replica, False to read from the primary
+        """
+        if database.analytics_engine is None:
+            return False
+
+        lag = cls.replica_lag()
+        if lag is None or lag > ANALYTICS_MAX_REPLICA_LAG_SECONDS:
+            return False
+
+        return not cls.is_pinned(user_id)
+
+
+def get_analytics_db(current_user: User = Depends(get_current_active_user)):
+    """
+    Dependency providing a session for read-only analytics and reporting
+
+    Falls back to the primary when no replica is configured, the replica is
+    lagging or unreachable, or the user wrote within the pin window.
+    """
+    db = database.AnalyticsSessionLocal()
+    db.info["use_replica"] = ReplicaRouter.should_use_replica(current_user.id)
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,419 @@
+from typing import Dict, List, Any, Optional, Tuple
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+import math
+import os
+
+from app.models.assessment import Quiz, QuizSubmission
+from app.models.analytics import QuizScoreRollup, RollupWatermark
+from app.utils.upsert import dialect_insert
+
+# Submissions younger than this are left to the live tail, so attempts that are
+# started and graded later (timed quizzes) are not baked in before they have a score
+ROLLUP_SETTLE_SECONDS = int(os.getenv("ROLLUP_SETTLE_SECONDS", 3 * 60 * 60))
+ROLLUP_BATCH_SIZE = int(os.getenv("ROLLUP_BATCH_SIZE", 5000))
+
+HISTOGRAM_BINS = 10
+GRANULARITIES = ("hour", "day")
+WATERMARK_NAME = "quiz_score_rollups"
+
+class RollupService:
+    """
+    Incremental hourly/daily rollups of quiz submissions for dashboards
+    """
+
+    @classmethod
+    def empty_stats(cls) -> Dict[str, Any]:
+        """
+        Create an empty accumulator for submission statistics
+
+        :return: Statistics dictionary with zeroed counters
+        """
+        return {
+            "attempts": 0,
+            "passes": 0,
+            "score_sum": 0.0,
+            "score_sq_sum": 0.0,
+            "histogram": [0] * HISTOGRAM_BINS
+        }
+
+    @classmethod
+    def histogram_bin(cls, score: float) -> int:
+        """
+        Map a 0..1 score to its histogram bin
+
+        :param score: Submission score
+        :return: Bin index
+        """
+        clamped = min(max(score, 0.0), 1.0)
+        return min(int(clamped * HISTOGRAM_BINS), HISTOGRAM_BINS - 1)
+
+    @classmethod
+    def accumulate(cls, stats: Dict[str, Any], score: float, is_passed: bool) -> None:
+        """
+        Fold a single graded submission into an accumulator
+
+        :param stats: Accumulator created by empty_stats
+        :param score: Submission score
+        :param is_passed: Whether the submission passed
+        """
+        stats["attempts"] += 1
+        stats["passes"] += 1 if is_passed else 0
+        stats["score_sum"] += score
+        stats["score_sq_sum"] += score * score
+        stats["histogram"][cls.histogram_bin(score)] += 1
+
+    @classmethod
+    def merge(cls, target: Dict[str, Any], other: Dict[str, Any]) -> None:
+        """
+        Merge one accumulator into another in place
+
+        :param target: Accumulator to update
+        :param other: Accumulator to merge in
+        """
+        target["attempts"] += other["attempts"]
+        target["passes"] += other["passes"]
+        target["score_sum"] += other["score_sum"]
+        target["score_sq_sum"] += other["score_sq_sum"]
+        target["histogram"] = [a + b for a, b in zip(target["histogram"], other["histogram"])]
+
+    @classmethod
+    def summarize(cls, stats: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Derive dashboard metrics from an accumulator
+
+        :param stats: Accumulator
+        :return: Attempts, pass rate, mean, standard deviation and histogram
+        """
+        attempts = stats["attempts"]
+        if attempts == 0:
+            return {
+                "total_attempts": 0,
+                "passed_attempts": 0,
+                "average_score": 0.0,
+                "score_stddev": 0.0,
+                "pass_rate": 0,
+                "score_histogram": stats["histogram"]
+            }
+
+        mean = stats["score_sum"] / attempts
+        variance = max(stats["score_sq_sum"] / attempts - mean * mean, 0.0)
+        return {
+            "total_attempts": attempts,
+            "passed_attempts": stats["passes"],
+            "average_score": mean,
+            "score_stddev": math.sqrt(variance),
+            "pass_rate": (stats["passes"] / attempts) * 100,
+            "score_histogram": stats["histogram"]
+        }
+
+    @classmethod
+    def bucket_start(cls, moment: datetime, granularity: str) -> datetime:
+        """
+        Truncate a timestamp to the start of its bucket
+
+        :param moment: Timestamp
+        :param granularity: 'hour' or 'day'
+        :return: Bucket start
+        """
+        if granularity == "hour":
+            return moment.replace(minute=0, second=0, microsecond=0)
+        if granularity == "day":
+            return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        raise ValueError(f"Unsupported rollup granularity: {granularity}")
+
+    @classmethod
+    def read_watermark(cls, db: Session) -> int:
+        """
+        Last submission id folded into rollups
+
+        Read-only: dashboards may run on a replica, so a missing watermark
+        reads as 0 (everything is still in the live tail) instead of being created.
+
+        :param db: Database session
+        :return: Watermark submission id
+        """
+        watermarks = RollupWatermark.__table__
+        return db.execute(
+            select(watermarks.c.last_id).where(watermarks.c.name == WATERMARK_NAME)
+        ).scalar() or 0
+
+    @classmethod
+    def _lock_watermark(cls, db: Session) -> int:
+        """
+        Create the watermark row if needed and lock it for the rollup transaction
+
+        :param db: Database session
+        :return: Watermark submission id
+        """
+        watermarks = RollupWatermark.__table__
+        db.execute(
+            dialect_insert(db, watermarks).values(name=WATERMARK_NAME, last_id=0).on_conflict_do_nothing(
+                index_elements=[watermarks.c.name]
+            )
+        )
+        return db.execute(
+            select(watermarks.c.last_id).where(watermarks.c.name == WATERMARK_NAME).with_for_update()
+        ).scalar_one()
+
+    @classmethod
+    def run_incremental_rollup(
+        cls,
+        db: Session,
+        batch_size: int = ROLLUP_BATCH_SIZE,
+        now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Fold settled submissions past the watermark into hourly and daily rollups
+
+        Each batch is applied together with the watermark advance in one
+        transaction, so a crash never double counts or skips submissions.
+
+        :param db: Database session
+        :param batch_size: Maximum submissions processed per transaction
+        :param now: Override for the current time (used for settling)
+        :return: Number of processed submissions and the new watermark
+        """
+        settle_before = (now or datetime.utcnow()) - timedelta(seconds=ROLLUP_SETTLE_SECONDS)
+        submissions = QuizSubmission.__table__
+        quizzes = Quiz.__table__
+        watermarks = RollupWatermark.__table__
+        processed = 0
+
+        while True:
+            last_id = cls._lock_watermark(db)
+
+            rows = db.execute(
+                select(
+                    submissions.c.id,
+                    submissions.c.quiz_id,
+                    quizzes.c.course_id,
+                    submissions.c.score,
+                    submissions.c.is_passed,
+                    submissions.c.submitted_at
+                ).join_from(
+                    submissions, quizzes, quizzes.c.id == submissions.c.quiz_id
+                ).where(
+                    submissions.c.id > last_id
+                ).order_by(
+                    submissions.c.id
+                ).limit(batch_size)
+            ).all()
+
+            # Only consume the settled prefix so the watermark never jumps past
+            # a submission that may still be graded
+            settled = []
+            for row in rows:
+                if row.submitted_at and row.submitted_at > settle_before:
+                    break
+                settled.append(row)
+
+            if not settled:
+                db.commit()
+                break
+
+            buckets: Dict[Tuple[str, int, int, datetime], Dict[str, Any]] = {}
+            for row in settled:
+                if row.score is None:
+                    continue  # abandoned attempt, never graded
+                for granularity in GRANULARITIES:
+                    key = (granularity, row.course_id, row.quiz_id, cls.bucket_start(row.submitted_at, granularity))
+                    stats = buckets.setdefault(key, cls.empty_stats())
+                    cls.accumulate(stats, row.score, row.is_passed)
+
+            cls._apply_buckets(db, buckets)
+
+            db.execute(
+                update(watermarks).where(watermarks.c.name == WATERMARK_NAME).values(last_id=settled[-1].id)
+            )
+            db.commit()
+            processed += len(settled)
+
+            if len(settled) < len(rows) or len(rows) < batch_size:
+                break
+
+        return {
+            "processed_submissions": processed,
+            "watermark": cls.read_watermark(db)
+        }
+
+    @classmethod
+    def _apply_buckets(
+        cls,
+        db: Session,
+        buckets: Dict[Tuple[str, int, int, datetime], Dict[str, Any]]
+    ) -> None:
+        """
+        Add batch accumulators to the stored rollup rows
+
+        Runs under the watermark lock, so no other rollup run updates the same rows.
+
+        :param db: Database session
+        :param buckets: Accumulators keyed by (granularity, course, quiz, bucket start)
+        """
+        if not buckets:
+            return
+
+        rollups = QuizScoreRollup.__table__
+        quiz_ids = {key[2] for key in buckets}
+        bucket_starts = {key[3] for key in buckets}
+
+        existing = {
+            (rollup.granularity, rollup.course_id, rollup.quiz_id, rollup.bucket_start): rollup
+            for rollup in db.execute(
+                select(rollups).where(
+                    rollups.c.quiz_id.in_(quiz_ids),
+                    rollups.c.bucket_start.in_(bucket_starts)
+                )
+            ).all()
+        }
+
+        new_rollups = []
+        for key, stats in buckets.items():
+            rollup = existing.get(key)
+            if rollup is None:
+                granularity, course_id, quiz_id, bucket_start = key
+                new_rollups.append({
+                    "granularity": granularity,
+                    "course_id": course_id,
+                    "quiz_id": quiz_id,
+                    "bucket_start": bucket_start,
+                    "attempts": stats["attempts"],
+                    "passes": stats["passes"],
+                    "score_sum": stats["score_sum"],
+                    "score_sq_sum": stats["score_sq_sum"],
+                    "score_histogram": stats["histogram"]
+                })
+                continue
+
+            db.execute(update(rollups).where(rollups.c.id == rollup.id).values(
+                attempts=rollups.c.attempts + stats["attempts"],
+                passes=rollups.c.passes + stats["passes"],
+                score_sum=rollups.c.score_sum + stats["score_sum"],
+                score_sq_sum=rollups.c.score_sq_sum + stats["score_sq_sum"],
+                score_histogram=[
+                    a + b for a, b in zip(rollup.score_histogram or [0] * HISTOGRAM_BINS, stats["histogram"])
+                ]
+            ))
+
+        if new_rollups:
+            db.execute(insert(rollups), new_rollups)
+
+    @classmethod
+    def _rollup_stats(cls, rollup: Any) -> Dict[str, Any]:
+        """
+        Accumulator for a stored rollup row
+
+        :param rollup: quiz_score_rollups row
+        :return: Statistics dictionary
+        """
+        return {
+            "attempts": rollup.attempts,
+            "passes": rollup.passes,
+            "score_sum": rollup.score_sum,
+            "score_sq_sum": rollup.score_sq_sum,
+            "histogram": rollup.score_histogram or [0] * HISTOGRAM_BINS
+        }
+
+    @classmethod
+    def _live_tail(cls, db: Session, course_id: int, after_id: int):
+        """
+        Graded submissions of a course not yet folded into rollups
+
+        :param db: Database session
+        :param course_id: Course identifier
+        :param after_id: Watermark submission id
+        :return: Rows of (quiz_id, score, is_passed, submitted_at)
+        """
+        submissions = QuizSubmission.__table__
+        quizzes = Quiz.__table__
+        return db.execute(
+            select(
+                submissions.c.quiz_id,
+                submissions.c.score,
+                submissions.c.is_passed,
+                submissions.c.submitted_at
+            ).join_from(
+                submissions, quizzes, quizzes.c.id == submissions.c.quiz_id
+            ).where(
+                quizzes.c.course_id == course_id,
+                submissions.c.id > after_id,
+                submissions.c.score.isnot(None)
+            )
+        ).all()
+
+    @classmethod
+    def get_course_quiz_stats(cls, db: Session, course_id: int) -> Dict[int, Dict[str, Any]]:
+        """
+        Per-quiz statistics for a course from daily rollups plus the live tail
+
+        :param db: Database session
+        :param course_id: Course identifier
+        :return: Accumulators keyed by quiz id
+        """
+        rollups = QuizScoreRollup.__table__
+        watermark = cls.read_watermark(db)
+        stats: Dict[int, Dict[str, Any]] = {}
+
+        for rollup in db.execute(
+            select(rollups).where(
+                rollups.c.granularity == "day",
+                rollups.c.course_id == course_id
+            )
+        ).all():
+            cls.merge(stats.setdefault(rollup.quiz_id, cls.empty_stats()), cls._rollup_stats(rollup))
+
+        for quiz_id, score, is_passed, _ in cls._live_tail(db, course_id, watermark):
+            cls.accumulate(stats.setdefault(quiz_id, cls.empty_stats()), score, is_passed)
+
+        return stats
+
+    @classmethod
+    def get_course_timeseries(
+        cls,
+        db: Session,
+        course_id: int,
+        granularity: str = "day",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Course-wide attempt/score time series from rollups plus the live tail
+
+        :param db: Database session
+        :param course_id: Course identifier
+        :param granularity: 'hour' or 'day'
+        :param start: Optional inclusive lower bound on bucket start
+        :param end: Optional exclusive upper bound on bucket start
+        :return: Buckets ordered by time
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported rollup granularity: {granularity}")
+
+        rollups = QuizScoreRollup.__table__
+        watermark = cls.read_watermark(db)
+        series: Dict[datetime, Dict[str, Any]] = {}
+
+        query = select(rollups).where(
+            rollups.c.granularity == granularity,
+            rollups.c.course_id == course_id
+        )
+        if start:
+            query = query.where(rollups.c.bucket_start >= start)
+        if end:
+            query = query.where(rollups.c.bucket_start < end)
+
+        for rollup in db.execute(query).all():
+            cls.merge(series.setdefault(rollup.bucket_start, cls.empty_stats()), cls._rollup_stats(rollup))
+
+        for _, score, is_passed, submitted_at in cls._live_tail(db, course_id, watermark):
+            bucket = cls.bucket_start(submitted_at, granularity)
+            if (start and bucket < start) or (end and bucket >= end):
+                continue
+            cls.accumulate(series.setdefault(bucket, cls.empty_stats()), score, is_passed)
+
+        return [
+            {"bucket_start": bucket, **cls.summarize(series[bucket])}
+            for bucket in sorted(series)
+        ]
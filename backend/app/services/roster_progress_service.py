@@ -0,0 +1,170 @@
+from typing import Dict, List, Any, Optional, Tuple
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+import base64
+
+from app.models.course import Enrollment
+from app.models.assessment import Quiz, QuizSubmission
+from app.models.user import User
+
+ROSTER_SORTS = ("progress", "enrollment")
+
+class RosterProgressService:
+    """
+    Progress of every learner enrolled in a course, for instructor rosters
+    """
+
+    @classmethod
+    def encode_cursor(cls, sort_value: int, enrollment_id: int) -> str:
+        """
+        Opaque keyset cursor pointing after a roster row
+
+        :param sort_value: Sort key of the last row on the page
+        :param enrollment_id: Enrollment id of the last row (tie breaker)
+        :return: URL-safe cursor string
+        """
+        return base64.urlsafe_b64encode(f"{sort_value}:{enrollment_id}".encode()).decode()
+
+    @classmethod
+    def decode_cursor(cls, cursor: str) -> Tuple[int, int]:
+        """
+        Decode a cursor produced by encode_cursor
+
+        :param cursor: Cursor string
+        :return: (sort value, enrollment id)
+        """
+        try:
+            sort_value, enrollment_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+            return int(sort_value), int(enrollment_id)
+        except (ValueError, UnicodeDecodeError):
+            raise ValueError("Invalid roster cursor")
+
+    @classmethod
+    def get_roster(
+        cls,
+        db: Session,
+        course_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        sort: str = "progress",
+        descending: bool = True
+    ) -> Dict[str, Any]:
+        """
+        One page of the course roster with progress, quiz average and last activity
+
+        Uses two queries regardless of page size: the enrollment page read
+        from the denormalized counters, then one grouped quiz query for the
+        learners on the page. Pages are keyset-paginated on (sort key, id),
+        served by the (course_id, completed_lessons, id) index. Every
+        enrollment of a course carries the same lesson total, so ordering by
+        completed lessons is ordering by percent complete.
+
+        :param db: Database session
+        :param course_id: Course identifier
+        :param limit: Page size
+        :param cursor: Cursor returned with the previous page
+        :param sort: "progress" (completed lessons) or "enrollment" (enrollment order)
+        :param descending: Sort direction
+        :return: Roster rows and the cursor of the next page (None on the last page)
+        """
+        if sort not in ROSTER_SORTS:
+            raise ValueError(f"Unsupported roster sort: {sort}")
+
+        enrollments = Enrollment.__table__
+        users = User.__table__
+
+        sort_column = enrollments.c.completed_lessons if sort == "progress" else enrollments.c.id
+        order = (sort_column.desc(), enrollments.c.id.desc()) if descending else (sort_column.asc(), enrollments.c.id.asc())
+
+        query = select(
+            enrollments.c.id,
+            enrollments.c.user_id,
+            enrollments.c.status,
+            enrollments.c.enrolled_at,
+            enrollments.c.completed_lessons,
+            enrollments.c.total_lessons,
+            enrollments.c.last_activity_at,
+            users.c.username,
+            users.c.full_name
+        ).join(
+            users, users.c.id == enrollments.c.user_id
+        ).where(
+            enrollments.c.course_id == course_id
+        )
+
+        if cursor:
+            after_value, after_id = cls.decode_cursor(cursor)
+            if descending:
+                query = query.where(or_(
+                    sort_column < after_value,
+                    and_(sort_column == after_value, enrollments.c.id < after_id)
+                ))
+            else:
+                query = query.where(or_(
+                    sort_column > after_value,
+                    and_(sort_column == after_value, enrollments.c.id > after_id)
+                ))
+
+        # Fetch one extra row to know whether another page follows
+        rows = db.execute(query.order_by(*order).limit(limit + 1)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        quiz_stats = cls._quiz_stats(db, course_id, [row.user_id for row in rows])
+
+        items = []
+        for row in rows:
+            average_score, last_submission = quiz_stats.get(row.user_id, (None, None))
+            last_activity = max(
+                (moment for moment in (row.last_activity_at, last_submission) if moment is not None),
+                default=None
+            )
+            items.append({
+                "enrollment_id": row.id,
+                "user_id": row.user_id,
+                "username": row.username,
+                "full_name": row.full_name,
+                "status": row.status.value if hasattr(row.status, "value") else row.status,
+                "enrolled_at": row.enrolled_at,
+                "completed_lessons": row.completed_lessons,
+                "total_lessons": row.total_lessons,
+                "progress_percentage": round(row.completed_lessons / row.total_lessons * 100, 2) if row.total_lessons else 0,
+                "average_quiz_score": round(average_score, 2) if average_score is not None else None,
+                "last_activity_at": last_activity
+            })
+
+        next_cursor = None
+        if has_more and rows:
+            last = rows[-1]
+            next_cursor = cls.encode_cursor(last.completed_lessons if sort == "progress" else last.id, last.id)
+
+        return {"course_id": course_id, "items": items, "next_cursor": next_cursor}
+
+    @classmethod
+    def _quiz_stats(cls, db: Session, course_id: int, user_ids: List[int]) -> Dict[int, Tuple[Optional[float], Any]]:
+        """
+        Average quiz score and latest submission per learner, in one grouped query
+        """
+        if not user_ids:
+            return {}
+
+        submissions = QuizSubmission.__table__
+        quizzes = Quiz.__table__
+
+        rows = db.execute(
+            select(
+                submissions.c.user_id,
+                func.avg(submissions.c.score),
+                func.max(submissions.c.submitted_at)
+            ).join(
+                quizzes, quizzes.c.id == submissions.c.quiz_id
+            ).where(
+                quizzes.c.course_id == course_id,
+                submissions.c.user_id.in_(user_ids)
+            ).group_by(submissions.c.user_id)
+        ).all()
+
+        return {
+            user_id: (float(average) if average is not None else None, last_submission)
+            for user_id, average, last_submission in rows
+        }
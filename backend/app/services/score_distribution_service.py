@@ -0,0 +1,182 @@
+from typing import Dict, List, Any, Optional
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from datetime import datetime
+import os
+import random
+
+from app.models.assessment import Quiz, QuizSubmission
+from app.models.analytics import ScoreSketch
+from app.utils.tdigest import TDigest
+from app.utils.upsert import dialect_insert
+
+SCOPES = ("quiz", "course")
+DEFAULT_QUANTILES = (0.1, 0.5, 0.9)
+# Each digest is split over this many rows so concurrent graders of one
+# course rarely wait on the same row lock; reads merge the shards
+SCORE_SKETCH_SHARDS = max(int(os.getenv("SCORE_SKETCH_SHARDS", 16)), 1)
+
+class ScoreDistributionService:
+    """
+    Streaming score percentiles per quiz and per course backed by t-digests
+    """
+
+    @classmethod
+    def record_score(
+        cls,
+        db: Session,
+        quiz_id: int,
+        course_id: int,
+        score: float
+    ) -> None:
+        """
+        Add a graded score to the quiz and course digests
+
+        Runs in the caller's transaction. The score goes to a randomly chosen
+        shard of each digest, so only graders that pick the same shard
+        serialize on its row lock. Rows are locked in a fixed (course, quiz)
+        order so concurrent graders cannot deadlock.
+
+        :param db: Database session
+        :param quiz_id: Quiz identifier
+        :param course_id: Course of the quiz
+        :param score: Submission score between 0 and 1
+        """
+        if score is None:
+            return
+
+        table = ScoreSketch.__table__
+        shard = random.randrange(SCORE_SKETCH_SHARDS)
+        for scope, scope_id in (("course", course_id), ("quiz", quiz_id)):
+            db.execute(dialect_insert(db, table).values(
+                scope=scope,
+                scope_id=scope_id,
+                shard=shard,
+                digest=TDigest().to_bytes(),
+                sample_count=0,
+                updated_at=datetime.utcnow()
+            ).on_conflict_do_nothing(index_elements=[table.c.scope, table.c.scope_id, table.c.shard]))
+
+            row_filter = (table.c.scope == scope, table.c.scope_id == scope_id, table.c.shard == shard)
+            stored = db.execute(select(table.c.digest).where(*row_filter).with_for_update()).scalar_one()
+
+            digest = TDigest.from_bytes(stored)
+            digest.add(score)
+            db.execute(update(table).where(*row_filter).values(
+                digest=digest.to_bytes(),
+                sample_count=table.c.sample_count + 1,
+                updated_at=datetime.utcnow()
+            ))
+
+    @classmethod
+    def get_digest(cls, db: Session, scope: str, scope_id: int) -> Optional[TDigest]:
+        """
+        Load the stored digest for a quiz or course, merging its shards
+
+        :param db: Database session
+        :param scope: 'quiz' or 'course'
+        :param scope_id: Quiz or course identifier
+        :return: Digest, or None if nothing has been graded yet
+        """
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown score sketch scope: {scope}")
+
+        table = ScoreSketch.__table__
+        shards = db.execute(select(table.c.digest).where(
+            table.c.scope == scope,
+            table.c.scope_id == scope_id,
+            table.c.sample_count > 0
+        )).scalars().all()
+
+        if not shards:
+            return None
+
+        digest = TDigest.from_bytes(shards[0])
+        for other in shards[1:]:
+            digest.merge(TDigest.from_bytes(other))
+        return digest
+
+    @classmethod
+    def get_percentiles(
+        cls,
+        db: Session,
+        scope: str,
+        scope_id: int,
+        quantiles: List[float] = DEFAULT_QUANTILES
+    ) -> Dict[str, Any]:
+        """
+        Score percentiles for a quiz or course
+
+        :param db: Database session
+        :param scope: 'quiz' or 'course'
+        :param scope_id: Quiz or course identifier
+        :param quantiles: Quantiles between 0 and 1
+        :return: Sample count and the score at each requested percentile
+        """
+        digest = cls.get_digest(db, scope, scope_id)
+
+        return {
+            "scope": scope,
+            "scope_id": scope_id,
+            "sample_count": len(digest) if digest else 0,
+            "percentiles": {
+                f"p{round(q * 100, 2):g}": digest.quantile(q) if digest else None
+                for q in quantiles
+            }
+        }
+
+    @classmethod
+    def get_percentile_rank(
+        cls,
+        db: Session,
+        quiz_id: int,
+        score: float
+    ) -> Optional[float]:
+        """
+        Percentage of a quiz's scores at or below the given score
+
+        :param db: Database session
+        :param quiz_id: Quiz identifier
+        :param score: Score to rank
+        :return: Percentile rank between 0 and 100, or None without data
+        """
+        digest = cls.get_digest(db, "quiz", quiz_id)
+        if digest is None:
+            return None
+        return digest.cdf(score) * 100
+
+    @classmethod
+    def rebuild(cls, db: Session, quiz_id: int) -> int:
+        """
+        Recompute a quiz digest from its stored submissions
+
+        The rebuilt digest replaces all of the quiz's shards. The course digest is left alone; rebuild every quiz of a course and
+        merge them if it needs repairing as well.
+
+        :param db: Database session
+        :param quiz_id: Quiz identifier
+        :return: Number of scores folded into the digest
+        """
+        submissions = QuizSubmission.__table__
+        scores = db.execute(
+            select(submissions.c.score).where(
+                submissions.c.quiz_id == quiz_id,
+                submissions.c.score.isnot(None)
+            ).execution_options(yield_per=10000)
+        ).scalars()
+
+        digest = TDigest.from_values(scores)
+
+        table = ScoreSketch.__table__
+        db.execute(delete(table).where(table.c.scope == "quiz", table.c.scope_id == quiz_id))
+        db.execute(dialect_insert(db, table).values(
+            scope="quiz",
+            scope_id=quiz_id,
+            shard=0,
+            digest=digest.to_bytes(),
+            sample_count=len(digest),
+            updated_at=datetime.utcnow()
+        ))
+        db.commit()
+
+        return len(digest)
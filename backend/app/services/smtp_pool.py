@@ -0,0 +1,240 @@
+from typing import List, Optional, Callable, Iterable, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email.message import EmailMessage
+import logging
+import os
+import smtplib
+import threading
+import time
+
+SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
+SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
+SMTP_USERNAME = os.getenv("SMTP_USERNAME", "")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+EMAIL_FROM = os.getenv("EMAIL_FROM", "no-reply@swahililearn.local")
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", 4))
+SMTP_SEND_CONCURRENCY = int(os.getenv("SMTP_SEND_CONCURRENCY", 4))
+# Recycle connections periodically; many providers cap messages per session
+SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", 100))
+SMTP_IDLE_TIMEOUT_SECONDS = float(os.getenv("SMTP_IDLE_TIMEOUT_SECONDS", 60))
+SMTP_TIMEOUT_SECONDS = float(os.getenv("SMTP_TIMEOUT_SECONDS", 30))
+
+logger = logging.getLogger(__name__)
+
+# Errors after which a connection can no longer be trusted. Every SMTPException
+# is also an OSError, so rejections must be told apart before socket errors
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPHeloError, smtplib.SMTPConnectError)
+# Rejections of a single message; the connection remains usable
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+def build_message(
+    to_email: str,
+    subject: str,
+    body: str,
+    html_body: Optional[str] = None,
+    from_email: str = EMAIL_FROM
+) -> EmailMessage:
+    """
+    Build a plain text email with an optional HTML alternative
+
+    :param to_email: Recipient email address
+    :param subject: Email subject
+    :param body: Plain text body
+    :param html_body: Optional HTML version of the body
+    :param from_email: Sender address
+    :return: Message ready to send
+    """
+    message = EmailMessage()
+    message['Subject'] = subject
+    message['From'] = from_email
+    message['To'] = to_email
+    message.set_content(body)
+    if html_body:
+        message.add_alternative(html_body, subtype='html')
+    return message
+
+class _PooledConnection:
+    __slots__ = ("smtp", "sent", "last_used")
+
+    def __init__(self, smtp):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+class SMTPConnectionPool:
+    """
+    Bounded pool of authenticated SMTP connections
+
+    Connecting, STARTTLS and AUTH happen once per connection instead of
+    once per email. Connections are reused until they have sent
+    max_messages_per_connection emails or sat idle for idle_timeout; a
+    connection that fails is discarded and the message is retried once on
+    a fresh one.
+    """
+
+    def __init__(
+        self,
+        host: str = SMTP_HOST,
+        port: int = SMTP_PORT,
+        username: str = SMTP_USERNAME,
+        password: str = SMTP_PASSWORD,
+        starttls: bool = SMTP_STARTTLS,
+        max_connections: int = SMTP_POOL_SIZE,
+        max_messages_per_connection: int = SMTP_MAX_MESSAGES_PER_CONNECTION,
+        idle_timeout: float = SMTP_IDLE_TIMEOUT_SECONDS,
+        timeout: float = SMTP_TIMEOUT_SECONDS,
+        concurrency: int = SMTP_SEND_CONCURRENCY,
+        smtp_factory: Callable = smtplib.SMTP
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.max_connections = max_connections
+        self.max_messages_per_connection = max_messages_per_connection
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self._smtp_factory = smtp_factory
+
+        self._idle: deque = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self.connections_opened = 0
+
+    def _connect(self) -> _PooledConnection:
+        smtp = self._smtp_factory(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()
+            if self.starttls:
+                smtp.starttls()
+                smtp.ehlo()
+            if self.username:
+                smtp.login(self.username, self.password)
+        except Exception:
+            self._close(smtp)
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        return _PooledConnection(smtp)
+
+    @staticmethod
+    def _close(smtp) -> None:
+        try:
+            smtp.quit()
+        except Exception:
+            try:
+                smtp.close()
+            except Exception:
+                pass
+
+    def _release(self, pooled: _PooledConnection) -> None:
+        pooled.sent += 1
+        pooled.last_used = time.monotonic()
+        if pooled.sent >= self.max_messages_per_connection:
+            self._close(pooled.smtp)
+            return
+        with self._lock:
+            self._idle.append(pooled)
+
+    def _checkout(self, fresh: bool) -> _PooledConnection:
+        with self._lock:
+            while self._idle and not fresh:
+                pooled = self._idle.pop()
+                if time.monotonic() - pooled.last_used < self.idle_timeout:
+                    return pooled
+                self._close(pooled.smtp)
+        return self._connect()
+
+    @contextmanager
+    def connection(self, fresh: bool = False):
+        """
+        Borrow a connection, opening one if no healthy idle connection exists
+
+        At most max_connections are open at a time; callers block until one
+        is free.
+
+        :param fresh: Open a new connection instead of reusing an idle one
+        """
+        self._slots.acquire()
+        try:
+            pooled = self._checkout(fresh)
+            try:
+                yield pooled
+            except MESSAGE_ERRORS:
+                # smtplib resets the session after a rejection, so it stays usable
+                self._release(pooled)
+                raise
+            except BaseException:
+                # Never return a connection in an unknown state to the pool
+                self._close(pooled.smtp)
+                raise
+            self._release(pooled)
+        finally:
+            self._slots.release()
+
+    def send(self, message: EmailMessage, retries: int = 1) -> bool:
+        """
+        Send one message over a pooled connection
+
+        :param message: Message to send
+        :param retries: Fresh-connection retries after a connection failure
+        :return: Whether the message was accepted by the server
+        """
+        for attempt in range(retries + 1):
+            try:
+                with self.connection(fresh=attempt > 0) as pooled:
+                    pooled.smtp.send_message(message)
+                return True
+            except CONNECTION_ERRORS as e:
+                error = e
+            except smtplib.SMTPException as e:
+                # Rejected by the server (recipient, content); retrying will not help
+                logger.error(f"Email to {message['To']} was rejected: {e}")
+                return False
+            except OSError as e:
+                error = e
+
+            if attempt < retries:
+                logger.info(f"SMTP connection failed, reconnecting: {error}")
+        logger.error(f"Email to {message['To']} failed: {error}")
+        return False
+
+    def send_many(self, messages: Iterable[EmailMessage]) -> List[bool]:
+        """
+        Send messages concurrently over the pooled connections
+
+        :param messages: Messages to send
+        :return: Per-message success, in input order
+        """
+        messages = list(messages)
+        if not messages:
+            return []
+        workers = max(1, min(self.concurrency, self.max_connections, len(messages)))
+        if workers == 1:
+            return [self.send(message) for message in messages]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smtp-send") as executor:
+            return list(executor.map(self.send, messages))
+
+    def close(self) -> None:
+        """
+        Close every idle connection
+        """
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for pooled in idle:
+            self._close(pooled.smtp)
+
+    def stats(self) -> Tuple[int, int]:
+        """
+        :return: (connections opened so far, idle connections)
+        """
+        with self._lock:
+            return self.connections_opened, len(self._idle)
+
+# Process-wide pool used by NotificationService
+smtp_pool = SMTPConnectionPool()
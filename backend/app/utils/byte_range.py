@@ -0,0 +1,57 @@
+from typing import Iterator, Optional, Tuple
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range HTTP Range header
+
+    Multiple ranges, unknown units and malformed headers are ignored (None),
+    which lets the caller answer with the full content as RFC 9110 allows.
+
+    :param header: Value of the Range header
+    :param size: Size of the representation in bytes
+    :return: Inclusive (start, end) byte offsets, or None to send everything
+    :raises ValueError: If the range cannot be satisfied
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    try:
+        start = int(start_text) if start_text else None
+        end = int(end_text) if end_text else None
+    except ValueError:
+        return None  # malformed ranges are ignored
+    if start is None and end is None:
+        return None
+
+    if start is None:
+        # Suffix range: the last N bytes
+        if not end:
+            raise ValueError(f"Range not satisfiable: {header}")
+        return max(0, size - end), size - 1
+
+    end = size - 1 if end is None else end
+    if start >= size or end < start:
+        raise ValueError(f"Range not satisfiable: {header}")
+    return start, min(end, size - 1)
+
+
+def iter_file_range(path: str, start: int, end: int, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """
+    Stream an inclusive byte range of a file in chunks
+
+    :param path: File path
+    :param start: First byte offset
+    :param end: Last byte offset (inclusive)
+    :param chunk_size: Bytes per chunk
+    """
+    with open(path, "rb") as source:
+        source.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = source.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
@@ -0,0 +1,146 @@
+import hashlib
+import math
+import zlib
+from typing import Iterable, Optional
+
+DEFAULT_PRECISION = 12  # 4096 registers, ~1.6% standard error
+
+# 2 ** -rank lookup, ranks never exceed 64 - precision + 1
+_INVERSE_POWERS = [2.0 ** -rank for rank in range(66)]
+
+
+class HyperLogLog:
+    """
+    Mergeable HyperLogLog sketch for approximate distinct counts
+
+    Registers are kept as a bytearray (one byte each), merges take the
+    register-wise maximum and the sketch serializes to a compact,
+    zlib-compressed byte string for storage in a binary column.
+    """
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: Optional[bytes] = None):
+        if not 4 <= precision <= 16:
+            raise ValueError("HyperLogLog precision must be between 4 and 16")
+
+        self.precision = precision
+        self.num_registers = 1 << precision
+        if registers is None:
+            self.registers = bytearray(self.num_registers)
+        else:
+            if len(registers) != self.num_registers:
+                raise ValueError("Register count does not match precision")
+            self.registers = bytearray(registers)
+
+    @staticmethod
+    def _hash(value) -> int:
+        digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def _position(self, value) -> tuple:
+        hashed = self._hash(value)
+        index = hashed >> (64 - self.precision)
+        remaining_bits = 64 - self.precision
+        remainder = hashed & ((1 << remaining_bits) - 1)
+        rank = remaining_bits - remainder.bit_length() + 1
+        return index, rank
+
+    def add(self, value) -> bool:
+        """
+        Add a value to the sketch
+
+        :param value: Any value with a stable string form (e.g. a user id)
+        :return: True if a register changed, i.e. the sketch needs persisting
+        """
+        index, rank = self._position(value)
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def would_change(self, value) -> bool:
+        """
+        Check whether adding a value would change the sketch, without adding it
+
+        :param value: Value to check
+        :return: True if add() would raise a register
+        """
+        index, rank = self._position(value)
+        return rank > self.registers[index]
+
+    def update(self, values: Iterable) -> bool:
+        changed = False
+        for value in values:
+            changed = self.add(value) or changed
+        return changed
+
+    def merge(self, other: "HyperLogLog") -> bool:
+        """
+        Merge another sketch into this one in place
+
+        :param other: Sketch with the same precision
+        :return: True if any register changed
+        """
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+
+        merged = bytearray(map(max, self.registers, other.registers))
+        changed = merged != self.registers
+        self.registers = merged
+        return changed
+
+    def count(self) -> int:
+        """
+        Estimate the number of distinct values added
+
+        :return: Cardinality estimate
+        """
+        m = self.num_registers
+        if m == 16:
+            alpha = 0.673
+        elif m == 32:
+            alpha = 0.697
+        elif m == 64:
+            alpha = 0.709
+        else:
+            alpha = 0.7213 / (1 + 1.079 / m)
+
+        estimate = alpha * m * m / sum(map(_INVERSE_POWERS.__getitem__, self.registers))
+
+        # Small range correction (linear counting)
+        if estimate <= 2.5 * m:
+            zeros = self.registers.count(0)
+            if zeros:
+                estimate = m * math.log(m / zeros)
+
+        return int(round(estimate))
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def to_bytes(self) -> bytes:
+        return bytes([self.precision]) + zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        return cls(precision=data[0], registers=zlib.decompress(data[1:]))
+
+    @classmethod
+    def merge_all(cls, sketches: Iterable["HyperLogLog"], precision: int = DEFAULT_PRECISION) -> "HyperLogLog":
+        """
+        Merge any number of sketches in a single register-wise pass
+
+        :param sketches: Sketches with the same precision
+        :param precision: Precision of the result when no sketches are given
+        :return: New merged sketch
+        """
+        sketches = list(sketches)
+        if not sketches:
+            return cls(precision=precision)
+
+        precision = sketches[0].precision
+        if any(sketch.precision != precision for sketch in sketches):
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        if len(sketches) == 1:
+            return cls(precision=precision, registers=sketches[0].registers)
+
+        return cls(precision=precision, registers=bytes(map(max, *(sketch.registers for sketch in sketches))))
@@ -0,0 +1,62 @@
+import importlib
+import sys
+import threading
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule(ModuleType):
+    """
+    Module proxy that defers the real import until an attribute is first accessed
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_name'] = name
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        """
+        Import the wrapped module exactly once
+
+        :return: The real module object
+        """
+        module = self.__dict__['_lazy_module']
+        if module is not None:
+            return module
+
+        with self.__dict__['_lazy_lock']:
+            module = self.__dict__['_lazy_module']
+            if module is None:
+                module = importlib.import_module(self.__dict__['_lazy_name'])
+                self.__dict__['_lazy_module'] = module
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__dict__['_lazy_module'] is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<LazyModule {self.__dict__['_lazy_name']} ({state})>"
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Return a proxy for a module that is only imported on first use
+
+    If the module has already been imported elsewhere it is returned directly.
+
+    :param name: Fully qualified module name, e.g. "matplotlib.pyplot"
+    :return: The module itself or a lazy proxy for it
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
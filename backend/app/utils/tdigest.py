@@ -0,0 +1,185 @@
+import math
+import struct
+from array import array
+from typing import Iterable, List, Optional, Tuple
+
+DEFAULT_COMPRESSION = 100
+
+_HEADER = struct.Struct("<dIdd")
+
+
+class TDigest:
+    """
+    Merging t-digest for streaming quantile and rank estimates
+
+    Values are buffered and periodically merged into a sorted list of
+    (mean, weight) centroids whose sizes are bounded by the arcsine scale
+    function, which keeps the tails (P10, P90) accurate while the whole
+    digest stays at roughly ``compression`` centroids.
+    """
+
+    def __init__(self, compression: float = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.centroids: List[Tuple[float, float]] = []
+        self.total_weight = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: List[Tuple[float, float]] = []
+        self._buffer_limit = int(compression * 5)
+
+    def _scale(self, q: float) -> float:
+        q = min(max(q, 0.0), 1.0)
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        """
+        Add a value to the digest
+
+        :param value: Observed value
+        :param weight: Weight of the observation
+        """
+        self._buffer.append((float(value), float(weight)))
+        self.total_weight += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+        if len(self._buffer) >= self._buffer_limit:
+            self._compress()
+
+    def merge(self, other: "TDigest") -> None:
+        """
+        Merge another digest into this one in place
+
+        :param other: Digest to merge
+        """
+        other._compress()
+        if not other.centroids:
+            return
+        self._buffer.extend(other.centroids)
+        self.total_weight += other.total_weight
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+
+        points = sorted(self.centroids + self._buffer)
+        self._buffer = []
+        total = self.total_weight
+
+        merged = []
+        cumulative = 0.0
+        current_mean, current_weight = points[0]
+
+        for mean, weight in points[1:]:
+            proposed = current_weight + weight
+            if self._scale((cumulative + proposed) / total) - self._scale(cumulative / total) <= 1:
+                current_mean += (mean - current_mean) * weight / proposed
+                current_weight = proposed
+            else:
+                merged.append((current_mean, current_weight))
+                cumulative += current_weight
+                current_mean, current_weight = mean, weight
+
+        merged.append((current_mean, current_weight))
+        self.centroids = merged
+
+    def __len__(self) -> int:
+        return int(self.total_weight)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate the value at a quantile
+
+        :param q: Quantile between 0 and 1 (0.5 is the median)
+        :return: Estimated value, or None for an empty digest
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1")
+
+        self._compress()
+        if not self.centroids:
+            return None
+        if len(self.centroids) == 1:
+            return self.centroids[0][0]
+
+        target = q * self.total_weight
+
+        # Centroid centres sit at the middle of their cumulative weight
+        previous_position, previous_value = 0.0, self.min
+        cumulative = 0.0
+        for mean, weight in self.centroids:
+            position = cumulative + weight / 2
+            if target < position:
+                return self._interpolate(target, previous_position, previous_value, position, mean)
+            previous_position, previous_value = position, mean
+            cumulative += weight
+
+        return self._interpolate(target, previous_position, previous_value, self.total_weight, self.max)
+
+    def cdf(self, value: float) -> Optional[float]:
+        """
+        Estimate the fraction of observations at or below a value
+
+        :param value: Value to rank
+        :return: Fraction between 0 and 1, or None for an empty digest
+        """
+        self._compress()
+        if not self.centroids:
+            return None
+        if value < self.min:
+            return 0.0
+        if value >= self.max:
+            return 1.0
+        if len(self.centroids) == 1:
+            return 0.5
+
+        previous_position, previous_value = 0.0, self.min
+        cumulative = 0.0
+        for mean, weight in self.centroids:
+            position = cumulative + weight / 2
+            if value < mean:
+                return self._interpolate(value, previous_value, previous_position, mean, position) / self.total_weight
+            previous_position, previous_value = position, mean
+            cumulative += weight
+
+        return self._interpolate(value, previous_value, previous_position, self.max, self.total_weight) / self.total_weight
+
+    @staticmethod
+    def _interpolate(x: float, x0: float, y0: float, x1: float, y1: float) -> float:
+        if x1 == x0:
+            return (y0 + y1) / 2
+        return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+
+    def to_bytes(self) -> bytes:
+        self._compress()
+        flat = array("d")
+        for mean, weight in self.centroids:
+            flat.append(mean)
+            flat.append(weight)
+        minimum = self.min if self.centroids else 0.0
+        maximum = self.max if self.centroids else 0.0
+        return _HEADER.pack(self.compression, len(self.centroids), minimum, maximum) + flat.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TDigest":
+        compression, size, minimum, maximum = _HEADER.unpack_from(data)
+        flat = array("d")
+        flat.frombytes(data[_HEADER.size:_HEADER.size + size * 16])
+
+        digest = cls(compression=compression)
+        digest.centroids = [(flat[i], flat[i + 1]) for i in range(0, len(flat), 2)]
+        digest.total_weight = sum(weight for _, weight in digest.centroids)
+        if digest.centroids:
+            digest.min, digest.max = minimum, maximum
+        return digest
+
+    @classmethod
+    def from_values(cls, values: Iterable[float], compression: float = DEFAULT_COMPRESSION) -> "TDigest":
+        digest = cls(compression=compression)
+        for value in values:
+            digest.add(value)
+        digest._compress()
+        return digest
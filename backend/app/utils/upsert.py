@@ -0,0 +1,21 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def dialect_insert(db: Session, table):
+    """
+    Return an INSERT construct that supports ON CONFLICT for the session's backend
+
+    Both PostgreSQL and SQLite (3.24+) implement INSERT ... ON CONFLICT DO UPDATE
+    with the same semantics, so callers can build a single upsert for either.
+
+    :param db: Database session
+    :param table: Table or mapped class to insert into
+    :return: Dialect-specific Insert with on_conflict_do_update/do_nothing
+    """
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        return postgresql.insert(table)
+    if dialect_name == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"Upsert is not supported for the {dialect_name} dialect")
@@ -0,0 +1,131 @@
+"""
+Certificate verification throughput benchmark
+
+Seeds a SQLite database with issued certificates and compares verifying a
+batch of ids one request at a time (one query per id, cold cache) with the
+bulk path (one IN query), cold and with a warm LRU cache.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.certificate_verification
+    python -m benchmarks.certificate_verification --certificates 50000 --batch 500 --rounds 5
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, Any, Callable
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.models.certificate import Certificate
+from app.models.course import Course
+from app.models.user import User
+from app.services.certificate_verification_service import CertificateVerificationService
+
+BATCH_SIZE = 10000
+
+
+def seed(engine, certificates: int) -> None:
+    """
+    Create the certificate tables and issue certificates across a few courses
+
+    :param engine: Target engine
+    :param certificates: Number of certificates to issue
+    """
+    for table in (User.__table__, Course.__table__, Certificate.__table__):
+        table.create(bind=engine)
+
+    issued_at = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Course.__table__), [{"id": i, "title": f"Course {i}"} for i in range(1, 21)])
+        for start in range(1, certificates + 1, BATCH_SIZE):
+            ids = range(start, min(start + BATCH_SIZE, certificates + 1))
+            conn.execute(insert(User.__table__), [
+                {"id": i, "username": f"learner{i}", "email": f"learner{i}@example.com"} for i in ids
+            ])
+            conn.execute(insert(Certificate.__table__), [
+                {"user_id": i, "course_id": i % 20 + 1, "certificate_id": f"cert-{i:08d}", "issued_at": issued_at}
+                for i in ids
+            ])
+
+
+def measure(label: str, rounds: int, batch: int, fn: Callable[[], None], prepare: Callable[[], None]) -> Dict[str, Any]:
+    elapsed = 0.0
+    for _ in range(rounds):
+        prepare()
+        started = time.perf_counter()
+        fn()
+        elapsed += time.perf_counter() - started
+    per_round_ms = elapsed / rounds * 1000
+    return {"label": label, "ms": per_round_ms, "ids_per_second": batch / (per_round_ms / 1000)}
+
+
+def run(certificates: int, batch: int, rounds: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Seed a temporary database and time the verification paths
+
+    :param certificates: Certificates to issue
+    :param batch: Ids verified per round
+    :param rounds: Rounds averaged per path
+    :return: Results keyed by path
+    """
+    handle, path = tempfile.mkstemp(suffix=".db")
+    os.close(handle)
+    engine = create_engine(f"sqlite:///{path}")
+    rng = random.Random(7)
+
+    try:
+        seed(engine, certificates)
+        ids = [f"cert-{rng.randint(1, certificates):08d}" for _ in range(batch)]
+
+        with Session(engine) as db:
+            results = {
+                "single": measure(
+                    "single id per call (cold cache)", rounds, batch,
+                    lambda: [CertificateVerificationService.verify(db, certificate_id) for certificate_id in ids],
+                    CertificateVerificationService.clear_cache
+                ),
+                "bulk_cold": measure(
+                    "bulk IN query (cold cache)", rounds, batch,
+                    lambda: CertificateVerificationService.verify_many(db, ids),
+                    CertificateVerificationService.clear_cache
+                ),
+                "bulk_warm": measure(
+                    "bulk (warm LRU cache)", rounds, batch,
+                    lambda: CertificateVerificationService.verify_many(db, ids),
+                    lambda: None
+                ),
+            }
+            assert all(result["is_valid"] for result in CertificateVerificationService.verify_many(db, ids))
+    finally:
+        CertificateVerificationService.clear_cache()
+        engine.dispose()
+        os.remove(path)
+
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark single vs bulk certificate verification")
+    parser.add_argument("--certificates", type=int, default=50000, help="Certificates to issue")
+    parser.add_argument("--batch", type=int, default=500, help="Ids verified per round")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds averaged per path")
+    args = parser.parse_args()
+
+    results = run(args.certificates, args.batch, args.rounds)
+
+    print(f"Verifying {args.batch} of {args.certificates} certificates, averaged over {args.rounds} rounds")
+    for result in results.values():
+        print(f"  {result['label']:<34} {result['ms']:8.1f} ms  {result['ids_per_second']:10.0f} ids/s")
+    print(f"Bulk speed-up over single-id calls: {results['single']['ms'] / results['bulk_cold']['ms']:.1f}x cold, "
+          f"{results['single']['ms'] / results['bulk_warm']['ms']:.1f}x warm")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
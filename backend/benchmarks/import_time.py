@@ -0,0 +1,157 @@
+"""
+Cold-start import profiling for backend modules
+
+Runs each module listed in import_time_budget.json in a fresh interpreter with
+``python -X importtime``, prints a report of the slowest imports and fails when a
+module exceeds its time budget or eagerly pulls in a forbidden heavy dependency.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --top 25 --output benchmarks/import_time_report.md
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Any
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_time_budget.json")
+
+
+def profile_module(module: str) -> Dict[str, Any]:
+    """
+    Import a module in a fresh interpreter and collect -X importtime output
+
+    :param module: Dotted module name to import
+    :return: Dictionary with per-import timings and the import status
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+
+    entries = []
+    errors = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            errors.append(line)
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header row
+        entries.append({
+            "self_us": int(parts[0]),
+            "cumulative_us": int(parts[1]),
+            "name": parts[2].strip()
+        })
+
+    own_entry = next((entry for entry in entries if entry["name"] == module), None)
+
+    return {
+        "module": module,
+        "ok": result.returncode == 0,
+        "error": "\n".join(errors[-5:]) if result.returncode != 0 else None,
+        "cumulative_ms": own_entry["cumulative_us"] / 1000 if own_entry else None,
+        "imported": {entry["name"] for entry in entries},
+        "entries": entries
+    }
+
+
+def check_budget(profile: Dict[str, Any], budget: Dict[str, Any]) -> List[str]:
+    """
+    Compare a module profile against its budget
+
+    :param profile: Output of profile_module
+    :param budget: Budget entry from import_time_budget.json
+    :return: List of human readable violations
+    """
+    if not profile["ok"]:
+        return [f"{profile['module']} failed to import:\n{profile['error']}"]
+
+    violations = []
+    max_ms = budget.get("max_cumulative_ms")
+    if max_ms is not None and profile["cumulative_ms"] is not None and profile["cumulative_ms"] > max_ms:
+        violations.append(
+            f"{profile['module']} took {profile['cumulative_ms']:.1f} ms (budget {max_ms} ms)"
+        )
+
+    for forbidden in budget.get("forbidden_imports", []):
+        loaded = [
+            name for name in profile["imported"]
+            if name == forbidden or name.startswith(forbidden + ".")
+        ]
+        if loaded:
+            violations.append(f"{profile['module']} eagerly imports {forbidden}")
+
+    return violations
+
+
+def render_report(profiles: List[Dict[str, Any]], top: int) -> str:
+    """
+    Render a markdown report of the slowest imports per module
+
+    :param profiles: Module profiles
+    :param top: Number of entries to list per module
+    :return: Markdown text
+    """
+    lines = ["# Import time report", ""]
+    for profile in profiles:
+        lines.append(f"## {profile['module']}")
+        lines.append("")
+        if not profile["ok"]:
+            lines.append("Import failed:")
+            lines.append("")
+            lines.append("```")
+            lines.append(profile["error"] or "")
+            lines.append("```")
+            lines.append("")
+            continue
+
+        lines.append(f"Cumulative: {profile['cumulative_ms']:.1f} ms")
+        lines.append("")
+        lines.append("| cumulative (ms) | self (ms) | module |")
+        lines.append("| ---: | ---: | --- |")
+        slowest = sorted(profile["entries"], key=lambda entry: entry["cumulative_us"], reverse=True)
+        for entry in slowest[:top]:
+            lines.append(
+                f"| {entry['cumulative_us'] / 1000:.1f} | {entry['self_us'] / 1000:.1f} | {entry['name']} |"
+            )
+        lines.append("")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Profile cold-start import time of backend modules")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list per module")
+    parser.add_argument("--output", help="Write the markdown report to this file")
+    args = parser.parse_args()
+
+    with open(BUDGET_FILE) as budget_file:
+        budgets = json.load(budget_file)["modules"]
+
+    profiles = [profile_module(module) for module in budgets]
+    report = render_report(profiles, args.top)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(report)
+    else:
+        print(report)
+
+    violations = []
+    for profile in profiles:
+        violations.extend(check_budget(profile, budgets[profile["module"]]))
+
+    for violation in violations:
+        print(f"BUDGET VIOLATION: {violation}", file=sys.stderr)
+
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Quiz reminder selection benchmark
+
+Seeds a SQLite database with enrollments across a few courses with timed
+quizzes, a share of which are already submitted, then runs the set-based
+reminder job and reports its run time and peak Python memory. Memory stays
+bounded by the chunk size rather than the number of enrollments.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.quiz_reminders
+    python -m benchmarks.quiz_reminders --enrollments 1000000 --chunk-size 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, Any
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.models.assessment import Quiz, QuizSubmission
+from app.models.course import Course, Enrollment
+from app.models.notification import Notification, NotificationCounter, NotificationOutbox
+from app.models.user import User
+from app.services.notification_service import NotificationService
+
+BATCH_SIZE = 20000
+COURSES = 10
+
+
+def seed(engine, enrollments: int, submitted_share: float) -> None:
+    """
+    Create the reminder tables with one enrollment per learner and a timed quiz per course
+
+    :param engine: Target engine
+    :param enrollments: Number of learners (and enrollments)
+    :param submitted_share: Share of learners who already submitted their quiz
+    """
+    for table in (User.__table__, Course.__table__, Enrollment.__table__, Quiz.__table__,
+                  QuizSubmission.__table__, Notification.__table__, NotificationCounter.__table__,
+                  NotificationOutbox.__table__):
+        table.create(bind=engine)
+
+    submitted_every = int(1 / submitted_share) if submitted_share else 0
+    with engine.begin() as conn:
+        conn.execute(insert(Course.__table__), [{"id": i, "title": f"Course {i}"} for i in range(1, COURSES + 1)])
+        conn.execute(insert(Quiz.__table__), [
+            {"id": i, "course_id": i, "title": f"Quiz {i}", "is_timed": True, "duration_minutes": 20}
+            for i in range(1, COURSES + 1)
+        ])
+        for start in range(1, enrollments + 1, BATCH_SIZE):
+            ids = range(start, min(start + BATCH_SIZE, enrollments + 1))
+            conn.execute(insert(User.__table__), [
+                {"id": i, "username": f"learner{i}", "email": f"learner{i}@example.com"} for i in ids
+            ])
+            conn.execute(insert(Enrollment.__table__), [{"user_id": i, "course_id": i % COURSES + 1} for i in ids])
+            if submitted_every:
+                submitted = [{"quiz_id": i % COURSES + 1, "user_id": i, "score": 75.0} for i in ids if i % submitted_every == 0]
+                if submitted:
+                    conn.execute(insert(QuizSubmission.__table__), submitted)
+
+
+def run(enrollments: int, chunk_size: int, submitted_share: float) -> Dict[str, Any]:
+    """
+    Seed a temporary database and time one reminder run
+
+    :param enrollments: Number of enrollments
+    :param chunk_size: Reminders written per batch
+    :param submitted_share: Share of learners who already submitted
+    :return: Reminder count, seconds and peak traced memory
+    """
+    handle, path = tempfile.mkstemp(suffix=".db")
+    os.close(handle)
+    engine = create_engine(f"sqlite:///{path}")
+
+    try:
+        seed(engine, enrollments, submitted_share)
+        with Session(engine) as db:
+            tracemalloc.start()
+            started = time.perf_counter()
+            reminders = NotificationService.send_quiz_deadline_reminders(db, chunk_size=chunk_size)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+    return {"reminders": reminders, "seconds": elapsed, "peak_mb": peak / 1024 / 1024}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the set-based quiz reminder job")
+    parser.add_argument("--enrollments", type=int, default=200000, help="Enrollments to seed")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Reminders written per batch")
+    parser.add_argument("--submitted-share", type=float, default=0.25, help="Share of learners who already submitted")
+    args = parser.parse_args()
+
+    result = run(args.enrollments, args.chunk_size, args.submitted_share)
+
+    print(f"{args.enrollments} enrollments, chunk size {args.chunk_size}")
+    print(f"  {result['reminders']} reminders in {result['seconds']:.1f} s "
+          f"({result['reminders'] / result['seconds']:.0f} reminders/s), peak {result['peak_mb']:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
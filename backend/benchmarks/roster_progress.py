@@ -0,0 +1,173 @@
+"""
+Course roster progress benchmark
+
+Seeds a SQLite database with one large course (50,000 enrollments by default,
+with lesson counters and quiz submissions), then times the roster progress
+query: the first page, a page deep into the roster through its keyset cursor,
+and a full walk over every page. Fails when a single page exceeds its budget.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.roster_progress
+    python -m benchmarks.roster_progress --enrollments 50000 --page-size 100 --max-page-ms 50
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.models.course import Enrollment
+from app.models.assessment import Quiz, QuizSubmission
+from app.models.user import User
+from app.services.roster_progress_service import RosterProgressService
+
+COURSE_ID = 1
+TOTAL_LESSONS = 40
+QUIZZES = 5
+BATCH_SIZE = 10000
+
+
+def seed(engine, enrollments: int) -> None:
+    """
+    Create the roster tables and fill them with one course of learners
+
+    :param engine: Target engine
+    :param enrollments: Number of enrollments to create
+    """
+    tables = (User.__table__, Enrollment.__table__, Quiz.__table__, QuizSubmission.__table__)
+    for table in tables:
+        table.create(bind=engine)
+
+    rng = random.Random(42)
+    now = datetime.utcnow()
+
+    with engine.begin() as conn:
+        conn.execute(insert(Quiz.__table__), [
+            {"id": quiz_id, "course_id": COURSE_ID, "title": f"Quiz {quiz_id}"}
+            for quiz_id in range(1, QUIZZES + 1)
+        ])
+
+        for start in range(1, enrollments + 1, BATCH_SIZE):
+            ids = range(start, min(start + BATCH_SIZE, enrollments + 1))
+            conn.execute(insert(User.__table__), [
+                {"id": i, "username": f"learner{i}", "email": f"learner{i}@example.com", "full_name": f"Learner {i}"}
+                for i in ids
+            ])
+            conn.execute(insert(Enrollment.__table__), [
+                {
+                    "id": i,
+                    "user_id": i,
+                    "course_id": COURSE_ID,
+                    "enrolled_at": now - timedelta(days=rng.randint(0, 365)),
+                    "completed_lessons": rng.randint(0, TOTAL_LESSONS),
+                    "total_lessons": TOTAL_LESSONS,
+                    "last_activity_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+                }
+                for i in ids
+            ])
+            conn.execute(insert(QuizSubmission.__table__), [
+                {
+                    "quiz_id": rng.randint(1, QUIZZES),
+                    "user_id": i,
+                    "score": rng.random() * 100,
+                    "is_passed": rng.random() > 0.3,
+                    "submitted_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+                }
+                for i in ids for _ in range(rng.randint(0, 3))
+            ])
+
+
+def timed_page(db: Session, **kwargs) -> Dict[str, Any]:
+    started = time.perf_counter()
+    page = RosterProgressService.get_roster(db, COURSE_ID, **kwargs)
+    return {"ms": (time.perf_counter() - started) * 1000, "page": page}
+
+
+def run(enrollments: int, page_size: int) -> Dict[str, Any]:
+    """
+    Seed a temporary database and time roster pages
+
+    :param enrollments: Number of enrollments to seed
+    :param page_size: Roster page size
+    :return: Timings in milliseconds
+    """
+    handle, path = tempfile.mkstemp(suffix=".db")
+    os.close(handle)
+    engine = create_engine(f"sqlite:///{path}")
+
+    try:
+        started = time.perf_counter()
+        seed(engine, enrollments)
+        seed_ms = (time.perf_counter() - started) * 1000
+
+        with Session(engine) as db:
+            first = timed_page(db, limit=page_size)
+
+            # Walk the whole roster through cursors; also yields a deep cursor
+            pages, walked, cursor, deep_cursor = 0, 0, None, None
+            started = time.perf_counter()
+            while True:
+                page = RosterProgressService.get_roster(db, COURSE_ID, limit=page_size, cursor=cursor)
+                pages += 1
+                walked += len(page["items"])
+                cursor = page["next_cursor"]
+                if pages == max(1, enrollments // page_size // 2):
+                    deep_cursor = cursor
+                if cursor is None:
+                    break
+            walk_ms = (time.perf_counter() - started) * 1000
+
+            deep = timed_page(db, limit=page_size, cursor=deep_cursor)
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+    return {
+        "enrollments": enrollments,
+        "page_size": page_size,
+        "seed_ms": seed_ms,
+        "first_page_ms": first["ms"],
+        "deep_page_ms": deep["ms"],
+        "full_walk_ms": walk_ms,
+        "pages": pages,
+        "rows_walked": walked
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark course roster progress pages")
+    parser.add_argument("--enrollments", type=int, default=50000, help="Enrollments in the benchmark course")
+    parser.add_argument("--page-size", type=int, default=100, help="Roster page size")
+    parser.add_argument("--max-page-ms", type=float, default=None, help="Fail when a single page is slower")
+    args = parser.parse_args()
+
+    result = run(args.enrollments, args.page_size)
+
+    print(f"Seeded {result['enrollments']} enrollments in {result['seed_ms']:.0f} ms")
+    print(f"First page ({result['page_size']} rows): {result['first_page_ms']:.1f} ms")
+    print(f"Deep page (middle of the roster): {result['deep_page_ms']:.1f} ms")
+    print(
+        f"Full walk: {result['pages']} pages, {result['rows_walked']} rows in {result['full_walk_ms']:.0f} ms "
+        f"({result['full_walk_ms'] / result['pages']:.1f} ms/page)"
+    )
+
+    if result["rows_walked"] != result["enrollments"]:
+        print(f"ROSTER WALK MISMATCH: walked {result['rows_walked']} of {result['enrollments']}", file=sys.stderr)
+        return 1
+
+    slowest = max(result["first_page_ms"], result["deep_page_ms"])
+    if args.max_page_ms is not None and slowest > args.max_page_ms:
+        print(f"BUDGET VIOLATION: roster page took {slowest:.1f} ms (budget {args.max_page_ms} ms)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+SMTP sending throughput benchmark
+
+Starts a local aiosmtpd server and compares opening one SMTP connection per
+email (the old NotificationService behaviour) with sending over the pooled
+persistent connections. The server can add a delay to every EHLO to stand in
+for the TLS and AUTH round trips a real relay costs per connection.
+
+Requires the dev dependency aiosmtpd (requirements-dev.txt).
+
+Usage (from the backend directory):
+
+    python -m benchmarks.smtp_throughput
+    python -m benchmarks.smtp_throughput --messages 2000 --connections 8 --handshake-ms 20
+"""
+import argparse
+import asyncio
+import smtplib
+import socket
+import sys
+import threading
+import time
+from typing import Dict, Any, List
+
+from app.services.smtp_pool import SMTPConnectionPool, build_message
+
+
+class CountingHandler:
+    """
+    aiosmtpd handler that accepts and counts messages, delaying each EHLO
+    """
+
+    def __init__(self, handshake_delay: float):
+        self.handshake_delay = handshake_delay
+        self.received = 0
+        self._lock = threading.Lock()
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        session.host_name = hostname
+        if self.handshake_delay:
+            await asyncio.sleep(self.handshake_delay)
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        with self._lock:
+            self.received += 1
+        return "250 Message accepted for delivery"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def send_per_message(host: str, port: int, messages: List) -> None:
+    for message in messages:
+        with smtplib.SMTP(host, port) as server:
+            server.ehlo()
+            server.send_message(message)
+
+
+def run(messages: int, connections: int, handshake_ms: float) -> Dict[str, Dict[str, Any]]:
+    """
+    Start a local SMTP server and time both sending strategies
+
+    :param messages: Emails sent per strategy
+    :param connections: Pooled connections (and sending threads)
+    :param handshake_ms: Delay added to every EHLO, in milliseconds
+    :return: Results keyed by strategy
+    """
+    from aiosmtpd.controller import Controller
+
+    host, port = "127.0.0.1", free_port()
+    handler = CountingHandler(handshake_ms / 1000)
+    controller = Controller(handler, hostname=host, port=port)
+    controller.start()
+
+    batch = [
+        build_message(f"learner{i}@example.com", "Upcoming quiz", f"Reminder {i}", from_email="no-reply@example.com")
+        for i in range(messages)
+    ]
+    results = {}
+    try:
+        started = time.perf_counter()
+        send_per_message(host, port, batch)
+        elapsed = time.perf_counter() - started
+        results["per_message"] = {
+            "label": "one connection per email",
+            "seconds": elapsed,
+            "connections": messages,
+        }
+
+        pool = SMTPConnectionPool(
+            host=host,
+            port=port,
+            username="",
+            starttls=False,
+            max_connections=connections,
+            concurrency=connections,
+            max_messages_per_connection=max(messages, 1)
+        )
+        started = time.perf_counter()
+        sent = pool.send_many(batch)
+        elapsed = time.perf_counter() - started
+        pool.close()
+        assert all(sent)
+        results["pooled"] = {
+            "label": f"pooled ({connections} connections)",
+            "seconds": elapsed,
+            "connections": pool.connections_opened,
+        }
+    finally:
+        controller.stop()
+
+    assert handler.received == messages * 2
+    for result in results.values():
+        result["emails_per_second"] = messages / result["seconds"]
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark per-email vs pooled SMTP connections")
+    parser.add_argument("--messages", type=int, default=500, help="Emails sent per strategy")
+    parser.add_argument("--connections", type=int, default=4, help="Pooled connections")
+    parser.add_argument("--handshake-ms", type=float, default=10.0, help="Delay added to every EHLO")
+    args = parser.parse_args()
+
+    try:
+        import aiosmtpd  # noqa: F401
+    except ImportError:
+        print("aiosmtpd is not installed; install requirements-dev.txt to run this benchmark")
+        return 1
+
+    results = run(args.messages, args.connections, args.handshake_ms)
+
+    print(f"Sending {args.messages} emails, {args.handshake_ms:.0f} ms handshake delay")
+    for result in results.values():
+        print(f"  {result['label']:<28} {result['seconds']:8.2f} s  {result['emails_per_second']:8.0f} emails/s  "
+              f"{result['connections']:6d} connections")
+    print(f"Pooled speed-up: {results['per_message']['seconds'] / results['pooled']['seconds']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,22 @@
+import argparse
+
+from app.services.database import SessionLocal
+from app.services.enrollment_progress_service import EnrollmentProgressService
+
+def repair_progress_counters(course_id: int = None):
+    """
+    Recompute enrollment progress counters that drifted from the progress rows
+    """
+    db = SessionLocal()
+    try:
+        repaired = EnrollmentProgressService.repair(db, course_id=course_id)
+        print(f"Repaired progress counters on {repaired} enrollments")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Repair denormalized enrollment progress counters")
+    parser.add_argument("--course-id", type=int, default=None, help="Only repair enrollments of this course")
+    args = parser.parse_args()
+
+    repair_progress_counters(args.course_id)
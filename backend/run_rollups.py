@@ -0,0 +1,28 @@
+import argparse
+import time
+
+from app.services.database import SessionLocal
+from app.services.rollup_service import RollupService, ROLLUP_BATCH_SIZE
+
+def run_rollups(batch_size: int = ROLLUP_BATCH_SIZE):
+    """
+    Fold newly settled quiz submissions into the hourly and daily rollups
+    """
+    db = SessionLocal()
+    try:
+        result = RollupService.run_incremental_rollup(db, batch_size=batch_size)
+        print(f"Rolled up {result['processed_submissions']} submissions (watermark {result['watermark']})")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain quiz score rollups")
+    parser.add_argument("--batch-size", type=int, default=ROLLUP_BATCH_SIZE)
+    parser.add_argument("--interval", type=int, default=0, help="Repeat every N seconds (0 runs once)")
+    args = parser.parse_args()
+
+    while True:
+        run_rollups(args.batch_size)
+        if not args.interval:
+            break
+        time.sleep(args.interval)
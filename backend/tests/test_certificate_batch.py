@@ -0,0 +1,130 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.certificate import Certificate
+from app.models.course import Course, Enrollment
+from app.models.user import User
+from app.services.certificate_batch_service import CertificateBatchService, CertificateJobStatus
+from app.services.certificate_renderer import CertificateRenderer, render_certificate
+from app.services.certificate_storage import CertificateStorage
+
+certificates = Certificate.__table__
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for table in (User.__table__, Course.__table__, Enrollment.__table__, certificates):
+        table.create(bind=engine)
+
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [{"id": i, "username": f"mhitimu{i}", "email": f"h{i}@example.com"} for i in range(1, 6)])
+        conn.execute(insert(Course.__table__), [{"id": 1, "title": "Kiswahili Msingi"}])
+        conn.execute(insert(Enrollment.__table__), [
+            {"id": 1, "user_id": 1, "course_id": 1, "completed_lessons": 4, "total_lessons": 4},
+            {"id": 2, "user_id": 2, "course_id": 1, "completed_lessons": 4, "total_lessons": 4},
+            {"id": 3, "user_id": 3, "course_id": 1, "completed_lessons": 4, "total_lessons": 4},
+            {"id": 4, "user_id": 4, "course_id": 1, "completed_lessons": 3, "total_lessons": 4},
+            {"id": 5, "user_id": 5, "course_id": 1, "completed_lessons": 0, "total_lessons": 0},
+        ])
+        # Learner 3 already holds a certificate
+        conn.execute(insert(certificates), [{"user_id": 3, "course_id": 1, "certificate_id": "existing", "issued_at": datetime.utcnow()}])
+
+    return sessionmaker(bind=engine)
+
+
+def fake_render(spec):
+    if spec["user_name"] == "mhitimu2":
+        raise RuntimeError("font missing")
+    return {
+        "png": f"PNG:{spec['user_name']}:{spec['course_title']}".encode(),
+        "pdf": f"PDF:{spec['user_name']}".encode()
+    }
+
+
+def run_batch(session_factory, storage, render_fn=fake_render):
+    return CertificateBatchService.start_course_batch(
+        1, session_factory=session_factory, renderer=CertificateRenderer(workers=0, render_fn=render_fn),
+        storage=storage, background=False
+    )
+
+
+def certificate_rows(session_factory):
+    with session_factory() as db:
+        return {row.user_id: row for row in db.execute(select(certificates))}
+
+
+def test_batch_issues_once_per_completer_and_reports_progress(session_factory, tmp_path):
+    storage = CertificateStorage(str(tmp_path))
+
+    job = run_batch(session_factory, storage)
+
+    assert job.status == CertificateJobStatus.COMPLETED
+    # Learner 3's unrendered certificate is rendered alongside the new ones
+    assert (job.total, job.rendered, job.failed) == (3, 2, 1)
+    assert job.to_dict()["progress_percentage"] == 100.0
+    assert CertificateBatchService.get_job(job.job_id) is job
+
+    issued = certificate_rows(session_factory)
+    assert sorted(issued) == [1, 2, 3]
+    assert issued[3].certificate_id == "existing"
+    assert issued[3].rendered_at is not None
+    assert issued[2].png_sha256 is None
+    assert issued[2].rendered_at is None
+
+    rendered = issued[1]
+    png_path = storage.path_for(rendered.png_sha256, "png")
+    with open(png_path, "rb") as artifact:
+        assert artifact.read() == b"PNG:mhitimu1:Kiswahili Msingi"
+    assert rendered.png_size == len(b"PNG:mhitimu1:Kiswahili Msingi")
+    assert storage.exists(rendered.pdf_sha256, "pdf")
+    assert rendered.rendered_at is not None
+
+
+def test_rerun_renders_certificates_left_without_artifacts(session_factory, tmp_path):
+    storage = CertificateStorage(str(tmp_path))
+    run_batch(session_factory, storage)
+    failed_id = certificate_rows(session_factory)[2].certificate_id
+
+    # The font is fixed; the rerun issues nothing new but renders learner 2
+    again = run_batch(session_factory, storage, render_fn=lambda spec: {"png": b"PNG", "pdf": b"PDF"})
+    assert (again.total, again.rendered, again.failed) == (1, 1, 0)
+
+    issued = certificate_rows(session_factory)
+    assert issued[2].certificate_id == failed_id
+    assert storage.exists(issued[2].png_sha256, "png")
+
+    assert run_batch(session_factory, storage).total == 0
+
+
+def test_issuing_never_creates_a_second_certificate_per_course(session_factory):
+    with session_factory() as db:
+        assert CertificateBatchService.issue_for_completers(db, 1) == 2
+        assert CertificateBatchService.issue_for_completers(db, 1) == 0
+
+        # A concurrent run that read the completers before this one committed
+        with pytest.raises(IntegrityError):
+            db.execute(insert(certificates).values(user_id=1, course_id=1, certificate_id="dup", issued_at=datetime.utcnow()))
+        db.rollback()
+
+    assert len(certificate_rows(session_factory)) == 3
+
+
+def test_render_certificate_encodes_png_and_pdf():
+    pytest.importorskip("PIL")
+    pytest.importorskip("qrcode")
+
+    artifacts = render_certificate({
+        "certificate_id": "abc",
+        "user_name": "Amani",
+        "course_title": "Kiswahili Msingi",
+        "issued_at": datetime(2026, 1, 1),
+        "verification_url": "http://localhost/verify-certificate/abc"
+    })
+    assert artifacts["png"].startswith(b"\x89PNG")
+    assert artifacts["pdf"].startswith(b"%PDF")
@@ -0,0 +1,78 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.certificate import Certificate
+from app.services.certificate_signing import (
+    CertificateRevocationList, CertificateSigner, CertificateTokenService
+)
+
+certificates = Certificate.__table__
+ISSUED = datetime(2026, 6, 1, 12, 30)
+
+
+def issue(signer, certificate_id="cheti-1"):
+    return CertificateTokenService.issue_token(
+        certificate_id, 7, 3, ISSUED, "amani", "Kiswahili Msingi", signer=signer
+    )
+
+
+def test_token_verifies_offline_and_rejects_tampering():
+    signer = CertificateSigner("siri", previous_keys=[])
+    revocations = CertificateRevocationList()
+    token = issue(signer)
+
+    result = CertificateTokenService.verify_token(token, signer=signer, revocations=revocations)
+    assert result == {
+        "is_valid": True,
+        "certificate_id": "cheti-1",
+        "user_id": 7,
+        "course_id": 3,
+        "issued_at": date(2026, 6, 1),
+        "course_title": "Kiswahili Msingi",
+        "user_name": "amani"
+    }
+
+    payload, signature = token.split(".")
+    forged = issue(signer, "cheti-2").split(".")[0]
+    for bad in (f"{forged}.{signature}", f"{payload}.{signature[:-2]}AA", "not-a-token", f"{payload}.***"):
+        assert CertificateTokenService.verify_token(bad, signer=signer, revocations=revocations)["is_valid"] is False
+
+
+def test_previous_keys_still_verify_after_rotation():
+    old_token = issue(CertificateSigner("zamani", previous_keys=[]))
+    rotated = CertificateSigner("mpya", previous_keys=["zamani"])
+
+    assert rotated.verify(old_token)["cid"] == "cheti-1"
+    assert CertificateSigner("mpya", previous_keys=[]).verify(issue(rotated))["cid"] == "cheti-1"
+    with pytest.raises(ValueError):
+        CertificateSigner("mpya", previous_keys=[]).verify(old_token)
+
+
+def test_revocation_list_refreshes_incrementally():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    certificates.create(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(certificates), [
+            {"user_id": i, "course_id": 1, "certificate_id": f"cheti-{i}", "issued_at": ISSUED, "revoked_at": None}
+            for i in (1, 2, 3)
+        ])
+        conn.execute(update(certificates).where(certificates.c.certificate_id == "cheti-1").values(revoked_at=ISSUED))
+
+    signer = CertificateSigner("siri", previous_keys=[])
+    revocations = CertificateRevocationList(session_factory=sessionmaker(bind=engine))
+    assert revocations.refresh() == 1
+
+    result = CertificateTokenService.verify_token(issue(signer, "cheti-1"), signer=signer, revocations=revocations)
+    assert result["is_valid"] is False and result["message"] == "Certificate has been revoked"
+    assert CertificateTokenService.verify_token(issue(signer, "cheti-2"), signer=signer, revocations=revocations)["is_valid"]
+
+    with engine.begin() as conn:
+        conn.execute(update(certificates).where(certificates.c.certificate_id == "cheti-2").values(
+            revoked_at=ISSUED + timedelta(days=1)
+        ))
+    assert revocations.refresh() == 1
+    assert revocations.is_revoked("cheti-2") and not revocations.is_revoked("cheti-3")
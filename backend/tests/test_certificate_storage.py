@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.certificate import Certificate
+from app.routes import certificates as certificate_routes
+from app.services.certificate_storage import CertificateStorage
+from app.services.database import get_db
+from app.utils.byte_range import parse_range
+
+PNG = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    store = CertificateStorage(str(tmp_path))
+    monkeypatch.setattr(certificate_routes, "certificate_storage", store)
+    return store
+
+
+@pytest.fixture
+def client(storage):
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Certificate.__table__.create(bind=engine)
+    values = storage.put_all({"png": PNG})
+    with engine.begin() as conn:
+        conn.execute(insert(Certificate.__table__), [
+            {"user_id": 1, "course_id": 1, "certificate_id": "cheti-1", "issued_at": datetime.utcnow(), **values}
+        ])
+        conn.execute(insert(Certificate.__table__), [
+            {"user_id": 2, "course_id": 1, "certificate_id": "cheti-2", "issued_at": datetime.utcnow()}
+        ])
+
+    SessionTesting = sessionmaker(bind=engine)
+
+    def override_get_db():
+        db = SessionTesting()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(certificate_routes.router)
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+
+def test_storage_is_content_addressed(storage):
+    digest, size = storage.put(b"cheti", "png")
+    assert storage.put(b"cheti", "png") == (digest, size)
+    assert storage.path_for(digest, "png").endswith(f"{digest[:2]}/{digest[2:4]}/{digest}.png")
+    assert storage.exists(digest, "png")
+    assert not storage.exists(digest, "pdf")
+
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("bytes=x-y", 100) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=100-", 100)
+
+
+def test_download_streams_with_etag_and_cache_headers(client):
+    response = client.get("/certificates/cheti-1/download")
+    assert response.status_code == 200
+    assert response.content == PNG
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["cache-control"].startswith("public, max-age=")
+
+    etag = response.headers["etag"]
+    assert client.get("/certificates/cheti-1/download", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_download_serves_byte_ranges(client):
+    response = client.get("/certificates/cheti-1/download", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.content == PNG[10:20]
+    assert response.headers["content-range"] == f"bytes 10-19/{len(PNG)}"
+
+    stale = client.get("/certificates/cheti-1/download", headers={"Range": "bytes=10-19", "If-Range": '"old"'})
+    assert stale.status_code == 200 and stale.content == PNG
+
+    unsatisfiable = client.get("/certificates/cheti-1/download", headers={"Range": f"bytes={len(PNG)}-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == f"bytes */{len(PNG)}"
+
+
+def test_download_reports_missing_artifacts(client):
+    assert client.get("/certificates/unknown/download").status_code == 404
+    assert client.get("/certificates/cheti-2/download").status_code == 404
+    assert client.get("/certificates/cheti-1/download?format=pdf").status_code == 404
@@ -0,0 +1,68 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event, insert, update
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.models.certificate import Certificate
+from app.models.course import Course
+from app.models.user import User
+from app.services.certificate_signing import CertificateRevocationList
+from app.services.certificate_verification_service import CertificateVerificationService
+
+certificates = Certificate.__table__
+ISSUED = datetime(2026, 6, 1)
+
+
+@pytest.fixture
+def verify_db(monkeypatch):
+    monkeypatch.setattr(CertificateVerificationService, "_cache", type(CertificateVerificationService._cache)())
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for table in (User.__table__, Course.__table__, certificates):
+        table.create(bind=engine)
+
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [{"id": i, "username": f"mhitimu{i}", "email": f"h{i}@example.com"} for i in (1, 2, 3)])
+        conn.execute(insert(Course.__table__), [{"id": 1, "title": "Kiswahili Msingi"}])
+        conn.execute(insert(certificates), [
+            {"user_id": i, "course_id": 1, "certificate_id": f"cheti-{i}", "issued_at": ISSUED, "revoked_at": None}
+            for i in (1, 2, 3)
+        ])
+        conn.execute(update(certificates).where(certificates.c.certificate_id == "cheti-3").values(revoked_at=ISSUED))
+
+    queries = []
+    event.listen(engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+
+    with Session(engine) as db:
+        yield db, queries
+
+
+def test_bulk_verification_uses_one_query_and_keeps_request_order(verify_db):
+    db, queries = verify_db
+    revocations = CertificateRevocationList()
+
+    results = CertificateVerificationService.verify_many(
+        db, ["cheti-2", "haipo", "cheti-1", "cheti-3", "cheti-2"], revocations=revocations
+    )
+
+    assert len(queries) == 1
+    assert [result["certificate_id"] for result in results] == ["cheti-2", "haipo", "cheti-1", "cheti-3", "cheti-2"]
+    assert [result["is_valid"] for result in results] == [True, False, True, False, True]
+    assert results[0]["user_name"] == "mhitimu2" and results[0]["course_title"] == "Kiswahili Msingi"
+    assert results[3]["message"] == "Certificate has been revoked"
+
+
+def test_cached_certificates_are_served_without_queries_but_revocation_still_applies(verify_db):
+    db, queries = verify_db
+    revocations = CertificateRevocationList()
+
+    CertificateVerificationService.verify_many(db, ["cheti-1", "cheti-2"], revocations=revocations)
+    queries.clear()
+
+    assert CertificateVerificationService.verify(db, "cheti-1")["is_valid"]
+    assert queries == []
+
+    revocations.add("cheti-1")
+    assert CertificateVerificationService.verify_many(db, ["cheti-1"], revocations=revocations)[0]["is_valid"] is False
+    assert queries == []
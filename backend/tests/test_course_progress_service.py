@@ -0,0 +1,95 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.models.assessment import Quiz, QuizSubmission
+from app.models.certificate import Certificate
+from app.models.course import Course, Enrollment
+from app.models.user import User
+from app.services import course_progress_service
+from app.services.certificate_batch_service import BASE_URL
+from app.services.certificate_renderer import CertificateRenderer
+from app.services.certificate_storage import CertificateStorage
+from app.services.certificate_verification_service import CertificateVerificationService
+from app.services.course_progress_service import CourseProgressService
+
+certificates = Certificate.__table__
+
+
+@pytest.fixture
+def db(monkeypatch, tmp_path):
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for table in (User.__table__, Course.__table__, Enrollment.__table__, Quiz.__table__,
+                  QuizSubmission.__table__, certificates):
+        table.create(bind=engine)
+
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [{"id": i, "username": f"mhitimu{i}", "email": f"h{i}@example.com"} for i in (1, 2)])
+        conn.execute(insert(Course.__table__), [{"id": 1, "title": "Kiswahili Msingi"}])
+        conn.execute(insert(Enrollment.__table__), [
+            {"user_id": 1, "course_id": 1, "completed_lessons": 4, "total_lessons": 4, "last_activity_at": datetime(2026, 10, 1)},
+            {"user_id": 2, "course_id": 1, "completed_lessons": 1, "total_lessons": 4, "last_activity_at": datetime(2026, 10, 2)},
+        ])
+        conn.execute(insert(Quiz.__table__), [{"id": 1, "course_id": 1, "title": "Salamu"}])
+        conn.execute(insert(QuizSubmission.__table__), [
+            {"quiz_id": 1, "user_id": 1, "score": 0.8},
+            {"quiz_id": 1, "user_id": 1, "score": 0.6},
+        ])
+
+    renders = []
+
+    def fake_render(spec):
+        renders.append(spec)
+        return {"png": f"PNG:{spec['user_name']}".encode(), "pdf": b"PDF"}
+
+    monkeypatch.setattr(course_progress_service, "certificate_renderer", CertificateRenderer(workers=0, render_fn=fake_render))
+    monkeypatch.setattr(course_progress_service, "certificate_storage", CertificateStorage(str(tmp_path)))
+    CertificateVerificationService.clear_cache()
+
+    with Session(engine) as session:
+        session.renders = renders
+        yield session
+    engine.dispose()
+
+
+def test_progress_reads_enrollment_counters_and_quiz_average(db):
+    progress = CourseProgressService.calculate_course_progress(db, 1, 1)
+
+    assert progress["completed_lessons"] == 4
+    assert progress["lesson_progress_percentage"] == 100
+    assert progress["average_quiz_score"] == pytest.approx(0.7)
+    assert progress["is_course_completed"] is True
+
+    assert CourseProgressService.calculate_course_progress(db, 2, 1)["is_course_completed"] is False
+    assert CourseProgressService.calculate_course_progress(db, 2, 9)["total_lessons"] == 0
+
+
+def test_certificate_is_issued_rendered_once_and_verifiable(db):
+    first = CourseProgressService.generate_course_certificate(db, 1, 1)
+
+    certificate_id = first["certificate_id"]
+    assert first["downloads"]["pdf"] == f"{BASE_URL}/certificates/{certificate_id}/download?format=pdf"
+    assert first["verification_url"].startswith(f"{BASE_URL}/verify-certificate/")
+    row = db.execute(select(certificates)).one()
+    assert row.rendered_at is not None
+    assert course_progress_service.certificate_storage.exists(row.png_sha256, "png")
+
+    # Asking again returns the same certificate without rendering it again
+    again = CourseProgressService.generate_course_certificate(db, 1, 1)
+    assert again == first
+    assert len(db.renders) == 1
+    assert db.execute(select(func.count()).select_from(certificates)).scalar() == 1
+
+    verified = CourseProgressService.verify_certificate(db, certificate_id)
+    assert verified["is_valid"] is True
+    assert (verified["user_name"], verified["course_title"]) == ("mhitimu1", "Kiswahili Msingi")
+
+
+def test_incomplete_course_gets_no_certificate(db):
+    result = CourseProgressService.generate_course_certificate(db, 2, 1)
+
+    assert result["error"] == "Course not completed"
+    assert db.execute(select(func.count()).select_from(certificates)).scalar() == 0
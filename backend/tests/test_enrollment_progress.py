@@ -0,0 +1,191 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, func, insert, select, update
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.course import Course, Enrollment, Lesson, CourseProgress
+from app.routes import progress as progress_routes
+from app.services.auth import get_current_active_user
+from app.services.database import get_db
+from app.services.enrollment_progress_service import EnrollmentProgressService
+
+enrollments = Enrollment.__table__
+lessons = Lesson.__table__
+progress = CourseProgress.__table__
+
+
+@pytest.fixture
+def progress_db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for table in (enrollments, lessons, progress):
+        table.create(bind=engine)
+
+    with engine.begin() as conn:
+        conn.execute(insert(lessons), [{"id": i, "course_id": 1, "title": f"Somo {i}", "order": i} for i in (1, 2, 3, 4)])
+        conn.execute(insert(enrollments), [
+            {"id": 1, "user_id": 1, "course_id": 1, "total_lessons": 4, "completed_lessons": 0},
+            {"id": 2, "user_id": 2, "course_id": 1, "total_lessons": 4, "completed_lessons": 0},
+        ])
+        conn.execute(insert(progress), [
+            {"enrollment_id": 1, "lesson_id": 1, "completed": True},
+            {"enrollment_id": 1, "lesson_id": 2, "completed": True},
+            {"enrollment_id": 2, "lesson_id": 2, "completed": False},
+        ])
+
+    with Session(engine) as db:
+        yield db
+
+
+def counters(db):
+    rows = db.execute(select(enrollments.c.id, enrollments.c.completed_lessons, enrollments.c.total_lessons)).all()
+    return {row.id: (row.completed_lessons, row.total_lessons) for row in rows}
+
+
+def test_repair_fixes_only_drifted_enrollments(progress_db):
+    assert EnrollmentProgressService.repair(progress_db) == 1
+    assert counters(progress_db) == {1: (2, 4), 2: (0, 4)}
+    assert EnrollmentProgressService.repair(progress_db) == 0
+
+
+def test_lesson_added_and_removed_adjust_counters(progress_db):
+    EnrollmentProgressService.repair(progress_db)
+
+    EnrollmentProgressService.lesson_added(progress_db, course_id=1)
+    assert counters(progress_db) == {1: (2, 5), 2: (0, 5)}
+
+    EnrollmentProgressService.lesson_removed(progress_db, course_id=1, lesson_id=2)
+    assert counters(progress_db) == {1: (1, 4), 2: (0, 4)}
+
+
+def test_progress_is_read_from_counters():
+    enrollment = SimpleNamespace(total_lessons=8, completed_lessons=3, last_activity_at=None)
+    assert EnrollmentProgressService.get_progress(enrollment)["progress_percentage"] == 37.5
+
+    empty = SimpleNamespace(total_lessons=0, completed_lessons=0, last_activity_at=None)
+    assert EnrollmentProgressService.get_progress(empty)["progress_percentage"] == 0
+
+
+def test_upsert_creates_then_updates_one_row(progress_db):
+    first = datetime(2026, 1, 1, 9, 0)
+    created = EnrollmentProgressService.upsert_lesson_progress(progress_db, 2, 3, True, 100.0, at=first)
+    again = EnrollmentProgressService.upsert_lesson_progress(
+        progress_db, 2, 3, False, 50.0, at=first + timedelta(hours=1)
+    )
+
+    assert again.id == created.id
+    assert (again.completed, again.progress_percentage, again.updated_at) == (False, 50.0, first + timedelta(hours=1))
+    assert again.completed_at == first
+    row = progress_db.execute(select(progress).where(progress.c.id == created.id)).one()
+    assert row == again
+
+
+def test_concurrent_tracking_keeps_one_row_and_exact_counter(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'progress.db'}", connect_args={"check_same_thread": False, "timeout": 30})
+
+    # SQLite has no row locks: BEGIN IMMEDIATE stands in for SELECT ... FOR UPDATE
+    @event.listens_for(engine, "connect")
+    def disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    for table in (enrollments, lessons, progress):
+        table.create(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(lessons), [{"id": i, "course_id": 1, "title": f"Somo {i}", "order": i} for i in (1, 2, 3)])
+        conn.execute(insert(enrollments), [{"id": 1, "user_id": 1, "course_id": 1, "total_lessons": 3, "completed_lessons": 0}])
+
+    def hammer(attempt):
+        lesson_id = attempt % 3 + 1
+        completed = attempt % 2 == 0
+        with Session(engine) as db:
+            target = EnrollmentProgressService.lock_lesson_progress(db, 1, 1, lesson_id)
+            EnrollmentProgressService.upsert_lesson_progress(db, 1, lesson_id, completed, float(attempt % 101))
+            EnrollmentProgressService.record_progress_change(db, 1, target.was_completed, completed)
+            db.commit()
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(hammer, range(200)))
+
+    with Session(engine) as db:
+        assert db.execute(select(func.count()).select_from(progress)).scalar() == 3
+        completed = db.execute(select(func.count()).select_from(progress).where(progress.c.completed.is_(True))).scalar()
+        assert db.execute(select(enrollments.c.completed_lessons)).scalar() == completed
+    engine.dispose()
+
+
+def test_track_updates_counters_incrementally_in_few_statements(progress_db, monkeypatch):
+    progress_db.execute(insert(enrollments).values(id=3, user_id=1, course_id=2, total_lessons=1, completed_lessons=0))
+    progress_db.execute(insert(lessons).values(id=5, course_id=2, title="Vitenzi", order=1, content_type="text"))
+    progress_db.execute(update(lessons).values(content_type="text"))
+    EnrollmentProgressService.repair(progress_db)
+    progress_db.commit()
+
+    activity = []
+    monkeypatch.setattr(progress_routes.ActiveLearnerService, "record_activity", lambda db, course_id, user_id: activity.append(course_id))
+    statements = []
+    event.listen(progress_db.get_bind(), "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+
+    app = FastAPI()
+    app.include_router(progress_routes.router, prefix="/progress")
+    app.dependency_overrides[get_db] = lambda: progress_db
+    app.dependency_overrides[get_current_active_user] = lambda: SimpleNamespace(id=1)
+    client = TestClient(app)
+
+    response = client.post("/progress/track", json={"enrollment_id": 1, "lesson_id": 3, "completed": True, "progress_percentage": 100})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["lesson_id"], body["completed"], body["lesson"]["title"]) == (3, True, "Somo 3")
+
+    # Read + lock, upsert with RETURNING and one counter increment; no recount
+    assert len(statements) == 3
+    assert statements[1].lstrip().upper().startswith("INSERT") and "RETURNING" in statements[1]
+    assert not any("count(" in statement.lower() for statement in statements)
+    assert counters(progress_db)[1] == (3, 4)
+
+    # Repeating or reverting a lesson moves the counter by the real change only
+    client.post("/progress/track", json={"enrollment_id": 1, "lesson_id": 3, "completed": True, "progress_percentage": 100})
+    assert counters(progress_db)[1] == (3, 4)
+    client.post("/progress/track", json={"enrollment_id": 1, "lesson_id": 1, "completed": False, "progress_percentage": 20})
+    assert counters(progress_db)[1] == (2, 4)
+    assert EnrollmentProgressService.repair(progress_db) == 0
+
+    # A lesson of another course is not tracked against this enrollment
+    response = client.post("/progress/track", json={"enrollment_id": 1, "lesson_id": 5, "completed": True})
+    assert (response.status_code, response.json()["detail"]) == (404, "Lesson not found")
+    assert client.post("/progress/track", json={"enrollment_id": 2, "lesson_id": 1}).status_code == 404
+    assert counters(progress_db)[3] == (0, 1)
+    assert activity == [1, 1, 1]
+
+
+def test_deleting_a_lesson_keeps_counters_consistent(progress_db):
+    Course.__table__.create(bind=progress_db.get_bind())
+    progress_db.execute(insert(Course.__table__), [{"id": 1, "title": "Kiswahili Msingi", "instructor_id": 9}])
+    EnrollmentProgressService.repair(progress_db)
+    progress_db.commit()
+
+    current_user = SimpleNamespace(id=9)
+    app = FastAPI()
+    app.include_router(progress_routes.router, prefix="/progress")
+    app.dependency_overrides[get_db] = lambda: progress_db
+    app.dependency_overrides[get_current_active_user] = lambda: current_user
+    client = TestClient(app)
+
+    assert client.delete("/progress/lessons/2").status_code == 204
+    assert counters(progress_db) == {1: (1, 3), 2: (0, 3)}
+    assert progress_db.execute(select(func.count()).select_from(progress).where(progress.c.lesson_id == 2)).scalar() == 0
+    assert progress_db.execute(select(func.count()).select_from(lessons)).scalar() == 3
+    assert EnrollmentProgressService.repair(progress_db) == 0
+
+    assert client.delete("/progress/lessons/2").status_code == 404
+    current_user.id = 1
+    assert client.delete("/progress/lessons/1").status_code == 403
+    assert counters(progress_db) == {1: (1, 3), 2: (0, 3)}
@@ -0,0 +1,197 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, select, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.analytics import ActiveLearnerSketch, LearnerPaceStat
+from app.models.assessment import Quiz
+from app.models.course import Course, Enrollment
+from app.models.event import EventLog
+from app.models.lesson import LessonModule
+from app.models.lesson_progress import LessonProgress
+from app.models.user import User
+from app.routes import assessments as assessment_routes
+from app.routes import lessons as lesson_routes
+from app.services import active_learner_service
+from app.services import event_pipeline as event_pipeline_module
+from app.services.auth import get_current_active_user
+from app.services.database import Base, get_db
+from app.services.event_pipeline import LearningEvent, LearningEventPipeline, LearningEventType
+from app.utils.hyperloglog import HyperLogLog
+
+events = EventLog.__table__
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine, tables=[events])
+    return sessionmaker(bind=engine)
+
+
+def count_events(session_factory):
+    with session_factory() as db:
+        return db.execute(select(func.count()).select_from(events)).scalar()
+
+
+def test_flush_writes_batches_and_notifies_subscribers(session_factory):
+    pipeline = LearningEventPipeline(session_factory=session_factory, batch_size=4)
+    batches = []
+    pipeline.subscribe(batches.append)
+
+    for user_id in range(10):
+        pipeline.publish(LearningEvent(
+            LearningEventType.QUIZ_SUBMITTED, user_id=user_id, course_id=1, entity_id=3, payload={"score": 0.5}
+        ))
+
+    assert count_events(session_factory) == 0
+    assert pipeline.flush() == 10
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert count_events(session_factory) == 10
+
+    with session_factory() as db:
+        row = db.execute(select(events).order_by(events.c.id)).first()
+    assert row.event_type == "quiz_submitted"
+    assert row.payload == {"score": 0.5}
+    assert row.event_date == row.occurred_at.date()
+
+
+def test_full_buffer_drops_instead_of_blocking(session_factory):
+    pipeline = LearningEventPipeline(session_factory=session_factory, capacity=3)
+
+    accepted = [pipeline.publish(LearningEvent(LearningEventType.LESSON_VIEWED, user_id=1)) for _ in range(5)]
+
+    assert accepted == [True, True, True, False, False]
+    assert pipeline.dropped_events == 2
+
+
+def test_failed_batch_is_requeued_in_order(session_factory):
+    def broken_session():
+        raise RuntimeError("database unavailable")
+
+    pipeline = LearningEventPipeline(session_factory=broken_session, batch_size=2)
+    for entity_id in range(3):
+        pipeline.publish(LearningEvent(LearningEventType.PROGRESS_UPDATED, entity_id=entity_id))
+
+    assert pipeline.flush() == 0
+    assert pipeline.pending() == 3
+
+    pipeline._session_factory = session_factory
+    assert pipeline.flush() == 3
+    with session_factory() as db:
+        entity_ids = db.execute(select(events.c.entity_id).order_by(events.c.id)).scalars().all()
+    assert entity_ids == [0, 1, 2]
+
+
+def test_stop_flushes_remaining_events(session_factory):
+    pipeline = LearningEventPipeline(session_factory=session_factory, flush_interval=60)
+    pipeline.start()
+    pipeline.publish(LearningEvent(LearningEventType.QUIZ_STARTED, user_id=1, course_id=1))
+    pipeline.stop()
+
+    assert count_events(session_factory) == 1
+
+
+def test_starting_a_quiz_publishes_quiz_started(session_factory, monkeypatch):
+    for table in (User.__table__, Course.__table__, Enrollment.__table__, Quiz.__table__):
+        table.create(bind=session_factory.kw["bind"])
+    with session_factory() as db:
+        db.execute(insert(User.__table__), [{"id": i, "username": f"m{i}", "email": f"m{i}@example.com"} for i in (1, 2)])
+        db.execute(insert(Course.__table__), [{"id": 1, "title": "Kiswahili Msingi"}])
+        db.execute(insert(Enrollment.__table__), [{"user_id": 1, "course_id": 1}])
+        db.execute(insert(Quiz.__table__), [
+            {"id": 1, "course_id": 1, "title": "Salamu", "is_timed": True, "duration_minutes": 15},
+            {"id": 2, "course_id": 1, "title": "Untimed", "is_timed": False, "duration_minutes": None}
+        ])
+        db.commit()
+
+    pipeline = LearningEventPipeline(session_factory=session_factory)
+    monkeypatch.setattr(event_pipeline_module, "event_pipeline", pipeline)
+    current_user = SimpleNamespace(id=1)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(assessment_routes.router)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_active_user] = lambda: current_user
+    client = TestClient(app)
+
+    timed = client.post("/quizzes/1/start").json()
+    assert (timed["is_timed"], timed["duration_minutes"]) == (True, 15)
+    # Submissions are not timed against the limit, so no deadline is promised
+    assert "end_time" not in timed
+    assert client.post("/quizzes/2/start").json()["duration_minutes"] is None
+    assert client.post("/quizzes/9/start").status_code == 404
+    current_user.id = 2
+    assert client.post("/quizzes/1/start").status_code == 403
+
+    assert pipeline.flush() == 2
+    with session_factory() as db:
+        rows = db.execute(select(events).order_by(events.c.id)).all()
+    assert [(row.event_type, row.user_id, row.course_id, row.entity_id) for row in rows] == [
+        ("quiz_started", 1, 1, 1), ("quiz_started", 1, 1, 2)
+    ]
+    assert [row.payload for row in rows] == [{"is_timed": True}, {"is_timed": False}]
+
+
+def test_lesson_views_and_completions_are_published(session_factory, monkeypatch):
+    for table in (Course.__table__, Enrollment.__table__, LessonModule.__table__, LessonProgress.__table__,
+                  LearnerPaceStat.__table__, ActiveLearnerSketch.__table__):
+        table.create(bind=session_factory.kw["bind"])
+    with session_factory() as db:
+        db.execute(insert(Course.__table__), [{"id": 1, "title": "Kiswahili Msingi"}])
+        db.execute(insert(Enrollment.__table__), [{"user_id": 1, "course_id": 1}])
+        db.execute(insert(LessonModule.__table__), [{"id": 7, "course_id": 1, "title": "Salamu", "content_type": "video"}])
+        db.commit()
+
+    pipeline = LearningEventPipeline(session_factory=session_factory)
+    monkeypatch.setattr(event_pipeline_module, "event_pipeline", pipeline)
+    monkeypatch.setattr(active_learner_service, "_sketch_cache", {})
+    heartbeats = []
+    monkeypatch.setattr(lesson_routes, "heartbeat_buffer", SimpleNamespace(record=lambda *args: heartbeats.append(args)))
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(lesson_routes.router)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_active_user] = lambda: SimpleNamespace(id=1)
+    client = TestClient(app)
+
+    assert client.post("/lessons/7/heartbeat", json={"seconds": 30}).status_code == 202
+    assert client.post("/lessons/7/complete").json()["newly_completed"] is True
+    # Completing again changes nothing and publishes nothing
+    assert client.post("/lessons/7/complete").json()["newly_completed"] is False
+    assert heartbeats == [(1, 7, 30)]
+
+    assert pipeline.flush() == 2
+    with session_factory() as db:
+        rows = db.execute(select(events).order_by(events.c.id)).all()
+    assert [(row.event_type, row.user_id, row.course_id, row.entity_id) for row in rows] == [
+        ("lesson_viewed", 1, 1, 7), ("lesson_completed", 1, 1, 7)
+    ]
+    assert [row.payload for row in rows] == [{"seconds": 30}, {"completion_seconds": None}]
+
+    # Both paths count the learner as active in the course
+    with session_factory() as db:
+        sketch = db.execute(select(ActiveLearnerSketch.__table__.c.sketch).where(ActiveLearnerSketch.__table__.c.course_id == 1)).scalar_one()
+    assert HyperLogLog.from_bytes(sketch).count() == 1
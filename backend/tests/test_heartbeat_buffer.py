@@ -0,0 +1,154 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.course import Enrollment
+from app.models.lesson import LessonModule
+from app.models.lesson_progress import LessonProgress
+from app.routes import lessons as lesson_routes
+from app.services.auth import get_current_active_user
+from app.services.database import get_db
+from app.services.heartbeat_buffer import HeartbeatBuffer
+
+progress = LessonProgress.__table__
+lessons = LessonModule.__table__
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    lessons.create(bind=engine)
+    progress.create(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(lessons), [{"id": i, "course_id": 1, "title": f"Somo {i}", "content_type": "video"} for i in (1, 2)])
+        conn.execute(insert(progress).values(user_id=1, lesson_id=1, total_time_spent=100, is_completed=False, completed_at=None))
+    return sessionmaker(bind=engine)
+
+
+def crash(buffer):
+    # The process dies before flushing: its files stay, its lock goes
+    buffer._log.close()
+    buffer._owner_lock.close()
+
+
+def time_spent(session_factory):
+    with session_factory() as db:
+        rows = db.execute(select(progress.c.user_id, progress.c.lesson_id, progress.c.total_time_spent)).all()
+    return {(user_id, lesson_id): seconds for user_id, lesson_id, seconds in rows}
+
+
+def test_heartbeats_are_coalesced_into_one_write_per_lesson(session_factory, tmp_path):
+    buffer = HeartbeatBuffer(session_factory=session_factory, log_dir=str(tmp_path))
+    for _ in range(6):
+        buffer.record(1, 1, 15)
+        buffer.record(2, 2, 10)
+    buffer.record(3, 99, 30)  # unknown lesson
+
+    assert buffer.pending() == 3
+    assert buffer.flush() == 2
+    assert time_spent(session_factory) == {(1, 1): 190, (2, 2): 60}
+    assert buffer.log_path == str(tmp_path / f"heartbeats-{os.getpid()}.log")
+    assert sorted(path.name for path in tmp_path.iterdir()) == [f"heartbeats-{os.getpid()}.lock"]
+
+
+def test_append_log_is_replayed_after_a_crash(session_factory, tmp_path):
+    crashed = HeartbeatBuffer(session_factory=session_factory, log_dir=str(tmp_path), pid=101)
+    crashed.record(1, 1, 20)
+    crashed.record(1, 2, 5)
+    crash(crashed)
+
+    restarted = HeartbeatBuffer(session_factory=session_factory, log_dir=str(tmp_path), pid=101)
+    assert restarted.recover() == 2
+    restarted.stop()
+
+    assert time_spent(session_factory) == {(1, 1): 120, (1, 2): 5}
+    # Replayed entries are not replayed again by the next restart
+    assert HeartbeatBuffer(session_factory=session_factory, log_dir=str(tmp_path), pid=101).recover() == 0
+
+
+def test_workers_keep_separate_logs_and_leave_live_ones_alone(session_factory, tmp_path):
+    first = HeartbeatBuffer(session_factory=session_factory, log_dir=str(tmp_path), pid=201)
+    second = HeartbeatBuffer(session_factory=session_factory, log_dir=str(tmp_path), pid=202)
+    first.recover()
+    second.recover()
+    first.record(1, 1, 10)
+    second.record(1, 2, 7)
+
+    # Another worker starting up does not replay heartbeats of running workers
+    assert HeartbeatBuffer(session_factory=session_factory, log_dir=str(tmp_path), pid=203).recover() == 0
+
+    first.flush()
+    assert second.pending() == 1
+    assert (tmp_path / "heartbeats-202.log").read_text() == "1,2,7\n"
+    second.flush()
+    assert time_spent(session_factory) == {(1, 1): 110, (1, 2): 7}
+
+
+def test_orphaned_log_is_claimed_by_exactly_one_worker(session_factory, tmp_path):
+    dead = HeartbeatBuffer(session_factory=session_factory, log_dir=str(tmp_path), pid=301)
+    for _ in range(3):
+        dead.record(2, 2, 5)
+    crash(dead)
+
+    workers = [HeartbeatBuffer(session_factory=session_factory, log_dir=str(tmp_path), pid=pid) for pid in (302, 303)]
+    assert sorted(worker.recover() for worker in workers) == [0, 3]
+    assert not any(path.name.startswith("heartbeats-301") for path in tmp_path.iterdir())
+
+    for worker in workers:
+        worker.stop()
+    assert time_spent(session_factory) == {(1, 1): 100, (2, 2): 15}
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failed_flush_keeps_heartbeats(session_factory, tmp_path):
+    def broken_session():
+        raise RuntimeError("database unavailable")
+
+    buffer = HeartbeatBuffer(session_factory=broken_session, log_dir=str(tmp_path))
+    buffer.record(1, 1, 30)
+    assert buffer.flush() == 0
+    buffer.record(1, 1, 10)
+
+    buffer._session_factory = session_factory
+    assert buffer.flush() == 1
+    assert time_spent(session_factory) == {(1, 1): 140}
+    assert not os.path.exists(buffer._flushing_log_path)
+
+
+def test_heartbeat_endpoint_only_accepts_enrolled_learners(session_factory, tmp_path, monkeypatch):
+    Enrollment.__table__.create(bind=session_factory.kw["bind"])
+    with session_factory() as db:
+        db.execute(insert(Enrollment.__table__), [{"user_id": 1, "course_id": 1}])
+        db.commit()
+
+    buffer = HeartbeatBuffer(session_factory=session_factory, log_dir=str(tmp_path))
+    monkeypatch.setattr(lesson_routes, "heartbeat_buffer", buffer)
+    monkeypatch.setattr(lesson_routes.ActiveLearnerService, "record_activity", lambda db, course_id, user_id: False)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    current_user = SimpleNamespace(id=1)
+    app = FastAPI()
+    app.include_router(lesson_routes.router)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_active_user] = lambda: current_user
+    client = TestClient(app)
+
+    assert client.post("/lessons/2/heartbeat", json={"seconds": 30}).status_code == 202
+    assert client.post("/lessons/99/heartbeat", json={"seconds": 30}).status_code == 404
+    current_user.id = 2
+    assert client.post("/lessons/2/heartbeat", json={"seconds": 30}).status_code == 403
+
+    buffer.flush()
+    assert time_spent(session_factory) == {(1, 1): 100, (1, 2): 30}
@@ -0,0 +1,39 @@
+from app.utils.hyperloglog import HyperLogLog
+
+
+def test_estimate_is_within_error_bounds():
+    """A 4096-register sketch should be within a few percent of the true count"""
+    sketch = HyperLogLog()
+    sketch.update(range(50000))
+    assert abs(sketch.count() - 50000) / 50000 < 0.05
+
+
+def test_small_cardinalities_are_near_exact():
+    sketch = HyperLogLog()
+    sketch.update([1, 2, 3, 2, 1, 3, 42])
+    assert sketch.count() == 4
+
+
+def test_merge_equals_union():
+    """Merging daily sketches counts learners active on several days once"""
+    monday, tuesday = HyperLogLog(), HyperLogLog()
+    monday.update(range(0, 6000))
+    tuesday.update(range(3000, 9000))
+
+    union = HyperLogLog()
+    union.update(range(0, 9000))
+
+    merged = HyperLogLog.merge_all([monday, tuesday])
+    assert merged.registers == union.registers
+    assert abs(merged.count() - 9000) / 9000 < 0.05
+
+
+def test_serialization_round_trip_and_idempotent_adds():
+    sketch = HyperLogLog()
+    assert sketch.add(7)
+    assert not sketch.would_change(7)
+    assert not sketch.add(7)
+
+    restored = HyperLogLog.from_bytes(sketch.to_bytes())
+    assert restored.registers == sketch.registers
+    assert len(sketch.to_bytes()) < 100  # mostly-empty registers compress well
@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.models.analytics import ActiveLearnerSketch, QuizScoreRollup, RollupWatermark
+from app.models.assessment import Quiz, QuizSubmission
+from app.models.course import Course, Enrollment, EnrollmentStatus
+from app.services import instructor_dashboard_service
+from app.services.instructor_dashboard_service import InstructorDashboardService
+from app.services.rollup_service import RollupService
+from app.utils.hyperloglog import HyperLogLog
+
+
+def test_dashboard_is_cached_per_instructor(monkeypatch):
+    calls = []
+
+    def build(db, instructor_id, activity_days):
+        calls.append(instructor_id)
+        return {"instructor_id": instructor_id, "courses": []}
+
+    clock = [1000.0]
+    monkeypatch.setattr(InstructorDashboardService, "_cache", {})
+    monkeypatch.setattr(InstructorDashboardService, "_build_dashboard", build)
+    monkeypatch.setattr(instructor_dashboard_service, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+
+    first = InstructorDashboardService.get_dashboard(None, 1)
+    assert InstructorDashboardService.get_dashboard(None, 1) is first
+    InstructorDashboardService.get_dashboard(None, 2)
+    assert calls == [1, 2]
+
+    InstructorDashboardService.get_dashboard(None, 1, use_cache=False)
+    assert calls == [1, 2, 1]
+
+    # Expired dashboards are rebuilt and dropped from the cache
+    clock[0] += instructor_dashboard_service.INSTRUCTOR_DASHBOARD_CACHE_SECONDS
+    InstructorDashboardService.get_dashboard(None, 2)
+    assert calls == [1, 2, 1, 2]
+    assert list(InstructorDashboardService._cache) == [(2, 7)]
+
+
+def test_totals_weight_pass_rate_by_attempts():
+    totals = InstructorDashboardService._totals([
+        {"total_enrollments": 10, "completed_enrollments": 5, "quiz_attempts": 100, "quiz_pass_rate": 50.0},
+        {"total_enrollments": 30, "completed_enrollments": 3, "quiz_attempts": 300, "quiz_pass_rate": 90.0},
+    ])
+    assert totals["completion_rate"] == 20.0
+    assert totals["quiz_pass_rate"] == 80.0
+    assert totals["courses"] == 2
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for table in (Course.__table__, Enrollment.__table__, Quiz.__table__, QuizSubmission.__table__,
+                  QuizScoreRollup.__table__, RollupWatermark.__table__, ActiveLearnerSketch.__table__):
+        table.create(bind=engine)
+
+    today = datetime.utcnow().date()
+    long_ago = datetime.utcnow() - timedelta(days=3)
+    with engine.begin() as conn:
+        conn.execute(insert(Course.__table__), [
+            {"id": 1, "title": "Kiswahili Msingi", "instructor_id": 7, "is_deleted": False},
+            {"id": 2, "title": "Sarufi", "instructor_id": 7, "is_deleted": False},
+            {"id": 3, "title": "Imefutwa", "instructor_id": 7, "is_deleted": True},
+            {"id": 4, "title": "Mwalimu Mwingine", "instructor_id": 8, "is_deleted": False},
+        ])
+        statuses = [EnrollmentStatus.COMPLETED, EnrollmentStatus.ACTIVE, EnrollmentStatus.ACTIVE, EnrollmentStatus.DROPPED]
+        conn.execute(insert(Enrollment.__table__), [
+            {"user_id": i, "course_id": 1, "status": statuses[i % 4]} for i in range(8)
+        ] + [
+            {"user_id": i, "course_id": 2, "status": EnrollmentStatus.ACTIVE} for i in range(2)
+        ] + [
+            {"user_id": i, "course_id": course_id, "status": EnrollmentStatus.COMPLETED} for i in range(3) for course_id in (3, 4)
+        ])
+        conn.execute(insert(Quiz.__table__), [
+            {"id": 1, "course_id": 1, "title": "Salamu"},
+            {"id": 2, "course_id": 1, "title": "Familia"},
+            {"id": 3, "course_id": 4, "title": "Vitenzi"},
+        ])
+        conn.execute(insert(QuizSubmission.__table__), [
+            {"quiz_id": 1, "user_id": 0, "score": 0.9, "is_passed": True, "submitted_at": long_ago},
+            {"quiz_id": 1, "user_id": 1, "score": 0.5, "is_passed": False, "submitted_at": long_ago},
+            {"quiz_id": 2, "user_id": 2, "score": None, "is_passed": False, "submitted_at": long_ago},
+            {"quiz_id": 3, "user_id": 0, "score": 0.2, "is_passed": False, "submitted_at": long_ago},
+        ])
+
+        sketches = []
+        for course_id, day_offset, learners in ((1, 0, range(0, 5)), (1, 1, range(3, 7)), (1, 10, range(20, 40)), (2, 0, range(2))):
+            sketch = HyperLogLog()
+            sketch.update(learners)
+            sketches.append({"course_id": course_id, "day": today - timedelta(days=day_offset), "sketch": sketch.to_bytes()})
+        conn.execute(insert(ActiveLearnerSketch.__table__), sketches)
+
+    with Session(engine) as session:
+        # The first two submissions are rolled up, later ones stay in the live tail
+        RollupService.run_incremental_rollup(session)
+        session.execute(insert(QuizSubmission.__table__), [
+            {"quiz_id": 2, "user_id": 3, "score": 0.8, "is_passed": True},
+            {"quiz_id": 2, "user_id": 4, "score": 0.6, "is_passed": False},
+        ])
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def test_dashboard_aggregates_every_course_of_the_instructor(db):
+    dashboard = InstructorDashboardService._build_dashboard(db, 7, activity_days=7)
+
+    assert dashboard["instructor_id"] == 7
+    first, second = dashboard["courses"]
+
+    assert (first["course_id"], first["title"]) == (1, "Kiswahili Msingi")
+    assert (first["total_enrollments"], first["active_enrollments"], first["completed_enrollments"]) == (8, 4, 2)
+    assert first["completion_rate"] == 25.0
+    assert first["quiz_attempts"] == 4
+    assert first["quiz_pass_rate"] == 50.0
+    assert first["average_score"] == pytest.approx((0.9 + 0.5 + 0.8 + 0.6) / 4)
+    # Learners 0-6 were active in the window; the sketch from ten days ago is outside it
+    assert first["active_learners"] == 7
+
+    assert (second["course_id"], second["total_enrollments"], second["active_enrollments"]) == (2, 2, 2)
+    assert (second["quiz_attempts"], second["quiz_pass_rate"], second["average_score"]) == (0, 0, 0.0)
+    assert second["active_learners"] == 2
+
+    assert dashboard["totals"] == {
+        "courses": 2,
+        "total_enrollments": 10,
+        "completed_enrollments": 2,
+        "completion_rate": 20.0,
+        "quiz_attempts": 4,
+        "quiz_pass_rate": 50.0
+    }
+
+
+def test_dashboard_without_courses(db):
+    dashboard = InstructorDashboardService._build_dashboard(db, 99, activity_days=7)
+    assert dashboard["courses"] == []
+    assert dashboard["totals"]["courses"] == 0
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+from app.utils.lazy_import import LazyModule, lazy_import
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(code: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return result.stdout.strip()
+
+
+def test_lazy_import_defers_until_attribute_access():
+    """The wrapped module is not imported until it is actually used"""
+    output = _run(
+        "import sys\n"
+        "from app.utils.lazy_import import lazy_import\n"
+        "colorsys = lazy_import('colorsys')\n"
+        "print('colorsys' in sys.modules)\n"
+        "colorsys.rgb_to_hsv(0.1, 0.2, 0.3)\n"
+        "print('colorsys' in sys.modules)\n"
+    )
+    assert output.splitlines() == ["False", "True"]
+
+
+def test_lazy_import_returns_already_loaded_module():
+    """Modules that are already imported are returned unwrapped"""
+    module = lazy_import("json")
+    assert not isinstance(module, LazyModule)
+    assert module is sys.modules["json"]
+
+
+def test_lazy_module_proxies_attributes():
+    """Attributes resolve against the real module once loaded"""
+    proxy = LazyModule("string")
+    assert proxy.ascii_lowercase == "abcdefghijklmnopqrstuvwxyz"
+    assert proxy.is_loaded
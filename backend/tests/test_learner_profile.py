@@ -0,0 +1,100 @@
+import pytest
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.models.analytics import LearnerPaceStat
+from app.models.assessment import Quiz, QuizSubmission
+from app.models.course import Course, Enrollment, EnrollmentStatus
+from app.models.lesson import LessonModule
+from app.models.user import User
+from app.services.advanced_analytics_service import AdvancedAnalyticsService
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for table in (User.__table__, Course.__table__, Enrollment.__table__, Quiz.__table__, QuizSubmission.__table__,
+                  LessonModule.__table__, LearnerPaceStat.__table__):
+        table.create(bind=engine)
+
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [
+            {"id": 1, "username": "amani", "email": "amani@example.com"},
+            {"id": 2, "username": "baraka", "email": "baraka@example.com"},
+        ])
+        conn.execute(insert(Course.__table__), [{"id": 1, "title": "Salamu"}, {"id": 2, "title": "Sarufi"}, {"id": 3, "title": "Hadithi"}])
+        conn.execute(insert(Enrollment.__table__), [
+            {"user_id": 1, "course_id": 1, "status": EnrollmentStatus.COMPLETED},
+            {"user_id": 1, "course_id": 2, "status": EnrollmentStatus.ACTIVE},
+            {"user_id": 1, "course_id": 3, "status": EnrollmentStatus.ACTIVE},
+            {"user_id": 2, "course_id": 1, "status": EnrollmentStatus.COMPLETED},
+        ])
+        conn.execute(insert(LessonModule.__table__), [
+            {"course_id": 1, "title": "Habari", "content_type": "text", "skill_tags": ["speaking", "vocabulary"]},
+            {"course_id": 1, "title": "Kwaheri", "content_type": "text", "skill_tags": ["speaking"]},
+            {"course_id": 2, "title": "Ngeli", "content_type": "text", "skill_tags": ["grammar"]},
+            {"course_id": 3, "title": "Hadithi", "content_type": "text", "skill_tags": None},
+        ])
+        conn.execute(insert(Quiz.__table__), [
+            {"id": 1, "course_id": 1, "title": "Salamu"},
+            {"id": 2, "course_id": 2, "title": "Ngeli"},
+            {"id": 3, "course_id": 3, "title": "Hadithi"},
+        ])
+        conn.execute(insert(QuizSubmission.__table__), [
+            {"quiz_id": 1, "user_id": 1, "score": 0.9, "is_passed": True},
+            {"quiz_id": 1, "user_id": 1, "score": 0.7, "is_passed": True},
+            {"quiz_id": 2, "user_id": 1, "score": 0.5, "is_passed": False},
+            {"quiz_id": 3, "user_id": 1, "score": 0.6, "is_passed": False},
+            {"quiz_id": 2, "user_id": 2, "score": 0.1, "is_passed": False},
+        ])
+
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def test_learner_profile_summarizes_courses_quizzes_and_skills(db):
+    profile = AdvancedAnalyticsService.generate_learner_profile(db, 1)
+
+    assert (profile["user_id"], profile["username"], profile["email"]) == (1, "amani", "amani@example.com")
+    stats = profile["profile"]
+    assert stats["total_courses_enrolled"] == 3
+    assert stats["completed_courses"] == 1
+    assert stats["quiz_performance"]["total_quizzes"] == 4
+    assert stats["quiz_performance"]["average_score"] == pytest.approx(0.675)
+
+    # Skills come from the lesson modules of each quiz's course; untagged courses are skipped
+    skills = [(skill["skill_tag"], skill["total_attempts"], skill["proficiency_level"]) for skill in stats["skill_strengths"]]
+    assert skills == [("speaking", 2, "Proficient"), ("vocabulary", 2, "Proficient"), ("grammar", 1, "Beginner")]
+    assert stats["skill_strengths"][0]["average_score"] == pytest.approx(0.8)
+
+
+def test_learner_profile_without_quizzes_or_unknown_user(db):
+    db.execute(insert(User.__table__).values(id=3, username="chausiku", email="c@example.com"))
+
+    stats = AdvancedAnalyticsService.generate_learner_profile(db, 3)["profile"]
+    assert stats["total_courses_enrolled"] == 0
+    assert stats["quiz_performance"]["total_quizzes"] == 0
+    assert stats["quiz_performance"]["passed_quizzes"] == 0
+    assert stats["skill_strengths"] == []
+
+    with pytest.raises(ValueError):
+        AdvancedAnalyticsService.generate_learner_profile(db, 99)
+
+
+def test_learner_profile_includes_pace_and_portable_pass_counts(db):
+    db.execute(insert(LearnerPaceStat.__table__).values(user_id=1, completed_lessons=4, total_completion_seconds=4 * 5400))
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+
+    stats = AdvancedAnalyticsService.generate_learner_profile(db, 1)["profile"]
+
+    assert stats["learning_pace"] == {"avg_lesson_duration_hours": 1.5, "pace_category": "Average"}
+    assert stats["quiz_performance"]["passed_quizzes"] == 2
+    assert stats["quiz_performance"]["pass_rate"] == 50.0
+    # Passes are counted with CASE; sum() over a boolean column fails on PostgreSQL
+    assert not any("sum(quiz_submissions.is_passed)" in statement for statement in statements)
+
+    pace = AdvancedAnalyticsService.generate_learner_profile(db, 2)["profile"]["learning_pace"]
+    assert pace == {"avg_lesson_duration_hours": 0.0, "pace_category": "Very Fast"}
@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.analytics import LearnerPaceStat
+from app.models.course import Course, Enrollment
+from app.models.lesson import LessonModule
+from app.models.lesson_progress import LessonProgress
+from app.routes import lessons as lesson_routes
+from app.services.auth import get_current_active_user
+from app.services.database import get_db
+from app.services.learning_pace_service import LearningPaceService, duration_seconds
+
+progress = LessonProgress.__table__
+pace = LearnerPaceStat.__table__
+
+
+@pytest.fixture
+def pace_db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    progress.create(bind=engine)
+    pace.create(bind=engine)
+
+    start = datetime(2026, 3, 1, 9, 0)
+    with engine.begin() as conn:
+        conn.execute(insert(progress), [
+            {"user_id": 1, "lesson_id": 1, "started_at": start, "completed_at": start + timedelta(minutes=30), "is_completed": True},
+            {"user_id": 1, "lesson_id": 2, "started_at": start, "completed_at": start + timedelta(minutes=90), "is_completed": True},
+            {"user_id": 1, "lesson_id": 3, "started_at": start, "completed_at": None, "is_completed": False},
+            {"user_id": 2, "lesson_id": 1, "started_at": start, "completed_at": start + timedelta(hours=3), "is_completed": True},
+        ])
+
+    with Session(engine) as db:
+        yield db
+
+
+def pace_totals(db):
+    return [tuple(row) for row in db.execute(
+        select(pace.c.user_id, pace.c.completed_lessons, pace.c.total_completion_seconds).order_by(pace.c.user_id)
+    )]
+
+
+def test_rebuild_stores_durations_and_running_totals(pace_db):
+    assert LearningPaceService.rebuild(pace_db) == 2
+
+    durations = pace_db.execute(
+        select(progress.c.completion_seconds).order_by(progress.c.id)
+    ).scalars().all()
+    assert durations == [1800, 5400, None, 10800]
+
+    totals = pace_db.execute(
+        select(pace.c.user_id, pace.c.completed_lessons, pace.c.total_completion_seconds).order_by(pace.c.user_id)
+    ).all()
+    assert [tuple(row) for row in totals] == [(1, 2, 7200), (2, 1, 10800)]
+
+
+def test_duration_expression_is_dialect_aware():
+    assert "julianday" in str(duration_seconds("sqlite", progress.c.started_at, progress.c.completed_at))
+    assert "EXTRACT" in str(duration_seconds("postgresql", progress.c.started_at, progress.c.completed_at))
+    with pytest.raises(ValueError):
+        duration_seconds("oracle", progress.c.started_at, progress.c.completed_at)
+
+
+def test_completion_updates_running_totals_once(pace_db):
+    start = datetime(2026, 3, 1, 9, 0)
+
+    assert LearningPaceService.record_lesson_completion(pace_db, 1, 3, at=start + timedelta(minutes=45)) == (True, 2700)
+    # Completing again is a no-op, distinguishable from a lesson without a start time
+    assert LearningPaceService.record_lesson_completion(pace_db, 1, 3, at=start + timedelta(hours=5)) == (False, None)
+    # Never opened: completed, but there is no duration to count
+    assert LearningPaceService.record_lesson_completion(pace_db, 1, 4, at=start) == (True, None)
+    assert LearningPaceService.record_lesson_completion(pace_db, 2, 2, at=start + timedelta(hours=1)) == (True, None)
+    pace_db.commit()
+
+    # Upserts: learner 1 had no totals before, learner 2's one lesson had no start
+    assert pace_totals(pace_db) == [(1, 1, 2700)]
+    assert LearningPaceService.get_learning_pace(pace_db, 1) == {"completed_lessons": 1, "avg_lesson_duration_hours": 0.75}
+
+    assert LearningPaceService.record_lesson_completion(pace_db, 1, 5, at=start) == (True, None)
+    pace_db.execute(insert(progress).values(user_id=1, lesson_id=6, started_at=start, is_completed=False))
+    assert LearningPaceService.record_lesson_completion(pace_db, 1, 6, at=start + timedelta(minutes=15)) == (True, 900)
+    pace_db.commit()
+    assert pace_totals(pace_db) == [(1, 2, 3600)]
+
+
+def test_mark_completed_distinguishes_repeat_from_missing_start():
+    unstarted = SimpleNamespace(is_completed=False, started_at=None, completion_seconds=None)
+    assert LessonProgress.mark_completed(unstarted) is True
+    assert unstarted.completion_seconds is None
+    assert LessonProgress.mark_completed(unstarted) is False
+
+    started = SimpleNamespace(is_completed=False, started_at=datetime.utcnow() - timedelta(minutes=2), completion_seconds=None)
+    assert LessonProgress.mark_completed(started) is True
+    assert 119 <= started.completion_seconds <= 121
+
+
+def test_complete_endpoint_records_pace_for_enrolled_learners(monkeypatch):
+    monkeypatch.setattr(lesson_routes.ActiveLearnerService, "record_activity", lambda db, course_id, user_id: False)
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for table in (Course.__table__, Enrollment.__table__, LessonModule.__table__, progress, pace):
+        table.create(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Course.__table__), [{"id": 1, "title": "Kiswahili Msingi"}])
+        conn.execute(insert(Enrollment.__table__), [{"user_id": 1, "course_id": 1}])
+        conn.execute(insert(LessonModule.__table__), [{"id": 7, "course_id": 1, "title": "Salamu", "content_type": "video"}])
+        conn.execute(insert(progress), [{
+            "user_id": 1, "lesson_id": 7, "started_at": datetime.utcnow() - timedelta(minutes=10), "is_completed": False
+        }])
+    session_factory = sessionmaker(bind=engine)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    current_user = SimpleNamespace(id=1)
+    app = FastAPI()
+    app.include_router(lesson_routes.router)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_active_user] = lambda: current_user
+    client = TestClient(app)
+
+    first = client.post("/lessons/7/complete").json()
+    assert first["newly_completed"] is True
+    assert 595 <= first["completion_seconds"] <= 605
+    assert client.post("/lessons/7/complete").json()["newly_completed"] is False
+    assert client.post("/lessons/8/complete").status_code == 404
+    current_user.id = 2
+    assert client.post("/lessons/7/complete").status_code == 403
+
+    with session_factory() as db:
+        [(user_id, completed_lessons, seconds)] = pace_totals(db)
+        assert (user_id, completed_lessons, seconds) == (1, 1, first["completion_seconds"])
+    engine.dispose()
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.course import Course, Enrollment
+from app.models.assessment import Quiz, QuizSubmission
+from app.models.notification import Notification, NotificationCounter, NotificationOutbox
+from app.models.user import User
+from app.routes import notifications as notification_routes
+from app.services.auth import get_current_active_user
+from app.services.database import get_db
+from app.services.notification_service import NotificationService
+
+notifications = Notification.__table__
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for table in (User.__table__, Course.__table__, Enrollment.__table__, Quiz.__table__, QuizSubmission.__table__,
+                  notifications, NotificationCounter.__table__, NotificationOutbox.__table__):
+        table.create(bind=engine)
+
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [{"id": i, "username": f"mwanafunzi{i}", "email": f"m{i}@example.com"} for i in (1, 2, 3)])
+        conn.execute(insert(Course.__table__), [{"id": i, "title": f"Kozi {i}"} for i in (1, 2, 3)])
+        conn.execute(insert(Enrollment.__table__), [
+            {"user_id": 1, "course_id": 1}, {"user_id": 1, "course_id": 2}, {"user_id": 1, "course_id": 3},
+            {"user_id": 2, "course_id": 1}
+        ])
+        conn.execute(insert(Quiz.__table__), [
+            {"id": i, "course_id": i, "title": f"Jaribio {i}", "is_timed": True, "duration_minutes": 10} for i in (1, 2, 3)
+        ])
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def test_counters_follow_created_and_read_notifications(session_factory):
+    with session_factory() as db:
+        NotificationService.send_quiz_deadline_reminders(db, chunk_size=2)
+        # The next day's run reminds everyone again
+        NotificationService.send_quiz_deadline_reminders(db, chunk_size=2, now=datetime.utcnow() + timedelta(days=1))
+        assert [NotificationService.get_unread_count(db, user_id) for user_id in (1, 2, 3)] == [6, 2, 0]
+
+        first_two = db.execute(
+            select(notifications.c.id).where(notifications.c.user_id == 1).order_by(notifications.c.id).limit(2)
+        ).scalars().all()
+        assert NotificationService.mark_notifications_as_read(db, 1, first_two) == 2
+        # Already read, and another user's notification: nothing changes
+        other = db.execute(select(notifications.c.id).where(notifications.c.user_id == 2)).scalars().first()
+        assert NotificationService.mark_notifications_as_read(db, 1, first_two + [other]) == 0
+        assert NotificationService.get_unread_count(db, 1) == 4
+        assert NotificationService.get_unread_count(db, 2) == 2
+
+        assert NotificationService.mark_notifications_as_read(db, 1) == 4
+        assert NotificationService.get_unread_count(db, 1) == 0
+        assert NotificationService.recount_unread(db, 1) == 0
+        assert NotificationService.recount_unread(db, 2) == 2
+
+
+def test_recount_repairs_drift_using_the_partial_unread_index(session_factory):
+    with session_factory() as db:
+        NotificationService.send_quiz_deadline_reminders(db)
+        db.execute(text("UPDATE notification_counters SET unread_count = 42 WHERE user_id = 1"))
+        db.commit()
+
+        assert NotificationService.recount_unread(db, 1) == 3
+        assert NotificationService.get_unread_count(db, 1) == 3
+
+        plan = " ".join(str(row) for row in db.execute(text(
+            "EXPLAIN QUERY PLAN SELECT count(*) FROM notifications WHERE user_id = 1 AND is_read = 0"
+        )).all())
+        assert "ix_notifications_user_unread" in plan
+
+
+def test_unread_count_endpoint(session_factory):
+    with session_factory() as db:
+        NotificationService.send_quiz_deadline_reminders(db)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(notification_routes.router)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_active_user] = lambda: SimpleNamespace(id=1)
+    client = TestClient(app)
+
+    response = client.get("/notifications/unread-count")
+    assert response.status_code == 200
+    assert response.json() == {"unread_count": 3}
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    response = client.post("/notifications/mark-read", json={})
+    assert response.json() == {"marked_read": 3, "unread_count": 0}
+    assert client.get("/notifications/unread-count").json() == {"unread_count": 0}
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.course import Course, Enrollment
+from app.models.assessment import Quiz, QuizSubmission
+from app.models.notification import Notification, NotificationCounter, NotificationOutbox
+from app.models.user import User
+from app.services.notification_outbox import NotificationOutboxService, NotificationOutboxWorker
+from app.services.notification_service import NotificationService
+
+outbox = NotificationOutbox.__table__
+notifications = Notification.__table__
+WINDOW = 600
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for table in (User.__table__, Course.__table__, Enrollment.__table__, Quiz.__table__,
+                  QuizSubmission.__table__, notifications, NotificationCounter.__table__, outbox):
+        table.create(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def hold(db, to_email, subjects, user_id=None):
+    NotificationOutboxService.enqueue_emails(db, [
+        {"to_email": to_email, "subject": subject, "body": subject, "notification_type": "quiz_reminder", "user_id": user_id}
+        for subject in subjects
+    ], digest=True)
+    db.commit()
+
+
+def outbox_rows(db):
+    return db.execute(select(outbox).order_by(outbox.c.id)).all()
+
+
+def test_held_emails_are_combined_per_user_after_the_window(session_factory):
+    with session_factory() as db:
+        hold(db, "amani@example.com", [f"Upcoming Quiz: Somo {i}" for i in range(15)], user_id=1)
+        hold(db, "baraka@example.com", ["Upcoming Quiz: Salamu"], user_id=2)
+        hold(db, "chausiku@example.com", ["Upcoming Quiz: Namba", "Upcoming Quiz: Rangi"], user_id=3)
+        now = datetime.utcnow()
+
+        assert NotificationService.digest_pending_emails(db, WINDOW, now=now + timedelta(seconds=WINDOW - 5)) == 0
+        assert NotificationService.digest_pending_emails(db, WINDOW, now=now + timedelta(seconds=WINDOW + 5), chunk_size=2) == 3
+
+        pending = [row for row in outbox_rows(db) if row.status == "pending"]
+        assert sorted(row.to_email for row in pending) == ["amani@example.com", "baraka@example.com", "chausiku@example.com"]
+
+        digest = next(row for row in pending if row.to_email == "amani@example.com")
+        assert (digest.notification_type, digest.user_id) == ("digest", 1)
+        assert digest.subject == "You have 15 updates from Swahili Learn"
+        assert all(f"- Upcoming Quiz: Somo {i}\n" in digest.body for i in range(15))
+
+        single = next(row for row in pending if row.to_email == "baraka@example.com")
+        assert single.subject == "Upcoming Quiz: Salamu"
+
+        assert sum(row.status == "digested" for row in outbox_rows(db)) == 17
+        assert NotificationService.digest_pending_emails(db, WINDOW, now=now + timedelta(days=1)) == 0
+
+
+def test_reminders_for_many_courses_become_one_email_and_keep_in_app_notifications(session_factory):
+    with session_factory() as db:
+        db.execute(insert(User.__table__), [{"id": 1, "username": "amani", "email": "amani@example.com"}])
+        db.execute(insert(Course.__table__), [{"id": i, "title": f"Kozi {i}"} for i in range(1, 16)])
+        db.execute(insert(Enrollment.__table__), [{"user_id": 1, "course_id": i} for i in range(1, 16)])
+        db.execute(insert(Quiz.__table__), [
+            {"id": i, "course_id": i, "title": f"Jaribio {i}", "is_timed": True, "duration_minutes": 10} for i in range(1, 16)
+        ])
+        db.commit()
+
+        assert NotificationService.send_quiz_deadline_reminders(db) == 15
+        assert len(db.execute(select(notifications.c.id).where(notifications.c.user_id == 1)).all()) == 15
+
+    sent = []
+    worker = NotificationOutboxWorker(session_factory, sender=lambda messages: [sent.append(m["Subject"]) or True for m in messages])
+    worker.add_stage(lambda db: NotificationService.digest_pending_emails(db, window_seconds=0))
+
+    assert worker.run_once() == 0
+    assert worker.run_stages() == 1
+    assert worker.run_once() == 1
+    assert sent == ["You have 15 updates from Swahili Learn"]
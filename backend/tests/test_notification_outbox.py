@@ -0,0 +1,143 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.notification import NotificationOutbox
+from app.services.notification_outbox import (
+    NotificationOutboxService, NotificationOutboxWorker, OutboxStatus
+)
+
+outbox = NotificationOutbox.__table__
+NOW = datetime.utcnow()
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    outbox.create(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def enqueue(db, count):
+    NotificationOutboxService.enqueue_emails(db, [
+        {"to_email": f"learner{i}@example.com", "subject": "Karibu", "body": f"Body {i}", "notification_type": "course_enrollment", "user_id": i}
+        for i in range(count)
+    ])
+
+
+def rows(db):
+    return db.execute(select(outbox).order_by(outbox.c.id)).all()
+
+
+def test_outbox_rows_follow_the_callers_transaction(session_factory):
+    with session_factory() as db:
+        enqueue(db, 2)
+        db.rollback()
+        assert rows(db) == []
+
+        NotificationOutboxService.enqueue_email(
+            db, "amani@example.com", "Karibu", "Body", "course_enrollment", user_id=7, related_id=3
+        )
+        db.commit()
+        [row] = rows(db)
+        assert (row.status, row.attempts, row.related_id) == ("pending", 0, 3)
+
+
+def test_worker_delivers_and_marks_sent(session_factory):
+    delivered = []
+    with session_factory() as db:
+        enqueue(db, 5)
+        db.commit()
+
+    worker = NotificationOutboxWorker(session_factory, sender=lambda messages: [delivered.append(m["To"]) or True for m in messages], batch_size=3)
+    assert worker.run_once(now=NOW + timedelta(days=1)) == 3
+    assert worker.run_once(now=NOW + timedelta(days=1)) == 2
+    assert worker.run_once(now=NOW + timedelta(days=1)) == 0
+
+    assert delivered == [f"learner{i}@example.com" for i in range(5)]
+    with session_factory() as db:
+        assert {(row.status, row.attempts, row.claim_token) for row in rows(db)} == {("sent", 1, None)}
+
+
+def test_failures_back_off_exponentially_then_give_up(session_factory):
+    with session_factory() as db:
+        enqueue(db, 1)
+        db.commit()
+
+    def refuse(messages):
+        raise ConnectionRefusedError("mail server down")
+
+    worker = NotificationOutboxWorker(session_factory, sender=refuse, max_attempts=3)
+    now = NOW + timedelta(days=1)
+    delays = []
+    for _ in range(3):
+        assert worker.run_once(now=now) == 1
+        # Not due again until the backoff has passed
+        assert worker.run_once(now=now) == 0
+        with session_factory() as db:
+            [row] = rows(db)
+        if row.status == "pending":
+            delays.append((row.available_at - now).total_seconds())
+            now = row.available_at
+
+    assert delays == [
+        NotificationOutboxService.backoff_delay(1),
+        NotificationOutboxService.backoff_delay(2)
+    ]
+    assert delays[1] == delays[0] * 2
+    assert (row.status, row.attempts, row.last_error) == ("failed", 3, "mail server down")
+
+
+def test_abandoned_claims_are_retried_after_the_lease(session_factory):
+    with session_factory() as db:
+        enqueue(db, 2)
+        db.commit()
+        # A worker claims the batch and crashes before recording results
+        claimed = NotificationOutboxService.claim_batch(db, lease_seconds=60, now=NOW + timedelta(days=1))
+        assert len(claimed) == 2
+        assert NotificationOutboxService.claim_batch(db, now=NOW + timedelta(days=1, seconds=30)) == []
+
+        reclaimed = NotificationOutboxService.claim_batch(db, now=NOW + timedelta(days=1, seconds=61))
+        assert [row.attempts for row in reclaimed] == [2, 2]
+
+        # The crashed worker's late results no longer apply
+        NotificationOutboxService.complete_batch(db, claimed, [True, True])
+        assert {row.status for row in rows(db)} == {OutboxStatus.PROCESSING.value}
+
+
+def test_concurrent_workers_never_deliver_twice(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'outbox.db'}", connect_args={"timeout": 30})
+    outbox.create(bind=engine)
+    with Session(engine) as db:
+        enqueue(db, 200)
+        db.commit()
+
+    delivered = []
+    lock = threading.Lock()
+
+    def sender(messages):
+        with lock:
+            delivered.extend(m["To"] for m in messages)
+        return [True] * len(messages)
+
+    workers = [NotificationOutboxWorker(sessionmaker(bind=engine), sender=sender, batch_size=7) for _ in range(4)]
+
+    def drain(worker):
+        while worker.run_once():
+            pass
+
+    threads = [threading.Thread(target=drain, args=(worker,)) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(delivered) == sorted(f"learner{i}@example.com" for i in range(200))
+    with Session(engine) as db:
+        assert {row.status for row in rows(db)} == {"sent"}
+    engine.dispose()
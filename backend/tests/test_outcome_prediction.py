@@ -0,0 +1,93 @@
+import math
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.models.assessment import Quiz, QuizSubmission
+from app.models.course import Course, Enrollment
+from app.models.user import User
+from app.services.advanced_analytics_service import AdvancedAnalyticsService
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for table in (User.__table__, Course.__table__, Enrollment.__table__, Quiz.__table__, QuizSubmission.__table__):
+        table.create(bind=engine)
+
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [{"id": i, "username": f"mwanafunzi{i}", "email": f"m{i}@example.com"} for i in range(1, 6)])
+        conn.execute(insert(Course.__table__), [{"id": 1, "title": "Kiswahili Msingi"}, {"id": 2, "title": "Sarufi"}])
+        # Learner 5 is not enrolled in course 1; learner 4 is enrolled without graded work
+        conn.execute(insert(Enrollment.__table__), [{"user_id": i, "course_id": 1} for i in range(1, 5)])
+        conn.execute(insert(Quiz.__table__), [
+            {"id": 1, "course_id": 1, "title": "Salamu"},
+            {"id": 2, "course_id": 1, "title": "Familia"},
+            {"id": 3, "course_id": 1, "title": "Vitenzi"},
+            {"id": 4, "course_id": 2, "title": "Ngeli"},
+        ])
+        conn.execute(insert(QuizSubmission.__table__), [
+            {"user_id": 1, "quiz_id": 1, "score": 0.9},
+            {"user_id": 1, "quiz_id": 2, "score": 0.7},
+            {"user_id": 1, "quiz_id": 3, "score": 0.5},
+            {"user_id": 1, "quiz_id": 4, "score": 0.1},
+            {"user_id": 2, "quiz_id": 1, "score": 0.6},
+            {"user_id": 2, "quiz_id": 2, "score": 0.8},
+            {"user_id": 2, "quiz_id": 3, "score": None},
+            {"user_id": 3, "quiz_id": 1, "score": 0.7},
+            {"user_id": 3, "quiz_id": 1, "score": 0.9},
+            {"user_id": 5, "quiz_id": 1, "score": 0.0},
+        ])
+
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def assert_same_prediction(batch, single):
+    for section in ("historical_performance", "predictive_insights"):
+        for key, value in single[section].items():
+            if isinstance(value, float):
+                assert batch[section][key] == pytest.approx(value), (section, key)
+            else:
+                assert batch[section][key] == value, (section, key)
+
+
+def test_course_predictions_match_the_single_learner_model(db):
+    roster = AdvancedAnalyticsService.predict_course_learning_outcomes(db, 1)
+
+    assert [prediction["user_id"] for prediction in roster][-1] == 4
+    for prediction in roster[:-1]:
+        assert_same_prediction(prediction, AdvancedAnalyticsService.predict_learning_outcomes(db, prediction["user_id"]))
+    assert "message" in roster[-1]
+    assert "message" in AdvancedAnalyticsService.predict_learning_outcomes(db, 4)
+
+
+def test_predictions_only_use_enrolled_learners(db):
+    roster = {prediction["user_id"]: prediction for prediction in AdvancedAnalyticsService.predict_course_learning_outcomes(db, 1)}
+
+    assert set(roster) == {1, 2, 3, 4}
+    assert roster[1]["total_attempts"] == 3
+    assert roster[2]["total_attempts"] == 2
+
+    # Quiz difficulty comes from the enrolled cohort only, so learner 5's 0.0 is ignored
+    quiz_means = {1: (0.9 + 0.6 + 0.7 + 0.9) / 4, 2: (0.7 + 0.8) / 2, 3: 0.5}
+    difficulty = [1 + 2 * (1 - quiz_means[quiz_id]) for quiz_id in (1, 2, 3)]
+    expected = np.corrcoef(difficulty, [0.9, 0.7, 0.5])[0, 1]
+    assert roster[1]["predictive_insights"]["difficulty_performance_correlation"] == pytest.approx(expected)
+    assert roster[1]["historical_performance"]["performance_variance"] == pytest.approx(0.2)
+
+
+def test_constant_difficulty_leaves_the_correlation_undefined(db):
+    single = AdvancedAnalyticsService.predict_learning_outcomes(db, 3)
+    [batch] = [prediction for prediction in AdvancedAnalyticsService.predict_course_learning_outcomes(db, 1) if prediction["user_id"] == 3]
+
+    for prediction in (single, batch):
+        insights = prediction["predictive_insights"]
+        assert insights["difficulty_performance_correlation"] is None
+        assert insights["predicted_future_performance"] == pytest.approx(0.8)
+        assert insights["recommended_difficulty"] == "intermediate"
+        assert not math.isnan(prediction["historical_performance"]["performance_variance"])
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.models.analytics import ActiveLearnerSketch
+from app.models.course import Enrollment, Lesson, CourseProgress
+from app.models.lesson import LessonModule
+from app.models.lesson_progress import LessonProgress
+from app.schemas.course import ProgressSyncEvent
+from app.services import active_learner_service
+from app.services.progress_sync_service import ProgressSyncService
+from app.utils.hyperloglog import HyperLogLog
+
+enrollments = Enrollment.__table__
+lessons = Lesson.__table__
+progress = CourseProgress.__table__
+modules = LessonModule.__table__
+lesson_progress = LessonProgress.__table__
+sketches = ActiveLearnerSketch.__table__
+
+NOW = datetime.utcnow().replace(microsecond=0)
+
+
+@pytest.fixture
+def sync_db(monkeypatch):
+    monkeypatch.setattr(active_learner_service, "_sketch_cache", {})
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for table in (enrollments, lessons, progress, modules, lesson_progress, sketches):
+        table.create(bind=engine)
+
+    with engine.begin() as conn:
+        conn.execute(insert(lessons), [
+            {"id": 1, "course_id": 1, "title": "Salamu", "order": 1},
+            {"id": 2, "course_id": 1, "title": "Namba", "order": 2},
+            {"id": 3, "course_id": 2, "title": "Vitenzi", "order": 1},
+        ])
+        conn.execute(insert(modules), [{"id": 1, "course_id": 1, "title": "Sauti", "content_type": "audio"}])
+        conn.execute(insert(enrollments), [
+            {"id": 1, "user_id": 1, "course_id": 1, "total_lessons": 2, "completed_lessons": 1},
+            {"id": 2, "user_id": 2, "course_id": 2, "total_lessons": 1, "completed_lessons": 0},
+        ])
+        conn.execute(insert(progress), [{
+            "enrollment_id": 1, "lesson_id": 1, "completed": True, "progress_percentage": 100.0,
+            "completed_at": NOW - timedelta(hours=1), "updated_at": NOW - timedelta(hours=1)
+        }])
+
+    with Session(engine) as db:
+        yield db
+
+
+def event(**fields):
+    return ProgressSyncEvent(**{"occurred_at": NOW - timedelta(minutes=10), **fields})
+
+
+def test_sync_applies_last_writer_per_lesson(sync_db):
+    result = ProgressSyncService.sync(sync_db, user_id=1, events=[
+        event(enrollment_id=1, lesson_id=2, progress_percentage=40, occurred_at=NOW - timedelta(minutes=20)),
+        event(enrollment_id=1, lesson_id=2, completed=True, progress_percentage=100),
+        event(enrollment_id=1, lesson_id=1, progress_percentage=10, occurred_at=NOW - timedelta(days=1)),
+        event(type="time_spent", lesson_id=1, seconds=300),
+        event(type="time_spent", lesson_id=1, seconds=120),
+    ])
+
+    assert result["applied"] == 1
+    assert result["stale"] == 1  # lesson 1 changed on the server after the offline edit
+    assert result["rejected"] == []
+    assert {(row["lesson_id"], row["completed"]) for row in result["progress"]} == {(1, True), (2, True)}
+
+    counters = sync_db.execute(select(enrollments.c.completed_lessons, enrollments.c.last_activity_at).where(enrollments.c.id == 1)).one()
+    assert counters.completed_lessons == 2
+    assert counters.last_activity_at == NOW - timedelta(minutes=10)
+
+    assert sync_db.execute(select(lesson_progress.c.total_time_spent)).scalar() == 420
+
+
+def test_sync_rejects_foreign_enrollments_and_lessons(sync_db):
+    result = ProgressSyncService.sync(sync_db, user_id=1, events=[
+        event(enrollment_id=2, lesson_id=3, completed=True),
+        event(enrollment_id=1, lesson_id=3, completed=True),
+        event(type="time_spent", lesson_id=99, seconds=60),
+    ])
+
+    assert [r["reason"] for r in result["rejected"]] == [
+        "enrollment_not_found", "lesson_not_in_course", "lesson_not_accessible"
+    ]
+    assert result["applied"] == 0
+    assert sync_db.execute(select(progress.c.id)).all() == [(1,)]
+
+
+def test_future_device_clock_is_clamped(sync_db):
+    ProgressSyncService.sync(sync_db, user_id=1, events=[
+        event(enrollment_id=1, lesson_id=2, progress_percentage=50, occurred_at=NOW + timedelta(days=365)),
+    ])
+    stored = sync_db.execute(select(progress.c.updated_at).where(progress.c.lesson_id == 2)).scalar()
+    assert stored <= datetime.utcnow()
+
+
+def test_delta_cursor_uses_server_write_time(sync_db):
+    last_sync = datetime.utcnow()
+
+    # Another device of the learner syncs a change it made offline long before
+    ProgressSyncService.sync(sync_db, user_id=1, events=[
+        event(enrollment_id=1, lesson_id=2, completed=True, progress_percentage=100, occurred_at=last_sync - timedelta(days=2)),
+    ])
+
+    result = ProgressSyncService.sync(sync_db, user_id=1, events=[], since=last_sync)
+    assert [(row["lesson_id"], row["completed"]) for row in result["progress"]] == [(2, True)]
+    assert ProgressSyncService.sync(sync_db, user_id=1, events=[], since=datetime.utcnow())["progress"] == []
+
+
+def test_sync_upserts_one_row_per_lesson(sync_db):
+    for minutes in (30, 20, 10):
+        ProgressSyncService.sync(sync_db, user_id=1, events=[
+            event(enrollment_id=1, lesson_id=2, progress_percentage=100 - minutes, occurred_at=NOW - timedelta(minutes=minutes)),
+        ])
+
+    rows = sync_db.execute(select(progress.c.progress_percentage, progress.c.synced_at).where(progress.c.lesson_id == 2)).all()
+    assert len(rows) == 1
+    assert rows[0].progress_percentage == 90
+    assert rows[0].synced_at >= NOW
+
+
+def test_sync_counts_the_learner_active_on_each_offline_day(sync_db):
+    ProgressSyncService.sync(sync_db, user_id=1, events=[
+        event(enrollment_id=1, lesson_id=2, progress_percentage=40, occurred_at=NOW - timedelta(days=2)),
+        event(type="time_spent", lesson_id=1, seconds=60),
+        event(enrollment_id=2, lesson_id=3, completed=True),  # not the learner's enrollment
+    ])
+
+    rows = sync_db.execute(select(sketches.c.course_id, sketches.c.day, sketches.c.sketch).order_by(sketches.c.day)).all()
+    assert [(row.course_id, row.day) for row in rows] == [
+        (1, (NOW - timedelta(days=2)).date()), (1, (NOW - timedelta(minutes=10)).date())
+    ]
+    assert [HyperLogLog.from_bytes(row.sketch).count() for row in rows] == [1, 1]
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+from sqlalchemy import case, create_engine, func, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.models.analytics import QuestionStat, UserQuestionStat
+from app.models.assessment import QuizSubmission, QuizSubmissionAnswer
+from app.services.question_stats_service import QuestionStatsService
+
+submissions = QuizSubmission.__table__
+answers = QuizSubmissionAnswer.__table__
+user_stats = UserQuestionStat.__table__
+question_stats = QuestionStat.__table__
+
+# quiz_id -> (course_id, question IDs)
+QUIZZES = {1: (1, [1, 2, 3, 4]), 2: (2, [5, 6, 7])}
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for table in (submissions, answers, user_stats, question_stats):
+        table.create(bind=engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def grade(db, user_id, quiz_id, graded_answers):
+    """
+    Store a graded submission the way the grading path does and bump the counters
+    """
+    course_id, _ = QUIZZES[quiz_id]
+    submission_id = db.execute(
+        insert(submissions).values(quiz_id=quiz_id, user_id=user_id).returning(submissions.c.id)
+    ).scalar_one()
+    db.execute(insert(answers), [
+        {"submission_id": submission_id, "question_id": question_id, "user_answer": "jibu", "is_correct": is_correct}
+        for question_id, is_correct in graded_answers
+    ])
+    QuestionStatsService.record_graded_answers(db, user_id, course_id, quiz_id, graded_answers)
+
+
+def test_counters_match_a_recompute_from_submission_answers(db):
+    rng = random.Random(7)
+    for _ in range(60):
+        quiz_id = rng.choice(list(QUIZZES))
+        _, question_ids = QUIZZES[quiz_id]
+        graded_answers = [(question_id, rng.random() < 0.6) for question_id in question_ids]
+        # Some submissions answer a question more than once
+        if rng.random() < 0.2:
+            graded_answers.append((question_ids[0], rng.random() < 0.6))
+        grade(db, rng.randint(1, 6), quiz_id, graded_answers)
+        if rng.random() < 0.3:
+            db.commit()
+    db.commit()
+
+    incorrect = func.sum(case((answers.c.is_correct, 0), else_=1))
+    joined = answers.join(submissions, submissions.c.id == answers.c.submission_id)
+
+    expected_per_user = set(db.execute(
+        select(submissions.c.user_id, answers.c.question_id, func.count(), incorrect)
+        .select_from(joined).group_by(submissions.c.user_id, answers.c.question_id)
+    ).all())
+    expected_per_question = set(db.execute(
+        select(answers.c.question_id, submissions.c.quiz_id, func.count(), incorrect)
+        .select_from(joined).group_by(answers.c.question_id, submissions.c.quiz_id)
+    ).all())
+
+    assert set(db.execute(select(
+        user_stats.c.user_id, user_stats.c.question_id, user_stats.c.attempt_count, user_stats.c.incorrect_count
+    )).all()) == expected_per_user
+    assert set(db.execute(select(
+        question_stats.c.question_id, question_stats.c.quiz_id, question_stats.c.attempt_count, question_stats.c.incorrect_count
+    )).all()) == expected_per_question
+
+    # Course IDs follow the question's quiz
+    for question_id, course_id in db.execute(select(question_stats.c.question_id, question_stats.c.course_id)):
+        assert course_id == (1 if question_id <= 4 else 2)
+
+
+def test_rolled_back_submission_leaves_counters_untouched(db):
+    grade(db, 1, 1, [(1, True), (2, False)])
+    db.commit()
+    grade(db, 1, 1, [(1, False), (2, False)])
+    db.rollback()
+
+    assert set(db.execute(select(
+        user_stats.c.question_id, user_stats.c.attempt_count, user_stats.c.incorrect_count
+    )).all()) == {(1, 1, 0), (2, 1, 1)}
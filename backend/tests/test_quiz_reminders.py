@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, func, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.models.course import Course, Enrollment
+from app.models.assessment import Quiz, QuizSubmission
+from app.models.notification import Notification, NotificationCounter, NotificationOutbox
+from app.models.user import User
+from app.services.notification_outbox import NotificationOutboxService
+from app.services.notification_service import NotificationService
+
+notifications = Notification.__table__
+outbox = NotificationOutbox.__table__
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for table in (User.__table__, Course.__table__, Enrollment.__table__, Quiz.__table__,
+                  QuizSubmission.__table__, notifications, NotificationCounter.__table__, outbox):
+        table.create(bind=engine)
+
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [{"id": i, "username": f"mwanafunzi{i}", "email": f"m{i}@example.com"} for i in range(1, 31)])
+        conn.execute(insert(Course.__table__), [{"id": 1, "title": "Kiswahili Msingi"}, {"id": 2, "title": "Sarufi"}])
+        conn.execute(insert(Enrollment.__table__), [{"user_id": i, "course_id": 1 if i <= 20 else 2} for i in range(1, 31)])
+        conn.execute(insert(Quiz.__table__), [
+            {"id": 1, "course_id": 1, "title": "Salamu", "is_timed": True, "duration_minutes": 15},
+            {"id": 2, "course_id": 1, "title": "Untimed", "is_timed": False, "duration_minutes": 15},
+            {"id": 3, "course_id": 1, "title": "No limit", "is_timed": True, "duration_minutes": None},
+            {"id": 4, "course_id": 2, "title": "Vitenzi", "is_timed": True, "duration_minutes": 30},
+        ])
+        conn.execute(insert(QuizSubmission.__table__), [
+            {"quiz_id": 1, "user_id": user_id, "score": 90.0} for user_id in (1, 2, 3)
+        ] + [{"quiz_id": 4, "user_id": 21, "score": 50.0}])
+    yield engine
+    engine.dispose()
+
+
+def test_reminders_skip_submitted_and_untimed_quizzes(engine):
+    with Session(engine) as db:
+        assert NotificationService.send_quiz_deadline_reminders(db, chunk_size=4) == 17 + 9
+
+        reminded = set(db.execute(select(notifications.c.user_id, notifications.c.related_id)).all())
+        assert reminded == {(i, 1) for i in range(4, 21)} | {(i, 4) for i in range(22, 31)}
+
+        emails = db.execute(select(outbox.c.to_email, outbox.c.subject, outbox.c.body).where(outbox.c.user_id == 30)).all()
+        assert len(emails) == 1
+        assert emails[0].to_email == "m30@example.com"
+        assert emails[0].subject == "Upcoming Quiz: Vitenzi"
+        assert "Course: Sarufi" in emails[0].body and "Duration: 30 minutes" in emails[0].body
+        # Reminder emails wait for the per-user digest
+        assert db.execute(select(func.count()).select_from(outbox).where(outbox.c.status == "digest")).scalar() == 26
+
+
+def test_reminders_are_paged_and_committed_per_chunk(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+
+    with Session(engine) as db:
+        NotificationService.send_quiz_deadline_reminders(db, chunk_size=5)
+
+    selects = [statement for statement in statements if statement.lstrip().upper().startswith("SELECT")]
+    inserts = [statement for statement in statements if statement.lstrip().upper().startswith("INSERT")]
+    # 26 reminders: five full pages and a short last page, each resuming after the previous key
+    assert len(selects) == 6
+    assert all(select_.count("NOT (EXISTS") == 2 for select_ in selects)
+    assert all("(quizzes.id, enrollments.id) >" in select_ for select_ in selects[1:])
+    # Notification INSERT, unread counter upsert and outbox INSERT per chunk of 5 rows
+    assert len(inserts) == 3 * 6
+
+
+def test_interrupted_run_resumes_without_duplicates(engine, monkeypatch):
+    enqueue = NotificationOutboxService.enqueue_emails
+    calls = []
+
+    def fail_on_third_chunk(db, emails, **kwargs):
+        calls.append(len(emails))
+        if len(calls) == 3:
+            raise ConnectionError("database went away")
+        return enqueue(db, emails, **kwargs)
+
+    monkeypatch.setattr(NotificationOutboxService, "enqueue_emails", fail_on_third_chunk)
+    with Session(engine) as db:
+        with pytest.raises(ConnectionError):
+            NotificationService.send_quiz_deadline_reminders(db, chunk_size=5)
+        db.rollback()
+
+        # The first two chunks were committed and are visible to the outbox workers
+        assert db.execute(select(func.count()).select_from(notifications)).scalar() == 10
+        assert db.execute(select(func.count()).select_from(outbox)).scalar() == 10
+
+        monkeypatch.setattr(NotificationOutboxService, "enqueue_emails", enqueue)
+        assert NotificationService.send_quiz_deadline_reminders(db, chunk_size=5) == 16
+
+        reminded = db.execute(select(notifications.c.user_id, notifications.c.related_id)).all()
+        assert len(reminded) == len(set(reminded)) == 26
+        assert db.execute(select(func.sum(NotificationCounter.__table__.c.unread_count))).scalar() == 26
+
+        # A repeated run inside the resend window has nothing left to send
+        assert NotificationService.send_quiz_deadline_reminders(db, chunk_size=5) == 0
+        assert NotificationService.send_quiz_deadline_reminders(db, now=datetime.utcnow() + timedelta(days=1)) == 26
@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import create_engine, insert, select, text, update
+from sqlalchemy.pool import StaticPool
+
+from app.models.analytics import RollupWatermark
+from app.services import database
+from app.services.read_replica import ReplicaRouter
+
+watermarks = RollupWatermark.__table__
+
+
+def make_engine(name):
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    watermarks.create(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(watermarks), [{"name": name}])
+    return engine
+
+
+@pytest.fixture
+def engines(monkeypatch):
+    primary, replica = make_engine("primary"), make_engine("replica")
+    monkeypatch.setattr(database, "analytics_engine", replica)
+    monkeypatch.setattr(database.AnalyticsSessionLocal, "kw", {**database.AnalyticsSessionLocal.kw, "bind": primary})
+    monkeypatch.setattr(ReplicaRouter, "_recent_writes", {})
+    monkeypatch.setattr(ReplicaRouter, "_lag_checked_at", 0.0)
+    return primary, replica
+
+
+def read_source(use_replica):
+    db = database.AnalyticsSessionLocal()
+    db.info["use_replica"] = use_replica
+    try:
+        return db.execute(select(watermarks.c.name)).scalar()
+    finally:
+        db.close()
+
+
+def test_reads_go_to_replica_and_writes_to_primary(engines):
+    primary, _ = engines
+    assert read_source(True) == "replica"
+    assert read_source(False) == "primary"
+
+    db = database.AnalyticsSessionLocal()
+    db.info["use_replica"] = True
+    db.execute(insert(watermarks).values(name="written"))
+    db.commit()
+    db.close()
+
+    with primary.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM rollup_watermarks")).scalar() == 2
+
+
+def test_core_write_pins_the_writer(engines):
+    db = database.AnalyticsSessionLocal()
+    db.info["user_id"] = 7
+    db.execute(select(watermarks.c.name)).all()
+    db.commit()
+    assert not ReplicaRouter.is_pinned(7)
+
+    db.execute(update(watermarks).values(last_id=3))
+    db.rollback()
+    assert not ReplicaRouter.is_pinned(7)
+
+    db.execute(update(watermarks).values(last_id=3))
+    db.commit()
+    db.close()
+    assert ReplicaRouter.is_pinned(7)
+    assert not ReplicaRouter.is_pinned(8)
+
+
+def test_recent_writer_is_pinned_to_primary(engines):
+    assert ReplicaRouter.should_use_replica(user_id=7)
+
+    ReplicaRouter.record_write(7)
+    assert not ReplicaRouter.should_use_replica(user_id=7)
+    assert ReplicaRouter.should_use_replica(user_id=8)
+
+
+def test_falls_back_without_a_usable_replica(engines, monkeypatch):
+    monkeypatch.setattr(ReplicaRouter, "replica_lag", classmethod(lambda cls: None))
+    assert not ReplicaRouter.should_use_replica(user_id=1)
+
+    monkeypatch.setattr(database, "analytics_engine", None)
+    assert not ReplicaRouter.should_use_replica(user_id=1)
+    assert read_source(True) == "primary"
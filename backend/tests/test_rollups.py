@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.models.analytics import QuizScoreRollup, RollupWatermark
+from app.models.assessment import Quiz, QuizSubmission
+from app.services.rollup_service import ROLLUP_SETTLE_SECONDS, RollupService
+
+submissions = QuizSubmission.__table__
+rollups = QuizScoreRollup.__table__
+watermarks = RollupWatermark.__table__
+NOW = datetime(2026, 3, 20, 12)
+
+
+def test_rollup_accumulators_merge_like_a_single_pass():
+    """Merging per-bucket accumulators gives the same stats as one pass over all scores"""
+    scores = [(0.95, True), (0.4, False), (0.72, True), (1.0, True), (0.0, False)]
+
+    single = RollupService.empty_stats()
+    for score, passed in scores:
+        RollupService.accumulate(single, score, passed)
+
+    first, second = RollupService.empty_stats(), RollupService.empty_stats()
+    for score, passed in scores[:2]:
+        RollupService.accumulate(first, score, passed)
+    for score, passed in scores[2:]:
+        RollupService.accumulate(second, score, passed)
+    RollupService.merge(first, second)
+
+    assert first == single
+    summary = RollupService.summarize(first)
+    assert summary["total_attempts"] == 5
+    assert summary["pass_rate"] == 60
+    assert abs(summary["average_score"] - 0.614) < 1e-9
+    assert sum(summary["score_histogram"]) == 5
+    assert summary["score_histogram"][9] == 2  # 0.95 and a perfect score share the top bin
+
+
+def test_bucket_start_truncation():
+    """Submissions are bucketed to the start of their hour and day"""
+    moment = datetime(2026, 3, 14, 15, 9, 26, 535)
+    assert RollupService.bucket_start(moment, "hour") == datetime(2026, 3, 14, 15)
+    assert RollupService.bucket_start(moment, "day") == datetime(2026, 3, 14)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for table in (Quiz.__table__, submissions, rollups, watermarks):
+        table.create(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Quiz.__table__), [
+            {"id": 1, "course_id": 1, "title": "Salamu"},
+            {"id": 2, "course_id": 1, "title": "Familia"},
+            {"id": 3, "course_id": 2, "title": "Vitenzi"},
+        ])
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def submit(db, count, start, step, score=lambda i: (i * 37 % 101) / 100):
+    """
+    Add graded submissions spread over time; every seventh one was never graded
+    """
+    db.execute(insert(submissions), [
+        {
+            "quiz_id": i % 3 + 1,
+            "user_id": i,
+            "score": None if i % 7 == 0 else score(i),
+            "is_passed": score(i) >= 0.7,
+            "submitted_at": start + step * i
+        } for i in range(count)
+    ])
+    db.commit()
+
+
+def raw_stats(db, course_id, key):
+    """
+    Accumulators computed straight from the submissions table
+    """
+    stats = {}
+    rows = db.execute(
+        select(submissions.c.quiz_id, submissions.c.score, submissions.c.is_passed, submissions.c.submitted_at)
+        .join_from(submissions, Quiz.__table__, Quiz.__table__.c.id == submissions.c.quiz_id)
+        .where(Quiz.__table__.c.course_id == course_id, submissions.c.score.isnot(None))
+    ).all()
+    for row in rows:
+        RollupService.accumulate(stats.setdefault(key(row), RollupService.empty_stats()), row.score, row.is_passed)
+    return stats
+
+
+def assert_same_stats(actual, expected):
+    assert set(actual) == set(expected)
+    for key in expected:
+        assert actual[key]["attempts"] == expected[key]["attempts"]
+        assert actual[key]["passes"] == expected[key]["passes"]
+        assert actual[key]["histogram"] == expected[key]["histogram"]
+        assert actual[key]["score_sum"] == pytest.approx(expected[key]["score_sum"])
+        assert actual[key]["score_sq_sum"] == pytest.approx(expected[key]["score_sq_sum"])
+
+
+def test_rollups_plus_live_tail_match_the_raw_aggregate(db):
+    settled_at = NOW - timedelta(seconds=ROLLUP_SETTLE_SECONDS + 60)
+    # Settled history over four days, then an unsettled attempt and more history behind it
+    submit(db, 80, settled_at - timedelta(days=4), timedelta(hours=1, minutes=11))
+    db.execute(insert(submissions).values(quiz_id=1, user_id=99, score=None, submitted_at=NOW - timedelta(minutes=5)))
+    db.commit()
+    submit(db, 10, settled_at - timedelta(days=1), timedelta(minutes=17))
+
+    result = RollupService.run_incremental_rollup(db, batch_size=7, now=NOW)
+
+    # The watermark stops in front of the unsettled attempt
+    assert result == {"processed_submissions": 80, "watermark": 80}
+    assert RollupService.read_watermark(db) == 80
+    assert db.execute(select(func.count()).select_from(rollups)).scalar() > 0
+
+    # Another run with nothing settled past the watermark is a no-op
+    assert RollupService.run_incremental_rollup(db, batch_size=7, now=NOW)["processed_submissions"] == 0
+
+    for course_id in (1, 2):
+        assert_same_stats(
+            RollupService.get_course_quiz_stats(db, course_id),
+            raw_stats(db, course_id, lambda row: row.quiz_id)
+        )
+        for granularity in ("hour", "day"):
+            expected = raw_stats(db, course_id, lambda row: RollupService.bucket_start(row.submitted_at, granularity))
+            series = RollupService.get_course_timeseries(db, course_id, granularity)
+            assert [point["bucket_start"] for point in series] == sorted(expected)
+            for point in series:
+                summary = RollupService.summarize(expected[point["bucket_start"]])
+                assert point["total_attempts"] == summary["total_attempts"]
+                assert point["passed_attempts"] == summary["passed_attempts"]
+                assert point["score_histogram"] == summary["score_histogram"]
+                assert point["average_score"] == pytest.approx(summary["average_score"])
+
+    # Once the attempt settles the rest is folded in and the tail is empty again
+    result = RollupService.run_incremental_rollup(db, batch_size=7, now=NOW + timedelta(days=1))
+    assert result == {"processed_submissions": 11, "watermark": 91}
+    assert_same_stats(RollupService.get_course_quiz_stats(db, 1), raw_stats(db, 1, lambda row: row.quiz_id))
+
+
+def test_reading_stats_never_creates_the_watermark(db):
+    submit(db, 5, NOW - timedelta(days=1), timedelta(minutes=1))
+
+    stats = RollupService.get_course_quiz_stats(db, 1)
+    RollupService.get_course_timeseries(db, 1)
+
+    assert sum(quiz["attempts"] for quiz in stats.values()) == 3
+    assert RollupService.read_watermark(db) == 0
+    assert db.execute(select(func.count()).select_from(watermarks)).scalar() == 0
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.models.course import Enrollment
+from app.models.assessment import Quiz, QuizSubmission
+from app.models.user import User
+from app.services.roster_progress_service import RosterProgressService
+
+NOW = datetime.utcnow().replace(microsecond=0)
+
+
+@pytest.fixture
+def roster_db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for table in (User.__table__, Enrollment.__table__, Quiz.__table__, QuizSubmission.__table__):
+        table.create(bind=engine)
+
+    completed = {1: 2, 2: 8, 3: 5, 4: 8, 5: 0}
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [{"id": i, "username": f"mwanafunzi{i}", "email": f"m{i}@example.com"} for i in range(1, 7)])
+        conn.execute(insert(Enrollment.__table__), [
+            {"id": i, "user_id": i, "course_id": 1, "completed_lessons": done, "total_lessons": 8,
+             "last_activity_at": NOW - timedelta(days=i)}
+            for i, done in completed.items()
+        ] + [{"id": 6, "user_id": 6, "course_id": 2, "completed_lessons": 1, "total_lessons": 2, "last_activity_at": None}])
+        conn.execute(insert(Quiz.__table__), [{"id": 1, "course_id": 1, "title": "Salamu"}, {"id": 2, "course_id": 2, "title": "Namba"}])
+        conn.execute(insert(QuizSubmission.__table__), [
+            {"quiz_id": 1, "user_id": 2, "score": 0.8, "submitted_at": NOW - timedelta(days=5)},
+            {"quiz_id": 1, "user_id": 2, "score": 0.6, "submitted_at": NOW},
+            {"quiz_id": 2, "user_id": 2, "score": 0.0, "submitted_at": NOW},
+        ])
+
+    with Session(engine) as db:
+        yield db
+
+
+def test_roster_pages_by_progress_with_keyset_cursor(roster_db):
+    first = RosterProgressService.get_roster(roster_db, 1, limit=2)
+    assert [row["enrollment_id"] for row in first["items"]] == [4, 2]
+    assert first["items"][0]["progress_percentage"] == 100.0
+
+    second = RosterProgressService.get_roster(roster_db, 1, limit=2, cursor=first["next_cursor"])
+    third = RosterProgressService.get_roster(roster_db, 1, limit=2, cursor=second["next_cursor"])
+    assert [row["enrollment_id"] for row in second["items"]] == [3, 1]
+    assert [row["enrollment_id"] for row in third["items"]] == [5]
+    assert third["next_cursor"] is None
+
+    ascending = RosterProgressService.get_roster(roster_db, 1, limit=10, descending=False)
+    assert [row["enrollment_id"] for row in ascending["items"]] == [5, 1, 3, 2, 4]
+
+
+def test_roster_includes_course_quiz_average_and_latest_activity(roster_db):
+    rows = {row["user_id"]: row for row in RosterProgressService.get_roster(roster_db, 1, sort="enrollment")["items"]}
+
+    # Only course 1 submissions count; the 0.0 in course 2 would pull the average down
+    assert rows[2]["average_quiz_score"] == pytest.approx(0.7)
+    assert rows[2]["last_activity_at"] == NOW
+    assert rows[1]["average_quiz_score"] is None
+    assert rows[1]["last_activity_at"] == NOW - timedelta(days=1)
+
+
+def test_roster_rejects_bad_sort_and_cursor(roster_db):
+    with pytest.raises(ValueError):
+        RosterProgressService.get_roster(roster_db, 1, sort="name")
+    with pytest.raises(ValueError):
+        RosterProgressService.get_roster(roster_db, 1, cursor="not-a-cursor")
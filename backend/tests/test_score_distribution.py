@@ -0,0 +1,86 @@
+import random
+
+import pytest
+from sqlalchemy import create_engine, event, func, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.models.analytics import ScoreSketch
+from app.models.assessment import QuizSubmission
+from app.services import score_distribution_service
+from app.services.score_distribution_service import ScoreDistributionService
+from app.utils.tdigest import TDigest
+
+sketches = ScoreSketch.__table__
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for table in (sketches, QuizSubmission.__table__):
+        table.create(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def scores(n=2000, seed=3):
+    rng = random.Random(seed)
+    return [rng.betavariate(5, 2) for _ in range(n)]
+
+
+def test_sharded_digests_merge_to_the_same_percentiles(engine, monkeypatch):
+    monkeypatch.setattr(score_distribution_service, "SCORE_SKETCH_SHARDS", 8)
+    values = scores()
+    with Session(engine) as db:
+        for i, score in enumerate(values):
+            ScoreDistributionService.record_score(db, quiz_id=1 + i % 2, course_id=1, score=score)
+        db.commit()
+
+        shards = db.execute(
+            select(sketches.c.scope, sketches.c.scope_id, func.count(), func.sum(sketches.c.sample_count))
+            .group_by(sketches.c.scope, sketches.c.scope_id)
+        ).all()
+        assert sorted(shards) == [("course", 1, 8, 2000), ("quiz", 1, 8, 1000), ("quiz", 2, 8, 1000)]
+
+        exact = TDigest.from_values(values)
+        course = ScoreDistributionService.get_percentiles(db, "course", 1)
+        assert course["sample_count"] == 2000
+        for q, key in ((0.1, "p10"), (0.5, "p50"), (0.9, "p90")):
+            assert course["percentiles"][key] == pytest.approx(exact.quantile(q), abs=0.01)
+
+        quiz = ScoreDistributionService.get_digest(db, "quiz", 1)
+        assert len(quiz) == 1000
+        assert ScoreDistributionService.get_percentile_rank(db, 1, quiz.quantile(0.5)) == pytest.approx(50, abs=1)
+        assert ScoreDistributionService.get_percentiles(db, "quiz", 3)["sample_count"] == 0
+
+
+def test_grading_locks_one_shard_per_scope(engine, monkeypatch):
+    monkeypatch.setattr(score_distribution_service, "SCORE_SKETCH_SHARDS", 8)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+
+    with Session(engine) as db:
+        ScoreDistributionService.record_score(db, quiz_id=1, course_id=1, score=0.8)
+        db.commit()
+
+        # One shard row per scope is created and rewritten; the other course shards stay unlocked
+        assert len([statement for statement in statements if statement.lstrip().upper().startswith("UPDATE")]) == 2
+        rows = db.execute(select(sketches.c.scope, sketches.c.shard, sketches.c.sample_count)).all()
+        assert sorted(scope for scope, _, _ in rows) == ["course", "quiz"]
+        assert len({shard for _, shard, _ in rows}) == 1
+        assert {count for _, _, count in rows} == {1}
+
+
+def test_rebuild_collapses_quiz_shards(engine, monkeypatch):
+    monkeypatch.setattr(score_distribution_service, "SCORE_SKETCH_SHARDS", 8)
+    values = scores(300)
+    with Session(engine) as db:
+        db.execute(insert(QuizSubmission.__table__), [{"quiz_id": 1, "user_id": i, "score": score} for i, score in enumerate(values)])
+        for score in values[:100]:
+            ScoreDistributionService.record_score(db, quiz_id=1, course_id=1, score=score)
+        db.commit()
+
+        assert ScoreDistributionService.rebuild(db, 1) == 300
+
+        assert db.execute(select(sketches.c.shard, sketches.c.sample_count).where(sketches.c.scope == "quiz")).all() == [(0, 300)]
+        assert len(ScoreDistributionService.get_digest(db, "course", 1)) == 100
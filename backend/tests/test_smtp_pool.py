@@ -0,0 +1,135 @@
+import smtplib
+import threading
+import time
+
+from app.services.smtp_pool import SMTPConnectionPool, build_message
+
+
+class FakeSMTP:
+    """
+    Records handshakes and deliveries; failures are scripted per instance
+    """
+    instances = []
+    lock = threading.Lock()
+    fail_next = []
+    active = 0
+    max_active = 0
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = []
+        self.logins = 0
+        self.closed = False
+        with FakeSMTP.lock:
+            FakeSMTP.instances.append(self)
+            FakeSMTP.active += 1
+            FakeSMTP.max_active = max(FakeSMTP.max_active, FakeSMTP.active)
+
+    def ehlo(self):
+        pass
+
+    def starttls(self):
+        pass
+
+    def login(self, username, password):
+        self.logins += 1
+
+    def send_message(self, message):
+        with FakeSMTP.lock:
+            error = FakeSMTP.fail_next.pop(0) if FakeSMTP.fail_next else None
+        if error is not None:
+            raise error
+        time.sleep(0.001)
+        self.sent.append(message["To"])
+
+    def quit(self):
+        if not self.closed:
+            self.closed = True
+            with FakeSMTP.lock:
+                FakeSMTP.active -= 1
+
+    close = quit
+
+
+def make_pool(**kwargs):
+    FakeSMTP.instances = []
+    FakeSMTP.fail_next = []
+    FakeSMTP.active = 0
+    FakeSMTP.max_active = 0
+    options = dict(
+        host="smtp.test", port=587, username="mailer", password="siri", starttls=True,
+        max_connections=2, max_messages_per_connection=100, idle_timeout=60, concurrency=2,
+        smtp_factory=FakeSMTP
+    )
+    options.update(kwargs)
+    return SMTPConnectionPool(**options)
+
+
+def message(i):
+    return build_message(f"learner{i}@example.com", "Quiz reminder", f"Body {i}", from_email="noreply@example.com")
+
+
+def test_sequential_sends_reuse_one_authenticated_connection():
+    pool = make_pool()
+
+    assert all(pool.send(message(i)) for i in range(10))
+
+    assert pool.stats() == (1, 1)
+    assert len(FakeSMTP.instances) == 1
+    assert FakeSMTP.instances[0].logins == 1
+    assert len(FakeSMTP.instances[0].sent) == 10
+
+    pool.close()
+    assert pool.stats() == (1, 0)
+    assert FakeSMTP.instances[0].closed
+
+
+def test_dropped_connection_is_replaced_and_message_retried():
+    pool = make_pool()
+    pool.send(message(0))
+    FakeSMTP.fail_next = [smtplib.SMTPServerDisconnected("gone")]
+
+    assert pool.send(message(1))
+
+    stale, fresh = FakeSMTP.instances
+    assert stale.closed
+    assert fresh.sent == ["learner1@example.com"]
+    assert pool.stats() == (2, 1)
+
+
+def test_rejected_recipient_fails_without_dropping_the_connection():
+    pool = make_pool()
+    FakeSMTP.fail_next = [smtplib.SMTPRecipientsRefused({"bad@example.com": (550, b"No such user")})]
+
+    assert pool.send(message(0)) is False
+    assert pool.send(message(1))
+
+    assert pool.stats() == (1, 1)
+    assert FakeSMTP.instances[0].sent == ["learner1@example.com"]
+
+
+def test_connections_are_recycled_after_max_messages_and_idle_timeout():
+    pool = make_pool(max_messages_per_connection=3)
+    for i in range(7):
+        pool.send(message(i))
+    assert [len(smtp.sent) for smtp in FakeSMTP.instances] == [3, 3, 1]
+    assert [smtp.closed for smtp in FakeSMTP.instances] == [True, True, False]
+
+    pool = make_pool(idle_timeout=0)
+    pool.send(message(0))
+    pool.send(message(1))
+    assert pool.stats() == (2, 1)
+    assert FakeSMTP.instances[0].closed
+
+
+def test_send_many_keeps_order_and_bounds_open_connections():
+    pool = make_pool(max_connections=3, concurrency=8)
+    FakeSMTP.fail_next = [smtplib.SMTPDataError(554, b"Rejected")]
+
+    results = pool.send_many([message(i) for i in range(60)])
+
+    assert len(results) == 60
+    assert results.count(False) == 1
+    assert FakeSMTP.max_active <= 3
+    assert pool.connections_opened <= 3
+    assert sum(len(smtp.sent) for smtp in FakeSMTP.instances) == 59
+    assert pool.send_many([]) == []
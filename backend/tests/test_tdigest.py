@@ -0,0 +1,46 @@
+import random
+
+from app.utils.tdigest import TDigest
+
+
+def _sample(n=20000, seed=7):
+    rng = random.Random(seed)
+    return [rng.betavariate(5, 2) for _ in range(n)]
+
+
+def test_quantiles_track_exact_values():
+    """Median and tail percentiles stay close to the exact order statistics"""
+    values = _sample()
+    digest = TDigest.from_values(values)
+    ordered = sorted(values)
+
+    for q in (0.1, 0.5, 0.9):
+        exact = ordered[int(q * len(ordered))]
+        assert abs(digest.quantile(q) - exact) < 0.01
+
+
+def test_cdf_is_inverse_of_quantile():
+    digest = TDigest.from_values(_sample())
+    for q in (0.1, 0.5, 0.9):
+        assert abs(digest.cdf(digest.quantile(q)) - q) < 0.01
+    assert digest.cdf(-1) == 0.0
+    assert digest.cdf(2) == 1.0
+
+
+def test_merge_and_serialization():
+    """Merged and round-tripped digests agree with a digest built in one go"""
+    values = _sample()
+    left = TDigest.from_values(values[:10000])
+    right = TDigest.from_values(values[10000:])
+    left.merge(right)
+
+    restored = TDigest.from_bytes(left.to_bytes())
+    assert len(restored) == len(values)
+    assert abs(restored.quantile(0.5) - TDigest.from_values(values).quantile(0.5)) < 0.01
+    assert len(left.to_bytes()) < 4096
+
+
+def test_empty_digest():
+    digest = TDigest.from_bytes(TDigest().to_bytes())
+    assert digest.quantile(0.5) is None
+    assert digest.cdf(0.5) is None